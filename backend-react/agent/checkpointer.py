@@ -0,0 +1,559 @@
+"""
+Compact SQLite checkpointer for long-lived threads
+
+기본 체크포인터는 채널 값이 바뀔 때마다 채널 전체를 새 버전으로 저장합니다. messages 채널은
+매 단계 바뀌므로 체크포인트마다 지금까지의 모든 메시지(ToolMessage의 Markdown 헤더와
+들여쓴 JSON 포함)가 다시 저장되어, 긴 대화에서는 스레드당 저장량이 턴 수의 제곱으로 늘어납니다.
+
+CompactSqliteSaver는 로컬 SQLite 파일에 저장하며:
+- 메시지 델타: messages 채널은 메시지 하나씩 (스레드, 내용 해시) 키로 한 번만 저장하고,
+  체크포인트에는 메시지 해시 목록만 남김 (이미 저장된 메시지는 다시 쓰지 않음).
+  search_hits 채널(검색 결과 캐시, 최대 MAX_CACHED_HITS개)도 검색이 있을 때마다 전체가
+  다시 저장되므로 같은 방식으로 검색 결과 하나씩 저장
+- 압축: CHECKPOINT_COMPRESS_MIN_BYTES 이상인 값(큰 도구 결과 등)은 zstd로 압축
+  (zstandard 패키지가 없으면 zlib 사용, requirements.txt에 포함)
+
+저장 형식만 다르고 체크포인트 내용은 기본 체크포인터와 같습니다 (time travel, 대기 중
+쓰기 복구 동일). LangGraph API 서버는 자체 persistence를 사용하므로, 이 체크포인터는
+그래프를 직접 실행할 때(CHECKPOINT_DB 설정) 사용합니다. 비교: python benchmark_checkpointer.py
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_serializable_checkpoint_metadata,
+)
+
+try:
+    import zstandard
+except ImportError:  # zstandard가 없으면 zlib으로 압축
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 비어 있으면 체크포인터 없이 컴파일 (LangGraph API 서버가 persistence 제공)
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "")
+# 이 크기(바이트) 이상인 직렬화 값만 압축 (0이면 압축하지 않음)
+CHECKPOINT_COMPRESS_MIN_BYTES = int(os.getenv("CHECKPOINT_COMPRESS_MIN_BYTES", "1024"))
+CHECKPOINT_ZSTD_LEVEL = int(os.getenv("CHECKPOINT_ZSTD_LEVEL", "3"))
+
+# 항목 단위로 나눠 messages 테이블에 저장하는 리스트 채널 (리듀서가 기존 항목 객체를 유지하는 채널)
+MESSAGE_CHANNELS = ("messages", "search_hits")
+# 항목 해시 목록으로 저장된 채널 값의 직렬화 타입
+MESSAGE_REFS_TYPE = "message_refs"
+DIGEST_SIZE = 16
+# 항목 객체 → 해시 캐시를 유지할 최근 (스레드, 채널) 수 (같은 항목을 단계마다 다시 직렬화하지 않음)
+KNOWN_MESSAGE_THREADS = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    thread_id TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, digest)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    blob BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+def compression_codec() -> str:
+    """사용할 압축 방식 (zstandard 패키지가 있으면 zstd, 없으면 zlib)"""
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress_typed(typed: Tuple[str, bytes], min_bytes: int = CHECKPOINT_COMPRESS_MIN_BYTES) -> Tuple[str, bytes]:
+    """
+    직렬화된 값이 min_bytes 이상이면 압축하고 타입에 압축 방식을 붙입니다.
+
+    압축해도 작아지지 않으면 원본을 그대로 반환합니다.
+    """
+    type_, data = typed
+    if min_bytes <= 0 or len(data) < min_bytes:
+        return typed
+    if zstandard is not None:
+        compressed = zstandard.ZstdCompressor(level=CHECKPOINT_ZSTD_LEVEL).compress(data)
+    else:
+        compressed = zlib.compress(data, 6)
+    if len(compressed) >= len(data):
+        return typed
+    return f"{type_}+{compression_codec()}", compressed
+
+
+def decompress_typed(typed: Tuple[str, bytes]) -> Tuple[str, bytes]:
+    """compress_typed로 압축된 값을 원래 (타입, 바이트)로 되돌립니다."""
+    type_, data = typed
+    base, _, codec = type_.rpartition("+")
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 체크포인트를 읽으려면 zstandard 패키지가 필요합니다")
+        return base, zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return base, zlib.decompress(data)
+    return typed
+
+
+def message_digest(typed: Tuple[str, bytes]) -> str:
+    """직렬화된 메시지(또는 검색 결과)의 내용 해시 (같은 ID라도 내용이 바뀌면 다른 해시)"""
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    hasher.update(typed[0].encode())
+    hasher.update(b"\0")
+    hasher.update(typed[1])
+    return hasher.hexdigest()
+
+
+class CompactSqliteSaver(BaseCheckpointSaver[str]):
+    """
+    메시지 델타와 압축으로 저장하는 SQLite 체크포인터
+
+    Args:
+        path: SQLite 파일 경로 (":memory:"면 메모리 DB)
+        delta_messages: messages / search_hits 채널을 항목 단위로 한 번만 저장 (False면 채널 전체 저장)
+        compress_min_bytes: 이 크기 이상인 값만 압축 (0이면 압축하지 않음)
+
+    delta_messages=False, compress_min_bytes=0이면 기본 체크포인터와 같은 방식
+    (채널 버전마다 전체 값 저장)으로 동작하며 벤치마크 기준선으로 사용합니다.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB or "checkpoints.sqlite",
+        *,
+        delta_messages: bool = True,
+        compress_min_bytes: int = CHECKPOINT_COMPRESS_MIN_BYTES,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.delta_messages = delta_messages
+        self.compress_min_bytes = compress_min_bytes
+        directory = os.path.dirname(path) if path != ":memory:" else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # 노드 스레드와 이벤트 루프가 같은 연결을 쓰므로 모든 접근을 잠금으로 직렬화
+        self.lock = threading.Lock()
+        # (스레드, 채널) → {id(항목 객체): (항목 객체, 해시)} (마지막으로 저장한 채널 값 기준)
+        self._known_messages: "OrderedDict[Tuple[str, str], Dict[int, Tuple[Any, str]]]" = OrderedDict()
+        with self.lock:
+            if path != ":memory:":
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+    # --- 직렬화 ---
+
+    def _dump(self, value: Any) -> Tuple[str, bytes]:
+        return compress_typed(self.serde.dumps_typed(value), self.compress_min_bytes)
+
+    def _load(self, type_: str, data: bytes) -> Any:
+        return self.serde.loads_typed(decompress_typed((type_, data)))
+
+    def _dump_channel(self, thread_id: str, channel: str, value: Any) -> Tuple[str, bytes]:
+        """채널 값을 직렬화합니다. 델타 채널은 새 항목만 저장하고 해시 목록을 반환합니다."""
+        if not (self.delta_messages and channel in MESSAGE_CHANNELS and isinstance(value, list)):
+            return self._dump(value)
+        key = (thread_id, channel)
+        known = self._known_messages.get(key, {})
+        current = {}
+        serialized = {}
+        digests = []
+        for message in value:
+            # 이전 체크포인트에서 저장한 같은 항목 객체는 다시 직렬화하지 않음
+            entry = known.get(id(message))
+            if entry is not None and entry[0] is message:
+                digest = entry[1]
+            else:
+                typed = self.serde.dumps_typed(message)
+                digest = message_digest(typed)
+                serialized[digest] = typed
+            digests.append(digest)
+            current[id(message)] = (message, digest)
+        if serialized:
+            # 이미 저장된 항목(같은 스레드, 같은 내용)은 압축/저장하지 않음
+            stored = self._stored_digests(thread_id, list(serialized))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO messages (thread_id, digest, type, blob) VALUES (?, ?, ?, ?)",
+                [
+                    (thread_id, digest, *compress_typed(typed, self.compress_min_bytes))
+                    for digest, typed in serialized.items()
+                    if digest not in stored
+                ],
+            )
+        self._known_messages[key] = current
+        self._known_messages.move_to_end(key)
+        while len(self._known_messages) > KNOWN_MESSAGE_THREADS:
+            self._known_messages.popitem(last=False)
+        # 항목 해시(16바이트)를 이어 붙여 저장
+        return MESSAGE_REFS_TYPE, b"".join(bytes.fromhex(digest) for digest in digests)
+
+    def _select_messages(self, columns: str, thread_id: str, digests: List[str]) -> List[tuple]:
+        rows = []
+        # SQLite 변수 개수 제한을 넘지 않도록 나눠 조회
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(self.conn.execute(
+                f"SELECT {columns} FROM messages WHERE thread_id = ? AND digest IN ({placeholders})",
+                (thread_id, *chunk),
+            ))
+        return rows
+
+    def _stored_digests(self, thread_id: str, digests: List[str]) -> set:
+        return {row[0] for row in self._select_messages("digest", thread_id, digests)}
+
+    def _load_channel_values(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            row = self.conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            if row[0] == MESSAGE_REFS_TYPE:
+                values[channel] = self._load_messages(
+                    thread_id, [row[1][i:i + DIGEST_SIZE].hex() for i in range(0, len(row[1]), DIGEST_SIZE)]
+                )
+            else:
+                values[channel] = self._load(*row)
+        return values
+
+    def _load_messages(self, thread_id: str, digests: List[str]) -> List[Any]:
+        stored = {
+            digest: (type_, data)
+            for digest, type_, data in self._select_messages(
+                "digest, type, blob", thread_id, list(dict.fromkeys(digests))
+            )
+        }
+        return [self._load(*stored[digest]) for digest in digests]
+
+    def _pending_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self.conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self._load(type_, data)) for task_id, channel, type_, data in rows]
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint_data, metadata_data = row
+        checkpoint = self._load(type_, checkpoint_data)
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_channel_values(
+                    thread_id, checkpoint_ns, checkpoint["channel_versions"]
+                ),
+            },
+            metadata=json.loads(metadata_data),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=self._pending_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    # --- BaseCheckpointSaver ---
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: Tuple[Any, ...] = (thread_id, checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self.lock:
+            row = self.conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata "
+            "FROM checkpoints"
+        )
+        conditions = []
+        params: List[Any] = []
+        if config is not None:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            if filter:
+                metadata = json.loads(row[-1])
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            with self.lock:
+                item = self._to_tuple(thread_id, checkpoint_ns, tuple(row))
+            if limit is not None:
+                limit -= 1
+            yield item
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+        metadata_data = json.dumps(get_serializable_checkpoint_metadata(config, metadata), ensure_ascii=False)
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                # 이번 단계에서 바뀐 채널만 새 버전으로 저장
+                for channel, version in new_versions.items():
+                    type_, data = (
+                        self._dump_channel(thread_id, channel, values[channel])
+                        if channel in values
+                        else ("empty", b"")
+                    )
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, type, blob) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (thread_id, checkpoint_ns, channel, str(version), type_, data),
+                    )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints "
+                    "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint["id"],
+                        config["configurable"].get("checkpoint_id"),
+                        *self._dump(stored),
+                        metadata_data,
+                    ),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                # 롤백된 항목이 저장된 것으로 캐시되지 않도록 비움
+                self._forget_thread(thread_id)
+                raise
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # 특수 채널(오류/인터럽트 등)은 항상 최신 값으로 교체, 일반 쓰기는 처음 값 유지
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = [
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self._dump(value),
+                task_path,
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self.lock:
+            self.conn.executemany(
+                f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, blob, task_path) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _forget_thread(self, thread_id: str) -> None:
+        for key in [key for key in self._known_messages if key[0] == thread_id]:
+            del self._known_messages[key]
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self.lock:
+            self._forget_thread(thread_id)
+            for table in ("checkpoints", "blobs", "messages", "writes"):
+                self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- 통계 ---
+
+    def thread_bytes(self, thread_id: str) -> Dict[str, int]:
+        """스레드 하나가 테이블별로 차지하는 저장 바이트 (값 + 키 컬럼 길이)"""
+        sizes = {}
+        columns = {
+            "checkpoints": "length(checkpoint) + length(metadata) + length(checkpoint_id)",
+            "blobs": "length(blob) + length(channel) + length(version)",
+            "messages": "length(blob) + length(digest)",
+            "writes": "length(blob) + length(channel) + length(task_id) + length(task_path)",
+        }
+        with self.lock:
+            for table, expression in columns.items():
+                (total,) = self.conn.execute(
+                    f"SELECT COALESCE(SUM({expression}), 0) FROM {table} WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+                sizes[table] = int(total)
+        sizes["total"] = sum(sizes.values())
+        return sizes
+
+
+def build_checkpointer() -> Optional[CompactSqliteSaver]:
+    """CHECKPOINT_DB가 설정되어 있으면 그 파일을 쓰는 체크포인터를 반환합니다."""
+    if not CHECKPOINT_DB:
+        return None
+    if zstandard is None:
+        logger.warning("⚠️ zstandard not installed, compressing checkpoints with zlib (pip install zstandard)")
+    logger.info("💾 Compact SQLite checkpointer: %s (compression: %s)", CHECKPOINT_DB, compression_codec())
+    return CompactSqliteSaver(CHECKPOINT_DB)
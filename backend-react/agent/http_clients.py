@@ -0,0 +1,180 @@
+"""
+Process-wide HTTP clients for LLM calls
+
+노드별 ChatOpenAI가 각자 기본 설정의 HTTP 클라이언트를 만들지 않도록 프로세스 전체에서
+동기/비동기 httpx 클라이언트를 하나씩 공유합니다.
+
+- 연결 풀 크기 / keep-alive 유지 시간 / 연결·읽기 타임아웃을 환경 변수로 설정
+- HTTP/2는 h2 패키지가 설치되어 있을 때만 사용 (한 연결에서 요청 다중화)
+- 재시도: 연결 실패는 httpx 전송 계층이, 429/5xx 응답은 OpenAI SDK(max_retries)가 재시도
+- 연결 재사용 통계: 요청 수 대비 새로 연결한 횟수를 httpcore trace 이벤트로 집계
+- 스트리밍 응답 재사용: OpenAI SDK의 동기 스트림은 SSE의 [DONE]을 받으면 응답 끝(청크 종료
+  표시)을 읽지 않고 닫기 때문에 연결이 풀로 돌아가지 않고 버려집니다. [DONE]을 이미 받은
+  응답은 닫기 전에 남은 바이트를 읽어 연결을 재사용합니다 (중간에 중단한 스트림은 그대로
+  끊음, 비동기 스트림은 SDK가 직접 처리).
+"""
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_S", "30"))
+LLM_HTTP_CONNECT_TIMEOUT_S = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT_S", "5"))
+# 읽기 타임아웃 기본값 (노드별 timeout_s가 있으면 요청마다 그 값을 사용)
+LLM_HTTP_READ_TIMEOUT_S = float(os.getenv("LLM_HTTP_READ_TIMEOUT_S", "60"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+# 연결 수립 실패(ConnectError/ConnectTimeout) 재시도 횟수
+LLM_HTTP_CONNECT_RETRIES = int(os.getenv("LLM_HTTP_CONNECT_RETRIES", "1"))
+# 429/5xx/연결 끊김 응답 재시도 횟수 (OpenAI SDK 지수 백오프)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+
+def http2_available() -> bool:
+    """HTTP/2 사용 가능 여부 (LLM_HTTP2=true이고 h2 패키지가 있을 때)"""
+    if not LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ConnectionStats:
+    """
+    공유 클라이언트의 연결 재사용 통계
+
+    요청마다 httpcore trace 콜백을 붙여 새 TCP 연결과 TLS 핸드셰이크를 셉니다.
+    새 연결 없이 보낸 요청은 풀의 연결을 재사용한 것입니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "new_connections": 0, "tls_handshakes": 0, "http2_requests": 0}
+
+    def _count(self, event: str) -> None:
+        key = {
+            "connection.connect_tcp.complete": "new_connections",
+            "connection.start_tls.complete": "tls_handshakes",
+            "http2.send_request_headers.started": "http2_requests",
+        }.get(event)
+        if key:
+            with self._lock:
+                self.stats[key] += 1
+
+    def trace(self, event: str, info: Dict[str, Any]) -> None:
+        self._count(event)
+
+    async def atrace(self, event: str, info: Dict[str, Any]) -> None:
+        self._count(event)
+
+    def on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+        request.extensions["trace"] = self.trace
+
+    async def aon_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+        request.extensions["trace"] = self.atrace
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        reused = max(0, stats["requests"] - stats["new_connections"])
+        return {
+            **stats,
+            "reused": reused,
+            "reuse_rate": round(reused / stats["requests"], 3) if stats["requests"] else None,
+        }
+
+
+connection_stats = ConnectionStats()
+
+# SSE 스트림 종료 표시 (이 뒤에는 청크 종료 표시만 남음)
+SSE_DONE = b"data: [DONE]"
+
+
+class _DrainingStream(httpx.SyncByteStream):
+    """[DONE]까지 받은 SSE 응답은 닫을 때 나머지를 읽어 연결을 풀로 돌려보냅니다."""
+
+    def __init__(self, stream: httpx.SyncByteStream):
+        self._stream = stream
+        self._tail = b""
+        self._finished = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._tail = (self._tail + chunk)[-64:]
+            yield chunk
+        self._finished = True
+
+    def close(self) -> None:
+        if SSE_DONE in self._tail and not self._finished:
+            try:
+                for _ in self._stream:
+                    pass
+            except httpx.HTTPError:
+                pass
+        self._stream.close()
+
+
+class ReusingTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            response.stream = _DrainingStream(response.stream)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def request_timeout(read_timeout_s: Optional[float] = None) -> httpx.Timeout:
+    """연결 타임아웃은 공통 설정, 읽기 타임아웃은 노드 설정을 쓰는 요청 타임아웃"""
+    return httpx.Timeout(read_timeout_s or LLM_HTTP_READ_TIMEOUT_S, connect=LLM_HTTP_CONNECT_TIMEOUT_S)
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY_S,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """프로세스 전체에서 공유하는 동기 httpx 클라이언트"""
+    http2 = http2_available()
+    logger.info(
+        "🌐 Shared LLM HTTP client - max connections: %d, keep-alive: %d (%.0fs), http2: %s, connect retries: %d",
+        LLM_HTTP_MAX_CONNECTIONS, LLM_HTTP_MAX_KEEPALIVE, LLM_HTTP_KEEPALIVE_EXPIRY_S, http2, LLM_HTTP_CONNECT_RETRIES,
+    )
+    return httpx.Client(
+        timeout=request_timeout(),
+        transport=ReusingTransport(
+            httpx.HTTPTransport(limits=_pool_limits(), http2=http2, retries=LLM_HTTP_CONNECT_RETRIES)
+        ),
+        event_hooks={"request": [connection_stats.on_request]},
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """프로세스 전체에서 공유하는 비동기 httpx 클라이언트"""
+    return httpx.AsyncClient(
+        timeout=request_timeout(),
+        transport=httpx.AsyncHTTPTransport(limits=_pool_limits(), http2=http2_available(), retries=LLM_HTTP_CONNECT_RETRIES),
+        event_hooks={"request": [connection_stats.aon_request]},
+    )
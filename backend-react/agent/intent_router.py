@@ -0,0 +1,268 @@
+"""
+Rule-based intent router for explicit search commands
+
+"K5 브레이크 문제 검색해줘"처럼 검색 대상이 분명한 명령은 LLM 계획 단계(Thinking +
+도구 호출 생성) 없이 바로 elasticsearch_search 호출을 만듭니다.
+
+- 엔티티 사전: 인덱스에서 직접 읽습니다 (es_indices.json의 router_vocabulary 설정 -
+  키워드 필드는 terms 집계, 텍스트 필드는 문서 표본의 단어). 인덱스 설명(display_name,
+  description)의 단어도 포함합니다. 사전은 웜업 때 읽고, INTENT_ROUTER_VOCAB_TTL_S가 지나면
+  요청 경로를 막지 않도록 백그라운드에서 다시 읽습니다 (검색 도구의 circuit breaker 사용).
+  차종 한글 이름 별칭(tools/vehicle_catalog.MODEL_ALIASES)만 인덱스에 없는 값이라 코드에 둡니다.
+- 검색 명령어가 있고, 정확히 하나의 인덱스에만 엔티티가 일치할 때만 라우팅합니다.
+  그 밖의 경우(질문형, 이전 결과 후속 질문, 인덱스 모호 등)는 None을 반환해 LLM이 계획합니다.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from tools.bm25_engine import TOKEN_PATTERN, tokenize
+from tools.elasticsearch_tool import ElasticsearchConfig, search_guard
+from tools.vehicle_catalog import MODEL_ALIASES
+
+logger = logging.getLogger(__name__)
+
+# 명시적 검색 명령 (문장 끝)
+COMMAND_PATTERN = re.compile(
+    r"\s*(?:을|를|에\s*대해서?|관련(?:된)?|좀)?\s*(?:검색|찾아|조회|보여)\s*(?:해|하여)?\s*"
+    r"(?:줘|주세요|줄래|봐|봐줘|봐주세요)?\s*[.!~]*\s*$"
+)
+
+# 이전 결과를 가리키는 표현 (refine_search_results 대상일 수 있으므로 LLM에 맡김)
+FOLLOW_UP_PATTERN = re.compile(r"그\s*중|이\s*중|위\s*결과|이전|방금|아까|결과에서|정렬|필터|다시")
+
+# 인덱스 설명에서 키워드로 쓰지 않을 일반 단어
+GENERIC_TOKENS = {"관련", "정보", "및", "일반", "참고", "자료"}
+
+# 인덱스에서 읽은 엔티티 사전을 유지할 시간 (읽기 실패 시 짧게 두고 다시 시도)
+VOCABULARY_TTL_S = int(os.getenv("INTENT_ROUTER_VOCAB_TTL_S", "3600"))
+VOCABULARY_FAILURE_TTL_S = 60
+
+
+class IntentRouter:
+    """엔티티 사전 기반 검색 명령 라우터"""
+
+    def __init__(self, index_configs: Dict[str, dict], vocabularies: Dict[str, Set[str]], aliases: Dict[str, str]):
+        self.index_configs = index_configs
+        self.aliases = {alias.lower(): value for alias, value in aliases.items()}
+        # 인덱스별 키워드 = 데이터 사전 + 인덱스 표시 이름/설명
+        self.vocabularies: Dict[str, Set[str]] = {}
+        for index_name, index_config in index_configs.items():
+            description = f"{index_config.get('display_name', '')} {index_config.get('description', '')}"
+            keywords = {token for token in tokenize(description) if token not in GENERIC_TOKENS}
+            self.vocabularies[index_name] = keywords | {term.lower() for term in vocabularies.get(index_name, set())}
+
+    def route(self, text: str, has_cached_hits: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        사용자 메시지를 검색 호출로 변환합니다.
+
+        Args:
+            text: 사용자 메시지
+            has_cached_hits: 이전 검색 결과가 상태에 있는지 여부
+
+        Returns:
+            {"index", "query", "matched"} 또는 None (LLM 계획 필요)
+        """
+        command = COMMAND_PATTERN.search(text)
+        if not command:
+            return None
+        query = text[:command.start()].strip()
+        if not query or "?" in query:
+            return None
+        if has_cached_hits and FOLLOW_UP_PATTERN.search(query):
+            return None
+
+        # 차종명은 데이터의 차종 값(대소문자, 한글 별칭 포함)으로 바꿔 검색
+        tokens = [self.aliases.get(token.lower(), token) for token in TOKEN_PATTERN.findall(query)]
+        matches = {
+            index_name: [token for token in tokens if token.lower() in vocabulary]
+            for index_name, vocabulary in self.vocabularies.items()
+        }
+        matched_indices = [index_name for index_name, matched in matches.items() if matched]
+        if len(matched_indices) != 1:
+            return None
+
+        index = matched_indices[0]
+        return {
+            "index": index,
+            "query": " ".join(tokens),
+            "matched": matches[index],
+        }
+
+    def thinking_text(self, decision: Dict[str, Any]) -> str:
+        """라우팅 결과에 대한 Thinking 메시지를 만듭니다."""
+        display_name = self.index_configs.get(decision["index"], {}).get("display_name", decision["index"])
+        return (
+            "### 🤔 Thinking\n"
+            f"'{decision['query']}' 키워드로 {display_name}({decision['index']}) 인덱스를 검색하겠습니다."
+        )
+
+
+def build_aliases(keyword_values: Set[str]) -> Dict[str, str]:
+    """별칭(소문자, 차종 한글 이름) → 데이터의 키워드 값"""
+    aliases = {value.lower(): value for value in keyword_values}
+    aliases.update(MODEL_ALIASES)
+    return aliases
+
+
+def vocabulary_query(vocabulary_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    엔티티 사전을 읽는 검색 요청 본문을 만듭니다.
+
+    Args:
+        vocabulary_config: es_indices.json의 router_vocabulary 설정
+            (terms_fields: terms 집계할 키워드 필드, text_fields: 표본 문서에서 단어를 뽑을 필드,
+            size: 필드별 집계 값 수 및 표본 문서 수)
+    """
+    terms_fields = vocabulary_config.get("terms_fields", [])
+    text_fields = vocabulary_config.get("text_fields", [])
+    size = vocabulary_config.get("size", 500)
+    body: Dict[str, Any] = {
+        "size": size if text_fields else 0,
+        "query": {"match_all": {}},
+        "_source": text_fields,
+    }
+    if terms_fields:
+        body["aggs"] = {field: {"terms": {"field": field, "size": size}} for field in terms_fields}
+    return body
+
+
+def parse_vocabulary(response: Dict[str, Any], vocabulary_config: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+    """
+    사전 검색 응답에서 (키워드 필드 값, 텍스트 필드 단어)를 꺼냅니다.
+    """
+    values: Set[str] = set()
+    for field in vocabulary_config.get("terms_fields", []):
+        for bucket in response.get("aggregations", {}).get(field, {}).get("buckets", []):
+            values.add(str(bucket["key"]))
+    words: Set[str] = set()
+    for hit in response["hits"]["hits"]:
+        for field in vocabulary_config.get("text_fields", []):
+            words.update(token for token in tokenize(hit["_source"].get(field)) if len(token) >= 2)
+    return values, words
+
+
+def build_router(config: ElasticsearchConfig) -> Tuple[IntentRouter, List[str]]:
+    """
+    인덱스에서 사전을 읽어 라우터를 만듭니다.
+
+    검색 도구와 같은 circuit breaker(search_guard)를 거치므로 Elasticsearch 장애 시
+    요청을 보내지 않고 이전 응답(stale)이나 폴백 엔진의 사전을 사용합니다.
+
+    Returns:
+        (라우터, 사전을 인덱스에서 새로 읽지 못한 인덱스별 오류)
+    """
+    es_client = config.get_client()
+    fallback_client = config.get_fallback_client()
+    vocabularies: Dict[str, Set[str]] = {}
+    keyword_values: Set[str] = set()
+    errors: List[str] = []
+    for index_name, index_config in config.index_configs.items():
+        vocabulary_config = index_config.get("router_vocabulary")
+        if not vocabulary_config:
+            continue
+        body = vocabulary_query(vocabulary_config)
+        try:
+            if config.resilience:
+                response, degraded = search_guard.call(
+                    ("router_vocabulary", index_name),
+                    lambda timeout: es_client.options(request_timeout=timeout, max_retries=0).search(index=index_name, body=body),
+                    hedge=False,
+                    fallback=(lambda: fallback_client.search(index=index_name, body=body)) if fallback_client else None,
+                )
+                if degraded:
+                    errors.append(f"{index_name}: served {degraded} vocabulary")
+            else:
+                response = es_client.search(index=index_name, body=body)
+        except Exception as e:
+            # 사전 없이 인덱스 설명 단어만 사용
+            logger.warning(f"⚠️ Intent router vocabulary unavailable for '{index_name}': {e}")
+            errors.append(f"{index_name}: {e}")
+            continue
+        values, words = parse_vocabulary(response, vocabulary_config)
+        vocabularies[index_name] = values | words
+        keyword_values |= values
+    return IntentRouter(config.index_configs, vocabularies, build_aliases(keyword_values)), errors
+
+
+def _backend_key() -> tuple:
+    """라우터를 만든 검색 백엔드 설정 (바뀌면 사전을 다시 읽음)"""
+    return (os.getenv("SEARCH_BACKEND", "elasticsearch").lower(), os.getenv("ELASTICSEARCH_URL"), os.getenv("SEARCH_FALLBACK"))
+
+
+_router: Optional[IntentRouter] = None
+# (만료 시각, 라우터를 만든 검색 백엔드 설정, 진행 중인 백그라운드 갱신)
+_router_expires = 0.0
+_router_backend: Optional[tuple] = None
+_refresh_thread: Optional[threading.Thread] = None
+_router_lock = threading.Lock()
+
+
+def refresh_intent_router() -> Dict[str, Any]:
+    """
+    인덱스에서 사전을 다시 읽어 공유 라우터를 교체합니다 (웜업과 백그라운드 갱신에서 호출).
+
+    같은 백엔드에서 갱신이 실패하면 마지막 라우터를 계속 사용합니다.
+
+    Returns:
+        {"vocabulary": 인덱스별 사전 크기, "errors": 사전을 새로 읽지 못한 인덱스별 오류}
+        (INTENT_ROUTER=false이면 {"enabled": False})
+    """
+    global _router, _router_expires, _router_backend
+    if os.getenv("INTENT_ROUTER", "true").lower() != "true":
+        return {"enabled": False}
+    backend = _backend_key()
+    try:
+        router, errors = build_router(ElasticsearchConfig())
+        logger.info("🧭 Intent router ready - vocabulary: %s", ", ".join(f"{k}({len(v)})" for k, v in router.vocabularies.items()))
+    except Exception as e:
+        logger.warning(f"⚠️ Intent router unavailable, using LLM planner only: {e}")
+        router, errors = None, [str(e)]
+    with _router_lock:
+        if router is not None or backend != _router_backend:
+            _router = router
+        _router_backend = backend
+        _router_expires = time.time() + (VOCABULARY_FAILURE_TTL_S if errors else VOCABULARY_TTL_S)
+        current = _router
+    vocabulary = {name: len(terms) for name, terms in current.vocabularies.items()} if current else {}
+    return {"vocabulary": vocabulary, "errors": errors}
+
+
+def _refresh_in_background() -> None:
+    global _refresh_thread
+    try:
+        refresh_intent_router()
+    finally:
+        with _router_lock:
+            _refresh_thread = None
+
+
+def get_intent_router() -> Optional[IntentRouter]:
+    """
+    공유 라우터를 반환합니다 (INTENT_ROUTER=false이거나 아직 준비되지 않았으면 None).
+
+    요청 경로에서는 사전을 읽지 않습니다. 만료되었거나 검색 백엔드가 바뀌었으면
+    백그라운드 갱신을 시작하고, 끝날 때까지 마지막 라우터(백엔드가 바뀌었으면 None)를 반환합니다.
+    """
+    global _refresh_thread
+    if os.getenv("INTENT_ROUTER", "true").lower() != "true":
+        return None
+    backend = _backend_key()
+    with _router_lock:
+        router = _router if backend == _router_backend else None
+        if (time.time() >= _router_expires or backend != _router_backend) and _refresh_thread is None:
+            _refresh_thread = threading.Thread(target=_refresh_in_background, name="intent-router-refresh", daemon=True)
+            _refresh_thread.start()
+    return router
+
+
+def message_text(message: Any) -> str:
+    """메시지 내용을 문자열로 반환합니다 (멀티모달 content는 텍스트 부분만)."""
+    content = getattr(message, "content", "")
+    if isinstance(content, str):
+        return content
+    parts: List[str] = [part.get("text", "") for part in content if isinstance(part, dict)]
+    return " ".join(parts)
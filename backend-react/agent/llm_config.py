@@ -0,0 +1,115 @@
+"""
+Per-node LLM configuration
+
+그래프의 LLM 호출 단계(노드)별로 모델과 생성 제한을 설정합니다.
+
+- thinking: 검색 계획 (1-2문장)
+- tool_call: 도구 호출 생성
+- answer: 최종 답변
+- followups: 후속 질문 제안 (답변과 병렬 실행)
+
+설정 우선순위: 환경 변수(LLM_<NODE>_MODEL 등) > config/llm_nodes.json > 기본값
+
+streaming=false인 노드는 응답을 한 번에 받습니다 (토큰 스트림 없음, 호출 중에는
+취소/마감 시각으로 중단할 수 없고 호출 전후에만 확인).
+"""
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Optional
+
+from langchain_openai import ChatOpenAI
+
+from agent.http_clients import LLM_MAX_RETRIES, get_async_http_client, get_http_client, request_timeout
+
+logger = logging.getLogger(__name__)
+
+LLM_NODES = ("thinking", "tool_call", "answer", "followups")
+
+DEFAULT_NODE_CONFIG = {
+    "model": "gpt-4o-mini",
+    "max_tokens": None,
+    "timeout_s": 60,
+    "streaming": True,
+}
+
+
+def _parse_env_value(key: str, value: str) -> Any:
+    """환경 변수 값을 설정 타입으로 변환합니다."""
+    if key == "streaming":
+        return value.lower() == "true"
+    if key == "max_tokens":
+        return int(value) if value else None
+    if key == "timeout_s":
+        return float(value)
+    return value
+
+
+def load_node_configs(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    노드별 LLM 설정을 읽습니다.
+
+    Returns:
+        {노드 이름: {"model", "max_tokens", "timeout_s", "streaming"}}
+    """
+    path = path or os.getenv("LLM_CONFIG_FILE", "config/llm_nodes.json")
+    file_configs: Dict[str, dict] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            file_configs = json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"⚠️ LLM node config file not found: {path}, using defaults")
+    except json.JSONDecodeError as e:
+        logger.error(f"❌ Invalid JSON in LLM node config: {e}")
+
+    # LLM_MODEL은 노드별 모델이 지정되지 않았을 때의 공통 기본 모델
+    base = {**DEFAULT_NODE_CONFIG, "model": os.getenv("LLM_MODEL", DEFAULT_NODE_CONFIG["model"])}
+    configs = {}
+    for node in LLM_NODES:
+        node_config = {**base, **file_configs.get(node, {})}
+        for key in DEFAULT_NODE_CONFIG:
+            env_value = os.getenv(f"LLM_{node.upper()}_{key.upper()}")
+            if env_value is not None:
+                node_config[key] = _parse_env_value(key, env_value)
+        configs[node] = node_config
+    return configs
+
+
+def build_chat_model(node_config: Dict[str, Any]) -> ChatOpenAI:
+    """노드 설정으로 ChatOpenAI 인스턴스를 만듭니다 (HTTP 클라이언트는 모든 노드가 공유)."""
+    return ChatOpenAI(
+        model=node_config["model"],
+        temperature=0,
+        max_tokens=node_config.get("max_tokens"),
+        timeout=request_timeout(node_config.get("timeout_s")),
+        max_retries=LLM_MAX_RETRIES,
+        streaming=node_config.get("streaming", True),
+        # 스트림 끝에 사용량을 받아 정확한 출력 토큰 수로 생성 속도 계산
+        stream_usage=True,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+
+def build_node_llms(
+    factory: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+    configs: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    노드별 LLM을 만듭니다.
+
+    Args:
+        factory: (노드 이름, 노드 설정) → 채팅 모델 (미지정 시 ChatOpenAI, 벤치마크에서 가짜 모델 주입)
+        configs: 노드별 설정 (미지정 시 load_node_configs())
+
+    Returns:
+        {노드 이름: 채팅 모델}
+    """
+    configs = configs or load_node_configs()
+    factory = factory or (lambda node, node_config: build_chat_model(node_config))
+    llms = {node: factory(node, node_config) for node, node_config in configs.items()}
+    logger.info("🤖 LLM nodes: " + ", ".join(
+        f"{node}={config['model']}(max_tokens={config['max_tokens']}, timeout={config['timeout_s']}s)"
+        for node, config in configs.items()
+    ))
+    return llms
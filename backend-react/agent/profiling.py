@@ -0,0 +1,146 @@
+"""
+Opt-in per-run profiling of graph nodes
+
+느린 턴에서 시간이 어디에 쓰였는지(LLM I/O, Elasticsearch I/O, JSON, 로깅, 토큰 계산) 보기 위해
+노드 실행을 cProfile(결정적 프로파일러)로 감싸고 실행별 pstats 파일을 남깁니다.
+
+- 켜기: PROFILE_RUNS=true (모든 실행) 또는 실행 설정 configurable.profile=true (해당 실행만)
+- 출력: PROFILE_DIR/<run_id>/<시각 ns>-<노드>.prof (노드 호출마다 한 파일)
+- 집계: python profile_report.py (여러 실행의 상위 hotspot과 카테고리별 시간)
+
+프로파일러는 노드를 실행하는 스레드만 측정합니다. 검색 요청이 hedge/취소 대기를 위해 풀
+스레드에서 실행되면 그 시간은 tools/resilience.py의 대기 시간으로 나타납니다.
+"""
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from tools.logging_config import current_run_context
+
+logger = logging.getLogger(__name__)
+
+PROFILE_RUNS = os.getenv("PROFILE_RUNS", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".profiles")
+
+# 카테고리 → 함수가 정의된 파일 경로 패턴 (내장 함수는 이름으로 매칭)
+PROFILE_CATEGORIES = {
+    "llm_io": re.compile(r"[/\\](openai|httpx|httpcore)[/\\]"),
+    "es_io": re.compile(r"[/\\](elasticsearch|elastic_transport|urllib3)[/\\]|tools[/\\]resilience\.py"),
+    "json": re.compile(r"[/\\]json[/\\]|_json\."),
+    "logging": re.compile(r"[/\\]logging[/\\]|tools[/\\]logging_config\.py"),
+    "tokenizer": re.compile(r"[/\\]tiktoken[/\\]|tools[/\\]token_budget\.py"),
+    "embedded_search": re.compile(r"tools[/\\]bm25_engine\.py"),
+}
+
+
+def profiling_requested() -> bool:
+    """현재 실행을 프로파일링할지 (PROFILE_RUNS 또는 실행 설정의 profile 플래그)"""
+    if PROFILE_RUNS:
+        return True
+    try:
+        from langgraph.config import get_config
+
+        config = get_config()
+    except Exception:
+        return False
+    configurable = config.get("configurable") or {}
+    metadata = config.get("metadata") or {}
+    value = configurable.get("profile", metadata.get("profile"))
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def profile_path(run_id: str, node: str) -> str:
+    return os.path.join(PROFILE_DIR, run_id, f"{time.time_ns()}-{node}.prof")
+
+
+def profiled(func):
+    """
+    노드 함수를 프로파일링 가능한 노드로 감쌉니다 (꺼져 있으면 플래그 확인만 추가).
+
+    cancellable로 감싸기 전에 적용해야 비동기 실행에서도 노드가 실행되는 스레드를 측정합니다.
+    """
+    @functools.wraps(func)
+    def wrapper(state):
+        if not profiling_requested():
+            return func(state)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Python 3.12+는 프로세스에 프로파일러 하나만 허용 (병렬 노드가 이미 측정 중)
+            logger.warning(f"⚠️ Skipping profile for {func.__name__}: {e}")
+            return func(state)
+        try:
+            return func(state)
+        finally:
+            profiler.disable()
+            context = current_run_context()
+            path = profile_path(context.get("run_id", "no-run-id"), context.get("node", func.__name__))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            profiler.dump_stats(path)
+            logger.info("🔬 Profile saved: %s", path)
+
+    return wrapper
+
+
+def find_profiles(directory: str, last: Optional[int] = None) -> List[Tuple[str, str, str]]:
+    """
+    프로파일 파일 목록을 찾습니다.
+
+    Args:
+        directory: PROFILE_DIR
+        last: 최근 실행 N개만 (실행 디렉터리 수정 시각 기준)
+
+    Returns:
+        [(run_id, 노드, 파일 경로)]
+    """
+    if not os.path.isdir(directory):
+        return []
+    runs = sorted(
+        (entry for entry in os.scandir(directory) if entry.is_dir()),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    if last:
+        runs = runs[-last:]
+    profiles = []
+    for run in runs:
+        for name in sorted(os.listdir(run.path)):
+            if name.endswith(".prof"):
+                node = name[:-len(".prof")].split("-", 1)[-1]
+                profiles.append((run.name, node, os.path.join(run.path, name)))
+    return profiles
+
+
+def _category(func_key: tuple) -> Optional[str]:
+    filename, _, name = func_key
+    target = name if filename == "~" else filename
+    for category, pattern in PROFILE_CATEGORIES.items():
+        if pattern.search(target):
+            return category
+    return None
+
+
+def category_times(stats: pstats.Stats) -> Dict[str, float]:
+    """
+    카테고리별로 보낸 시간(초)을 계산합니다.
+
+    카테고리 밖의 함수가 카테고리 안의 함수를 호출한 누적 시간의 합이라 중첩 호출은 한 번만
+    셉니다. 카테고리끼리는 겹칠 수 있습니다 (예: OpenAI 클라이언트 안의 JSON 파싱은 llm_io와
+    json 모두에 포함).
+    """
+    categories = {func_key: _category(func_key) for func_key in stats.stats}
+    totals = {category: 0.0 for category in PROFILE_CATEGORIES}
+    for func_key, (_, _, _, _, callers) in stats.stats.items():
+        category = categories[func_key]
+        if category is None:
+            continue
+        for caller_key, caller_stats in callers.items():
+            if categories.get(caller_key) != category:
+                totals[category] += caller_stats[3]
+    return totals
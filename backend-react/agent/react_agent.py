@@ -1,29 +1,171 @@
 """
 ReAct Agent Implementation using LangGraph
 """
+import asyncio
 import os
+import re
+import threading
 import time
+import uuid
 import logging
-from typing import Literal
+from typing import Literal, Optional
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 
 # 환경 변수 로드
 load_dotenv()
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage, ToolMessage, message_chunk_to_message
+from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables.config import run_in_executor
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
 
+from agent.checkpointer import build_checkpointer
+from agent.intent_router import get_intent_router, message_text
+from agent.llm_config import build_node_llms, load_node_configs
+from agent.profiling import profiled
 from agent.state import AgentState
-from tools import elasticsearch_search
-from tools.elasticsearch_tool import ElasticsearchConfig
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from agent.stream_metrics import StreamTimer, answer_stream_metrics
+from agent.warmup import WARMUP_ON_LOAD, startup_warmup
+from tools import elasticsearch_search, refine_search_results
+from tools.elasticsearch_tool import ElasticsearchConfig, strip_results_block
+from tools.logging_config import VERBOSE, setup_logging
+from tools.resilience import cancel_scope, deadline_scope, interruption_reason
+from tools.result_refiner import summarize_hits
+from tools.token_budget import budget_scope, count_tokens, truncate_to_tokens
+
+# 로깅 설정 (큐 기반 JSON 로깅, 상세 로그는 샘플링)
+setup_logging()
 logger = logging.getLogger(__name__)
 
+# 한 턴(run)의 전체 시간 예산 (초)
+RUN_BUDGET_S = float(os.getenv("AGENT_RUN_BUDGET_S", "60"))
+
+# 한 턴의 도구 결과 텍스트 토큰 예산 (도구 호출 사이에 나눠 배정)
+TURN_RESULT_TOKEN_BUDGET = int(os.getenv("TURN_RESULT_TOKEN_BUDGET", "3000"))
+
+# 실행 중단 사유별 안내 문구
+INTERRUPTION_NOTICES = {
+    "cancelled": "⏹️ 실행이 취소되어 중단했습니다.",
+    "deadline": f"⏱️ 실행 시간 예산({RUN_BUDGET_S:.0f}초)을 초과해 중단했습니다.",
+}
+
+# 후속 질문 생성 (검색 결과가 준비되면 답변과 병렬로 실행)
+FOLLOWUP_QUESTIONS = os.getenv("FOLLOWUP_QUESTIONS", "true").lower() == "true"
+FOLLOWUP_CONTEXT_TOKENS = int(os.getenv("FOLLOWUP_CONTEXT_TOKENS", "800"))
+FOLLOWUP_COUNT = 3
+
+
+def prompt_messages(messages: list) -> list:
+    """
+    LLM 프롬프트용 메시지 목록을 만듭니다.
+
+    시스템 메시지는 제외하고, 이전 버전 대화의 도구 결과에 남아 있는 프론트엔드용
+    JSON 블록은 제거합니다 (같은 내용이 텍스트 결과에 이미 포함되어 있음).
+    """
+    return [
+        m.model_copy(update={"content": strip_results_block(m.content)}) if isinstance(m, ToolMessage) else m
+        for m in messages
+        if not isinstance(m, SystemMessage)
+    ]
+
+
+def cancellable(func):
+    """
+    동기 노드를 취소 가능한 노드로 감쌉니다.
+
+    그래프가 비동기로 실행될 때(LangGraph 서버) 노드는 스레드에서 실행됩니다. 실행이
+    취소되면(클라이언트 연결 종료, 새 메시지로 인한 interrupt) 취소 신호를 설정해
+    진행 중인 LLM 스트림과 Elasticsearch 요청이 바로 멈추도록 합니다.
+    """
+    def run(state: AgentState, cancel_event: threading.Event) -> dict:
+        with cancel_scope(cancel_event):
+            return func(state)
+
+    async def arun(state: AgentState) -> dict:
+        cancel_event = threading.Event()
+        try:
+            # run_in_executor는 실행 컨텍스트(콜백, 스트림 writer)를 스레드로 복사함
+            return await run_in_executor(None, run, state, cancel_event)
+        except asyncio.CancelledError:
+            cancel_event.set()
+            logger.warning(f"⏹️ Run cancelled during {func.__name__} - stopping in-flight work")
+            raise
+
+    return RunnableLambda(func, afunc=arun, name=func.__name__)
+
+
+def stream_llm(llm, messages: list, timer: Optional[StreamTimer] = None, streaming: bool = True) -> tuple:
+    """
+    LLM 응답을 스트리밍으로 받고, 실행이 취소되거나 마감 시각이 지나면 바로 중단합니다.
+
+    중단 시 스트림을 닫아 진행 중인 HTTP 요청도 함께 끊습니다. streaming=False(노드 설정)면
+    한 번에 응답을 받고 호출 전후에만 중단 여부를 확인합니다.
+
+    Returns:
+        (응답 메시지 - 중단 시 받은 부분까지, 중단 사유 "cancelled" / "deadline" 또는 None)
+    """
+    reason = interruption_reason()
+    if reason:
+        return AIMessage(content=""), reason
+
+    if not streaming:
+        response = llm.invoke(messages)
+        if timer is not None:
+            timer.on_chunk(response)
+        reason = interruption_reason()
+        return (AIMessage(content=""), reason) if reason else (response, None)
+
+    response_chunk = None
+    stream = llm.stream(messages)
+    try:
+        for chunk in stream:
+            if timer is not None:
+                timer.on_chunk(chunk)
+            response_chunk = chunk if response_chunk is None else response_chunk + chunk
+            reason = interruption_reason()
+            if reason:
+                break
+    finally:
+        stream.close()
+    if response_chunk is None:
+        return AIMessage(content=""), reason
+    return message_chunk_to_message(response_chunk), reason
+
+
+def interrupted_message(partial: Optional[AIMessage], reason: str) -> AIMessage:
+    """중단된 LLM 응답의 부분 내용에 중단 안내를 붙인 메시지를 만듭니다 (도구 호출은 버림)."""
+    content = message_text(partial).strip() if partial is not None else ""
+    notice = INTERRUPTION_NOTICES[reason]
+    return AIMessage(content=f"{content}\n\n{notice}" if content else notice)
+
+
+def route_search_command(state: AgentState) -> Optional[list]:
+    """
+    명시적 검색 명령이면 LLM 계획 없이 Thinking 메시지와 검색 도구 호출을 만듭니다.
+
+    Returns:
+        [Thinking 메시지, 도구 호출 메시지] 또는 None (LLM 계획 필요)
+    """
+    router = get_intent_router()
+    messages = state["messages"]
+    if router is None or not messages or not isinstance(messages[-1], HumanMessage):
+        return None
+
+    decision = router.route(message_text(messages[-1]), has_cached_hits=bool(state.get("search_hits")))
+    if decision is None:
+        return None
+
+    logger.info("🧭 Intent router: index=%s, query='%s', matched=%s", decision["index"], decision["query"], decision["matched"])
+    tool_call = {
+        "name": "elasticsearch_search",
+        "args": {"query": decision["query"], "index": decision["index"]},
+        "id": f"call_router_{uuid.uuid4().hex[:12]}",
+    }
+    return [
+        AIMessage(content=router.thinking_text(decision)),
+        AIMessage(content="", tool_calls=[tool_call]),
+    ]
+
 
 # ToolNode 직접 구현
 def call_tools(state: AgentState) -> dict:
@@ -33,16 +175,55 @@ def call_tools(state: AgentState) -> dict:
     last_message = messages[-1]
 
     tool_calls = last_message.tool_calls
-    tool_messages = []
 
-    logger.info(f"🔧 Tool calls: {len(tool_calls)} tools to execute")
+    logger.info("🔧 Tool calls: %d tools to execute", len(tool_calls), extra=VERBOSE)
+
+    # 각 도구 호출 실행 (요청 타임아웃은 이번 턴의 남은 예산으로 제한)
+    with deadline_scope(state.get("deadline")):
+        tool_messages, new_hits, partial_work = _execute_tool_calls(state, tool_calls)
+
+    total_duration = time.time() - start_time
+    logger.info("📊 All tools executed in %.2fs", total_duration)
+
+    update = {"messages": tool_messages, "search_hits": new_hits}
+    if partial_work:
+        logger.warning(
+            f"⏹️ Tools interrupted ({partial_work['reason']}) - completed {partial_work['completed_tool_calls']}, "
+            f"skipped {partial_work['skipped_tool_calls']} of {len(tool_calls)}"
+        )
+        update["partial_work"] = partial_work
+    return update
+
 
-    # 각 도구 호출 실행
-    for tool_call in tool_calls:
+def _execute_tool_calls(state: AgentState, tool_calls: list) -> tuple:
+    """
+    도구 호출 목록을 순서대로 실행합니다.
+
+    실행이 취소되거나 마감 시각이 지나면 남은 도구 호출은 실행하지 않고 안내 메시지로
+    응답합니다 (모든 도구 호출에는 응답 메시지가 있어야 함).
+
+    Returns:
+        (도구 메시지 목록, 새 검색 결과, 부분 작업 기록 또는 None)
+    """
+    tool_messages = []
+    new_hits = []
+    remaining_tokens = TURN_RESULT_TOKEN_BUDGET
+    interrupted = None
+    completed = 0
+
+    for i, tool_call in enumerate(tool_calls):
         tool_name = tool_call["name"]
         tool_args = tool_call["args"]
 
-        logger.info(f"🔨 Executing tool: {tool_name} with args: {tool_args}")
+        interrupted = interrupted or interruption_reason()
+        if interrupted:
+            tool_messages.append(ToolMessage(
+                content=f"{INTERRUPTION_NOTICES[interrupted]} 도구 `{tool_name}`을(를) 실행하지 않았습니다.",
+                tool_call_id=tool_call["id"],
+            ))
+            continue
+
+        logger.info("🔨 Executing tool: %s with args: %s", tool_name, tool_args, extra=VERBOSE)
         tool_start = time.time()
 
         # 도구 호출 정보를 포함한 메시지 생성
@@ -53,10 +234,43 @@ def call_tools(state: AgentState) -> dict:
             tool_info += f"  - {key}: `{value}`\n"
         tool_info += "\n---\n\n"
 
+        # 남은 턴 예산을 남은 도구 호출 수로 나눔 (앞선 호출이 덜 쓰면 뒤 호출이 더 받음)
+        call_budget = remaining_tokens // (len(tool_calls) - i) - count_tokens(tool_info)
+
         # 도구 실행
         try:
             if tool_name == "elasticsearch_search":
-                result = elasticsearch_search.invoke(tool_args)
+                with budget_scope(call_budget):
+                    tool_message = elasticsearch_search.invoke({**tool_call, "type": "tool_call"})
+                result = tool_message.content
+                query = tool_args.get("query")
+                new_hits.extend({**hit, "query": query} for hit in tool_message.artifact or [])
+            elif tool_name == "refine_search_results":
+                cached_hits = state.get("search_hits") or []
+                with budget_scope(call_budget):
+                    tool_message = refine_search_results.invoke({
+                        **tool_call,
+                        "args": {**tool_args, "hits": cached_hits},
+                        "type": "tool_call",
+                    })
+                result = tool_message.content
+
+                # 이전 결과로 답할 수 없으면 Elasticsearch 재검색으로 폴백
+                fallback_query = tool_args.get("fallback_query")
+                if not tool_message.artifact and fallback_query:
+                    logger.info("↩️ Cached hits insufficient, falling back to search: '%s'", fallback_query)
+                    search_args = {"query": fallback_query}
+                    if tool_args.get("index"):
+                        search_args["index"] = tool_args["index"]
+                    with budget_scope(call_budget - count_tokens(strip_results_block(result))):
+                        search_message = elasticsearch_search.invoke({
+                            "name": "elasticsearch_search",
+                            "args": search_args,
+                            "id": tool_call["id"],
+                            "type": "tool_call",
+                        })
+                    result = f"{result}\n\n↩️ 새로 검색한 결과:\n{search_message.content}"
+                    new_hits.extend({**hit, "query": fallback_query} for hit in search_message.artifact or [])
             else:
                 result = f"Unknown tool: {tool_name}"
                 logger.error(f"❌ Unknown tool requested: {tool_name}")
@@ -65,10 +279,11 @@ def call_tools(state: AgentState) -> dict:
             logger.error(f"❌ Tool execution error: {str(e)}")
 
         tool_duration = time.time() - tool_start
-        logger.info(f"✅ Tool {tool_name} completed in {tool_duration:.2f}s")
+        logger.info("✅ Tool %s completed in %.2fs", tool_name, tool_duration)
 
         # 도구 호출 정보 + 결과를 함께 포함
         full_result = tool_info + str(result)
+        remaining_tokens -= count_tokens(strip_results_block(full_result))
 
         # 도구 메시지 생성
         tool_messages.append(
@@ -77,11 +292,19 @@ def call_tools(state: AgentState) -> dict:
                 tool_call_id=tool_call["id"]
             )
         )
-
-    total_duration = time.time() - start_time
-    logger.info(f"📊 All tools executed in {total_duration:.2f}s")
-
-    return {"messages": tool_messages}
+        completed += 1
+
+    interrupted = interrupted or interruption_reason()
+    partial_work = None
+    if interrupted:
+        partial_work = {
+            "node": "tools",
+            "reason": interrupted,
+            "completed_tool_calls": completed,
+            "skipped_tool_calls": len(tool_calls) - completed,
+            "hits": len(new_hits),
+        }
+    return tool_messages, new_hits, partial_work
 
 
 def generate_reasoning_prompt() -> str:
@@ -101,6 +324,9 @@ def generate_reasoning_prompt() -> str:
         return f"""당신은 Elasticsearch를 활용하여 정보를 검색하는 AI입니다.
 
 ## 도구
+- **refine_search_results**: 이전 검색 결과를 필터링/정렬/그룹화 (재검색 없음)
+   후속 질문이 이전 결과로 답할 수 있으면 이 도구를 먼저 사용하세요.
+   이전 결과에 없을 수 있으면 fallback_query를 함께 지정하세요.
 - **elasticsearch_search**: 키워드로 검색
    사용 가능한 인덱스:
    - {indices_info}
@@ -117,6 +343,7 @@ def generate_reasoning_prompt() -> str:
         return """당신은 Elasticsearch를 활용하여 정보를 검색하는 AI입니다.
 
 ## 도구
+- **refine_search_results**: 이전 검색 결과를 필터링/정렬/그룹화 (재검색 없음)
 - **elasticsearch_search**: 키워드로 검색
 
 ## 응답 형식
@@ -147,38 +374,91 @@ ANSWER_PROMPT = """검색 결과를 바탕으로 사용자에게 정확하고 
 ### 💡 결론
 [검색 결과를 바탕으로 한 종합적인 답변]
 
-### 🔍 추가로 궁금하실 수 있는 질문
+답변은 항상 한국어로 제공하세요."""
+
+# 후속 질문 노드를 끈 경우(FOLLOWUP_QUESTIONS=false) 답변에 직접 포함하는 후속 질문 섹션
+INLINE_FOLLOWUP_SECTION = """### 🔍 추가로 궁금하실 수 있는 질문
 [이 답변과 관련하여 사용자가 추가로 궁금해할 만한 구체적인 질문 3개를 제안하세요]
 1. [관련 질문 1]
 2. [관련 질문 2]
 3. [관련 질문 3]
 
-답변은 항상 한국어로 제공하세요."""
+"""
+
+
+def build_answer_prompt(inline_followups: bool) -> str:
+    """답변 프롬프트 (inline_followups이면 후속 질문 섹션을 답변 형식에 포함)"""
+    if not inline_followups:
+        return ANSWER_PROMPT
+    closing = "답변은 항상 한국어로 제공하세요."
+    return ANSWER_PROMPT.replace(closing, INLINE_FOLLOWUP_SECTION + closing)
+
+FOLLOWUP_PROMPT = f"""사용자의 질문과 검색 결과를 보고, 사용자가 추가로 궁금해할 만한 구체적인 후속 질문 {FOLLOWUP_COUNT}개를 제안하세요.
 
+- 검색 결과에 나온 차종, 시스템, 문제점 등 구체적인 내용을 활용하세요
+- 번호를 붙여 한 줄에 하나씩, 질문만 작성하세요
+- 한국어로 작성하세요"""
 
-def create_react_agent():
+# "1. 질문", "- 질문" 형식의 목록 항목
+QUESTION_LINE_PATTERN = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*(.+?)\s*$")
+
+
+def parse_questions(text: str, limit: int = FOLLOWUP_COUNT) -> list:
+    """후속 질문 생성 결과에서 목록 항목만 꺼냅니다."""
+    questions = []
+    for line in text.splitlines():
+        match = QUESTION_LINE_PATTERN.match(line)
+        if match:
+            question = match.group(1).strip("*[] ")
+            if question and question not in questions:
+                questions.append(question)
+    return questions[:limit]
+
+
+def followup_context(messages: list) -> str:
+    """마지막 사용자 질문과 그 뒤의 도구 결과로 후속 질문 생성용 입력을 만듭니다."""
+    last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+    question = message_text(messages[last_human]) if last_human >= 0 else ""
+    results = "\n\n".join(
+        strip_results_block(m.content) for m in messages[last_human + 1:] if isinstance(m, ToolMessage)
+    )
+    return f"## 사용자 질문\n{question}\n\n## 검색 결과\n{truncate_to_tokens(results, FOLLOWUP_CONTEXT_TOKENS)}"
+
+
+def create_react_agent(llm_factory=None, checkpointer=None):
     """
     ReAct 에이전트 그래프를 생성합니다.
 
+    Args:
+        llm_factory: (노드 이름, 노드 설정) → 채팅 모델 (미지정 시 ChatOpenAI)
+        checkpointer: 스레드 상태 저장소 (미지정 시 LangGraph API의 persistence 사용)
+
     Returns:
         컴파일된 LangGraph 그래프
     """
-    # LLM 초기화
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",  # 빠른 응답을 위해 mini 모델 사용
-        temperature=0,
-        streaming=True,
-    )
+    # 노드별 LLM 초기화 (계획 단계는 더 작은 모델/짧은 출력 제한 사용 가능)
+    node_configs = load_node_configs()
+    llms = build_node_llms(llm_factory, node_configs)
+    streaming = {node: config.get("streaming", True) for node, config in node_configs.items()}
+    thinking_llm = llms["thinking"]
+    answer_llm = llms["answer"]
+    # 후속 질문은 답변 토큰 스트림에 섞이지 않도록 메시지 스트리밍에서 제외
+    followup_llm = llms["followups"].with_config(tags=["nostream"])
 
     # 도구 바인딩
-    tools = [elasticsearch_search]
-    llm_with_tools = llm.bind_tools(tools)
+    tools = [refine_search_results, elasticsearch_search]
+    llm_with_tools = llms["tool_call"].bind_tools(tools)
+
+    # 후속 질문 노드가 꺼져 있으면 기존처럼 답변 안에서 후속 질문을 제안
+    answer_prompt = build_answer_prompt(inline_followups=not FOLLOWUP_QUESTIONS)
+
+    # 워커 웜업 대상 등록 (연결 풀을 열 LLM, 미리 토큰화할 정적 프롬프트)
+    startup_warmup.register(llms, {"reasoning": REASONING_PROMPT, "answer": answer_prompt, "followups": FOLLOWUP_PROMPT})
 
     # 노드 함수 정의
     def call_model(state: AgentState) -> dict:
         """LLM을 호출하여 다음 액션 결정"""
         start_time = time.time()
-        from langchain_core.messages import AIMessage
         messages = state["messages"]
 
         # 마지막 메시지가 도구 결과인지 확인
@@ -187,53 +467,121 @@ def create_react_agent():
 
         if is_after_tool:
             # STEP 3: 도구 실행 후 - 최종 답변 생성
-            logger.info("📝 Generating final answer based on tool results")
+            logger.info("📝 Generating final answer based on tool results", extra=VERBOSE)
             answer_start = time.time()
 
-            messages_for_answer = [SystemMessage(content=ANSWER_PROMPT)] + [
-                m for m in messages if not isinstance(m, SystemMessage)
-            ]
-            response = llm.invoke(messages_for_answer)
+            messages_for_answer = [SystemMessage(content=answer_prompt)] + prompt_messages(messages)
+
+            # 토큰 스트리밍으로 생성하며 첫 토큰 지연 / 초당 토큰 / 토큰 간 간격 측정
+            timer = StreamTimer()
+            with deadline_scope(state.get("deadline")):
+                response, interrupted = stream_llm(answer_llm, messages_for_answer, timer, streaming["answer"])
+            stream_metrics = timer.finish()
+            update = {}
+            if interrupted:
+                # 중단된 답변은 생성된 부분까지 남기고 부분 작업으로 기록
+                stream_metrics["interrupted"] = interrupted
+                response = interrupted_message(response, interrupted)
+                update["partial_work"] = {"node": "agent", "reason": interrupted, "answer_tokens": stream_metrics["tokens"]}
+                logger.warning(f"⏹️ Answer interrupted ({interrupted}) after {stream_metrics['tokens']} tokens")
+            answer_stream_metrics.record(stream_metrics)
+
+            # 실행 메타데이터로 남김 (스레드 상태의 응답 메시지와 custom 스트림 이벤트)
+            response.response_metadata["stream_metrics"] = stream_metrics
+            get_stream_writer()({"type": "answer_metrics", **stream_metrics})
 
             answer_duration = time.time() - answer_start
-            logger.info(f"✅ Answer generated in {answer_duration:.2f}s")
-            logger.info(f"📊 Total call_model duration: {time.time() - start_time:.2f}s")
+            logger.info("✅ Answer generated in %.2fs (TTFT %sms)", answer_duration, stream_metrics["ttft_ms"])
+            logger.info("📊 Total call_model duration: %.2fs", time.time() - start_time, extra=VERBOSE)
 
-            return {"messages": [response]}
+            return {"messages": [response], **update}
         else:
+            # 명시적 검색 명령이면 LLM 계획 단계를 건너뜀
+            routed_messages = route_search_command(state)
+            if routed_messages:
+                logger.info("📊 Total call_model duration: %.2fs (intent router)", time.time() - start_time)
+                return {
+                    "messages": routed_messages,
+                    "deadline": start_time + RUN_BUDGET_S,
+                    "suggested_questions": [],
+                    "partial_work": None,
+                }
+
+            # 이번 턴의 마감 시각 (이전 턴의 후속 질문과 부분 작업 기록은 초기화)
+            turn_state = {"deadline": start_time + RUN_BUDGET_S, "suggested_questions": [], "partial_work": None}
+
             # STEP 1 & 2를 분리: Thinking 먼저, 그 다음 도구 호출
-            logger.info("🤔 Starting thinking phase")
+            logger.info("🤔 Starting thinking phase", extra=VERBOSE)
             thinking_start = time.time()
 
+            # 이전 검색 결과가 있으면 플래너에게 캐시 요약 제공
+            planning_prompts = [SystemMessage(content=REASONING_PROMPT)]
+            cache_summary = summarize_hits(state.get("search_hits") or [])
+            if cache_summary:
+                planning_prompts.append(SystemMessage(content=cache_summary))
+
             # 먼저 Thinking만 생성 (도구 없이)
-            messages_for_thinking = [SystemMessage(content=REASONING_PROMPT)] + [
-                m for m in messages if not isinstance(m, SystemMessage)
-            ]
-            thinking_response = llm.invoke(messages_for_thinking)
+            messages_for_thinking = planning_prompts + prompt_messages(messages)
+            with deadline_scope(turn_state["deadline"]):
+                thinking_response, interrupted = stream_llm(thinking_llm, messages_for_thinking, streaming=streaming["thinking"])
+            if interrupted:
+                logger.warning(f"⏹️ Thinking interrupted ({interrupted})")
+                return {
+                    **turn_state,
+                    "messages": [interrupted_message(thinking_response, interrupted)],
+                    "partial_work": {"node": "agent", "reason": interrupted, "stage": "thinking"},
+                }
 
             thinking_duration = time.time() - thinking_start
-            logger.info(f"💡 Thinking completed in {thinking_duration:.2f}s")
+            logger.info("💡 Thinking completed in %.2fs", thinking_duration)
 
             # Thinking 응답을 메시지에 추가
             messages_with_thinking = messages + [thinking_response]
 
             # 이제 도구 호출 생성
-            logger.info("🔧 Generating tool calls")
+            logger.info("🔧 Generating tool calls", extra=VERBOSE)
             tool_call_start = time.time()
 
             tool_prompt = SystemMessage(content="이전 Thinking을 바탕으로 적절한 도구를 호출하세요. 텍스트 응답 없이 도구만 호출하세요.")
-            messages_for_tools = [tool_prompt] + [
-                m for m in messages_with_thinking if not isinstance(m, SystemMessage)
-            ]
-            tool_response = llm_with_tools.invoke(messages_for_tools)
+            messages_for_tools = [tool_prompt] + planning_prompts[1:] + prompt_messages(messages_with_thinking)
+            with deadline_scope(turn_state["deadline"]):
+                tool_response, interrupted = stream_llm(llm_with_tools, messages_for_tools, streaming=streaming["tool_call"])
+            if interrupted:
+                # 도구 호출이 완성되지 않았으므로 Thinking까지만 남기고 종료
+                logger.warning(f"⏹️ Tool call generation interrupted ({interrupted})")
+                return {
+                    **turn_state,
+                    "messages": [thinking_response, interrupted_message(None, interrupted)],
+                    "partial_work": {"node": "agent", "reason": interrupted, "stage": "tool_call"},
+                }
 
             tool_call_duration = time.time() - tool_call_start
             num_tool_calls = len(tool_response.tool_calls) if hasattr(tool_response, 'tool_calls') else 0
-            logger.info(f"🔨 Tool calls generated ({num_tool_calls} calls) in {tool_call_duration:.2f}s")
-            logger.info(f"📊 Total call_model duration: {time.time() - start_time:.2f}s")
+            logger.info("🔨 Tool calls generated (%d calls) in %.2fs", num_tool_calls, tool_call_duration)
+            logger.info("📊 Total call_model duration: %.2fs", time.time() - start_time, extra=VERBOSE)
 
-            # 두 응답을 모두 반환
-            return {"messages": [thinking_response, tool_response]}
+            # 두 응답과 이번 턴의 마감 시각을 함께 반환
+            return {**turn_state, "messages": [thinking_response, tool_response]}
+
+    def suggest_questions(state: AgentState) -> dict:
+        """검색 결과로 후속 질문을 생성하는 노드 (답변 생성과 병렬 실행)"""
+        start_time = time.time()
+        try:
+            with deadline_scope(state.get("deadline")):
+                response, interrupted = stream_llm(followup_llm, [
+                    SystemMessage(content=FOLLOWUP_PROMPT),
+                    HumanMessage(content=followup_context(state["messages"])),
+                ], streaming=streaming["followups"])
+            # 중단되면 완성된 질문도 신뢰할 수 없으므로 버림
+            questions = parse_questions(message_text(response)) if not interrupted else []
+        except Exception as e:
+            logger.warning(f"⚠️ Follow-up question generation failed: {e}")
+            questions = []
+
+        logger.info("💬 %d follow-up questions generated in %.2fs", len(questions), time.time() - start_time)
+        # 답변 스트림과 별도로 프론트엔드에 바로 전달
+        get_stream_writer()({"type": "suggested_questions", "questions": questions})
+        return {"suggested_questions": questions}
 
     def should_continue(state: AgentState) -> Literal["tools", "end"]:
         """도구 호출이 필요한지 판단"""
@@ -248,8 +596,10 @@ def create_react_agent():
     workflow = StateGraph(AgentState)
 
     # 노드 추가
-    workflow.add_node("agent", call_model)
-    workflow.add_node("tools", call_tools)
+    # 비동기 실행(LangGraph 서버)에서 실행이 취소되면 진행 중인 작업을 바로 중단
+    # 프로파일링을 켠 실행은 노드별 cProfile 결과를 PROFILE_DIR에 저장
+    workflow.add_node("agent", cancellable(profiled(call_model)))
+    workflow.add_node("tools", cancellable(profiled(call_tools)))
 
     # 엣지 추가
     workflow.set_entry_point("agent")
@@ -262,10 +612,19 @@ def create_react_agent():
         }
     )
     workflow.add_edge("tools", "agent")
+    if FOLLOWUP_QUESTIONS:
+        # 도구 실행 후 답변(agent)과 후속 질문 생성이 같은 단계에서 병렬로 실행됨
+        workflow.add_node("suggest_questions", cancellable(profiled(suggest_questions)))
+        workflow.add_edge("tools", "suggest_questions")
+        workflow.add_edge("suggest_questions", END)
+
+    # 그래프 컴파일 (체크포인터가 없으면 LangGraph API가 자동으로 persistence 제공)
+    return workflow.compile(checkpointer=checkpointer)
 
-    # 그래프 컴파일 (LangGraph API가 자동으로 persistence 제공)
-    return workflow.compile()
 
+# 에이전트 인스턴스 생성 (CHECKPOINT_DB가 있으면 메시지 델타/압축 SQLite 체크포인터 사용)
+react_agent = create_react_agent(checkpointer=build_checkpointer())
 
-# 에이전트 인스턴스 생성
-react_agent = create_react_agent()
+# 그래프 로드 시 백그라운드 웜업 (readiness는 웜업이 끝나야 true)
+if WARMUP_ON_LOAD:
+    startup_warmup.start()
@@ -1,10 +1,30 @@
 """
 State definition for ReAct agent
 """
-from typing import Annotated, TypedDict, List
+from typing import Annotated, Any, Dict, Optional, TypedDict, List
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
 
+# 스레드당 보관할 최대 검색 결과 수
+MAX_CACHED_HITS = 200
+
+
+def merge_search_hits(
+    existing: List[Dict[str, Any]], new: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    검색 결과를 (인덱스, 문서 ID) 기준으로 병합합니다.
+
+    같은 문서가 다시 검색되면 최신 결과로 교체하고, 가장 최근 결과
+    MAX_CACHED_HITS개만 유지합니다.
+    """
+    merged = {(hit.get("index"), hit.get("id")): hit for hit in existing or []}
+    for hit in new or []:
+        key = (hit.get("index"), hit.get("id"))
+        merged.pop(key, None)
+        merged[key] = hit
+    return list(merged.values())[-MAX_CACHED_HITS:]
+
 
 class AgentState(TypedDict):
     """
@@ -12,5 +32,13 @@ class AgentState(TypedDict):
 
     Attributes:
         messages: 대화 메시지 목록 (자동으로 추가됨)
+        search_hits: 이전 턴까지의 구조화된 검색 결과 (후속 질문 정제용)
+        deadline: 현재 턴의 마감 시각 (time.time() 기준)
+        suggested_questions: 이번 턴 답변과 함께 제안할 후속 질문 (답변과 병렬로 생성)
+        partial_work: 이번 턴이 취소/시간 초과로 중단된 경우 중단 지점과 완료한 작업
     """
     messages: Annotated[List[BaseMessage], add_messages]
+    search_hits: Annotated[List[Dict[str, Any]], merge_search_hits]
+    deadline: Optional[float]
+    suggested_questions: List[str]
+    partial_work: Optional[Dict[str, Any]]
@@ -0,0 +1,132 @@
+"""
+Token streaming metrics for LLM nodes
+
+답변 노드의 토큰 스트림에서 첫 토큰 지연(TTFT), 초당 토큰 수, 토큰 간 간격을
+측정합니다. 실행별 측정값은 응답 메시지의 response_metadata와 custom 스트림
+이벤트로 전달되고, 노드별 최근 측정값은 StreamMetrics에 모아 백분위수로 봅니다.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from tools.resilience import LatencyTracker, percentile
+
+logger = logging.getLogger(__name__)
+
+# 첫 토큰 지연 목표 (ms) - 넘으면 경고 로그와 위반 횟수 집계
+ANSWER_TTFT_SLO_MS = float(os.getenv("ANSWER_TTFT_SLO_MS", "2000"))
+
+
+class StreamTimer:
+    """
+    한 번의 LLM 스트리밍 호출을 측정합니다.
+
+    내용이 있는 청크를 토큰 하나로 셉니다 (OpenAI 스트리밍은 청크당 대개 1토큰).
+    스트림 끝의 사용량 정보(usage_metadata)가 있으면 출력 토큰 수는 그 값을 씁니다.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.last_token_at: Optional[float] = None
+        self.chunks = 0
+        self.gaps: List[float] = []
+        self.output_tokens: Optional[int] = None
+
+    def on_chunk(self, chunk: Any) -> None:
+        """스트림 청크 하나를 기록합니다."""
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage and usage.get("output_tokens"):
+            self.output_tokens = usage["output_tokens"]
+        if not getattr(chunk, "content", None):
+            return
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        else:
+            self.gaps.append(now - self.last_token_at)
+        self.last_token_at = now
+        self.chunks += 1
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        측정을 마치고 결과를 반환합니다.
+
+        Returns:
+            {"ttft_ms", "total_ms", "tokens", "tokens_per_s", "gap_p50_ms", "gap_p95_ms", "gap_max_ms"}
+        """
+        end = time.perf_counter()
+        tokens = self.output_tokens or self.chunks
+        ttft = self.first_token_at - self.start if self.first_token_at is not None else None
+        # 생성 속도는 첫 토큰 이후 구간으로 계산 (TTFT와 분리)
+        generation_s = (self.last_token_at - self.first_token_at) if self.first_token_at is not None else 0.0
+        gap_p50 = percentile(self.gaps, 50)
+        gap_p95 = percentile(self.gaps, 95)
+        return {
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "total_ms": round((end - self.start) * 1000, 1),
+            "tokens": tokens,
+            "tokens_per_s": round((tokens - 1) / generation_s, 1) if generation_s > 0 and tokens > 1 else None,
+            "gap_p50_ms": round(gap_p50 * 1000, 1) if gap_p50 is not None else None,
+            "gap_p95_ms": round(gap_p95 * 1000, 1) if gap_p95 is not None else None,
+            "gap_max_ms": round(max(self.gaps) * 1000, 1) if self.gaps else None,
+        }
+
+
+class StreamMetrics:
+    """
+    노드별 스트리밍 측정값을 모읍니다.
+
+    Attributes:
+        name: 통계 로그에 표시할 노드 이름
+        ttft_slo_ms: 첫 토큰 지연 목표 (ms)
+    """
+
+    def __init__(self, name: str, ttft_slo_ms: float = ANSWER_TTFT_SLO_MS, window: int = 200):
+        self.name = name
+        self.ttft_slo_ms = ttft_slo_ms
+        self.ttft = LatencyTracker(window)
+        self.tokens_per_s = LatencyTracker(window)
+        self.gap_p95 = LatencyTracker(window)
+        self._lock = threading.Lock()
+        self.stats = {"runs": 0, "slo_violations": 0, "interrupted": 0}
+
+    def record(self, metrics: Dict[str, Any]) -> None:
+        """실행 하나의 측정값을 기록하고 로그를 남깁니다."""
+        with self._lock:
+            self.stats["runs"] += 1
+            if metrics.get("interrupted"):
+                self.stats["interrupted"] += 1
+        if metrics["ttft_ms"] is not None:
+            self.ttft.record(metrics["ttft_ms"] / 1000)
+            if metrics["ttft_ms"] > self.ttft_slo_ms:
+                with self._lock:
+                    self.stats["slo_violations"] += 1
+                logger.warning("🐢 %s TTFT %.0fms exceeds SLO %.0fms", self.name, metrics["ttft_ms"], self.ttft_slo_ms)
+        if metrics["tokens_per_s"] is not None:
+            self.tokens_per_s.record(metrics["tokens_per_s"])
+        if metrics["gap_p95_ms"] is not None:
+            self.gap_p95.record(metrics["gap_p95_ms"] / 1000)
+        logger.info(
+            "⏱️ %s stream - TTFT: %sms, %s tokens, %s tok/s, gap p50/p95/max: %s/%s/%sms",
+            self.name, metrics["ttft_ms"], metrics["tokens"], metrics["tokens_per_s"],
+            metrics["gap_p50_ms"], metrics["gap_p95_ms"], metrics["gap_max_ms"],
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        ttft_p50 = self.ttft.percentile(50)
+        ttft_p95 = self.ttft.percentile(95)
+        gap_p95 = self.gap_p95.percentile(50)
+        return {
+            **self.stats,
+            "ttft_p50_ms": round(ttft_p50 * 1000, 1) if ttft_p50 is not None else None,
+            "ttft_p95_ms": round(ttft_p95 * 1000, 1) if ttft_p95 is not None else None,
+            "tokens_per_s_p50": self.tokens_per_s.percentile(50),
+            "gap_p95_ms_p50": round(gap_p95 * 1000, 1) if gap_p95 is not None else None,
+        }
+
+
+# 답변 노드의 스트리밍 측정값
+answer_stream_metrics = StreamMetrics("answer")
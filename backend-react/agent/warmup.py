@@ -0,0 +1,165 @@
+"""
+Startup warmup for Elasticsearch and LLM connections
+
+새 워커의 첫 요청이 DNS / TCP·TLS 연결 수립과 ES 콜드 캐시 비용을 떠안지 않도록
+그래프 로드 시(WARMUP_ON_LOAD) 또는 readiness 프로브 호출 시 미리 준비합니다.
+
+- search: 공유 ES 클라이언트로 연결을 열고, es_indices.json의 인덱스별
+  warmup_queries를 검색 도구로 실행해 필터/필드 캐시와 인덱스 매핑 정보를 채웁니다.
+- router: 인텐트 라우터의 엔티티 사전을 인덱스에서 읽습니다 (INTENT_ROUTER=true일 때).
+- llm: 노드별 OpenAI 클라이언트로 모델 조회 요청을 보내 연결 풀을 엽니다.
+- prompts: 토크나이저를 로드하고 정적 프롬프트의 토큰 수를 미리 계산합니다.
+
+준비 상태(ready)는 웜업이 모든 단계를 성공해야 True가 됩니다. 실패한 단계(예외 또는
+ES/LLM 오류)는 경고 로그와 함께 상태의 failed_steps에 남기고, 실패로 끝난 웜업은
+다음 start() 호출(readiness 프로브) 때 다시 실행합니다.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from agent.intent_router import refresh_intent_router
+from tools.elasticsearch_tool import ElasticsearchConfig, elasticsearch_search
+from tools.token_budget import count_tokens, get_encoding
+
+logger = logging.getLogger(__name__)
+
+# 그래프 로드 시 백그라운드로 웜업 시작 (false면 readiness 프로브의 첫 호출 때 시작)
+WARMUP_ON_LOAD = os.getenv("WARMUP_ON_LOAD", "false").lower() == "true"
+
+# 인덱스별로 실행할 대표 질의 수 (es_indices.json의 warmup_queries 앞에서부터)
+WARMUP_QUERIES_PER_INDEX = int(os.getenv("WARMUP_QUERIES_PER_INDEX", "3"))
+
+# LLM 연결 웜업 요청 하나의 타임아웃 (초, 재시도 없음)
+WARMUP_LLM_TIMEOUT_S = float(os.getenv("WARMUP_LLM_TIMEOUT_S", "5"))
+
+
+class StartupWarmup:
+    """
+    워커 시작 시 한 번 실행하는 웜업
+
+    create_react_agent()가 그래프의 LLM과 정적 프롬프트를 등록하고,
+    start()는 백그라운드 스레드에서 run()을 한 번만 실행합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+        self.llms: Dict[str, Any] = {}
+        self.prompts: Dict[str, str] = {}
+        self.status: Dict[str, Any] = {"state": "pending", "duration_ms": None, "steps": {}, "failed_steps": []}
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and not self.status["failed_steps"]
+
+    def register(self, llms: Dict[str, Any], prompts: Dict[str, str]) -> None:
+        """웜업할 노드별 LLM과 정적 프롬프트를 등록합니다."""
+        self.llms = llms
+        self.prompts = prompts
+
+    def start(self) -> bool:
+        """백그라운드 웜업을 시작합니다 (실행 중이거나 성공했으면 False, 실패로 끝났으면 다시 실행)."""
+        with self._lock:
+            if self._thread is not None and not (self._done.is_set() and self.status["failed_steps"]):
+                return False
+            self._done.clear()
+            self._thread = threading.Thread(target=self.run, name="startup-warmup", daemon=True)
+            self._thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """웜업이 끝날 때까지 기다립니다 (끝났으면 True)."""
+        return self._done.wait(timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, **self.status}
+
+    def run(self) -> Dict[str, Any]:
+        """웜업 단계를 순서대로 실행하고 상태를 반환합니다."""
+        start = time.perf_counter()
+        self.status["state"] = "running"
+        failed_steps = []
+        logger.info("🔥 Startup warmup started")
+        for name, step in (
+            ("search", self._warm_search), ("router", self._warm_router), ("llm", self._warm_llms), ("prompts", self._warm_prompts),
+        ):
+            step_start = time.perf_counter()
+            try:
+                result = step()
+            except Exception as e:
+                logger.warning(f"⚠️ Warmup step '{name}' failed: {e}")
+                result = {"error": str(e)}
+            result["duration_ms"] = round((time.perf_counter() - step_start) * 1000, 1)
+            self.status["steps"][name] = result
+            if result.get("error") or result.get("errors"):
+                failed_steps.append(name)
+
+        self.status["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.status["failed_steps"] = failed_steps
+        self.status["state"] = "failed" if failed_steps else "done"
+        self._done.set()
+        if failed_steps:
+            logger.warning(f"⚠️ Startup warmup failed in {self.status['duration_ms']}ms - failed steps: {failed_steps}")
+        else:
+            logger.info("✅ Startup warmup completed in %sms: %s", self.status["duration_ms"], self.status["steps"])
+        return self.get_status()
+
+    def _warm_search(self) -> Dict[str, Any]:
+        """ES 연결을 열고 인덱스별 대표 질의를 실행합니다."""
+        config = ElasticsearchConfig()
+        result: Dict[str, Any] = {"backend": config.search_backend, "queries": 0, "errors": []}
+        if config.search_backend != "embedded":
+            config.get_client().info()
+
+        for index, index_config in config.index_configs.items():
+            for query in index_config.get("warmup_queries", [])[:WARMUP_QUERIES_PER_INDEX]:
+                # 실제 검색 도구로 실행해야 같은 쿼리 형태(필드 부스트, 하이라이트, collapse)의 캐시가 채워짐
+                content = elasticsearch_search.invoke({"query": query, "index": index})
+                result["queries"] += 1
+                if content.startswith(("❌", "⏹️")):
+                    result["errors"].append(f"{index}: {content.splitlines()[0]}")
+        if result["errors"]:
+            logger.warning(f"⚠️ Warmup search errors: {result['errors']}")
+        return result
+
+    def _warm_router(self) -> Dict[str, Any]:
+        """요청 경로에서 사전을 읽지 않도록 인텐트 라우터를 미리 만듭니다."""
+        return refresh_intent_router()
+
+    def _warm_llms(self) -> Dict[str, Any]:
+        """노드별 OpenAI 클라이언트의 연결 풀을 엽니다 (같은 HTTP 클라이언트는 한 번만)."""
+        result: Dict[str, Any] = {"connections": 0, "errors": []}
+        warmed = set()
+        for node, llm in self.llms.items():
+            client = getattr(llm, "root_client", None)
+            if client is None:
+                continue
+            http_client = getattr(client, "_client", client)
+            if id(http_client) in warmed:
+                continue
+            warmed.add(id(http_client))
+            try:
+                # 모델 조회는 토큰을 쓰지 않는 인증된 요청이라 연결과 인증을 함께 확인
+                client.with_options(timeout=WARMUP_LLM_TIMEOUT_S, max_retries=0).models.retrieve(llm.model_name)
+                result["connections"] += 1
+            except Exception as e:
+                result["errors"].append(f"{node}: {e}")
+        if result["errors"]:
+            logger.warning(f"⚠️ Warmup LLM connection errors: {result['errors']}")
+        return result
+
+    def _warm_prompts(self) -> Dict[str, Any]:
+        """토크나이저를 로드하고 정적 프롬프트의 토큰 수를 계산합니다."""
+        encoding = get_encoding()
+        return {
+            "tokenizer": encoding.name if encoding is not None else "estimate",
+            "tokens": {name: count_tokens(prompt) for name, prompt in self.prompts.items()},
+        }
+
+
+# 프로세스 전체의 웜업 상태 (그래프와 readiness 엔드포인트가 공유)
+startup_warmup = StartupWarmup()
@@ -0,0 +1,53 @@
+"""
+Custom HTTP routes mounted on the LangGraph API server (langgraph.json "http.app")
+
+- GET /ready: 웜업이 모든 단계를 성공했으면 200, 아니면 503과 실패한 단계(failed_steps)
+  (첫 호출 때 웜업을 시작하고, 실패로 끝났으면 다시 시작)
+- GET /warmup: 웜업 단계별 상태와 소요 시간
+- GET /stats/llm_http: 공유 LLM HTTP 클라이언트의 연결 재사용 통계
+- GET /stats/es_profile: ES 쿼리 프로파일링(샘플링/느린 쿼리) 기록 통계
+- GET /stats/single_flight: 동일 검색 요청 합치기(single-flight) 실행/합쳐진 호출 수
+- GET /stats/stream: 답변 토큰 스트리밍 측정값 (TTFT, 초당 토큰, SLO 위반/중단 수)
+"""
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from agent.http_clients import connection_stats
+from agent.stream_metrics import answer_stream_metrics
+from agent.warmup import startup_warmup
+from tools.elasticsearch_tool import search_flight, search_profiler
+
+app = FastAPI()
+
+
+@app.get("/ready")
+def ready():
+    """readiness 프로브: 웜업이 끝나기 전이나 실패한 단계가 있으면 트래픽을 받지 않도록 503 반환"""
+    startup_warmup.start()
+    status = startup_warmup.get_status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/warmup")
+def warmup_status():
+    return startup_warmup.get_status()
+
+
+@app.get("/stats/llm_http")
+def llm_http_stats():
+    return connection_stats.get_stats()
+
+
+@app.get("/stats/es_profile")
+def es_profile_stats():
+    return search_profiler.get_stats()
+
+
+@app.get("/stats/stream")
+def stream_stats():
+    return answer_stream_metrics.get_stats()
+
+
+@app.get("/stats/single_flight")
+def single_flight_stats():
+    return search_flight.get_stats()
@@ -0,0 +1,290 @@
+"""
+Offline batch evaluation of the ReAct agent graph
+
+질문 JSONL을 create_react_agent() 그래프로 실행해 질문별 지연 시간, 토큰 사용량, 검색 결과(ES hits),
+최종 답변을 JSONL로 남깁니다. 프롬프트, 인덱스 설정, 쿼리 형태를 바꾼 뒤 같은 질문 세트를 다시
+실행하고 --compare로 두 결과를 나란히 비교합니다.
+
+- 입력: 한 줄에 {"id": ..., "question": "..."} (id가 없으면 줄 번호, 나머지 필드는 결과에 그대로 복사)
+  멀티턴은 "history": [{"role": "user" | "assistant", "content": "..."}]로 이전 대화를 줍니다.
+- 실행: 그래프의 abatch_as_completed(max_concurrency)로 동시 실행 수를 제한하고 끝나는 순서대로 기록
+- 재개: 출력 파일에 이미 있는 id는 건너뜀 (--retry-errors면 오류난 질문만 다시 실행)
+
+    python batch_eval.py questions.jsonl results/baseline.jsonl --concurrency 8
+    python batch_eval.py questions.jsonl results/offline.jsonl --mock-llm --embedded
+    python batch_eval.py --compare results/baseline.jsonl results/prompt_v2.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+class EvalRecorder(UsageMetadataCallbackHandler):
+    """질문 하나의 실행 시간과 모델별 토큰 사용량을 기록합니다."""
+
+    def __init__(self):
+        super().__init__()
+        self.llm_calls = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        self.llm_calls += 1
+        super().on_llm_end(response, **kwargs)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs) -> None:
+        if parent_run_id is None:
+            self.started = time.perf_counter()
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs) -> None:
+        if parent_run_id is None:
+            self.finished = time.perf_counter()
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs) -> None:
+        if parent_run_id is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return round((self.finished - self.started) * 1000, 1)
+
+    def tokens(self) -> Dict[str, Any]:
+        usage = self.usage_metadata
+        return {
+            "input": sum(u.get("input_tokens", 0) for u in usage.values()),
+            "output": sum(u.get("output_tokens", 0) for u in usage.values()),
+            "total": sum(u.get("total_tokens", 0) for u in usage.values()),
+            "by_model": {model: u.get("total_tokens", 0) for model, u in usage.items()},
+        }
+
+
+def load_questions(path: str) -> List[Dict[str, Any]]:
+    """질문 JSONL을 읽습니다 (id가 없으면 줄 번호)."""
+    questions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                item = json.loads(line)
+                item.setdefault("id", str(line_no))
+                item["id"] = str(item["id"])
+                questions.append(item)
+    return questions
+
+
+def completed_ids(path: str, retry_errors: bool = False) -> set:
+    """이미 기록된 결과의 id (중간에 끊긴 마지막 줄은 무시)"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not (retry_errors and record.get("error")):
+                done.add(record["id"])
+    return done
+
+
+def build_input(item: Dict[str, Any]) -> Dict[str, Any]:
+    """질문 항목을 그래프 입력으로 변환합니다."""
+    messages = [
+        HumanMessage(content=turn["content"]) if turn["role"] == "user" else AIMessage(content=turn["content"])
+        for turn in item.get("history", [])
+    ]
+    messages.append(HumanMessage(content=item["question"]))
+    return {"messages": messages}
+
+
+def searches_from_state(state: Dict[str, Any], question_turns: int) -> List[Dict[str, Any]]:
+    """
+    이번 실행의 검색 호출(질의, 인덱스)과 각 검색의 결과 수, 상위 문서 ID를 정리합니다.
+
+    결과는 상태의 search_hits(검색 질의가 붙은 구조화된 결과)에서 가져옵니다. 같은 문서가 여러
+    검색에 나오면 마지막 검색에만 포함됩니다.
+    """
+    hits_by_search: Dict[tuple, List[str]] = {}
+    for hit in state.get("search_hits", []):
+        hits_by_search.setdefault((hit.get("query"), hit.get("index")), []).append(str(hit.get("id")))
+    searches = []
+    for message in state["messages"][question_turns:]:
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            if tool_call["name"] != "elasticsearch_search":
+                continue
+            query = tool_call["args"].get("query")
+            index = tool_call["args"].get("index")
+            ids = next(
+                (ids for (hit_query, hit_index), ids in hits_by_search.items()
+                 if hit_query == query and (index is None or hit_index == index)),
+                [],
+            )
+            searches.append({"query": query, "index": index, "hits": len(ids), "top_ids": ids[:5]})
+    return searches
+
+
+def build_record(item: Dict[str, Any], state: Any, recorder: EvalRecorder, label: Optional[str]) -> Dict[str, Any]:
+    """질문 하나의 결과 레코드를 만듭니다 (state가 예외면 오류 기록)."""
+    record = {**item, "label": label, "latency_ms": recorder.latency_ms, "tokens": recorder.tokens(), "llm_calls": recorder.llm_calls}
+    if isinstance(state, BaseException):
+        return {**record, "answer": None, "searches": [], "es_hits": 0, "error": f"{type(state).__name__}: {state}"}
+    answer = next(
+        (message.content for message in reversed(state["messages"]) if isinstance(message, AIMessage) and not message.tool_calls),
+        None,
+    )
+    searches = searches_from_state(state, len(item.get("history", [])) + 1)
+    return {
+        **record,
+        "answer": answer,
+        "searches": searches,
+        "es_hits": sum(search["hits"] for search in searches),
+        "suggested_questions": state.get("suggested_questions", []),
+        "partial_work": state.get("partial_work"),
+        "error": None,
+    }
+
+
+async def run_batch(graph, items: List[Dict[str, Any]], output_path: str, concurrency: int, label: Optional[str]) -> int:
+    """질문들을 동시 실행 수를 제한해 실행하고 끝나는 순서대로 결과를 추가합니다."""
+    from agent.intent_router import refresh_intent_router
+
+    # 워커 웜업처럼 인텐트 라우터를 미리 만들어 첫 질문부터 라우팅되게 함
+    refresh_intent_router()
+    recorders = [EvalRecorder() for _ in items]
+    configs = [
+        {"callbacks": [recorder], "max_concurrency": concurrency, "run_name": f"batch_eval:{item['id']}"}
+        for item, recorder in zip(items, recorders)
+    ]
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    written = 0
+    with open(output_path, "a+b") as f:
+        # 쓰는 도중 끊긴 마지막 줄은 별도 줄로 남겨 새 결과와 섞이지 않게 함 (재개 시 무시됨)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    with open(output_path, "a", encoding="utf-8") as out:
+        async for i, state in graph.abatch_as_completed(
+            [build_input(item) for item in items], configs, return_exceptions=True
+        ):
+            record = build_record(items[i], state, recorders[i], label)
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            written += 1
+            status = "❌" if record["error"] else "✅"
+            print(f"{status} [{written}/{len(items)}] {items[i]['id']} - {record['latency_ms']}ms, "
+                  f"{record['tokens']['total']} tokens, {record['es_hits']} hits")
+    return written
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return {record["id"]: record for record in (json.loads(line) for line in f if line.strip())}
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """결과 레코드의 오류율, 지연 백분위수, 평균 토큰/검색 결과 수"""
+    ok = [record for record in records if not record.get("error")]
+    latencies = sorted(record["latency_ms"] for record in ok if record.get("latency_ms") is not None)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] if latencies else None
+
+    return {
+        "questions": len(records),
+        "errors": len(records) - len(ok),
+        "latency_p50_ms": pct(50),
+        "latency_p95_ms": pct(95),
+        "avg_tokens": statistics.mean(record["tokens"]["total"] for record in ok) if ok else None,
+        "avg_es_hits": statistics.mean(record["es_hits"] for record in ok) if ok else None,
+        "no_hits": sum(1 for record in ok if record["es_hits"] == 0),
+    }
+
+
+def compare(path_a: str, path_b: str) -> None:
+    """두 결과 파일을 같은 id끼리 비교합니다."""
+    a, b = load_results(path_a), load_results(path_b)
+    common = [qid for qid in a if qid in b]
+    summaries = {path_a: summarize([a[qid] for qid in common]), path_b: summarize([b[qid] for qid in common])}
+    print(f"\n📊 공통 질문 {len(common)}개 (A만 {len(set(a) - set(b))}개, B만 {len(set(b) - set(a))}개)")
+    print(f"{'':<10}{'오류':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'토큰':>8}{'hits':>7}{'0건':>6}")
+    for name, (path, summary) in zip("AB", summaries.items()):
+        print(f"{name:<10}{summary['errors']:>6}{summary['latency_p50_ms'] or 0:>10.0f}{summary['latency_p95_ms'] or 0:>10.0f}"
+              f"{summary['avg_tokens'] or 0:>8.0f}{summary['avg_es_hits'] or 0:>7.1f}{summary['no_hits']:>6}  {path}")
+
+    changed = []
+    for qid in common:
+        ids_a = {doc_id for search in a[qid]["searches"] for doc_id in search["top_ids"]}
+        ids_b = {doc_id for search in b[qid]["searches"] for doc_id in search["top_ids"]}
+        overlap = len(ids_a & ids_b) / len(ids_a | ids_b) if ids_a | ids_b else 1.0
+        if overlap < 1.0 or a[qid]["answer"] != b[qid]["answer"]:
+            changed.append((overlap, qid))
+    print(f"\n🔍 검색 결과 또는 답변이 달라진 질문 {len(changed)}개 (상위 문서 겹침 낮은 순)")
+    for overlap, qid in sorted(changed)[:10]:
+        print(f"  - {qid}: 겹침 {overlap:.0%}, hits {a[qid]['es_hits']} → {b[qid]['es_hits']}, "
+              f"{a[qid]['latency_ms']} → {b[qid]['latency_ms']}ms | {a[qid]['question']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline batch evaluation of the agent graph")
+    parser.add_argument("questions", nargs="?", help="질문 JSONL")
+    parser.add_argument("output", nargs="?", help="결과 JSONL (있으면 이어서 실행)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=None, help="처음 N개 질문만")
+    parser.add_argument("--label", default=None, help="결과에 붙일 실행 이름 (예: prompt-v2)")
+    parser.add_argument("--retry-errors", action="store_true", help="오류난 질문도 다시 실행")
+    parser.add_argument("--mock-llm", action="store_true", help="가짜 OpenAI 서버로 실행 (API 키 불필요)")
+    parser.add_argument("--embedded", action="store_true", help="내장 검색 엔진으로 실행 (Elasticsearch 불필요)")
+    parser.add_argument("--compare", nargs=2, metavar=("A", "B"), help="두 결과 파일 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if not (args.questions and args.output):
+        parser.error("questions와 output이 필요합니다 (또는 --compare A B)")
+
+    items = load_questions(args.questions)[:args.limit]
+    done = completed_ids(args.output, args.retry_errors)
+    pending = [item for item in items if item["id"] not in done]
+    print(f"📋 질문 {len(items)}개 중 완료 {len(items) - len(pending)}개, 실행할 질문 {len(pending)}개 (동시 {args.concurrency}개)")
+    if not pending:
+        return
+
+    mock = None
+    if args.mock_llm:
+        from mock_openai_server import MockOpenAIServer
+
+        mock = MockOpenAIServer()
+        os.environ["OPENAI_BASE_URL"] = mock.start()
+        os.environ["OPENAI_API_KEY"] = "sk-mock"
+    if args.embedded:
+        os.environ["SEARCH_BACKEND"] = "embedded"
+
+    # 환경 변수(모델, 검색 백엔드)를 설정한 뒤 그래프 생성
+    from agent.react_agent import create_react_agent
+
+    graph = create_react_agent()
+    start = time.perf_counter()
+    try:
+        written = asyncio.run(run_batch(graph, pending, args.output, args.concurrency, args.label))
+    finally:
+        if mock is not None:
+            mock.stop()
+
+    ids = {item["id"] for item in items}
+    summary = summarize([record for qid, record in load_results(args.output).items() if qid in ids])
+    print(f"\n✅ {written}개 실행 ({time.perf_counter() - start:.1f}초) - {summary}")
+
+
+if __name__ == "__main__":
+    main()
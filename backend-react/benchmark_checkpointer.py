@@ -0,0 +1,214 @@
+"""
+Benchmark checkpoint storage for a long-lived thread
+
+가짜 OpenAI 서버(mock_openai_server)와 내장 검색 엔진으로 한 스레드에서 여러 턴 대화를 실행하며
+체크포인터 저장 방식별로 턴당 체크포인트 쓰기 시간(put + put_writes), 다음 턴 시작 시 상태
+읽기 시간(get_tuple), 스레드당 저장 바이트를 비교합니다.
+
+LangGraph 기본 체크포인터:
+- MemorySaver: InMemorySaver (저장 바이트는 직렬화된 값 크기의 합)
+- SqliteSaver: langgraph-checkpoint-sqlite 패키지가 설치되어 있을 때만 실행
+
+CompactSqliteSaver 저장 형식별 (같은 SQLite 저장소):
+- snapshot: 기본 체크포인터 방식 - 채널이 바뀔 때마다 채널 전체를 저장, 압축 없음
+- compressed: snapshot + 큰 값 압축
+- delta: 메시지/검색 결과 델타 저장, 압축 없음
+- delta+compressed: 델타 + 큰 값 압축 (CHECKPOINT_DB 설정 시 사용하는 방식)
+
+    python benchmark_checkpointer.py --turns 30
+    python benchmark_checkpointer.py --turns 60 --keep-db .bench_checkpoints
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Optional
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from load_test import MULTI_TURN_SESSIONS, SINGLE_TURN_QUERIES
+from mock_openai_server import MockOpenAIServer
+
+# 오프라인 실행: 내장 검색 엔진 사용 (main()에서 설정되지 않은 값만 채움)
+OFFLINE_ENV = {"SEARCH_BACKEND": "embedded", "LOG_LEVEL": "WARNING", "OPENAI_API_KEY": "sk-mock"}
+
+# 기본 체크포인터
+STOCK_MODES = ("MemorySaver", "SqliteSaver")
+# CompactSqliteSaver 저장 형식 (compress: CHECKPOINT_COMPRESS_MIN_BYTES 이상 압축)
+COMPACT_MODES = {
+    "snapshot": {"delta_messages": False, "compress": False},
+    "compressed": {"delta_messages": False, "compress": True},
+    "delta": {"delta_messages": True, "compress": False},
+    "delta+compressed": {"delta_messages": True, "compress": True},
+}
+MODES = [*STOCK_MODES, *COMPACT_MODES]
+
+# 멀티턴 세션의 질문을 먼저, 이어서 단일 질문을 반복 (같은 스레드에서 순서대로)
+CONVERSATION = [query for session in MULTI_TURN_SESSIONS for query in session] + SINGLE_TURN_QUERIES
+
+
+def make_saver(mode: str, path: str) -> Optional[BaseCheckpointSaver]:
+    """저장 방식에 맞는 체크포인터를 만듭니다 (SqliteSaver 패키지가 없으면 None)."""
+    from agent.checkpointer import CHECKPOINT_COMPRESS_MIN_BYTES, CompactSqliteSaver
+
+    if mode == "MemorySaver":
+        return InMemorySaver()
+    if mode == "SqliteSaver":
+        try:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError:
+            return None
+        return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+    options = COMPACT_MODES[mode]
+    return CompactSqliteSaver(
+        path,
+        delta_messages=options["delta_messages"],
+        compress_min_bytes=CHECKPOINT_COMPRESS_MIN_BYTES if options["compress"] else 0,
+    )
+
+
+def stored_bytes(saver: BaseCheckpointSaver, thread_id: str) -> int:
+    """스레드 하나가 차지하는 저장 바이트 (체크포인터마다 저장 구조가 다름)"""
+    if isinstance(saver, InMemorySaver):
+        total = 0
+        for checkpoints in saver.storage[thread_id].values():
+            for checkpoint, metadata, _ in checkpoints.values():
+                total += len(checkpoint[1]) + len(metadata[1])
+        total += sum(len(typed[1]) for key, typed in saver.blobs.items() if key[0] == thread_id)
+        for key, writes in saver.writes.items():
+            if key[0] == thread_id:
+                total += sum(len(write[2][1]) for write in writes.values())
+        return total
+    if hasattr(saver, "thread_bytes"):
+        return saver.thread_bytes(thread_id)["total"]
+    # SqliteSaver: 체크포인트에 채널 값이 모두 들어 있음
+    (checkpoints,) = saver.conn.execute(
+        "SELECT COALESCE(SUM(length(checkpoint) + length(metadata)), 0) FROM checkpoints WHERE thread_id = ?",
+        (thread_id,),
+    ).fetchone()
+    (writes,) = saver.conn.execute(
+        "SELECT COALESCE(SUM(length(value)), 0) FROM writes WHERE thread_id = ?", (thread_id,)
+    ).fetchone()
+    return int(checkpoints + writes)
+
+
+def instrument(saver: BaseCheckpointSaver) -> dict:
+    """체크포인트 쓰기(put, put_writes) 시간을 기록하도록 감쌉니다."""
+    timings = {"write_ms": 0.0, "puts": 0}
+    for name in ("put", "put_writes"):
+        original = getattr(saver, name)
+
+        def timed(*args, _original=original, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                timings["write_ms"] += (time.perf_counter() - start) * 1000
+                timings["puts"] += 1
+
+        setattr(saver, name, timed)
+    return timings
+
+
+def run_mode(mode: str, turns: int, db_dir: str) -> Optional[dict]:
+    """한 저장 방식으로 turns턴 대화를 실행하고 턴별 쓰기/읽기 시간과 저장 바이트를 측정합니다."""
+    from agent.react_agent import create_react_agent
+
+    path = os.path.join(db_dir, f"{mode.replace('+', '_')}.sqlite")
+    saver = make_saver(mode, path)
+    if saver is None:
+        print(f"⏭️ {mode}: langgraph-checkpoint-sqlite 패키지가 없어 건너뜀")
+        return None
+    timings = instrument(saver)
+    graph = create_react_agent(checkpointer=saver)
+    thread_id = str(uuid.uuid4())
+    config = {"configurable": {"thread_id": thread_id}}
+
+    writes, reads, sizes = [], [], []
+    for turn in range(turns):
+        timings["write_ms"] = 0.0
+        graph.invoke({"messages": [HumanMessage(content=CONVERSATION[turn % len(CONVERSATION)])]}, config)
+        writes.append(timings["write_ms"])
+
+        # 다음 턴 시작 시 최신 상태 읽기
+        start = time.perf_counter()
+        latest = saver.get_tuple(config)
+        reads.append((time.perf_counter() - start) * 1000)
+        sizes.append(stored_bytes(saver, thread_id))
+
+    messages = len(latest.checkpoint["channel_values"]["messages"])
+    checkpoints = sum(1 for _ in saver.list(config))
+    if hasattr(saver, "close"):
+        saver.close()
+    elif hasattr(saver, "conn"):
+        saver.conn.close()
+    return {
+        "write_ms": statistics.mean(writes),
+        "last_write_ms": statistics.mean(writes[-5:]),
+        "read_ms": statistics.mean(reads),
+        "last_read_ms": statistics.mean(reads[-5:]),
+        "bytes": sizes[-1],
+        "last_turn_bytes": sizes[-1] - sizes[-2] if len(sizes) > 1 else sizes[-1],
+        "file_bytes": sum(
+            os.path.getsize(os.path.join(db_dir, name)) for name in os.listdir(db_dir)
+            if name.startswith(os.path.basename(path))
+        ),
+        "messages": messages,
+        "checkpoints": checkpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint storage benchmark (mock OpenAI, embedded search)")
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--keep-db", help="SQLite 파일을 남길 디렉터리 (기본: 임시 디렉터리, 실행 후 삭제)")
+    args = parser.parse_args()
+
+    for key, value in OFFLINE_ENV.items():
+        os.environ.setdefault(key, value)
+    from agent.checkpointer import CHECKPOINT_COMPRESS_MIN_BYTES, compression_codec
+
+    mock = MockOpenAIServer(ttft_ms=0, token_ms=0)
+    os.environ["OPENAI_BASE_URL"] = mock.start()
+    db_dir = args.keep_db or tempfile.mkdtemp(prefix="benchmark_checkpointer_")
+    os.makedirs(db_dir, exist_ok=True)
+    try:
+        results = {mode: run_mode(mode, args.turns, db_dir) for mode in args.modes}
+        results = {mode: result for mode, result in results.items() if result is not None}
+    finally:
+        mock.stop()
+        if not args.keep_db:
+            shutil.rmtree(db_dir, ignore_errors=True)
+
+    first = next(iter(results.values()))
+    print(f"\n📊 스레드 하나, {args.turns}턴 ({first['messages']}개 메시지, 체크포인트 {first['checkpoints']}개), "
+          f"압축 {compression_codec()} (≥{CHECKPOINT_COMPRESS_MIN_BYTES}B)")
+    print(f"{'방식':<18}{'쓰기/턴(ms)':>13}{'마지막5턴':>11}{'읽기(ms)':>10}{'마지막5턴':>11}"
+          f"{'스레드 KB':>11}{'마지막 턴 KB':>14}{'파일 KB':>10}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<18}{result['write_ms']:>13.2f}{result['last_write_ms']:>11.2f}"
+            f"{result['read_ms']:>10.2f}{result['last_read_ms']:>11.2f}"
+            f"{result['bytes'] / 1024:>11.1f}{result['last_turn_bytes'] / 1024:>14.1f}{result['file_bytes'] / 1024:>10.1f}"
+        )
+    # 기본 체크포인터(설치된 것 중 첫 번째, 없으면 snapshot)를 기준으로 비교
+    baseline_mode = next((mode for mode in (*STOCK_MODES, "snapshot") if mode in results), None)
+    if baseline_mode is not None:
+        baseline = results[baseline_mode]
+        for mode, result in results.items():
+            if mode != baseline_mode:
+                print(
+                    f"  {mode}: 스레드 저장량 {result['bytes'] / baseline['bytes']:.1%}, "
+                    f"쓰기 시간 {result['write_ms'] / baseline['write_ms']:.1%} ({baseline_mode} 대비)"
+                )
+
+
+if __name__ == "__main__":
+    main()
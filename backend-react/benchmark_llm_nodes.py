@@ -0,0 +1,248 @@
+"""
+Benchmark per-node LLM settings with a simulated (fake) LLM
+
+OpenAI API 없이 그래프 전체를 실행합니다. 각 노드의 LLM 호출은 모델별 지연 프로필
+(첫 토큰 지연, 프롬프트 처리, 토큰당 생성 시간)로 지연 시간을 계산하는 가짜 모델로
+대체되며, 노드 설정의 max_tokens가 출력 길이를 제한합니다. 검색은 내장 엔진을 사용합니다.
+
+    python benchmark_llm_nodes.py --runs 20
+    LLM_THINKING_MODEL=gpt-4.1-nano LLM_TOOL_CALL_MODEL=gpt-4.1-nano python benchmark_llm_nodes.py
+
+지연 프로필은 비교용 가정값이며 --profiles로 JSON 파일을 지정해 바꿀 수 있습니다.
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import statistics
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from agent.llm_config import DEFAULT_NODE_CONFIG, LLM_NODES, load_node_configs
+from tools.logging_config import LOGGER_NAMESPACES
+from tools.token_budget import count_tokens
+
+# 오프라인 실행 환경: 내장 검색 엔진 사용, 모든 요청이 LLM 계획 단계를 거치도록 라우터 비활성화
+# (main()에서만 적용, 이 모듈을 가져오는 테스트는 필요한 값을 직접 설정)
+OFFLINE_ENV = {
+    "SEARCH_BACKEND": "embedded",
+    "INTENT_ROUTER": "false",
+    "OPENAI_API_KEY": "sk-offline-benchmark",
+}
+
+# 모델별 지연 프로필 (가정값): 첫 토큰 지연, 프롬프트 1k 토큰당 처리 시간, 출력 토큰당 시간
+DEFAULT_PROFILES = {
+    "gpt-4o-mini": {"ttft_ms": 450, "prefill_ms_per_1k": 40, "ms_per_token": 12},
+    "gpt-4.1-mini": {"ttft_ms": 400, "prefill_ms_per_1k": 35, "ms_per_token": 10},
+    "gpt-4.1-nano": {"ttft_ms": 250, "prefill_ms_per_1k": 20, "ms_per_token": 5},
+    "gpt-4o": {"ttft_ms": 600, "prefill_ms_per_1k": 60, "ms_per_token": 20},
+}
+
+# 제한이 없을 때 노드별 출력 길이 (토큰) - Thinking은 "1-2문장" 지시를 자주 넘김
+NATURAL_OUTPUT_TOKENS = {"thinking": 180, "tool_call": 40, "answer": 700, "followups": 60}
+
+BENCHMARK_QUESTIONS = [
+    "K5 브레이크 패드가 빨리 닳는 이유가 뭐야?",
+    "엔진 과열이 생기면 어떻게 대처해야 하나요?",
+    "배터리 방전으로 시동이 안 걸리는 사례 알려줄래?",
+    "변속 충격 문제의 원인은?",
+    "쇼크 업소버 누유 대책이 궁금해",
+]
+
+
+class SimulatedChatModel(BaseChatModel):
+    """모델 지연 프로필과 max_tokens를 반영하는 가짜 채팅 모델"""
+
+    node: str
+    model: str
+    max_tokens: Optional[int] = None
+    latency_profile: Dict[str, float]
+    # 실행 간 공유되는 기록 목록 (복사되지 않도록 Any로 선언)
+    records: Any
+    time_scale: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _simulate(self, messages) -> tuple:
+        """(응답 메시지, 첫 토큰까지 지연 ms, 출력 토큰 수)를 만들고 호출을 기록합니다."""
+        prompt_tokens = sum(count_tokens(str(message.content)) for message in messages)
+        completion_tokens = NATURAL_OUTPUT_TOKENS[self.node]
+        if self.max_tokens:
+            completion_tokens = min(completion_tokens, self.max_tokens)
+
+        if self.node == "tool_call":
+            question = next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+            message = AIMessage(content="", tool_calls=[{
+                "name": "elasticsearch_search",
+                "args": {"query": question, "index": "vehicle_issues"},
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+            }])
+        elif self.node == "followups":
+            message = AIMessage(content="\n".join(
+                f"{i}. 후속 질문 {i} " + "가" * (completion_tokens // 3) + "?" for i in range(1, 4)
+            ))
+        else:
+            prefix = "### 🤔 Thinking\n" if self.node == "thinking" else "### 📊 검색 결과 요약\n"
+            message = AIMessage(content=prefix + "가" * completion_tokens)
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        first_token_ms = self.latency_profile["ttft_ms"] + self.latency_profile["prefill_ms_per_1k"] * prompt_tokens / 1000
+        self.records.append({
+            "node": self.node,
+            "latency_ms": first_token_ms + self.latency_profile["ms_per_token"] * completion_tokens,
+            "ttft_ms": first_token_ms,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        })
+        return message, first_token_ms, completion_tokens
+
+    def _sleep(self, ms: float) -> None:
+        if self.time_scale:
+            time.sleep(ms / 1000 * self.time_scale)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, first_token_ms, completion_tokens = self._simulate(messages)
+        self._sleep(first_token_ms + self.latency_profile["ms_per_token"] * completion_tokens)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message, first_token_ms, completion_tokens = self._simulate(messages)
+        self._sleep(first_token_ms)
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"], ensure_ascii=False), "id": call["id"], "index": 0}
+                for call in message.tool_calls
+            ]))
+            return
+        # 출력 토큰 수만큼 나눠 토큰 간격마다 전송
+        content = message.content
+        step = max(1, -(-len(content) // completion_tokens))
+        for i in range(0, len(content), step):
+            if i:
+                self._sleep(self.latency_profile["ms_per_token"])
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=content[i:i + step]))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=message.usage_metadata))
+
+
+def critical_path_ms(run_records: List[Dict[str, Any]]) -> float:
+    """한 실행의 LLM 지연 합계 (후속 질문은 답변과 병렬이므로 더 긴 쪽만 반영)"""
+    sequential = sum(record["latency_ms"] for record in run_records if record["node"] != "followups")
+    answer = sum(record["latency_ms"] for record in run_records if record["node"] == "answer")
+    followups = sum(record["latency_ms"] for record in run_records if record["node"] == "followups")
+    return sequential + max(0.0, followups - answer)
+
+
+def answer_ttft_ms(run_records: List[Dict[str, Any]]) -> float:
+    """한 실행에서 사용자가 답변 첫 토큰을 받기까지의 LLM 지연 (계획 단계 + 답변 TTFT)"""
+    planning = sum(record["latency_ms"] for record in run_records if record["node"] in ("thinking", "tool_call"))
+    return planning + sum(record["ttft_ms"] for record in run_records if record["node"] == "answer")
+
+
+def run_variant(node_configs: Dict[str, dict], profiles: Dict[str, dict], questions: List[str], runs: int, time_scale: float) -> dict:
+    """노드 설정 하나로 그래프를 실행하고 노드별 지연 시간/토큰을 집계합니다."""
+    react_agent = importlib.import_module("agent.react_agent")
+    records: List[Dict[str, Any]] = []
+
+    def factory(node: str, _config: dict) -> SimulatedChatModel:
+        config = node_configs[node]
+        return SimulatedChatModel(
+            node=node,
+            model=config["model"],
+            max_tokens=config.get("max_tokens"),
+            latency_profile=profiles.get(config["model"], profiles["gpt-4o-mini"]),
+            records=records,
+            time_scale=time_scale,
+        )
+
+    graph = react_agent.create_react_agent(llm_factory=factory)
+    for namespace in LOGGER_NAMESPACES:
+        logging.getLogger(namespace).setLevel(logging.WARNING)
+    end_to_end = []
+    first_token = []
+    for i in range(runs):
+        question = questions[i % len(questions)]
+        records_before = len(records)
+        start = time.perf_counter()
+        graph.invoke({"messages": [HumanMessage(content=question)]})
+        wall_ms = (time.perf_counter() - start) * 1000
+        simulated_llm_ms = critical_path_ms(records[records_before:])
+        # 가짜 LLM의 실제 대기 시간(time_scale)은 빼고 시뮬레이션 지연을 더함
+        end_to_end.append(wall_ms - simulated_llm_ms * time_scale + simulated_llm_ms)
+        first_token.append(answer_ttft_ms(records[records_before:]))
+
+    nodes = {}
+    for node in LLM_NODES:
+        node_records = [record for record in records if record["node"] == node]
+        latencies = sorted(record["latency_ms"] for record in node_records)
+        nodes[node] = {
+            "model": node_configs[node]["model"],
+            "max_tokens": node_configs[node].get("max_tokens"),
+            "calls": len(node_records),
+            "avg_ms": statistics.mean(latencies),
+            "p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)],
+            "avg_prompt_tokens": statistics.mean(record["prompt_tokens"] for record in node_records),
+            "avg_completion_tokens": statistics.mean(record["completion_tokens"] for record in node_records),
+        }
+    return {
+        "nodes": nodes,
+        "avg_end_to_end_ms": statistics.mean(end_to_end),
+        "avg_answer_ttft_ms": statistics.mean(first_token),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-node LLM settings benchmark (simulated LLM, no API calls)")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--profiles", help="모델별 지연 프로필 JSON 파일")
+    parser.add_argument("--time-scale", type=float, default=0.0, help="시뮬레이션 지연을 실제로 대기하는 비율 (0: 대기 없음)")
+    args = parser.parse_args()
+    for key, value in OFFLINE_ENV.items():
+        os.environ.setdefault(key, value)
+
+    profiles = dict(DEFAULT_PROFILES)
+    if args.profiles:
+        with open(args.profiles, "r", encoding="utf-8") as f:
+            profiles.update(json.load(f))
+
+    variants = {
+        "baseline (단일 모델, 제한 없음)": {node: dict(DEFAULT_NODE_CONFIG) for node in LLM_NODES},
+        "configured (llm_nodes.json + env)": load_node_configs(),
+    }
+
+    results = {label: run_variant(configs, profiles, BENCHMARK_QUESTIONS, args.runs, args.time_scale)
+               for label, configs in variants.items()}
+
+    print(f"\n📊 노드별 LLM 지연 시간 / 토큰 (실행 {args.runs}회, 시뮬레이션)")
+    print(f"{'설정':<36}{'노드':<11}{'모델':<14}{'max_tokens':>11}{'avg(ms)':>9}{'p95(ms)':>9}{'입력':>7}{'출력':>7}")
+    for label, result in results.items():
+        for node, stats in result["nodes"].items():
+            print(
+                f"{label:<36}{node:<11}{stats['model']:<14}{str(stats['max_tokens']):>11}"
+                f"{stats['avg_ms']:>9.0f}{stats['p95_ms']:>9.0f}"
+                f"{stats['avg_prompt_tokens']:>7.0f}{stats['avg_completion_tokens']:>7.0f}"
+            )
+    print("\n⏱️ 평균 전체 응답 시간")
+    for label, result in results.items():
+        print(f"  - {label}: {result['avg_end_to_end_ms']:.0f}ms (답변 첫 토큰까지 {result['avg_answer_ttft_ms']:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark per-turn logging overhead on the tool hot path
+
+내장 검색 엔진으로 도구 실행(call_tools, 턴당 검색 2회)을 반복하며 세 가지 로깅
+설정의 턴당 시간을 비교합니다. 로그는 임시 파일에 기록합니다.
+
+- off: 로그 출력 없음 (순수 작업 시간 기준선)
+- sync: 이전 방식 - 호출 스레드에서 텍스트 포맷 후 바로 쓰기, 샘플링 없음
+- queue: 큐 기반 JSON 로깅 - 백그라운드 스레드에서 포맷/쓰기, 상세 로그 샘플링
+
+    python benchmark_logging.py --turns 200
+    LOG_VERBOSE_SAMPLE_RATE=1.0 python benchmark_logging.py
+"""
+import argparse
+import importlib
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SEARCH_BACKEND", "embedded")
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from langchain_core.messages import AIMessage
+
+from tools.logging_config import LOGGER_NAMESPACES, TEXT_FORMAT, setup_logging, shutdown_logging
+
+QUERIES = ["엔진 과열", "브레이크 소음", "배터리 방전", "변속 충격", "쇼크 업소버 누유"]
+
+
+def _reset_loggers(level: int) -> None:
+    shutdown_logging()
+    for namespace in LOGGER_NAMESPACES:
+        namespace_logger = logging.getLogger(namespace)
+        for handler in list(namespace_logger.handlers):
+            namespace_logger.removeHandler(handler)
+            handler.close()
+        namespace_logger.setLevel(level)
+        namespace_logger.propagate = False
+
+
+def configure(mode: str, path: str):
+    """로깅 설정을 적용하고 로그 파일 핸들(sync/queue 모드)을 반환합니다."""
+    if mode == "off":
+        _reset_loggers(logging.CRITICAL)
+        return None
+    _reset_loggers(logging.INFO)
+    stream = open(path, "w", encoding="utf-8")
+    if mode == "sync":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        for namespace in LOGGER_NAMESPACES:
+            logging.getLogger(namespace).addHandler(handler)
+    else:
+        setup_logging(stream=stream, force=True)
+    return stream
+
+
+def run_mode(mode: str, turns: int) -> dict:
+    """설정 하나로 turns번 도구 실행을 반복하고 턴당 시간과 로그 줄 수를 측정합니다."""
+    react_agent = importlib.import_module("agent.react_agent")
+    path = os.path.join(tempfile.gettempdir(), f"benchmark_logging_{mode}.log")
+    stream = configure(mode, path)
+
+    durations = []
+    for i in range(turns):
+        tool_calls = [
+            {"name": "elasticsearch_search", "args": {"query": QUERIES[(i + k) % len(QUERIES)], "index": "vehicle_issues"}, "id": f"call_{i}_{k}"}
+            for k in range(2)
+        ]
+        start = time.perf_counter()
+        react_agent.call_tools({"messages": [AIMessage(content="", tool_calls=tool_calls)]})
+        durations.append((time.perf_counter() - start) * 1000)
+
+    # 큐에 남은 로그를 모두 쓴 뒤 줄 수 집계 (측정 시간에는 포함하지 않음)
+    _reset_loggers(logging.CRITICAL)
+    lines = 0
+    if stream is not None:
+        stream.close()
+        with open(path, "r", encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+        os.remove(path)
+    durations.sort()
+    return {
+        "avg_ms": statistics.mean(durations),
+        "p95_ms": durations[max(0, int(len(durations) * 0.95) - 1)],
+        "lines_per_turn": lines / turns,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark (embedded search, no API calls)")
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    # 내장 엔진 생성과 첫 검색은 측정에서 제외
+    run_mode("off", 5)
+    results = {mode: run_mode(mode, args.turns) for mode in ("off", "sync", "queue")}
+
+    print(f"\n📊 턴당 로깅 오버헤드 (턴 {args.turns}회, 턴당 검색 2회, "
+          f"상세 로그 샘플링 {os.getenv('LOG_VERBOSE_SAMPLE_RATE', '0.1')})")
+    print(f"{'설정':<8}{'avg(ms)':>10}{'p95(ms)':>10}{'오버헤드(ms)':>14}{'로그 줄/턴':>12}")
+    baseline = results["off"]["avg_ms"]
+    for mode, result in results.items():
+        print(
+            f"{mode:<8}{result['avg_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            f"{result['avg_ms'] - baseline:>14.2f}{result['lines_per_turn']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
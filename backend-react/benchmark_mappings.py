@@ -0,0 +1,112 @@
+"""
+Benchmark legacy (standard + fuzziness AUTO) vs Korean-aware index mappings
+
+같은 데이터와 같은 쿼리로 두 매핑을 비교합니다.
+
+    python benchmark_mappings.py --docs 100000 --repeat 20
+"""
+import argparse
+import statistics
+import time
+
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk
+
+from generate_vehicle_data import ES_PASSWORD, ES_URL, ES_USERNAME, generate_vehicle_issues
+from tools.elasticsearch_tool import ElasticsearchConfig
+from tools.index_mappings import build_index_body, build_search_query, detect_korean_analyzer
+
+BENCHMARK_QUERIES = [
+    "브레이크 패드 마모",
+    "K5 브레이크 소음",
+    "엔진 과열 냉각수 누수",
+    "변속 충격 오일 교환",
+    "배터리 방전 시동 불가",
+    "쇼크 업소버 누유",
+    "연료 펌프 고장 가속 불량",
+    "브레이크 디스크",
+]
+
+
+def create_benchmark_index(es, index_name: str, mode: str, records: list) -> None:
+    """벤치마크용 인덱스를 생성하고 데이터를 색인합니다."""
+    if es.indices.exists(index=index_name):
+        es.indices.delete(index=index_name)
+    es.indices.create(index=index_name, body=build_index_body("vehicle_issues", mode))
+    actions = ({"_index": index_name, "_id": record["순번"], "_source": record} for record in records)
+    bulk(es, actions, chunk_size=1000, raise_on_error=False)
+    es.indices.refresh(index=index_name)
+    es.indices.forcemerge(index=index_name, max_num_segments=1)
+
+
+def run_queries(es, index_name: str, search_fields: list, capabilities: dict, repeat: int) -> dict:
+    """쿼리 목록을 반복 실행하고 지연 시간과 상위 결과를 수집합니다."""
+    latencies, took = [], []
+    top_ids = {}
+    for query in BENCHMARK_QUERIES:
+        body = {"query": build_search_query(query, search_fields, capabilities), "size": 5, "_source": False}
+        for i in range(repeat):
+            start = time.perf_counter()
+            response = es.search(index=index_name, body=body, request_cache=False)
+            latencies.append((time.perf_counter() - start) * 1000)
+            took.append(response["took"])
+            if i == 0:
+                top_ids[query] = [hit["_id"] for hit in response["hits"]["hits"]]
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "avg_took_ms": statistics.mean(took),
+        "top_ids": top_ids,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy vs Korean-aware mapping benchmark")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    es = Elasticsearch(
+        [ES_URL],
+        basic_auth=(ES_USERNAME, ES_PASSWORD) if ES_PASSWORD else None,
+        verify_certs=False,
+        request_timeout=60,
+    )
+    search_fields = ElasticsearchConfig().get_index_config("vehicle_issues")["search_fields"]
+    records = generate_vehicle_issues(args.docs, seed=args.seed)
+    korean_mode = detect_korean_analyzer(es)
+
+    variants = {
+        "legacy (standard + fuzzy)": ("vehicle_issues_bench_legacy", "standard"),
+        f"korean ({korean_mode})": ("vehicle_issues_bench_korean", korean_mode),
+    }
+
+    results = {}
+    for label, (index_name, mode) in variants.items():
+        print(f"\n📤 {label}: '{index_name}' 색인 중...")
+        create_benchmark_index(es, index_name, mode, records)
+        # 검색 도구와 같은 방식으로 매핑 _meta에서 쿼리 형태 결정
+        capabilities = build_index_body("vehicle_issues", mode)["mappings"].get("_meta", {"korean_analyzer": None})
+        size_bytes = es.indices.stats(index=index_name)["_all"]["primaries"]["store"]["size_in_bytes"]
+        results[label] = run_queries(es, index_name, search_fields, capabilities, args.repeat)
+        results[label]["size_mb"] = size_bytes / 1024 / 1024
+
+    print(f"\n📊 결과 ({args.docs:,}개 문서, 쿼리 {len(BENCHMARK_QUERIES)}개 x {args.repeat}회)")
+    print(f"{'매핑':<28}{'p50(ms)':>10}{'p95(ms)':>10}{'took(ms)':>10}{'크기(MB)':>10}")
+    for label, result in results.items():
+        print(f"{label:<28}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['avg_took_ms']:>10.2f}{result['size_mb']:>10.1f}")
+
+    legacy, korean = list(results.values())
+    print("\n🔍 상위 5개 결과 겹침 (legacy 대비)")
+    for query in BENCHMARK_QUERIES:
+        overlap = len(set(legacy["top_ids"][query]) & set(korean["top_ids"][query]))
+        print(f"  - {query}: {overlap}/5")
+
+    for index_name, _ in variants.values():
+        es.indices.delete(index=index_name)
+
+
+if __name__ == "__main__":
+    main()
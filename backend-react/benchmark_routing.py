@@ -0,0 +1,109 @@
+"""
+Benchmark manufacturer routing on a multi-shard vehicle_issues index
+
+제조사(_routing)로 색인한 다중 샤드 인덱스에서 한 제조사만 가리키는 질문을 라우팅 없이
+(전체 샤드) / 라우팅으로(한 샤드) 실행해 검색한 샤드 수와 지연 시간을 비교합니다.
+
+    python benchmark_routing.py --docs 100000 --shards 6 --repeat 20
+"""
+import argparse
+import statistics
+import time
+
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk
+
+from generate_vehicle_data import ES_PASSWORD, ES_URL, ES_USERNAME, build_bulk_actions, generate_vehicle_issues
+from tools.elasticsearch_tool import ElasticsearchConfig
+from tools.index_mappings import build_index_body, build_search_query, detect_korean_analyzer, load_mapping_spec
+from tools.routing import detect_manufacturer
+
+# 한 제조사만 가리키는 질문 (라우팅 대상)
+ROUTED_QUERIES = [
+    "K5 브레이크 소음",
+    "쏘나타 엔진 과열",
+    "GV80 변속 충격",
+    "스포티지 배터리 방전",
+    "티볼리 냉각수 누수",
+    "QM6 연료 펌프 고장",
+]
+
+
+def run_queries(es, index_name: str, search_fields: list, capabilities: dict, repeat: int, routed: bool) -> dict:
+    """질문 목록을 반복 실행하고 지연 시간, took, 검색한 샤드 수와 상위 결과를 수집합니다."""
+    latencies, took, shards = [], [], []
+    top_ids = {}
+    for query in ROUTED_QUERIES:
+        body = {"query": build_search_query(query, search_fields, capabilities), "size": 5, "_source": ["제조사"]}
+        options = {"routing": detect_manufacturer(query)} if routed else {}
+        for i in range(repeat):
+            start = time.perf_counter()
+            response = es.search(index=index_name, body=body, request_cache=False, **options)
+            latencies.append((time.perf_counter() - start) * 1000)
+            took.append(response["took"])
+            shards.append(response["_shards"]["total"])
+            if i == 0:
+                top_ids[query] = [hit["_id"] for hit in response["hits"]["hits"]]
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "avg_took_ms": statistics.mean(took),
+        "avg_shards": statistics.mean(shards),
+        "top_ids": top_ids,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manufacturer routing benchmark (multi-shard index)")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--shards", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    es = Elasticsearch(
+        [ES_URL],
+        basic_auth=(ES_USERNAME, ES_PASSWORD) if ES_PASSWORD else None,
+        verify_certs=False,
+        request_timeout=60,
+    )
+    index_name = "vehicle_issues_bench_routing"
+    search_fields = ElasticsearchConfig().get_index_config("vehicle_issues")["search_fields"]
+    records = generate_vehicle_issues(args.docs, seed=args.seed)
+    mode = detect_korean_analyzer(es)
+    if mode == "standard":
+        raise SystemExit("❌ 제조사 라우팅은 한국어 매핑(nori/ngram)에서만 사용됩니다 (ES_KOREAN_ANALYZER 확인)")
+
+    print(f"\n📤 '{index_name}' 색인 중 (샤드 {args.shards}개, 분석기 {mode}, 제조사 라우팅)...")
+    if es.indices.exists(index=index_name):
+        es.indices.delete(index=index_name)
+    spec = load_mapping_spec()
+    mapping = build_index_body("vehicle_issues", mode, spec, shards=args.shards)
+    es.indices.create(index=index_name, body=mapping)
+    bulk(es, build_bulk_actions(records, index_name, mapping, spec, mode), chunk_size=1000, raise_on_error=False)
+    es.indices.refresh(index=index_name)
+    es.indices.forcemerge(index=index_name, max_num_segments=1)
+
+    capabilities = mapping["mappings"]["_meta"]
+    results = {
+        "fan-out (라우팅 없음)": run_queries(es, index_name, search_fields, capabilities, args.repeat, routed=False),
+        "routed (제조사)": run_queries(es, index_name, search_fields, capabilities, args.repeat, routed=True),
+    }
+
+    print(f"\n📊 결과 ({args.docs:,}개 문서, 샤드 {args.shards}개, 질문 {len(ROUTED_QUERIES)}개 x {args.repeat}회)")
+    print(f"{'검색 방식':<24}{'샤드':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'took(ms)':>10}")
+    for label, result in results.items():
+        print(f"{label:<24}{result['avg_shards']:>8.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['avg_took_ms']:>10.2f}")
+
+    fan_out, routed = results.values()
+    print("\n🔍 상위 5개 결과 겹침 (fan-out 대비)")
+    for query in ROUTED_QUERIES:
+        overlap = len(set(fan_out["top_ids"][query]) & set(routed["top_ids"][query]))
+        print(f"  - {query} ({detect_manufacturer(query)}): {overlap}/5")
+
+    es.indices.delete(index=index_name)
+
+
+if __name__ == "__main__":
+    main()
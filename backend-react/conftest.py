@@ -0,0 +1,10 @@
+"""
+pytest 공통 설정
+
+agent 패키지를 가져오면 그래프(ChatOpenAI)가 생성되어 OPENAI_API_KEY가 필요합니다. 오프라인
+테스트는 실제 API를 호출하지 않으므로 수집 전에 더미 키만 채웁니다. 그 밖의 환경 변수는 각
+테스트가 monkeypatch로 설정합니다.
+"""
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
@@ -8,22 +8,20 @@ from elasticsearch.helpers import bulk
 import os
 from dotenv import load_dotenv
 
+from tools.incremental_loader import document_id, sync_index
+from tools.index_mappings import build_index_body, compose_fields, detect_korean_analyzer, load_mapping_spec
+from tools.vehicle_catalog import VEHICLES
+
 load_dotenv()
 
 # Elasticsearch 설정
 ES_URL = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
 ES_USERNAME = os.getenv("ELASTICSEARCH_USERNAME", "elastic")
 ES_PASSWORD = os.getenv("ELASTICSEARCH_PASSWORD", "")
+# vehicle_issues 프라이머리 샤드 수 (미지정 시 ES 기본값, 제조사 라우팅은 샤드가 여러 개일 때 효과)
+ES_VEHICLE_SHARDS = int(os.getenv("ES_VEHICLE_SHARDS", "0")) or None
 
-# 현실적인 데이터 패턴
-VEHICLES = {
-    "현대": ["Sonata", "Avante", "Grandeur", "Tucson", "SantaFe", "Kona", "Venue", "Palisade"],
-    "기아": ["K3", "K5", "K7", "K8", "Sportage", "Sorento", "Carnival", "Seltos", "Niro"],
-    "제네시스": ["G70", "G80", "G90", "GV70", "GV80"],
-    "쌍용": ["Tivoli", "Korando", "Rexton"],
-    "르노삼성": ["SM6", "QM6", "XM3"]
-}
-
+# 현실적인 데이터 패턴 (제조사별 차종 VEHICLES는 tools/vehicle_catalog.py)
 SYSTEMS = {
     "브레이크": {
         "문제점": [
@@ -270,40 +268,45 @@ SYSTEMS = {
 STAGES = ["설계", "개발", "테스트", "배포", "양산", "A/S"]
 SEVERITY = ["경미", "보통", "심각", "긴급"]
 
-def generate_vehicle_issues(num_records=100000):
-    """Generate realistic vehicle issue records"""
+# 발생일자 기준일 (실행 날짜와 무관하게 같은 seed는 같은 데이터 → 증분 색인 시 내용 해시 유지)
+DATA_ANCHOR_DATE = datetime(2025, 12, 1)
+
+def generate_vehicle_issues(num_records=100000, seed=None):
+    """Generate realistic vehicle issue records (seed를 지정하면 재현 가능한 데이터 생성)"""
+
+    rng = random.Random(seed)
 
     print(f"🔧 {num_records:,}개의 차량 문제점 데이터 생성 중...")
 
     records = []
     for i in range(num_records):
         # 랜덤하게 제조사와 차종 선택
-        manufacturer = random.choice(list(VEHICLES.keys()))
-        vehicle = random.choice(VEHICLES[manufacturer])
+        manufacturer = rng.choice(list(VEHICLES.keys()))
+        vehicle = rng.choice(VEHICLES[manufacturer])
 
         # 랜덤하게 시스템 선택
-        system = random.choice(list(SYSTEMS.keys()))
+        system = rng.choice(list(SYSTEMS.keys()))
         system_data = SYSTEMS[system]
 
         # 해당 시스템의 문제점, 현상, 원인, 대책 선택
-        issue = random.choice(system_data["문제점"])
-        symptom = random.choice(system_data["현상"])
-        cause = random.choice(system_data["원인"])
-        solution = random.choice(system_data["대책"])
+        issue = rng.choice(system_data["문제점"])
+        symptom = rng.choice(system_data["현상"])
+        cause = rng.choice(system_data["원인"])
+        solution = rng.choice(system_data["대책"])
 
         # 기타 정보
-        stage = random.choice(STAGES)
-        severity = random.choice(SEVERITY)
+        stage = rng.choice(STAGES)
+        severity = rng.choice(SEVERITY)
 
         # 날짜 생성 (최근 2년 이내)
-        days_ago = random.randint(0, 730)
-        date = (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+        days_ago = rng.randint(0, 730)
+        date = (DATA_ANCHOR_DATE - timedelta(days=days_ago)).strftime("%Y-%m-%d")
 
         # 주행거리 (랜덤)
-        mileage = random.randint(1000, 200000)
+        mileage = rng.randint(1000, 200000)
 
         # VIN 번호 생성 (임의)
-        vin = f"{manufacturer[:3].upper()}{vehicle[:3].upper()}{random.randint(10000000, 99999999)}"
+        vin = f"{manufacturer[:3].upper()}{vehicle[:3].upper()}{rng.randint(10000000, 99999999)}"
 
         record = {
             "순번": i + 1,
@@ -329,7 +332,26 @@ def generate_vehicle_issues(num_records=100000):
     print(f"✅ {num_records:,}개 데이터 생성 완료!")
     return records
 
-def index_to_elasticsearch(records, index_name="vehicle_issues"):
+def build_bulk_actions(records, index_name, mapping, mapping_spec, analyzer_mode):
+    """
+    Bulk 업로드 액션을 만듭니다.
+
+    매핑에 라우팅 필드(_meta.routing_field, 제조사)가 있으면 문서마다 그 값을 _routing으로
+    지정해 같은 제조사의 문서가 한 샤드에 모이게 합니다. 문서 ID는 증분 반영과 같은 순번 기반 ID입니다.
+    """
+    routing_field = mapping["mappings"].get("_meta", {}).get("routing_field")
+    id_fields = mapping_spec["indices"]["vehicle_issues"]["id_fields"]
+    for record in records:
+        action = {
+            "_index": index_name,
+            "_id": document_id(record, id_fields),
+            "_source": compose_fields("vehicle_issues", record, mapping_spec) if analyzer_mode != "standard" else record
+        }
+        if routing_field:
+            action["_routing"] = record[routing_field]
+        yield action
+
+def index_to_elasticsearch(records, index_name="vehicle_issues", shards=ES_VEHICLE_SHARDS):
     """Bulk index records to Elasticsearch"""
 
     print(f"\n📤 Elasticsearch에 데이터 업로드 중...")
@@ -346,40 +368,20 @@ def index_to_elasticsearch(records, index_name="vehicle_issues"):
         print(f"  기존 인덱스 '{index_name}' 삭제 중...")
         es.indices.delete(index=index_name)
 
-    # 인덱스 매핑 설정
-    mapping = {
-        "mappings": {
-            "properties": {
-                "순번": {"type": "integer"},
-                "제조사": {"type": "keyword"},
-                "차종": {"type": "keyword"},
-                "시스템": {"type": "keyword"},
-                "문제점내용": {"type": "text", "analyzer": "standard"},
-                "현상": {"type": "text", "analyzer": "standard"},
-                "원인및요구안내용": {"type": "text", "analyzer": "standard"},
-                "대책조치": {"type": "text", "analyzer": "standard"},
-                "단계": {"type": "keyword"},
-                "심각도": {"type": "keyword"},
-                "발생일자": {"type": "date"},
-                "주행거리": {"type": "integer"},
-                "VIN": {"type": "keyword"}
-            }
-        }
-    }
+    # 선언적 명세로 인덱스 매핑 생성 (nori 또는 ngram 한국어 분석기)
+    analyzer_mode = detect_korean_analyzer(es)
+    mapping_spec = load_mapping_spec()
+    mapping = build_index_body("vehicle_issues", analyzer_mode, mapping_spec, shards=shards)
+    print(f"  한국어 분석기: {analyzer_mode}")
+    if mapping["mappings"].get("_routing"):
+        print(f"  라우팅: {mapping['mappings']['_meta']['routing_field']} (샤드 {shards or '기본값'})")
 
     print(f"  새 인덱스 '{index_name}' 생성 중...")
     es.indices.create(index=index_name, body=mapping)
 
-    # Bulk 업로드를 위한 액션 생성
-    def generate_actions():
-        for record in records:
-            yield {
-                "_index": index_name,
-                "_source": record
-            }
-
-    # Bulk 업로드
-    success, failed = bulk(es, generate_actions(), chunk_size=1000, raise_on_error=False)
+    # Bulk 업로드 (중복 제거용 dedup_key 등 composed 필드, 제조사 라우팅 포함)
+    actions = build_bulk_actions(records, index_name, mapping, mapping_spec, analyzer_mode)
+    success, failed = bulk(es, actions, chunk_size=1000, raise_on_error=False)
 
     print(f"✅ 업로드 완료: {success:,}개 성공, {len(failed):,}개 실패")
 
@@ -415,15 +417,48 @@ def index_to_elasticsearch(records, index_name="vehicle_issues"):
     for bucket in agg_result["aggregations"]["by_system"]["buckets"]:
         print(f"    - {bucket['key']}: {bucket['doc_count']:,}개")
 
+def sync_to_elasticsearch(records, index_name="vehicle_issues", shards=ES_VEHICLE_SHARDS):
+    """
+    Incrementally sync records to Elasticsearch
+
+    순번을 문서 ID로, 내용 해시를 매니페스트와 비교해 새/변경 문서만 색인하고 사라진 문서는 삭제합니다.
+    인덱스가 없으면 새로 만듭니다 (shards는 이때만 적용).
+    """
+    print(f"\n📤 Elasticsearch에 변경분 반영 중...")
+
+    es = Elasticsearch(
+        [ES_URL],
+        basic_auth=(ES_USERNAME, ES_PASSWORD) if ES_PASSWORD else None,
+        verify_certs=False
+    )
+    stats = sync_index(es, "vehicle_issues", records, index_name=index_name, shards=shards)
+
+    print(f"✅ 반영 완료: 추가 {stats['created']:,}개, 변경 {stats['updated']:,}개, "
+          f"삭제 {stats['deleted']:,}개, 그대로 {stats['unchanged']:,}개, 실패 {stats['failed']:,}개")
+    if stats["full_scan"]:
+        print("  (매니페스트가 없거나 인덱스가 바뀌어 전체 문서를 비교했습니다)")
+    print(f"  총 문서 수: {es.count(index=index_name)['count']:,}개")
+
 if __name__ == "__main__":
+    import argparse
     import time
+
+    parser = argparse.ArgumentParser(description="Generate vehicle_issues data and load it into Elasticsearch")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42, help="같은 시드면 같은 데이터 (증분 반영 시 변경분만 색인)")
+    parser.add_argument("--rebuild", action="store_true", help="인덱스를 지우고 전체 재색인")
+    args = parser.parse_args()
+
     start_time = time.time()
 
-    # 10만개 데이터 생성
-    records = generate_vehicle_issues(100000)
+    # 데이터 생성
+    records = generate_vehicle_issues(args.docs, seed=args.seed)
 
-    # Elasticsearch에 업로드
-    index_to_elasticsearch(records)
+    # Elasticsearch에 업로드 (기본: 증분 반영)
+    if args.rebuild:
+        index_to_elasticsearch(records)
+    else:
+        sync_to_elasticsearch(records)
 
     elapsed_time = time.time() - start_time
     print(f"\n⏱️  총 소요 시간: {elapsed_time:.2f}초")
@@ -0,0 +1,293 @@
+"""
+End-to-end load test for the LangGraph API server with local stand-ins
+
+가짜 OpenAI 서버(mock_openai_server)와 내장 검색 엔진(SEARCH_BACKEND=embedded, 시드 고정 데이터)으로
+LangGraph API 서버(langgraph dev)를 띄우고, 한국어 차량 질문을 단일/멀티턴 세션으로 목표 도착률에
+맞춰 보냅니다. 도착률 단계별로 TTFT, 턴 전체 지연 백분위수, 오류율, 처리량을 측정하고 포화 지점
+(p95 턴 지연이 첫 단계의 --slo-factor배를 넘거나 오류율이 --max-error-rate를 넘는 첫 단계)을
+보고합니다.
+
+    python load_test.py --rates 0.5,1,2,4,8 --duration 60
+    python load_test.py --rates 2 --duration 30 --multi-turn-ratio 0.5 --ttft-ms 500
+    python load_test.py --server-url http://127.0.0.1:2025 --rates 1,2   # 이미 실행 중인 서버 (환경은 직접 설정)
+
+서버 실행에는 langgraph CLI 인메모리 서버가 필요합니다 (pip install "langgraph-cli[inmem]").
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from langgraph_sdk import get_client
+
+from mock_openai_server import MockOpenAIServer
+
+ASSISTANT_ID = "react_agent"
+
+# 단일턴 질문
+SINGLE_TURN_QUERIES = [
+    "K5 브레이크 소음 이슈 찾아줘",
+    "쏘나타 엔진 과열 원인이 뭐야?",
+    "투싼 변속기 충격 사례 알려줘",
+    "아반떼 배터리 방전 문제 검색해줘",
+    "GV80 에어컨 냄새 관련 이슈 있어?",
+    "스포티지 냉각수 누수 조치 방법은?",
+    "티볼리 연료 펌프 고장 사례",
+    "QM6 시동 꺼짐 현상 찾아줘",
+]
+
+# 멀티턴 세션 (같은 스레드에서 순서대로 질문)
+MULTI_TURN_SESSIONS = [
+    ["K5 브레이크 소음 이슈 찾아줘", "그중 가장 많이 한 조치는 뭐야?", "쏘렌토에도 같은 문제가 있어?"],
+    ["쏘나타 엔진 과열 원인이 뭐야?", "냉각 시스템 관련 건만 다시 보여줘"],
+    ["팰리세이드 전장 계통 이슈 알려줘", "그중 최근에 발생한 것은?", "비슷한 사례가 싼타페에도 있어?"],
+    ["모닝 에어백 경고등 사례 찾아줘", "조치 방법을 정리해줘"],
+]
+
+
+def build_sessions(rate: float, duration: float, multi_turn_ratio: float, seed: int) -> List[Dict[str, Any]]:
+    """
+    포아송 도착(평균 rate개/초)으로 duration초 동안의 세션 목록을 만듭니다.
+
+    Returns:
+        [{"at": 시작 시각(초), "kind": "single" | "multi", "turns": [질문, ...]}]
+    """
+    rng = random.Random(seed)
+    sessions = []
+    at = rng.expovariate(rate)
+    while at < duration:
+        if rng.random() < multi_turn_ratio:
+            sessions.append({"at": at, "kind": "multi", "turns": list(rng.choice(MULTI_TURN_SESSIONS))})
+        else:
+            sessions.append({"at": at, "kind": "single", "turns": [rng.choice(SINGLE_TURN_QUERIES)]})
+        at += rng.expovariate(rate)
+    return sessions
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """최근접 순위 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize_stage(rate: float, turns: List[Dict[str, Any]], sessions: int, elapsed: float, max_in_flight: int) -> Dict[str, Any]:
+    """한 도착률 단계의 턴 결과를 요약합니다."""
+    ok = [turn for turn in turns if turn["error"] is None]
+    ttft = [turn["ttft_ms"] for turn in ok if turn["ttft_ms"] is not None]
+    latency = [turn["latency_ms"] for turn in ok]
+    errors = len(turns) - len(ok)
+    return {
+        "rate": rate,
+        "sessions": sessions,
+        "turns": len(turns),
+        "errors": errors,
+        "error_rate": errors / len(turns) if turns else 0.0,
+        "throughput_sessions_s": sessions / elapsed if elapsed else 0.0,
+        "throughput_turns_s": len(ok) / elapsed if elapsed else 0.0,
+        "max_in_flight": max_in_flight,
+        **{f"ttft_p{pct}_ms": percentile(ttft, pct) for pct in (50, 95, 99)},
+        **{f"latency_p{pct}_ms": percentile(latency, pct) for pct in (50, 95, 99)},
+        "error_samples": sorted({turn["error"] for turn in turns if turn["error"]})[:3],
+    }
+
+
+def find_saturation(stages: List[Dict[str, Any]], slo_factor: float, max_error_rate: float) -> Optional[Dict[str, Any]]:
+    """
+    포화가 시작된 첫 단계를 찾습니다.
+
+    기준은 첫(가장 낮은) 도착률 단계의 p95 턴 지연이며, p95가 기준의 slo_factor배를 넘거나
+    오류율이 max_error_rate를 넘으면 포화로 봅니다. 열린 루프 부하라 서버가 도착률을 따라가지
+    못하면 대기열이 쌓여 지연으로 나타납니다.
+
+    Returns:
+        {"rate", "reason"} 또는 None (모든 단계가 기준 안)
+    """
+    if not stages:
+        return None
+    baseline = stages[0]["latency_p95_ms"]
+    for stage in stages:
+        if stage["error_rate"] > max_error_rate:
+            return {"rate": stage["rate"], "reason": f"error rate {stage['error_rate']:.1%}"}
+        if baseline and stage["latency_p95_ms"] and stage["latency_p95_ms"] > baseline * slo_factor:
+            return {"rate": stage["rate"], "reason": f"p95 {stage['latency_p95_ms']:.0f}ms > {slo_factor}x baseline {baseline:.0f}ms"}
+    return None
+
+
+async def run_turn(client, thread_id: str, query: str, timeout: float) -> Dict[str, Any]:
+    """한 턴을 스트리밍으로 실행하고 TTFT(사용자에게 보이는 첫 AI 토큰)와 턴 전체 지연을 잽니다."""
+    start = time.perf_counter()
+    ttft_ms = None
+    error = None
+    try:
+        async with asyncio.timeout(timeout):
+            async for chunk in client.runs.stream(
+                thread_id,
+                ASSISTANT_ID,
+                input={"messages": [{"role": "user", "content": query}]},
+                stream_mode="messages-tuple",
+            ):
+                if chunk.event == "error":
+                    error = str(chunk.data)[:200]
+                elif chunk.event == "messages" and ttft_ms is None:
+                    message, _ = chunk.data
+                    if message.get("type") in ("AIMessageChunk", "ai") and message.get("content"):
+                        ttft_ms = (time.perf_counter() - start) * 1000
+    except TimeoutError:
+        error = f"timeout after {timeout:.0f}s"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"[:200]
+    return {"query": query, "ttft_ms": ttft_ms, "latency_ms": (time.perf_counter() - start) * 1000, "error": error}
+
+
+async def run_stage(url: str, rate: float, duration: float, multi_turn_ratio: float, seed: int, timeout: float) -> Dict[str, Any]:
+    """한 도착률 단계를 실행합니다 (열린 루프: 응답을 기다리지 않고 도착 시각에 세션 시작)."""
+    client = get_client(url=url)
+    sessions = build_sessions(rate, duration, multi_turn_ratio, seed)
+    turns: List[Dict[str, Any]] = []
+    in_flight = {"now": 0, "max": 0}
+    start = time.perf_counter()
+
+    async def run_session(session: Dict[str, Any]) -> None:
+        await asyncio.sleep(max(0.0, session["at"] - (time.perf_counter() - start)))
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            thread = await client.threads.create()
+            for query in session["turns"]:
+                result = await run_turn(client, thread["thread_id"], query, timeout)
+                turns.append({**result, "kind": session["kind"]})
+                if result["error"]:
+                    break
+        except Exception as e:
+            turns.append({"query": session["turns"][0], "ttft_ms": None, "latency_ms": 0.0, "error": f"{type(e).__name__}: {e}"[:200], "kind": session["kind"]})
+        finally:
+            in_flight["now"] -= 1
+
+    await asyncio.gather(*(run_session(session) for session in sessions))
+    elapsed = time.perf_counter() - start
+    return summarize_stage(rate, turns, len(sessions), elapsed, in_flight["max"])
+
+
+def wait_ready(url: str, timeout: float, process: Optional[subprocess.Popen] = None) -> None:
+    """서버의 /ready(웜업 완료)가 200을 반환할 때까지 기다립니다."""
+    deadline = time.time() + timeout
+    with httpx.Client(timeout=5) as http:
+        while time.time() < deadline:
+            if process is not None and process.poll() is not None:
+                raise SystemExit(f"❌ LangGraph 서버가 종료되었습니다 (exit {process.returncode})")
+            try:
+                if http.get(f"{url}/ready").status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+    raise SystemExit(f"❌ {timeout:.0f}초 안에 서버가 준비되지 않았습니다: {url}")
+
+
+def start_server(port: int, openai_base_url: str, vehicle_docs: int, jobs_per_worker: Optional[int]) -> subprocess.Popen:
+    """가짜 OpenAI 서버와 내장 검색 엔진을 쓰도록 환경을 설정해 langgraph dev를 시작합니다."""
+    if shutil.which("langgraph") is None:
+        raise SystemExit('❌ langgraph CLI가 없습니다: pip install "langgraph-cli[inmem]"')
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": openai_base_url,
+        "OPENAI_API_KEY": "sk-mock",
+        "SEARCH_BACKEND": "embedded",
+        "EMBEDDED_VEHICLE_DOCS": str(vehicle_docs),
+        "WARMUP_ON_LOAD": "true",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    }
+    command = ["langgraph", "dev", "--port", str(port), "--no-browser", "--no-reload"]
+    if jobs_per_worker:
+        command += ["--n-jobs-per-worker", str(jobs_per_worker)]
+    return subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LangGraph API load test with mock OpenAI and embedded search")
+    parser.add_argument("--rates", default="0.5,1,2,4", help="단계별 세션 도착률(개/초), 쉼표 구분")
+    parser.add_argument("--duration", type=float, default=60.0, help="단계별 도착 시간(초)")
+    parser.add_argument("--multi-turn-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--turn-timeout", type=float, default=120.0)
+    parser.add_argument("--slo-factor", type=float, default=2.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--server-url", default=None, help="이미 실행 중인 서버 (미지정 시 로컬 스택 시작)")
+    parser.add_argument("--port", type=int, default=2025)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="가짜 OpenAI 첫 토큰 지연")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="가짜 OpenAI 토큰 간격")
+    parser.add_argument("--vehicle-docs", type=int, default=5000, help="내장 검색 엔진 문서 수 (시드 42)")
+    parser.add_argument("--jobs-per-worker", type=int, default=None, help="langgraph dev --n-jobs-per-worker")
+    parser.add_argument("--output", default=None, help="단계별 결과 JSON 저장 경로")
+    args = parser.parse_args()
+    rates = [float(rate) for rate in args.rates.split(",")]
+
+    mock = None
+    process = None
+    url = args.server_url
+    try:
+        if url is None:
+            mock = MockOpenAIServer(ttft_ms=args.ttft_ms, token_ms=args.token_ms)
+            openai_base_url = mock.start()
+            print(f"🤖 Mock OpenAI: {openai_base_url} (TTFT {args.ttft_ms:.0f}ms, {args.token_ms:.0f}ms/token)")
+            process = start_server(args.port, openai_base_url, args.vehicle_docs, args.jobs_per_worker)
+            url = f"http://127.0.0.1:{args.port}"
+        wait_ready(url, timeout=180, process=process)
+        print(f"✅ LangGraph API ready: {url}")
+
+        stages = []
+        for rate in rates:
+            print(f"\n🚦 도착률 {rate}/s x {args.duration:.0f}초 (멀티턴 {args.multi_turn_ratio:.0%})...")
+            stage = asyncio.run(run_stage(url, rate, args.duration, args.multi_turn_ratio, args.seed, args.turn_timeout))
+            stages.append(stage)
+            print(f"  턴 {stage['turns']}개, 오류 {stage['errors']}개, 최대 동시 세션 {stage['max_in_flight']}개")
+            for sample in stage["error_samples"]:
+                print(f"  ⚠️ {sample}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if mock is not None:
+            llm_stats = mock.get_stats()
+            mock.stop()
+
+    print(f"\n📊 결과 (단계별 {args.duration:.0f}초, 시드 {args.seed})")
+    print(f"{'rate/s':>7}{'세션/s':>8}{'턴':>6}{'오류율':>8}{'동시':>6}"
+          f"{'TTFT p50':>10}{'p95':>8}{'p99':>8}{'턴 p50':>9}{'p95':>8}{'p99':>8}")
+    for stage in stages:
+        print(
+            f"{stage['rate']:>7}{stage['throughput_sessions_s']:>8.2f}{stage['turns']:>6}{stage['error_rate']:>8.1%}{stage['max_in_flight']:>6}"
+            f"{_ms(stage['ttft_p50_ms']):>10}{_ms(stage['ttft_p95_ms']):>8}{_ms(stage['ttft_p99_ms']):>8}"
+            f"{_ms(stage['latency_p50_ms']):>9}{_ms(stage['latency_p95_ms']):>8}{_ms(stage['latency_p99_ms']):>8}"
+        )
+
+    saturation = find_saturation(stages, args.slo_factor, args.max_error_rate)
+    if saturation:
+        print(f"\n🔥 포화 지점: {saturation['rate']}/s ({saturation['reason']})")
+    else:
+        print(f"\n✅ 모든 단계가 기준 안 (최대 {rates[-1]}/s) - 더 높은 도착률로 다시 실행하세요")
+    if mock is not None:
+        print(f"🤖 Mock OpenAI 요청: {llm_stats}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "stages": stages, "saturation": saturation}, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
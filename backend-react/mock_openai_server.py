@@ -0,0 +1,194 @@
+"""
+Local mock OpenAI-compatible server
+
+OpenAI API 호출 없이 에이전트 그래프를 실제 HTTP 경로(공유 httpx 클라이언트, SSE 스트리밍)로
+실행하기 위한 가짜 서버입니다. 그래프의 LLM 노드 요청 형태를 보고 응답을 만듭니다.
+
+- tool_call (tools 포함, 마지막 메시지가 사용자 질문): elasticsearch_search 도구 호출
+- followups (시스템 프롬프트에 '후속 질문'): 번호 매긴 질문 3개
+- answer (마지막 메시지가 도구 결과): 검색 결과 요약 답변
+- thinking (그 외): 1문장 검색 계획
+
+    python mock_openai_server.py --port 8100 --ttft-ms 300 --token-ms 20
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=sk-mock langgraph dev
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def plan_response(body: Dict[str, Any]) -> Dict[str, Any]:
+    """요청 형태로 노드를 구분해 응답 내용(text 또는 tool_call)을 만듭니다."""
+    messages = body.get("messages", [])
+    last = messages[-1] if messages else {}
+    question = next((_text(m.get("content")) for m in reversed(messages) if m.get("role") == "user"), "")
+    system = " ".join(_text(m.get("content")) for m in messages if m.get("role") == "system")
+
+    if body.get("tools") and last.get("role") != "tool":
+        names = [tool["function"]["name"] for tool in body["tools"]]
+        name = "elasticsearch_search" if "elasticsearch_search" in names else names[0]
+        return {"tool_call": {"name": name, "arguments": json.dumps({"query": question, "index": "vehicle_issues"}, ensure_ascii=False)}}
+    if "후속 질문" in system:
+        return {"text": "\n".join(f"{i}. {question} 관련 후속 질문 {i}은 무엇인가요?" for i in range(1, 4))}
+    if last.get("role") == "tool":
+        return {"text": (
+            f"### 📊 검색 결과 요약\n'{question}'에 대한 검색 결과를 정리했습니다.\n\n"
+            "### 🔍 주요 발견사항\n1. 관련 이슈가 여러 차종에서 확인되었습니다.\n2. 대부분 부품 교체로 조치되었습니다.\n\n"
+            "### 💡 결론 및 권장사항\n동일 증상이 있으면 점검을 권장합니다."
+        )}
+    return {"text": f"'{question}' 관련 이슈를 차량 이슈 인덱스에서 검색하겠습니다."}
+
+
+class MockOpenAIServer:
+    """
+    가짜 OpenAI 서버 (FastAPI 앱 + 백그라운드 uvicorn 실행)
+
+    Attributes:
+        ttft_ms: 첫 청크까지의 지연
+        token_ms: 청크(단어) 사이 지연
+    """
+
+    def __init__(self, ttft_ms: float = 0.0, token_ms: float = 0.0):
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.stats = {"requests": 0, "streams": 0}
+        self.client_connections = set()
+        self.app = self._build_app()
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self.base_url: Optional[str] = None
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            self.stats["requests"] += 1
+            # 클라이언트 (host, port)는 TCP 연결 하나를 뜻함 (keep-alive 재사용 시 같은 포트)
+            self.client_connections.add((request.client.host, request.client.port))
+            plan = plan_response(body)
+            if body.get("stream"):
+                self.stats["streams"] += 1
+                include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+                return StreamingResponse(self._stream(body["model"], plan, include_usage), media_type="text/event-stream")
+            await asyncio.sleep(self.ttft_ms / 1000)
+            return JSONResponse(self._completion(body["model"], plan))
+
+        @app.get("/v1/models/{model}")
+        async def retrieve_model(model: str, request: Request):
+            self.client_connections.add((request.client.host, request.client.port))
+            return {"id": model, "object": "model", "created": 0, "owned_by": "mock"}
+
+        @app.get("/mock/stats")
+        async def mock_stats():
+            return self.get_stats()
+
+        return app
+
+    @staticmethod
+    def _usage(plan: Dict[str, Any]) -> Dict[str, int]:
+        output_tokens = len(TOKEN_PATTERN.findall(plan.get("text", ""))) or 1
+        return {"prompt_tokens": 100, "completion_tokens": output_tokens, "total_tokens": 100 + output_tokens}
+
+    def _completion(self, model: str, plan: Dict[str, Any]) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"role": "assistant", "content": plan.get("text")}
+        finish_reason = "stop"
+        if "tool_call" in plan:
+            message["tool_calls"] = [{"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function", "function": plan["tool_call"]}]
+            finish_reason = "tool_calls"
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": self._usage(plan),
+        }
+
+    async def _stream(self, model: str, plan: Dict[str, Any], include_usage: bool):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, usage: Optional[dict] = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if usage is None else [],
+            }
+            if usage is not None:
+                payload["usage"] = usage
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        await asyncio.sleep(self.ttft_ms / 1000)
+        if "tool_call" in plan:
+            call = {"index": 0, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+                    "function": {"name": plan["tool_call"]["name"], "arguments": plan["tool_call"]["arguments"]}}
+            yield chunk({"role": "assistant", "content": None, "tool_calls": [call]})
+            finish_reason = "tool_calls"
+        else:
+            yield chunk({"role": "assistant", "content": ""})
+            for token in TOKEN_PATTERN.findall(plan["text"]):
+                yield chunk({"content": token})
+                if self.token_ms:
+                    await asyncio.sleep(self.token_ms / 1000)
+            finish_reason = "stop"
+        yield chunk({}, finish_reason)
+        if include_usage:
+            yield chunk({}, usage=self._usage(plan))
+        yield "data: [DONE]\n\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "client_connections": len(self.client_connections)}
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """백그라운드 스레드에서 서버를 시작하고 OpenAI base URL을 반환합니다 (port=0이면 빈 포트)."""
+        config = uvicorn.Config(self.app, host=host, port=port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="mock-openai", daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        bound_port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}/v1"
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible server for offline agent runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(ttft_ms=args.ttft_ms, token_ms=args.token_ms)
+    print(f"🤖 Mock OpenAI server: http://{args.host}:{args.port}/v1")
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
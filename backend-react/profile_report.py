@@ -0,0 +1,62 @@
+"""
+Aggregate per-run node profiles into a hotspot report
+
+PROFILE_RUNS=true 또는 configurable.profile=true로 실행한 그래프가 남긴 pstats 파일을 모아
+노드별 시간, 카테고리별 시간(LLM I/O, ES I/O, JSON, 로깅, 토큰 계산)과 상위 hotspot을 출력합니다.
+
+    python profile_report.py
+    python profile_report.py --last 20 --node agent --sort tottime --top 30
+    python profile_report.py --run 1f0e5b4c-... --output merged.prof
+"""
+import argparse
+import pstats
+from collections import defaultdict
+
+from agent.profiling import PROFILE_DIR, category_times, find_profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate node profiles across runs")
+    parser.add_argument("--dir", default=PROFILE_DIR, help="프로파일 디렉터리 (PROFILE_DIR)")
+    parser.add_argument("--last", type=int, default=None, help="최근 실행 N개만 집계")
+    parser.add_argument("--run", action="append", default=None, help="특정 run_id만 집계 (여러 번 지정 가능)")
+    parser.add_argument("--node", action="append", default=None, help="특정 노드만 집계 (여러 번 지정 가능)")
+    parser.add_argument("--sort", default="cumulative", choices=["cumulative", "tottime", "ncalls"])
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--output", default=None, help="합친 pstats 파일 저장 경로 (snakeviz 등으로 보기)")
+    args = parser.parse_args()
+
+    profiles = [
+        (run_id, node, path)
+        for run_id, node, path in find_profiles(args.dir, args.last)
+        if (not args.run or run_id in args.run) and (not args.node or node in args.node)
+    ]
+    if not profiles:
+        raise SystemExit(f"❌ '{args.dir}'에 프로파일이 없습니다 (PROFILE_RUNS=true 또는 configurable.profile=true로 실행)")
+
+    node_times = defaultdict(list)
+    for _, node, path in profiles:
+        node_times[node].append(pstats.Stats(path).total_tt)
+    stats = pstats.Stats(*[path for _, _, path in profiles])
+    total = stats.total_tt
+    runs = {run_id for run_id, _, _ in profiles}
+
+    print(f"\n📊 프로파일 {len(profiles)}개 (실행 {len(runs)}개), 측정 시간 합계 {total:.2f}초")
+    print(f"\n{'노드':<20}{'호출':>6}{'합계(s)':>10}{'평균(s)':>10}")
+    for node, times in sorted(node_times.items(), key=lambda item: -sum(item[1])):
+        print(f"{node:<20}{len(times):>6}{sum(times):>10.2f}{sum(times) / len(times):>10.3f}")
+
+    print(f"\n{'카테고리':<20}{'시간(s)':>10}{'비율':>8}   (카테고리끼리는 겹칠 수 있음)")
+    for category, seconds in sorted(category_times(stats).items(), key=lambda item: -item[1]):
+        print(f"{category:<20}{seconds:>10.2f}{seconds / total * 100 if total else 0:>7.1f}%")
+
+    if args.output:
+        stats.dump_stats(args.output)
+        print(f"\n💾 합친 프로파일 저장: {args.output}")
+
+    print(f"\n🔥 상위 {args.top}개 hotspot ({args.sort})")
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+
+
+if __name__ == "__main__":
+    main()
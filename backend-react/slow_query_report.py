@@ -0,0 +1,92 @@
+"""
+Summarize the Elasticsearch slow-query log
+
+ES_PROFILE_SAMPLE_RATE / ES_SLOW_QUERY_MS로 남긴 느린 쿼리 로그를 집계해 필드별 비용(시간, term
+쿼리 수 = fuzzy 확장 규모), 쿼리 단계별 시간과 가장 느린 검색을 출력합니다. search_fields의
+boost와 fuzziness를 조정할 때 사용합니다.
+
+    python slow_query_report.py
+    python slow_query_report.py --log logs/es_slow_queries.jsonl --index vehicle_issues --top 10
+"""
+import argparse
+import json
+import statistics
+from collections import defaultdict
+
+from tools.query_profiler import QueryProfileConfig
+
+
+def fuzziness_of(search_body: dict) -> str:
+    """검색 본문에 쓰인 fuzziness 설정 (없으면 '-')"""
+    values = set()
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "fuzziness" in node:
+                values.add(str(node["fuzziness"]))
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(search_body.get("query", {}))
+    return ",".join(sorted(values)) or "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slow-query log summary")
+    parser.add_argument("--log", default=QueryProfileConfig().log_path, help="느린 쿼리 로그 (ES_SLOW_QUERY_LOG)")
+    parser.add_argument("--index", default=None, help="특정 인덱스만 집계")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        with open(args.log, "r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        raise SystemExit(f"❌ '{args.log}'가 없습니다 (ES_PROFILE_SAMPLE_RATE 또는 ES_SLOW_QUERY_MS 설정 후 검색)")
+    if args.index:
+        entries = [entry for entry in entries if entry["index"] == args.index]
+    if not entries:
+        raise SystemExit("❌ 집계할 기록이 없습니다")
+
+    reasons = defaultdict(int)
+    phases = defaultdict(float)
+    fields = defaultdict(lambda: {"ms": 0.0, "terms": 0, "queries": 0})
+    for entry in entries:
+        reasons[entry["reason"]] += 1
+        profile = entry["profile"]
+        for phase, ms in profile["breakdown_ms"].items():
+            phases[phase] += ms
+        for field, stats in profile["fields"].items():
+            fields[field]["ms"] += stats["ms"]
+            fields[field]["terms"] += stats["terms"]
+            fields[field]["queries"] += 1
+
+    took = [entry["took_ms"] for entry in entries if entry.get("took_ms") is not None]
+    print(f"\n📊 기록 {len(entries)}개 ({', '.join(f'{reason} {count}' for reason, count in reasons.items())})")
+    if took:
+        print(f"  took 중앙값 {statistics.median(took):.1f}ms, 최대 {max(took)}ms")
+    rewrite = [entry["profile"]["rewrite_ms"] for entry in entries]
+    print(f"  rewrite 평균 {statistics.mean(rewrite):.2f}ms (fuzzy 확장은 rewrite와 term 쿼리 수로 나타남)")
+
+    print(f"\n{'필드':<28}{'시간(ms)':>10}{'검색당 term':>12}")
+    for field, stats in sorted(fields.items(), key=lambda item: -item[1]["ms"]):
+        print(f"{field:<28}{stats['ms']:>10.2f}{stats['terms'] / stats['queries']:>12.1f}")
+
+    print(f"\n{'쿼리 단계':<28}{'시간(ms)':>10}")
+    for phase, ms in sorted(phases.items(), key=lambda item: -item[1]):
+        print(f"{phase:<28}{ms:>10.2f}")
+
+    print(f"\n🐢 가장 느린 검색 {args.top}개")
+    for entry in sorted(entries, key=lambda item: -(item.get("took_ms") or 0))[:args.top]:
+        print(
+            f"  - {entry.get('took_ms')}ms [{entry['index']}] '{entry['query']}' "
+            f"(fuzziness {fuzziness_of(entry['search_body'])}, rewrite {entry['profile']['rewrite_ms']}ms, "
+            f"routing {entry.get('routing') or '-'})"
+        )
+
+
+if __name__ == "__main__":
+    main()
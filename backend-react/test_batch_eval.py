@@ -0,0 +1,76 @@
+"""
+Test offline batch evaluation with resume (mock OpenAI server + embedded search, no API call)
+"""
+import asyncio
+import json
+import os
+import tempfile
+
+import pytest
+
+from batch_eval import completed_ids, load_results, run_batch, summarize
+from mock_openai_server import MockOpenAIServer
+
+QUESTIONS = [
+    {"id": "q1", "question": "K5 브레이크 소음 이슈 찾아줘", "expected": "브레이크"},
+    {"id": "q2", "question": "쏘나타 엔진 과열 원인이 뭐야?"},
+    {"id": "q3", "question": "투싼 변속기 충격 사례 알려줘"},
+]
+
+
+def test_batch_run_and_resume(monkeypatch):
+    """끊긴 결과 파일에서 남은 질문만 실행하고 질문별 지연/토큰/검색 결과/답변을 기록하는지 테스트"""
+    server = MockOpenAIServer()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.start())
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    try:
+        from agent.react_agent import create_react_agent
+
+        graph = create_react_agent()
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "results", "run.jsonl")
+            # q1만 끝나고 q2를 쓰는 도중 끊긴 결과 파일
+            asyncio.run(run_batch(graph, QUESTIONS[:1], output, concurrency=2, label="base"))
+            with open(output, "a", encoding="utf-8") as f:
+                f.write('{"id": "q2", "question": "쏘나')
+            assert completed_ids(output) == {"q1"}
+
+            pending = [item for item in QUESTIONS if item["id"] not in completed_ids(output)]
+            assert asyncio.run(run_batch(graph, pending, output, concurrency=2, label="base")) == 2
+            with open(output, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            assert len(lines) == 4
+    finally:
+        server.stop()
+
+    records = [json.loads(line) for line in lines if line.endswith("}")]
+    by_id = {record["id"]: record for record in records}
+    assert set(by_id) == {"q1", "q2", "q3"}
+    record = by_id["q1"]
+    assert record["expected"] == "브레이크" and record["label"] == "base" and record["error"] is None
+    assert record["latency_ms"] > 0 and record["llm_calls"] >= 2 and record["tokens"]["total"] > 0
+    assert record["searches"][0]["query"] == "K5 브레이크 소음 이슈" and record["es_hits"] > 0
+    assert record["searches"][0]["hits"] == len(record["searches"][0]["top_ids"]) <= 5
+    assert record["answer"].startswith("### 📊 검색 결과 요약")
+    summary = summarize(records)
+    assert summary["questions"] == 3 and summary["errors"] == 0 and summary["no_hits"] == 0
+    print(f"✅ batch run and resume: {summary}")
+
+
+def test_load_results_and_errors():
+    """오류 레코드는 --retry-errors에서만 다시 실행 대상이 되는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "a", "error": None}) + "\n")
+            f.write(json.dumps({"id": "b", "error": "TimeoutError: "}) + "\n")
+        assert completed_ids(path) == {"a", "b"}
+        assert completed_ids(path, retry_errors=True) == {"a"}
+        assert set(load_results(path)) == {"a", "b"}
+    print("✅ load results and errors")
+
+
+if __name__ == "__main__":
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_batch_run_and_resume(monkeypatch)
+    test_load_results_and_errors()
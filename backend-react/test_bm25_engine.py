@@ -0,0 +1,94 @@
+"""
+Test the embedded BM25 search engine (no Elasticsearch required)
+"""
+import os
+
+import pytest
+
+from tools.bm25_engine import (
+    EmbeddedSearchEngine,
+    build_default_engine,
+    load_snapshot,
+    parse_field_boost,
+    write_snapshot,
+)
+
+VEHICLE_FIELDS = ["시스템^3", "문제점내용^2", "현상", "원인및요구안내용", "대책조치", "차종"]
+
+
+def _search(engine, query, index="vehicle_issues", size=5, fuzziness="AUTO"):
+    multi_match = {"query": query, "fields": VEHICLE_FIELDS, "type": "best_fields"}
+    if fuzziness:
+        multi_match["fuzziness"] = fuzziness
+    return engine.search(index=index, body={"query": {"multi_match": multi_match}, "size": size})
+
+
+def test_bm25_ranking_and_boosts():
+    """BM25 점수와 필드 가중치 테스트"""
+    assert parse_field_boost("시스템^3") == ("시스템", 3.0)
+    assert parse_field_boost("현상") == ("현상", 1.0)
+
+    engine = EmbeddedSearchEngine()
+    engine.index_documents("vehicle_issues", [
+        ("1", {"차종": "K5", "시스템": "브레이크", "문제점내용": "패드 마모", "현상": "소음"}),
+        ("2", {"차종": "Sonata", "시스템": "엔진", "문제점내용": "브레이크 오일 누유", "현상": "출력 저하"}),
+        ("3", {"차종": "K3", "시스템": "냉각", "문제점내용": "냉각수 누수", "현상": "온도 상승"}),
+    ])
+    response = _search(engine, "브레이크")
+    ids = [hit["_id"] for hit in response["hits"]["hits"]]
+    # 시스템^3 일치가 문제점내용^2 일치보다 높은 점수
+    assert ids == ["1", "2"]
+    assert response["hits"]["total"]["value"] == 2
+    print("✅ bm25 + boosts")
+
+
+def test_fuzzy_matching():
+    """퍼지 매칭 테스트"""
+    engine = EmbeddedSearchEngine()
+    engine.index_documents("vehicle_issues", [("1", {"시스템": "브레이크", "차종": "Sportage"})])
+    assert _search(engine, "브래이크")["hits"]["hits"][0]["_id"] == "1"
+    assert _search(engine, "sportag")["hits"]["hits"][0]["_id"] == "1"
+    assert _search(engine, "브래이크", fuzziness=None)["hits"]["hits"] == []
+    print("✅ fuzzy")
+
+
+def test_generated_data_and_snapshot(tmp_path="/tmp"):
+    """생성 데이터 기반 엔진 및 스냅샷 왕복 테스트"""
+    engine = build_default_engine(vehicle_docs=2000, seed=7)
+    response = _search(engine, "K5 브레이크 패드 마모")
+    top = response["hits"]["hits"][0]["_source"]
+    assert top["시스템"] == "브레이크"
+    assert engine.indices.exists(index="documents")
+
+    path = os.path.join(str(tmp_path), "embedded_snapshot_test.jsonl")
+    target = engine.indices_data["vehicle_issues"]
+    write_snapshot(path, "vehicle_issues", zip(target.ids[:100], target.sources[:100]))
+    restored = EmbeddedSearchEngine()
+    assert load_snapshot(restored, path) == 100
+    os.remove(path)
+    print(f"✅ generated data + snapshot: {engine.stats()}")
+
+
+def test_search_tool_backends(monkeypatch):
+    """SEARCH_BACKEND=embedded 및 SEARCH_FALLBACK=embedded 도구 테스트"""
+    from tools.elasticsearch_tool import elasticsearch_search
+
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    text, hits = elasticsearch_search.func("K5 브레이크", index="vehicle_issues")
+    assert hits and "json:search_results" not in text
+
+    # Elasticsearch가 없는 포트를 사용해 장애 상황 재현
+    monkeypatch.delenv("SEARCH_BACKEND")
+    monkeypatch.setenv("ELASTICSEARCH_URL", "http://127.0.0.1:1")
+    monkeypatch.setenv("SEARCH_FALLBACK", "embedded")
+    text, hits = elasticsearch_search.func("엔진 과열", index="vehicle_issues")
+    assert hits and "내장 검색 엔진" in text
+    print("✅ search tool backends")
+
+
+if __name__ == "__main__":
+    test_bm25_ranking_and_boosts()
+    test_fuzzy_matching()
+    test_generated_data_and_snapshot()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_search_tool_backends(monkeypatch)
@@ -0,0 +1,142 @@
+"""
+Test run cancellation and deadline propagation through the graph (no OpenAI API call required)
+"""
+import asyncio
+import importlib
+import threading
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from agent.stream_metrics import answer_stream_metrics
+from tools.elasticsearch_tool import search_guard
+from tools.resilience import ResilienceConfig, ResilientExecutor, RunCancelledError, cancel_scope
+from benchmark_llm_nodes import DEFAULT_PROFILES, OFFLINE_ENV, SimulatedChatModel
+
+react_agent = importlib.import_module("agent.react_agent")
+
+
+def _graph(monkeypatch, time_scale: float):
+    # 오프라인 실행: 내장 검색 엔진, 모든 질문이 Thinking 단계를 거치도록 라우터 비활성화
+    for key, value in OFFLINE_ENV.items():
+        monkeypatch.setenv(key, value)
+    return react_agent.create_react_agent(llm_factory=lambda node, config: SimulatedChatModel(
+        node=node, model=config["model"], max_tokens=config["max_tokens"],
+        latency_profile=DEFAULT_PROFILES["gpt-4o-mini"], records=[], time_scale=time_scale,
+    ))
+
+
+def test_deadline_stops_answer(monkeypatch):
+    """마감 시각이 지나면 답변을 생성하지 않고 부분 작업을 상태에 기록하는지 테스트"""
+    graph = _graph(monkeypatch, time_scale=0.0)
+    budget = react_agent.RUN_BUDGET_S
+    react_agent.RUN_BUDGET_S = 0.0
+    try:
+        state = graph.invoke({"messages": [HumanMessage(content="엔진 과열 원인이 뭐야?")]})
+    finally:
+        react_agent.RUN_BUDGET_S = budget
+
+    # Thinking 단계에서 바로 중단되어 도구 호출 없이 종료
+    assert state["partial_work"] == {"node": "agent", "reason": "deadline", "stage": "thinking"}
+    assert state["messages"][-1].content == react_agent.INTERRUPTION_NOTICES["deadline"]
+    assert not state["messages"][-1].tool_calls
+    print("✅ deadline stops answer")
+
+
+def test_skipped_tool_calls(monkeypatch):
+    """중단 후 남은 도구 호출은 실행하지 않고 안내 메시지로 응답하는지 테스트"""
+    from langchain_core.messages import AIMessage
+
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    tool_calls = [
+        {"name": "elasticsearch_search", "args": {"query": "엔진 과열", "index": "vehicle_issues"}, "id": "call_1"},
+        {"name": "elasticsearch_search", "args": {"query": "배터리 방전", "index": "vehicle_issues"}, "id": "call_2"},
+    ]
+    result = react_agent.call_tools({
+        "messages": [AIMessage(content="", tool_calls=tool_calls)],
+        "deadline": time.time() - 1,
+    })
+    assert [m.tool_call_id for m in result["messages"]] == ["call_1", "call_2"]
+    assert all("실행하지 않았습니다" in m.content for m in result["messages"])
+    assert result["partial_work"]["completed_tool_calls"] == 0 and result["partial_work"]["skipped_tool_calls"] == 2
+    print("✅ skipped tool calls")
+
+
+def test_cancel_stops_answer_stream(monkeypatch):
+    """비동기 실행이 취소되면 스레드에서 진행 중인 답변 스트림도 멈추는지 테스트"""
+    # 답변 700토큰 × 12ms × 0.1 ≈ 0.85초
+    graph = _graph(monkeypatch, time_scale=0.1)
+    interrupted_before = answer_stream_metrics.stats["interrupted"]
+
+    async def first_answer_token():
+        searched = False
+        async for mode, chunk in graph.astream(
+            {"messages": [HumanMessage(content="엔진 과열 원인이 뭐야?")]}, stream_mode=["custom", "messages"]
+        ):
+            if mode == "custom" and chunk["type"] == "search_results":
+                searched = True
+            elif mode == "messages" and searched and chunk[1].get("langgraph_node") == "agent":
+                # 답변 첫 토큰을 받으면 스트림을 닫아 클라이언트 연결 종료를 흉내 냄 (실행 취소)
+                break
+        return time.perf_counter()
+
+    cancelled_at = asyncio.run(first_answer_token())
+    # 취소 신호를 받은 노드 스레드가 곧바로 스트림을 닫고 중단을 기록함
+    deadline = time.perf_counter() + 0.5
+    while answer_stream_metrics.stats["interrupted"] == interrupted_before and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert answer_stream_metrics.stats["interrupted"] == interrupted_before + 1
+    assert time.perf_counter() - cancelled_at < 0.5
+    # 취소는 검색 장애가 아니므로 circuit breaker에 반영되지 않음
+    assert search_guard.breaker.state == "closed"
+    print("✅ cancel stops answer stream")
+
+
+def test_cancel_releases_breaker_trial():
+    """half-open 시험 요청 중 실행이 취소되어도 circuit breaker가 다음 요청을 시험 요청으로 허용하는지 테스트"""
+    config = ResilienceConfig()
+    config.hedge_enabled = False
+    config.breaker_failure_threshold = 1
+    config.breaker_reset_timeout = 0.1
+    executor = ResilientExecutor("cancel-test", config)
+
+    def down(timeout):
+        raise TimeoutError("timed out")
+
+    for when in ("in_flight", "before_request"):
+        try:
+            executor.call("key", down)
+        except TimeoutError:
+            pass
+        time.sleep(0.15)
+        assert executor.breaker.state == "half_open"
+        cancel_event = threading.Event()
+        if when == "in_flight":
+            # 시험 요청이 진행 중일 때 취소
+            threading.Timer(0.1, cancel_event.set).start()
+            request = lambda timeout: time.sleep(1)
+        else:
+            # 이미 취소된 실행: 요청을 보내기 전에 중단
+            cancel_event.set()
+            request = lambda timeout: "never"
+        try:
+            with cancel_scope(cancel_event):
+                executor.call("key", request)
+            raise AssertionError("expected RunCancelledError")
+        except RunCancelledError:
+            pass
+        # 시험 요청이 반납되어 다음 요청이 허용됨
+        assert executor.breaker.state == "half_open" and executor.breaker.allow_request()
+        executor.breaker.release_trial()
+
+    response, degraded = executor.call("key", lambda timeout: "recovered")
+    assert response == "recovered" and degraded is None and executor.breaker.state == "closed"
+    print("✅ cancel releases breaker trial")
+
+
+if __name__ == "__main__":
+    for test in (test_deadline_stops_answer, test_skipped_tool_calls, test_cancel_stops_answer_stream):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
+    test_cancel_releases_breaker_trial()
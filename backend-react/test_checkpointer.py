@@ -0,0 +1,142 @@
+"""
+Test the compact SQLite checkpointer (message deltas + compression, no API call)
+"""
+import json
+import os
+import tempfile
+import zlib
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, StateGraph
+
+from agent.checkpointer import MESSAGE_REFS_TYPE, CompactSqliteSaver, compress_typed, decompress_typed
+from agent.state import AgentState
+
+# 검색 도구 결과처럼 Markdown 헤더 + 들여쓴 JSON으로 된 큰 ToolMessage 본문
+TOOL_OUTPUT = "\n🔧 **Tool 호출 정보:**\n- 도구: `elasticsearch_search`\n\n" + json.dumps(
+    [{"차종": "K5", "문제점내용": "브레이크 소음 발생 " * 5, "조치내용": "패드 교체", "순번": i} for i in range(20)],
+    ensure_ascii=False,
+    indent=2,
+)
+
+
+def _graph(checkpointer):
+    """질문마다 도구 호출 → 도구 결과 → 답변 메시지를 추가하는 그래프"""
+
+    def work(state):
+        turn = len(state["messages"]) // 4
+        call = {"name": "elasticsearch_search", "args": {"query": f"q{turn}"}, "id": f"call_{turn}"}
+        return {
+            "messages": [
+                AIMessage(content="", tool_calls=[call], id=f"ai_call_{turn}"),
+                ToolMessage(content=TOOL_OUTPUT, tool_call_id=f"call_{turn}", id=f"tool_{turn}"),
+            ],
+            "search_hits": [{"index": "vehicle_issues", "id": str(turn), "query": f"q{turn}"}],
+        }
+
+    def answer(state):
+        return {"messages": [AIMessage(content=f"답변 {len(state['messages'])}", id=f"answer_{len(state['messages'])}")]}
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("work", work)
+    workflow.add_node("answer", answer)
+    workflow.set_entry_point("work")
+    workflow.add_edge("work", "answer")
+    workflow.add_edge("answer", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def _contents(state):
+    return [(type(message).__name__, message.id, message.content) for message in state["messages"]]
+
+
+def test_matches_default_checkpointer():
+    """기본(메모리) 체크포인터와 같은 상태/이력을 복원하고, 메시지는 한 번만 저장하는지 테스트"""
+    config = {"configurable": {"thread_id": "thread-1"}}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "db", "checkpoints.sqlite")
+        compact = _graph(CompactSqliteSaver(path))
+        default = _graph(InMemorySaver())
+        for turn in range(5):
+            for graph in (compact, default):
+                graph.invoke({"messages": [HumanMessage(content=f"질문 {turn}", id=f"human_{turn}")]}, config)
+
+        expected = default.get_state(config)
+        state = compact.get_state(config)
+        assert _contents(state.values) == _contents(expected.values) and len(state.values["messages"]) == 20
+        assert state.values["search_hits"] == expected.values["search_hits"]
+        history = list(compact.get_state_history(config))
+        assert [len(s.values.get("messages", [])) for s in history] == [
+            len(s.values.get("messages", [])) for s in default.get_state_history(config)
+        ]
+
+        # 새 프로세스에서 다시 열어도 같은 상태, 항목 행은 메시지 20개 + 검색 결과 5개만 저장
+        reopened = CompactSqliteSaver(path)
+        values = reopened.get_tuple(config).checkpoint["channel_values"]
+        assert _contents(values) == _contents(expected.values) and values["search_hits"] == expected.values["search_hits"]
+        (rows,) = reopened.conn.execute("SELECT COUNT(*) FROM messages").fetchone()
+        types = {row[0] for row in reopened.conn.execute("SELECT type FROM messages")}
+        assert rows == 25 and any(type_.endswith("+zstd") or type_.endswith("+zlib") for type_ in types)
+        channel_types = set(reopened.conn.execute(
+            "SELECT channel, type FROM blobs WHERE channel IN ('messages', 'search_hits')"
+        ))
+        assert channel_types == {("messages", MESSAGE_REFS_TYPE), ("search_hits", MESSAGE_REFS_TYPE)}
+        sizes = reopened.thread_bytes("thread-1")
+        assert sizes["total"] == sum(size for table, size in sizes.items() if table != "total")
+
+        reopened.delete_thread("thread-1")
+        assert reopened.get_tuple(config) is None and reopened.thread_bytes("thread-1")["total"] == 0
+    print(f"✅ matches default checkpointer: {len(history)} checkpoints, {rows} stored messages")
+
+
+def test_storage_smaller_than_snapshot():
+    """같은 대화에서 델타+압축 저장량이 전체 스냅숏 저장량보다 작은지 테스트"""
+    sizes = {}
+    for mode, options in {
+        "snapshot": {"delta_messages": False, "compress_min_bytes": 0},
+        "compact": {},
+    }.items():
+        saver = CompactSqliteSaver(":memory:", **options)
+        graph = _graph(saver)
+        config = {"configurable": {"thread_id": mode}}
+        for turn in range(8):
+            graph.invoke({"messages": [HumanMessage(content=f"질문 {turn}")]}, config)
+        sizes[mode] = saver.thread_bytes(mode)
+    assert sizes["compact"]["total"] * 5 < sizes["snapshot"]["total"]
+    assert sizes["compact"]["blobs"] * 20 < sizes["snapshot"]["blobs"]
+    print(f"✅ storage smaller than snapshot: {sizes['compact']['total']} vs {sizes['snapshot']['total']} bytes")
+
+
+def test_updated_message_stored_again():
+    """같은 ID의 메시지가 바뀌면 새 내용으로 저장되고 이전 체크포인트는 이전 내용을 유지하는지 테스트"""
+    saver = CompactSqliteSaver(":memory:")
+    graph = _graph(saver)
+    config = {"configurable": {"thread_id": "thread-1"}}
+    graph.invoke({"messages": [HumanMessage(content="질문", id="human_0")]}, config)
+    graph.update_state(config, {"messages": [HumanMessage(content="고친 질문", id="human_0")]})
+
+    assert graph.get_state(config).values["messages"][0].content == "고친 질문"
+    history = list(graph.get_state_history(config))
+    assert history[1].values["messages"][0].content == "질문"
+    print("✅ updated message stored again")
+
+
+def test_compress_typed():
+    """임계값 이상만 압축하고, 압축된 값은 원래 바이트로 복원되는지 테스트"""
+    small = ("msgpack", b"x" * 100)
+    assert compress_typed(small, 1024) == small
+    large = ("msgpack", TOOL_OUTPUT.encode())
+    compressed = compress_typed(large, 1024)
+    assert compressed[0] in ("msgpack+zstd", "msgpack+zlib") and len(compressed[1]) < len(large[1]) / 3
+    assert decompress_typed(compressed) == large
+    assert decompress_typed(("msgpack+zlib", zlib.compress(large[1]))) == large
+    assert compress_typed(large, 0) == large
+    print(f"✅ compress typed: {len(large[1])} → {len(compressed[1])} bytes ({compressed[0]})")
+
+
+if __name__ == "__main__":
+    test_matches_default_checkpointer()
+    test_storage_smaller_than_snapshot()
+    test_updated_message_stored_again()
+    test_compress_typed()
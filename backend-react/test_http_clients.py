@@ -0,0 +1,99 @@
+"""
+Test the shared LLM HTTP client against the local mock OpenAI server (no OpenAI API call required)
+"""
+import asyncio
+import importlib
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from mock_openai_server import MockOpenAIServer
+
+
+def test_graph_reuses_connections(monkeypatch):
+    """실제 ChatOpenAI로 한 턴을 실행할 때 모든 노드가 공유 클라이언트의 연결을 재사용하는지 테스트"""
+    server = MockOpenAIServer(ttft_ms=5, token_ms=1)
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-mock")
+    monkeypatch.setenv("OPENAI_BASE_URL", server.start())
+    try:
+        from agent.http_clients import connection_stats, get_http_client
+        from agent.llm_config import build_node_llms
+
+        llms = build_node_llms()
+        # 노드마다 설정(타임아웃)이 달라도 같은 httpx 클라이언트를 공유
+        assert {id(llm.root_client._client) for llm in llms.values()} == {id(get_http_client())}
+
+        react_agent = importlib.import_module("agent.react_agent")
+        graph = react_agent.create_react_agent()
+        before = connection_stats.get_stats()
+        for question in ["엔진 과열 원인이 뭐야?", "브레이크 소음 대책 알려줘"]:
+            state = graph.invoke({"messages": [HumanMessage(content=question)]})
+            assert state["messages"][-1].content.startswith("### 📊 검색 결과 요약")
+            assert len(state["suggested_questions"]) == 3
+
+        stats = connection_stats.get_stats()
+        requests = stats["requests"] - before["requests"]
+        new_connections = stats["new_connections"] - before["new_connections"]
+        # 턴당 thinking / tool_call / answer / followups 4회, 답변과 후속 질문은 병렬이라 연결 최대 2개
+        assert requests == 8 and 1 <= new_connections <= 2
+        assert server.get_stats()["client_connections"] == new_connections
+        # 다른 테스트의 요청이 섞이지 않도록 이 테스트의 요청만으로 재사용률 계산
+        assert (requests - new_connections) / requests >= 0.75
+        print(f"✅ graph reuses connections: {requests} requests over {new_connections} connections, {stats}")
+    finally:
+        server.stop()
+
+
+def test_mock_server_responses():
+    """가짜 서버가 노드 요청 형태에 맞는 응답(도구 호출 / 후속 질문 / 답변)을 주는지 테스트"""
+    from mock_openai_server import plan_response
+
+    tools = [{"type": "function", "function": {"name": "elasticsearch_search"}}]
+    question = {"role": "user", "content": "K5 배터리 방전"}
+    assert plan_response({"messages": [question], "tools": tools})["tool_call"]["name"] == "elasticsearch_search"
+    assert "1. " in plan_response({"messages": [{"role": "system", "content": "후속 질문 3개를 제안하세요"}, question]})["text"]
+    assert plan_response({"messages": [question, {"role": "tool", "content": "결과"}]})["text"].startswith("### 📊")
+    print("✅ mock server responses")
+
+
+def test_stream_reuse_and_abort(monkeypatch):
+    """끝까지 받은 비동기 스트림은 연결을 재사용하고, 중간에 닫은 스트림은 기다리지 않고 끊는지 테스트"""
+    server = MockOpenAIServer(ttft_ms=5, token_ms=50)
+    base_url = server.start()
+    try:
+        from agent.http_clients import connection_stats
+        from agent.llm_config import build_chat_model, load_node_configs
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-mock")
+        monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+        answer_llm = build_chat_model(load_node_configs()["answer"])
+        thinking_llm = build_chat_model({**load_node_configs()["thinking"], "streaming": True})
+
+        async def stream_twice():
+            for _ in range(2):
+                async for _ in thinking_llm.astream("엔진 과열"):
+                    pass
+
+        before = connection_stats.get_stats()
+        asyncio.run(stream_twice())
+        after = connection_stats.get_stats()
+        assert after["requests"] - before["requests"] == 2 and after["new_connections"] - before["new_connections"] == 1
+
+        # 후속 질문 응답은 50ms 간격 청크 약 30개 - 첫 청크 후 닫으면 나머지를 기다리지 않음
+        start = time.perf_counter()
+        stream = answer_llm.stream([("system", "후속 질문을 제안하세요"), ("user", "엔진 과열")])
+        next(stream)
+        stream.close()
+        assert time.perf_counter() - start < 0.5
+        print(f"✅ stream reuse and abort: {connection_stats.get_stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_mock_server_responses()
+    for test in (test_graph_reuses_connections, test_stream_reuse_and_abort):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
@@ -0,0 +1,92 @@
+"""
+Test incremental ingestion planning and manifest persistence (no Elasticsearch required)
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from generate_vehicle_data import generate_vehicle_issues
+from sample_data import SAMPLE_DOCS
+from tools.incremental_loader import load_manifest, plan_sync, prepare_documents, save_manifest
+
+
+def _manifest_docs(documents):
+    return {doc_id: [digest, routing] for doc_id, (_, digest, routing) in documents.items()}
+
+
+def test_plan_only_delta():
+    """두 번째 실행에서 추가/변경/삭제된 문서만 반영 대상이 되는지 테스트"""
+    records = generate_vehicle_issues(200, seed=7)
+    first = prepare_documents("vehicle_issues", records, "ngram", routing_field="제조사")
+    assert len(first) == 200
+    assert plan_sync(first, {})["create"] == list(first)
+
+    manifest_docs = _manifest_docs(first)
+    # 같은 데이터를 다시 만들면 변경 없음
+    again = prepare_documents("vehicle_issues", generate_vehicle_issues(200, seed=7), "ngram", routing_field="제조사")
+    plan = plan_sync(again, manifest_docs)
+    assert len(plan["unchanged"]) == 200 and not (plan["create"] or plan["update"] or plan["delete"])
+
+    # 1건 변경, 1건 삭제, 1건 추가
+    changed = [dict(record) for record in records[1:]]
+    changed[0]["문제점내용"] += " (재발)"
+    changed.append({**records[0], "순번": 201})
+    plan = plan_sync(prepare_documents("vehicle_issues", changed, "ngram", routing_field="제조사"), manifest_docs)
+    assert plan["create"] == ["201"] and plan["update"] == ["2"] and plan["delete"] == ["1"]
+    assert len(plan["unchanged"]) == 198
+    # 삭제에 필요한 라우팅 값은 매니페스트에 남아 있음
+    assert manifest_docs["1"][1] == records[0]["제조사"]
+    print(f"✅ plan only delta: {[(key, len(ids)) for key, ids in plan.items()]}")
+
+
+def test_generated_data_stable_across_days(monkeypatch):
+    """같은 seed로 만든 데이터는 생성한 날짜가 달라도 내용 해시가 같은지 테스트"""
+    import generate_vehicle_data
+
+    first = prepare_documents("vehicle_issues", generate_vehicle_issues(50, seed=7), "ngram", routing_field="제조사")
+
+    class _NextWeek(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(days=7)
+
+    monkeypatch.setattr(generate_vehicle_data, "datetime", _NextWeek)
+    records = generate_vehicle_issues(50, seed=7)
+    plan = plan_sync(prepare_documents("vehicle_issues", records, "ngram", routing_field="제조사"), _manifest_docs(first))
+    assert len(plan["unchanged"]) == 50
+    assert all(record["발생일자"] <= generate_vehicle_data.DATA_ANCHOR_DATE.strftime("%Y-%m-%d") for record in records)
+    print("✅ generated data stable across days")
+
+
+def test_volatile_fields_excluded():
+    """timestamp처럼 실행마다 바뀌는 필드는 내용 비교에서 빠지는지 테스트"""
+    first = prepare_documents("documents", SAMPLE_DOCS, "nori")
+    later = [{**doc, "timestamp": datetime.now() + timedelta(days=1)} for doc in SAMPLE_DOCS]
+    plan = plan_sync(prepare_documents("documents", later, "nori"), _manifest_docs(first))
+    assert len(plan["unchanged"]) == len(SAMPLE_DOCS)
+    assert set(first) == {doc["url"] for doc in SAMPLE_DOCS}
+    print("✅ volatile fields excluded")
+
+
+def test_manifest_roundtrip():
+    """매니페스트 저장/로드, 버전이 다르면 무시되는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "manifests", "documents.json")
+        assert load_manifest(path) is None
+        manifest = {"version": 1, "index_uuid": "abc", "docs": {"https://a": ["h1", None]}}
+        save_manifest(path, manifest)
+        assert load_manifest(path) == manifest
+        assert not os.path.exists(f"{path}.tmp")
+        save_manifest(path, {**manifest, "version": 0})
+        assert load_manifest(path) is None
+    print("✅ manifest roundtrip")
+
+
+if __name__ == "__main__":
+    test_plan_only_delta()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_generated_data_stable_across_days(monkeypatch)
+    test_volatile_fields_excluded()
+    test_manifest_roundtrip()
@@ -0,0 +1,50 @@
+"""
+Test declarative index mappings and query shape selection (no Elasticsearch required)
+"""
+from tools.index_mappings import MAPPING_SPEC_VERSION, build_index_body, build_search_query
+
+SEARCH_FIELDS = ["시스템^3", "문제점내용^2", "현상", "원인및요구안내용", "대책조치", "차종"]
+
+
+def test_legacy_mapping_matches_previous_shape():
+    """standard 모드는 기존 매핑과 동일한지 테스트"""
+    body = build_index_body("vehicle_issues", "standard")
+    properties = body["mappings"]["properties"]
+    assert properties["문제점내용"] == {"type": "text", "analyzer": "standard"}
+    assert properties["차종"] == {"type": "keyword"}
+    assert "settings" not in body and "_meta" not in body["mappings"]
+    print("✅ legacy mapping")
+
+
+def test_korean_mapping_multi_fields():
+    """nori/ngram 모드의 하위 필드와 분석기 설정 테스트"""
+    nori = build_index_body("vehicle_issues", "nori")
+    field = nori["mappings"]["properties"]["현상"]
+    assert field["analyzer"] == "korean_nori"
+    assert set(field["fields"]) == {"keyword", "ngram"}
+    assert "korean_nori_tokenizer" in nori["settings"]["analysis"]["tokenizer"]
+    assert nori["mappings"]["_meta"]["mapping_spec"] == MAPPING_SPEC_VERSION
+
+    ngram = build_index_body("documents", "ngram")
+    assert "korean_nori_tokenizer" not in ngram["settings"]["analysis"]["tokenizer"]
+    assert ngram["mappings"]["properties"]["content"]["index_options"] == "offsets"
+    print("✅ korean mapping")
+
+
+def test_query_shape_selection():
+    """인덱스 기능에 따른 쿼리 형태 선택 테스트"""
+    legacy = build_search_query("브레이크 패드 마모", SEARCH_FIELDS, {"korean_analyzer": None})
+    assert legacy["multi_match"]["fuzziness"] == "AUTO"
+
+    meta = build_index_body("vehicle_issues", "nori")["mappings"]["_meta"]
+    korean = build_search_query("브레이크 패드 마모", SEARCH_FIELDS, meta)["multi_match"]
+    assert "fuzziness" not in korean
+    assert "문제점내용.ngram^1" in korean["fields"]
+    assert not any(field.startswith("시스템.ngram") for field in korean["fields"])
+    print("✅ query shape")
+
+
+if __name__ == "__main__":
+    test_legacy_mapping_matches_previous_shape()
+    test_korean_mapping_multi_fields()
+    test_query_shape_selection()
@@ -0,0 +1,145 @@
+"""
+Test the rule-based intent router (no Elasticsearch or LLM call required)
+"""
+import importlib
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agent import intent_router
+from agent.intent_router import get_intent_router, parse_vocabulary, refresh_intent_router, vocabulary_query
+from tools.bm25_engine import EmbeddedSearchEngine
+from tools.elasticsearch_tool import search_guard
+from tools.resilience import CircuitBreaker
+
+# agent 패키지는 같은 이름의 그래프 객체를 내보내므로 모듈을 직접 가져옴
+react_agent = importlib.import_module("agent.react_agent")
+
+
+def _use_embedded_index(monkeypatch):
+    # 사전은 인덱스에서 읽으므로 내장 검색 엔진을 인덱스로 사용하고 웜업처럼 라우터를 미리 만듦
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    return refresh_intent_router()
+
+
+def test_explicit_commands(monkeypatch):
+    """명시적 검색 명령 라우팅 테스트"""
+    _use_embedded_index(monkeypatch)
+    router = get_intent_router()
+
+    decision = router.route("K5 브레이크 문제 검색해줘")
+    assert decision["index"] == "vehicle_issues" and decision["query"] == "K5 브레이크 문제"
+
+    assert router.route("k5 브레이크 문제 검색해줘")["query"] == "K5 브레이크 문제"
+    decision = router.route("쏘나타 엔진 과열을 찾아 주세요")
+    assert decision["index"] == "vehicle_issues" and decision["query"] == "Sonata 엔진 과열"
+
+    decision = router.route("LangGraph 관련 기술 문서 검색")
+    assert decision["index"] == "documents"
+    print("✅ explicit commands")
+
+
+def test_fallback_to_llm(monkeypatch):
+    """불확실한 메시지는 LLM에 맡기는지 테스트"""
+    _use_embedded_index(monkeypatch)
+    router = get_intent_router()
+    # 질문형 (명령 아님)
+    assert router.route("K5 브레이크 소음의 원인이 뭐야?") is None
+    # 명령이지만 알 수 있는 엔티티 없음
+    assert router.route("오늘 날씨 검색해줘") is None
+    # 두 인덱스 모두 일치 (모호)
+    assert router.route("LangGraph 브레이크 검색해줘") is None
+    # 이전 결과에 대한 후속 명령
+    assert router.route("그 중 K5 브레이크만 보여줘", has_cached_hits=True) is None
+    print("✅ fallback to llm")
+
+
+def test_route_search_command(monkeypatch):
+    """라우팅 결과가 Thinking + 도구 호출 메시지로 변환되는지 테스트"""
+    _use_embedded_index(monkeypatch)
+    routed = react_agent.route_search_command({"messages": [HumanMessage(content="Tucson 변속기 문제 조회해줘")]})
+    thinking, tool_message = routed
+    assert isinstance(thinking, AIMessage) and thinking.content.startswith("### 🤔 Thinking")
+    assert tool_message.tool_calls[0]["name"] == "elasticsearch_search"
+    assert tool_message.tool_calls[0]["args"] == {"query": "Tucson 변속기 문제", "index": "vehicle_issues"}
+
+    assert react_agent.route_search_command({"messages": [HumanMessage(content="변속기 문제가 왜 생기나요?")]}) is None
+    print("✅ route search command")
+
+
+def test_vocabulary_from_index(monkeypatch):
+    """엔티티 사전을 인덱스 데이터에서 읽고, 인덱스가 바뀌면 다시 읽는지 테스트"""
+    engine = EmbeddedSearchEngine()
+    engine.index_documents("vehicle_issues", [
+        ("1", {"제조사": "현대", "차종": "EV9", "시스템": "브레이크", "문제점내용": "회생 제동 소음"}),
+        ("2", {"제조사": "현대", "차종": "EV9", "시스템": "배터리", "문제점내용": "충전 중단"}),
+    ])
+    vocabulary_config = {"terms_fields": ["제조사", "차종"], "text_fields": ["문제점내용"], "size": 10}
+    response = engine.search(index="vehicle_issues", body=vocabulary_query(vocabulary_config))
+    values, words = parse_vocabulary(response, vocabulary_config)
+    assert values == {"현대", "EV9"} and {"회생", "제동", "충전"} <= words
+
+    # 생성기 상수에 없는 차종도 인덱스에 있으면 라우팅됨
+    monkeypatch.setattr(intent_router.ElasticsearchConfig, "get_client", lambda self: engine)
+    _use_embedded_index(monkeypatch)
+    decision = get_intent_router().route("ev9 회생 제동 검색해줘")
+    assert decision["index"] == "vehicle_issues" and decision["query"].startswith("EV9")
+
+    # 캐시된 라우터는 TTL 안에서 재사용
+    assert get_intent_router() is get_intent_router()
+    print("✅ vocabulary from index")
+
+
+def test_refresh_off_request_path(monkeypatch):
+    """요청 경로는 사전을 읽지 않고 백그라운드 갱신을 시작하며, 갱신 실패 시 마지막 라우터를 쓰는지 테스트"""
+    import time
+
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    monkeypatch.setattr(intent_router, "_router", None)
+    monkeypatch.setattr(intent_router, "_router_backend", None)
+    build_router = intent_router.build_router
+
+    def slow_build(config):
+        time.sleep(0.3)
+        return build_router(config)
+
+    monkeypatch.setattr(intent_router, "build_router", slow_build)
+    start = time.perf_counter()
+    assert get_intent_router() is None and time.perf_counter() - start < 0.1
+    intent_router._refresh_thread.join(10)
+    router = get_intent_router()
+    assert router is not None and router.route("K5 브레이크 문제 검색해줘")["index"] == "vehicle_issues"
+
+    def failing_build(config):
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(intent_router, "build_router", failing_build)
+    result = refresh_intent_router()
+    assert result["errors"] == ["connection refused"] and get_intent_router() is router
+    print("✅ refresh off request path")
+
+
+def test_vocabulary_respects_breaker(monkeypatch):
+    """circuit breaker가 열려 있으면 Elasticsearch에 요청하지 않고 폴백 엔진의 사전을 쓰는지 테스트"""
+    monkeypatch.delenv("SEARCH_BACKEND", raising=False)
+    monkeypatch.setenv("ELASTICSEARCH_URL", "http://127.0.0.1:1")
+    monkeypatch.setenv("SEARCH_FALLBACK", "embedded")
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(search_guard, "breaker", breaker)
+    fast_failed = search_guard.stats["fast_failed"]
+
+    result = refresh_intent_router()
+    assert search_guard.stats["fast_failed"] == fast_failed + 2
+    assert result["errors"] == ["vehicle_issues: served fallback vocabulary", "documents: served fallback vocabulary"]
+    assert get_intent_router().route("K5 브레이크 문제 검색해줘")["index"] == "vehicle_issues"
+    print("✅ vocabulary respects breaker")
+
+
+if __name__ == "__main__":
+    for test in (
+        test_explicit_commands, test_fallback_to_llm, test_route_search_command, test_vocabulary_from_index,
+        test_refresh_off_request_path, test_vocabulary_respects_breaker,
+    ):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
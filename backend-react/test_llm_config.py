@@ -0,0 +1,155 @@
+"""
+Test per-node LLM configuration (no OpenAI API call required)
+"""
+import pytest
+
+from agent.llm_config import build_chat_model, load_node_configs
+
+
+def test_config_precedence(monkeypatch):
+    """기본값 < 설정 파일 < 환경 변수 우선순위 테스트"""
+    configs = load_node_configs()
+    assert configs["thinking"]["max_tokens"] == 150
+    assert configs["answer"]["timeout_s"] == 60
+
+    monkeypatch.setenv("LLM_THINKING_MODEL", "gpt-4.1-nano")
+    monkeypatch.setenv("LLM_ANSWER_MAX_TOKENS", "800")
+    monkeypatch.setenv("LLM_TOOL_CALL_STREAMING", "false")
+    configs = load_node_configs()
+    assert configs["thinking"]["model"] == "gpt-4.1-nano"
+    assert configs["tool_call"]["model"] == "gpt-4o-mini"
+    assert configs["answer"]["max_tokens"] == 800
+    assert configs["tool_call"]["streaming"] is False
+
+    llm = build_chat_model(configs["answer"])
+    # 읽기 타임아웃은 노드 설정, 연결 타임아웃은 공유 HTTP 클라이언트 설정
+    assert llm.max_tokens == 800 and llm.request_timeout.read == 60 and llm.request_timeout.connect == 5
+    print("✅ config precedence")
+
+
+def test_graph_with_simulated_llm(monkeypatch):
+    """노드별 가짜 모델로 그래프 전체 실행 테스트"""
+    from benchmark_llm_nodes import DEFAULT_PROFILES, OFFLINE_ENV, run_variant
+
+    for key, value in OFFLINE_ENV.items():
+        monkeypatch.setenv(key, value)
+
+    configs = load_node_configs()
+    result = run_variant(configs, DEFAULT_PROFILES, ["엔진 과열 원인이 뭐야?"], runs=2, time_scale=0.0)
+    assert {node: stats["calls"] for node, stats in result["nodes"].items()} == {"thinking": 2, "tool_call": 2, "answer": 2, "followups": 2}
+    # max_tokens가 Thinking 출력 길이를 제한
+    assert result["nodes"]["thinking"]["avg_completion_tokens"] == 150
+    print(f"✅ graph with simulated llm: {result['avg_end_to_end_ms']:.0f}ms")
+
+
+def test_streaming_option(monkeypatch):
+    """streaming=false인 노드는 스트림 대신 한 번에 응답을 받는지 테스트"""
+    import importlib
+
+    from langchain_core.messages import HumanMessage
+
+    from benchmark_llm_nodes import DEFAULT_PROFILES, OFFLINE_ENV, SimulatedChatModel
+
+    for key, value in OFFLINE_ENV.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.setenv("LLM_ANSWER_STREAMING", "false")
+    calls = []
+
+    class RecordingChatModel(SimulatedChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            calls.append((self.node, "invoke"))
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            calls.append((self.node, "stream"))
+            yield from super()._stream(messages, stop, run_manager, **kwargs)
+
+    react_agent = importlib.import_module("agent.react_agent")
+    graph = react_agent.create_react_agent(llm_factory=lambda node, config: RecordingChatModel(
+        node=node, model=config["model"], max_tokens=config["max_tokens"],
+        latency_profile=DEFAULT_PROFILES["gpt-4o-mini"], records=[],
+    ))
+    state = graph.invoke({"messages": [HumanMessage(content="엔진 과열 원인이 뭐야?")]})
+    # answer는 환경 변수, followups는 설정 파일에서 streaming=false
+    assert sorted(calls) == [
+        ("answer", "invoke"), ("followups", "invoke"), ("thinking", "stream"), ("tool_call", "stream"),
+    ]
+    assert state["messages"][-1].content.startswith("### 📊 검색 결과 요약")
+    assert state["messages"][-1].response_metadata["stream_metrics"]["tokens"] > 0
+    print(f"✅ streaming option: {sorted(calls)}")
+
+
+def test_parallel_followups(monkeypatch):
+    """후속 질문이 답변과 별도로 생성되어 상태와 custom 스트림으로 전달되는지 테스트"""
+    import importlib
+
+    from langchain_core.messages import HumanMessage
+
+    from benchmark_llm_nodes import DEFAULT_PROFILES, OFFLINE_ENV, SimulatedChatModel
+
+    for key, value in OFFLINE_ENV.items():
+        monkeypatch.setenv(key, value)
+
+    react_agent = importlib.import_module("agent.react_agent")
+    assert react_agent.parse_questions("질문:\n1. K5 브레이크 소음 원인은?\n2) 교체 주기는?\n- 비용은?\n4. 넷째?") == [
+        "K5 브레이크 소음 원인은?", "교체 주기는?", "비용은?",
+    ]
+
+    configs = load_node_configs()
+    graph = react_agent.create_react_agent(llm_factory=lambda node, config: SimulatedChatModel(
+        node=node, model=config["model"], max_tokens=config["max_tokens"],
+        latency_profile=DEFAULT_PROFILES["gpt-4o-mini"], records=[],
+    ))
+    custom_events = []
+    final_state = None
+    for mode, chunk in graph.stream(
+        {"messages": [HumanMessage(content="엔진 과열 원인이 뭐야?")]}, stream_mode=["custom", "values"]
+    ):
+        if mode == "custom" and chunk["type"] == "suggested_questions":
+            custom_events.append(chunk)
+        else:
+            final_state = chunk
+    assert len(custom_events) == 1 and len(custom_events[0]["questions"]) == 3
+    assert final_state["suggested_questions"] == custom_events[0]["questions"]
+    # 후속 질문 노드가 있으면 답변 프롬프트에는 후속 질문 섹션이 없음
+    assert "추가로 궁금" not in react_agent.build_answer_prompt(inline_followups=False)
+    print("✅ parallel followups")
+
+
+def test_inline_followups_when_disabled(monkeypatch):
+    """FOLLOWUP_QUESTIONS=false이면 기존처럼 답변 프롬프트에 후속 질문 섹션을 포함하는지 테스트"""
+    import importlib
+
+    from langchain_core.messages import HumanMessage
+
+    from benchmark_llm_nodes import DEFAULT_PROFILES, OFFLINE_ENV, SimulatedChatModel
+
+    for key, value in OFFLINE_ENV.items():
+        monkeypatch.setenv(key, value)
+    answer_prompts = []
+
+    class RecordingChatModel(SimulatedChatModel):
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            if self.node == "answer":
+                answer_prompts.append(messages[0].content)
+            yield from super()._stream(messages, stop, run_manager, **kwargs)
+
+    react_agent = importlib.import_module("agent.react_agent")
+    monkeypatch.setattr(react_agent, "FOLLOWUP_QUESTIONS", False)
+    graph = react_agent.create_react_agent(llm_factory=lambda node, config: RecordingChatModel(
+        node=node, model=config["model"], max_tokens=config["max_tokens"],
+        latency_profile=DEFAULT_PROFILES["gpt-4o-mini"], records=[], time_scale=0.0,
+    ))
+    state = graph.invoke({"messages": [HumanMessage(content="엔진 과열 원인이 뭐야?")]})
+
+    assert "suggest_questions" not in graph.nodes and not state.get("suggested_questions")
+    assert len(answer_prompts) == 1 and "### 🔍 추가로 궁금하실 수 있는 질문" in answer_prompts[0]
+    assert answer_prompts[0].endswith("답변은 항상 한국어로 제공하세요.")
+    print("✅ inline followups when disabled")
+
+
+if __name__ == "__main__":
+    for test in (test_config_precedence, test_graph_with_simulated_llm, test_streaming_option, test_parallel_followups,
+                 test_inline_followups_when_disabled):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
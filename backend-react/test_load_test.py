@@ -0,0 +1,44 @@
+"""
+Test the load-test harness scheduling and reporting (no server required)
+"""
+from load_test import MULTI_TURN_SESSIONS, build_sessions, find_saturation, percentile, summarize_stage
+
+
+def test_build_sessions():
+    """포아송 도착 세션이 시드로 재현되고 멀티턴 비율을 따르는지 테스트"""
+    sessions = build_sessions(rate=5, duration=200, multi_turn_ratio=0.3, seed=7)
+    assert sessions == build_sessions(rate=5, duration=200, multi_turn_ratio=0.3, seed=7)
+    assert 900 <= len(sessions) <= 1100
+    assert all(a["at"] < b["at"] for a, b in zip(sessions, sessions[1:])) and sessions[-1]["at"] < 200
+    multi = [session for session in sessions if session["kind"] == "multi"]
+    assert 0.25 <= len(multi) / len(sessions) <= 0.35
+    assert all(session["turns"] in MULTI_TURN_SESSIONS for session in multi)
+    assert all(len(session["turns"]) == 1 for session in sessions if session["kind"] == "single")
+    print(f"✅ build sessions: {len(sessions)} sessions, {len(multi)} multi-turn")
+
+
+def test_summarize_and_saturation():
+    """백분위수, 오류율 요약과 포화 지점 판단 테스트"""
+    assert percentile([], 95) is None
+    assert percentile(list(range(1, 101)), 95) == 95 and percentile([3.0], 99) == 3.0
+
+    turns = [{"ttft_ms": 100.0 + i, "latency_ms": 1000.0 + i * 10, "error": None} for i in range(19)]
+    turns.append({"ttft_ms": None, "latency_ms": 120000.0, "error": "timeout after 120s"})
+    stage = summarize_stage(1.0, turns, sessions=15, elapsed=20.0, max_in_flight=3)
+    assert stage["errors"] == 1 and stage["error_rate"] == 0.05
+    assert stage["latency_p95_ms"] == 1180.0 and stage["ttft_p50_ms"] == 109.0
+    assert stage["throughput_turns_s"] == 0.95 and stage["error_samples"] == ["timeout after 120s"]
+
+    def stage_at(rate, p95, error_rate=0.0):
+        return {"rate": rate, "latency_p95_ms": p95, "error_rate": error_rate}
+
+    assert find_saturation([stage_at(1, 2000), stage_at(2, 2500), stage_at(4, 3900)], 2.0, 0.01) is None
+    assert find_saturation([stage_at(1, 2000), stage_at(2, 2500), stage_at(4, 4500)], 2.0, 0.01)["rate"] == 4
+    saturated = find_saturation([stage_at(1, 2000), stage_at(2, 2100, error_rate=0.05)], 2.0, 0.01)
+    assert saturated == {"rate": 2, "reason": "error rate 5.0%"}
+    print(f"✅ summarize and saturation: {saturated}")
+
+
+if __name__ == "__main__":
+    test_build_sessions()
+    test_summarize_and_saturation()
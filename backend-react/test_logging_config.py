@@ -0,0 +1,114 @@
+"""
+Test queued structured logging (no OpenAI API call required)
+"""
+import io
+import json
+import logging
+from typing import TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from tools import logging_config
+from tools.logging_config import VERBOSE, SamplingFilter, sampling_stats, setup_logging, shutdown_logging
+
+
+class _State(TypedDict):
+    value: int
+
+
+def _capture(monkeypatch, sample_rate: str) -> io.StringIO:
+    monkeypatch.delenv("LOG_LEVEL", raising=False)
+    monkeypatch.setenv("LOG_FORMAT", "json")
+    monkeypatch.setenv("LOG_VERBOSE_SAMPLE_RATE", sample_rate)
+    stream = io.StringIO()
+    setup_logging(stream=stream, force=True)
+    return stream
+
+
+def _lines(stream: io.StringIO):
+    # 리스너를 멈춰 큐에 남은 로그까지 모두 출력
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_with_run_context(monkeypatch):
+    """그래프 노드 안의 로그에 run_id / thread_id / 노드 이름이 붙는지 테스트"""
+    stream = _capture(monkeypatch, "1.0")
+    logger = logging.getLogger("agent.test_logging")
+
+    def node(state: _State):
+        logger.info("node value %s", state["value"])
+        return {"value": state["value"] + 1}
+
+    builder = StateGraph(_State)
+    builder.add_node("work", node)
+    builder.set_entry_point("work")
+    builder.add_edge("work", END)
+    # LangGraph 서버는 run_id를 실행 메타데이터로 전달
+    builder.compile().invoke(
+        {"value": 1},
+        {"configurable": {"thread_id": "thread-1"}, "metadata": {"run_id": "1f0e5b4c-0000-4000-8000-000000000001"}},
+    )
+    logger.info("outside graph")
+
+    entries = _lines(stream)
+    assert entries[0]["msg"] == "node value 1" and entries[0]["logger"] == "agent.test_logging"
+    assert entries[0]["thread_id"] == "thread-1" and entries[0]["node"] == "work"
+    assert entries[0]["run_id"] == "1f0e5b4c-0000-4000-8000-000000000001"
+    assert entries[1]["msg"] == "outside graph" and "thread_id" not in entries[1]
+    print(f"✅ json with run context: {entries[0]}")
+
+
+def test_verbose_sampling(monkeypatch):
+    """상세 로그는 비율만큼만 남고 경고/일반 로그는 모두 남는지 테스트"""
+    stream = _capture(monkeypatch, "0.1")
+    logger = logging.getLogger("tools.test_logging")
+    for i in range(100):
+        logger.info("verbose %s", i, extra=VERBOSE)
+    logger.info("regular")
+    logger.warning("warning", extra=VERBOSE)
+    dropped = sampling_stats()["dropped"]
+
+    messages = [entry["msg"] for entry in _lines(stream)]
+    assert sum(m.startswith("verbose") for m in messages) == 10 and dropped == 90
+    assert "regular" in messages and "warning" in messages
+
+    never = SamplingFilter(0.0)
+    record = logging.LogRecord("tools", logging.INFO, __file__, 1, "x", None, None)
+    record.verbose = True
+    assert not never.filter(record) and never.dropped == 1
+    print(f"✅ verbose sampling: kept {len(messages)} lines, dropped {dropped}")
+
+
+def test_lazy_formatting(monkeypatch):
+    """메시지 포맷이 호출 스레드가 아닌 출력 스레드에서 일어나는지 테스트"""
+    stream = _capture(monkeypatch, "1.0")
+    formatted_in = []
+
+    class Probe:
+        def __str__(self):
+            import threading
+
+            formatted_in.append(threading.current_thread().name)
+            return "probe"
+
+    # pytest 등 다른 핸들러가 로거에 붙어 있을 수 있으므로 검사 대상 큐 핸들러로만 레코드를 보냄
+    logger = logging.getLogger("agent.test_logging")
+    record = logger.makeRecord(logger.name, logging.INFO, __file__, 0, "value %s", (Probe(),), None)
+    logging_config._queue_handler.handle(record)
+    assert formatted_in == []
+    entries = _lines(stream)
+    assert entries[0]["msg"] == "value probe"
+    assert formatted_in and formatted_in[0] != "MainThread"
+    # 제외된 레벨은 포맷 자체를 하지 않음
+    stream = _capture(monkeypatch, "1.0")
+    logging.getLogger("agent.test_logging").debug("value %s", Probe())
+    assert _lines(stream) == [] and len(formatted_in) == 1
+    print(f"✅ lazy formatting: formatted in {formatted_in[0]}")
+
+
+if __name__ == "__main__":
+    for test in (test_json_with_run_context, test_verbose_sampling, test_lazy_formatting):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
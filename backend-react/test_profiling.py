@@ -0,0 +1,88 @@
+"""
+Test opt-in per-run node profiling (no OpenAI API call required)
+"""
+import asyncio
+import importlib
+import json
+import os
+import pstats
+import sys
+import tempfile
+from typing import TypedDict
+
+from langgraph.graph import END, StateGraph
+
+import agent.profiling as profiling
+from agent.profiling import category_times, find_profiles, profiled
+
+
+class _State(TypedDict):
+    value: int
+
+
+def _json_work(state: _State):
+    payload = [{"id": i, "text": "브레이크 소음" * 10} for i in range(2000)]
+    json.loads(json.dumps(payload, ensure_ascii=False))
+    return {"value": state["value"] + 1}
+
+
+def _graph():
+    # 실제 그래프와 같은 방식으로 감쌈 (비동기 실행은 스레드에서 노드 실행)
+    cancellable = importlib.import_module("agent.react_agent").cancellable
+    builder = StateGraph(_State)
+    builder.add_node("work", cancellable(profiled(_json_work)))
+    builder.set_entry_point("work")
+    builder.add_edge("work", END)
+    return builder.compile()
+
+
+def test_per_run_profiles():
+    """configurable.profile을 켠 실행만 run_id별 프로파일을 남기는지 테스트"""
+    graph = _graph()
+    with tempfile.TemporaryDirectory() as tmp:
+        profiling.PROFILE_DIR = tmp
+        graph.invoke({"value": 1}, {"metadata": {"run_id": "run-off"}})
+        graph.invoke({"value": 1}, {"configurable": {"profile": True}, "metadata": {"run_id": "run-sync"}})
+        asyncio.run(graph.ainvoke({"value": 1}, {"configurable": {"profile": True}, "metadata": {"run_id": "run-async"}}))
+
+        profiles = find_profiles(tmp)
+        assert sorted((run_id, node) for run_id, node, _ in profiles) == [("run-async", "work"), ("run-sync", "work")]
+        # 비동기 실행도 노드가 실행된 스레드의 작업이 측정됨
+        for _, _, path in profiles:
+            stats = pstats.Stats(path)
+            assert any(name == "_json_work" for _, _, name in stats.stats)
+            times = category_times(stats)
+            assert 0 < times["json"] <= stats.total_tt and times["llm_io"] == 0
+        print(f"✅ per-run profiles: {[(run_id, node) for run_id, node, _ in profiles]}, json {times['json']:.3f}s")
+
+
+def test_report_cli():
+    """집계 CLI가 노드/카테고리/hotspot을 출력하고 합친 pstats를 저장하는지 테스트"""
+    import io
+    from contextlib import redirect_stdout
+
+    import profile_report
+
+    graph = _graph()
+    with tempfile.TemporaryDirectory() as tmp:
+        profiling.PROFILE_DIR = tmp
+        for i in range(3):
+            graph.invoke({"value": i}, {"configurable": {"profile": True}, "metadata": {"run_id": f"run-{i}"}})
+        merged = os.path.join(tmp, "merged.prof")
+        argv = sys.argv
+        sys.argv = ["profile_report.py", "--dir", tmp, "--last", "2", "--top", "5", "--output", merged]
+        output = io.StringIO()
+        try:
+            with redirect_stdout(output):
+                profile_report.main()
+        finally:
+            sys.argv = argv
+        report = output.getvalue()
+        assert "프로파일 2개 (실행 2개)" in report and "json" in report and "_json_work" in report
+        assert os.path.exists(merged)
+    print("✅ report cli")
+
+
+if __name__ == "__main__":
+    test_per_run_profiles()
+    test_report_cli()
@@ -0,0 +1,194 @@
+"""
+Test Elasticsearch query profiling and slow-query capture (no Elasticsearch required)
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+
+import pytest
+
+from tools.query_profiler import QueryProfileConfig, QueryProfiler, summarize_profile
+
+# ES profile 응답 형태 (fuzzy multi_match가 필드별 term 쿼리로 재작성된 샤드 1개)
+PROFILE = {
+    "shards": [{
+        "id": "[node][vehicle_issues][0]",
+        "searches": [{
+            "rewrite_time": 2_500_000,
+            "collector": [{"name": "SimpleTopScoreDocCollector", "time_in_nanos": 400_000}],
+            "query": [{
+                "type": "BooleanQuery",
+                "description": "문제점내용:엔진 (문제점내용:엔징)^0.5 (차종:엔진)^3.0",
+                "time_in_nanos": 9_000_000,
+                "breakdown": {"create_weight": 1_000_000, "build_scorer": 3_000_000, "next_doc": 4_000_000, "score": 1_000_000, "score_count": 120},
+                "children": [
+                    {"type": "TermQuery", "description": "문제점내용:엔진", "time_in_nanos": 5_000_000},
+                    {"type": "BoostQuery", "description": "(문제점내용:엔징)^0.5", "time_in_nanos": 2_000_000,
+                     "children": [{"type": "TermQuery", "description": "문제점내용:엔징", "time_in_nanos": 1_500_000}]},
+                    {"type": "TermQuery", "description": "(차종:엔진)^3.0", "time_in_nanos": 1_000_000},
+                ],
+            }],
+        }],
+    }],
+}
+
+
+class _ProfilingClient:
+    """profile: true 요청에만 프로파일을 붙여 응답하고 search 호출을 기록하는 클라이언트"""
+
+    def __init__(self):
+        self.calls = []
+
+    def search(self, index, body, **kwargs):
+        self.calls.append((body, kwargs))
+        response = {"took": 42, "hits": {"total": {"value": 3}, "hits": []}}
+        if body.get("profile"):
+            response["profile"] = PROFILE
+        return response
+
+
+def _profiler(log_path: str, sample_rate: float = 0.0, slow_query_ms: float = 0.0) -> QueryProfiler:
+    config = QueryProfileConfig()
+    config.sample_rate = sample_rate
+    config.slow_query_ms = slow_query_ms
+    config.log_path = log_path
+    return QueryProfiler(config)
+
+
+def _entries(log_path: str) -> list:
+    with open(log_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_summarize_profile():
+    """재작성 시간, 단계별 시간, 필드별 term 쿼리 비용 요약 테스트"""
+    summary = summarize_profile(PROFILE)
+    assert summary["shards"] == 1 and summary["rewrite_ms"] == 2.5 and summary["query_ms"] == 9.0
+    assert summary["collector_ms"] == 0.4
+    assert list(summary["breakdown_ms"]) == ["next_doc", "build_scorer", "create_weight", "score"]
+    assert summary["fields"] == {"문제점내용": {"ms": 6.5, "terms": 2}, "차종": {"ms": 1.0, "terms": 1}}
+    assert summary["query_types"] == {"BooleanQuery": 1, "TermQuery": 3, "BoostQuery": 1}
+    print(f"✅ summarize profile: {summary['fields']}")
+
+
+def test_sampled_queries_annotated():
+    """샘플링된 검색은 같은 응답의 profile을 기록하고, 나머지는 기록하지 않는지 테스트"""
+    client = _ProfilingClient()
+    body = {"query": {"multi_match": {"query": "엔진", "fields": ["문제점내용"], "fuzziness": "AUTO"}}, "size": 5}
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "logs", "slow.jsonl")
+        profiler = _profiler(log_path, sample_rate=0.5)
+        for _ in range(4):
+            sampled = profiler.should_sample()
+            search_body = {**body, "profile": True} if sampled else body
+            response = client.search(index="vehicle_issues", body=search_body)
+            profiler.observe(client, "vehicle_issues", "엔진", search_body, {}, response, 12.0, sampled)
+
+        entries = _entries(log_path)
+        assert len(entries) == 2 and profiler.stats["sampled"] == 2 and profiler.stats["reruns"] == 0
+        assert entries[0]["reason"] == "sampled" and entries[0]["profile_source"] == "request"
+        assert entries[0]["took_ms"] == 42 and "profile" not in entries[0]["search_body"]
+        assert entries[0]["profile"]["fields"]["문제점내용"]["terms"] == 2
+    print("✅ sampled queries annotated")
+
+
+def test_slow_query_rerun():
+    """느린 검색은 같은 본문/라우팅으로 profile 재실행해 기록하고, 집계 CLI가 이를 출력하는지 테스트"""
+    import slow_query_report
+
+    client = _ProfilingClient()
+    body = {"query": {"multi_match": {"query": "K5 브레이크", "fields": ["차종^3"], "fuzziness": "AUTO"}}, "size": 5}
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "slow.jsonl")
+        profiler = _profiler(log_path, slow_query_ms=100)
+        fast = client.search(index="vehicle_issues", body=body, routing="기아")
+        profiler.observe(client, "vehicle_issues", "K5 브레이크", body, {"routing": "기아"}, fast, 30.0)
+        assert not os.path.exists(log_path)
+
+        profiler.observe(client, "vehicle_issues", "K5 브레이크", body, {"routing": "기아"}, fast, 150.0)
+        profiler.flush()
+        rerun_body, rerun_options = client.calls[-1]
+        assert rerun_body["profile"] is True and rerun_options == {"routing": "기아"}
+        entries = _entries(log_path)
+        assert len(entries) == 1 and entries[0]["reason"] == "slow" and entries[0]["profile_source"] == "rerun"
+        assert entries[0]["client_ms"] == 150.0 and entries[0]["routing"] == "기아"
+        assert profiler.get_stats()["reruns"] == 1
+
+        argv = sys.argv
+        sys.argv = ["slow_query_report.py", "--log", log_path]
+        output = io.StringIO()
+        try:
+            with redirect_stdout(output):
+                slow_query_report.main()
+        finally:
+            sys.argv = argv
+        report = output.getvalue()
+        assert "기록 1개 (slow 1)" in report and "문제점내용" in report and "fuzziness AUTO" in report
+    print("✅ slow query rerun")
+
+
+def test_coalesced_search_observed_once(monkeypatch):
+    """single-flight로 합쳐진 검색은 리더만 샘플링/기록하는지 테스트 (느린 쿼리 로그 중복 없음)"""
+    import tools.elasticsearch_tool as es_tool
+    from tools.bm25_engine import get_embedded_engine
+    from tools.elasticsearch_tool import ElasticsearchConfig, search_flight
+
+    engine = get_embedded_engine()
+
+    class _SlowClient:
+        """느린 Elasticsearch를 흉내 내는 내장 엔진 래퍼 (profile 요청에는 프로파일을 붙임)"""
+        indices = engine.indices
+
+        def __init__(self):
+            self.calls = []
+
+        def options(self, **kwargs):
+            return self
+
+        def search(self, index, body, **kwargs):
+            self.calls.append(body)
+            time.sleep(0.2)
+            response = engine.search(index=index, body={key: value for key, value in body.items() if key != "profile"})
+            if body.get("profile"):
+                response["profile"] = PROFILE
+            return response
+
+    client = _SlowClient()
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "slow.jsonl")
+        profiler = _profiler(log_path, sample_rate=1.0, slow_query_ms=100)
+        monkeypatch.setattr(ElasticsearchConfig, "get_client", lambda self: client)
+        monkeypatch.setattr(es_tool, "get_index_capabilities", lambda client, index: {})
+        monkeypatch.setattr(es_tool, "search_profiler", profiler)
+        monkeypatch.delenv("SEARCH_BACKEND", raising=False)
+        coalesced = search_flight.get_stats()["coalesced"]
+
+        threads = [
+            threading.Thread(target=es_tool.elasticsearch_search.func, args=("엔진 과열 원인",), kwargs={"index": "vehicle_issues"})
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        profiler.flush()
+
+        assert search_flight.get_stats()["coalesced"] == coalesced + 2
+        assert len(client.calls) == 1 and client.calls[0]["profile"] is True
+        entries = _entries(log_path)
+        assert len(entries) == 1 and profiler.stats["sampled"] == 1 and profiler.stats["slow"] == 1
+        assert profiler.stats["reruns"] == 0 and entries[0]["profile_source"] == "request"
+    print("✅ coalesced search observed once")
+
+
+if __name__ == "__main__":
+    test_summarize_profile()
+    test_sampled_queries_annotated()
+    test_slow_query_rerun()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_coalesced_search_observed_once(monkeypatch)
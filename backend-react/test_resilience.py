@@ -0,0 +1,254 @@
+"""
+Test hedged requests, deadlines and circuit breaker (no Elasticsearch required)
+"""
+import threading
+import time
+
+from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig
+from elasticsearch import ApiError, ConnectionError as ESConnectionError, ConnectionTimeout
+
+from tools.resilience import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    ResilienceConfig,
+    ResilientExecutor,
+    RunCancelledError,
+    cancel_scope,
+    deadline_scope,
+)
+
+
+def _api_error(status: int) -> ApiError:
+    meta = ApiResponseMeta(status=status, http_version="1.1", headers=HttpHeaders(), duration=0.0,
+                           node=NodeConfig("http", "localhost", 9200))
+    return ApiError(f"status {status}", meta=meta, body={})
+
+
+def _responds_with(status: int):
+    def request(timeout):
+        raise _api_error(status)
+    return request
+
+
+def _executor(**overrides):
+    config = ResilienceConfig()
+    config.hedge_min_samples = 3
+    config.hedge_percentile = 50
+    config.hedge_min_delay = 0.01
+    config.breaker_failure_threshold = 2
+    config.breaker_reset_timeout = 0.2
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return ResilientExecutor("test", config)
+
+
+def test_hedge_wins_over_slow_primary():
+    """느린 요청이 hedge 요청으로 대체되는지 테스트"""
+    executor = _executor()
+    for _ in range(3):
+        executor.call("warm", lambda timeout: "ok")
+
+    attempts = []
+
+    def sometimes_slow(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    start = time.time()
+    response, degraded = executor.call("key", sometimes_slow)
+    assert response == "fast" and degraded is None
+    assert time.time() - start < 0.4
+    assert executor.stats["hedged"] == 1 and executor.stats["hedge_wins"] == 1
+    print(f"✅ hedge: {executor.get_stats()}")
+
+
+def test_deadline_limits_timeout():
+    """남은 예산으로 요청 타임아웃이 제한되는지 테스트"""
+    executor = _executor(hedge_enabled=False)
+    seen = []
+    with deadline_scope(time.time() + 0.5):
+        executor.call("key", lambda timeout: seen.append(timeout))
+    assert seen[0] <= 0.5
+
+    try:
+        with deadline_scope(time.time() - 1):
+            executor.call("other", lambda timeout: "never")
+        raise AssertionError("expected DeadlineExceededError")
+    except DeadlineExceededError:
+        pass
+    print("✅ deadline")
+
+
+def test_breaker_fails_fast_and_serves_stale():
+    """연속 실패 후 즉시 실패, stale 또는 폴백 응답 반환 테스트"""
+    executor = _executor(hedge_enabled=False)
+    executor.call("cached", lambda timeout: "previous")
+
+    def down(timeout):
+        raise ESConnectionError("Connection refused")
+
+    for _ in range(2):
+        try:
+            executor.call("fresh", down)
+        except ESConnectionError:
+            pass
+    assert executor.breaker.state == "open"
+
+    calls = []
+    response, degraded = executor.call("cached", lambda timeout: calls.append(1))
+    assert response == "previous" and degraded == "stale" and not calls
+
+    response, degraded = executor.call("fresh", lambda timeout: "never", fallback=lambda: "embedded")
+    assert response == "embedded" and degraded == "fallback"
+
+    try:
+        executor.call("fresh", lambda timeout: "never")
+        raise AssertionError("expected CircuitOpenError")
+    except CircuitOpenError:
+        pass
+
+    time.sleep(0.25)
+    response, degraded = executor.call("fresh", lambda timeout: "recovered")
+    assert response == "recovered" and executor.breaker.state == "closed"
+    print(f"✅ breaker: {executor.get_stats()}")
+
+
+def test_unavailable_status_counts_as_failure():
+    """503/429 응답은 장애로 세어 대체 응답을 쓰고, 4xx 응답은 장애로 세지 않는지 테스트"""
+    executor = _executor(hedge_enabled=False)
+    executor.call("cached", lambda timeout: "previous")
+
+    response, degraded = executor.call("cached", _responds_with(503))
+    assert response == "previous" and degraded == "stale"
+    response, degraded = executor.call("fresh", _responds_with(429), fallback=lambda: "embedded")
+    assert response == "embedded" and degraded == "fallback"
+    assert executor.breaker.state == "open"
+    response, degraded = executor.call("cached", _responds_with(503))
+    assert degraded == "stale" and executor.stats["fast_failed"] == 1 and executor.stats["stale_served"] == 2
+
+    # half-open 시험 요청이 잘못된 쿼리(400)로 끝나면 회로를 닫지 않고 시험 요청만 반납
+    time.sleep(0.25)
+    try:
+        executor.call("fresh", _responds_with(400))
+        raise AssertionError("expected ApiError")
+    except ApiError:
+        pass
+    assert executor.breaker.state == "half_open" and executor.breaker.allow_request()
+    executor.breaker.release_trial()
+    print(f"✅ unavailable status: {executor.get_stats()}")
+
+
+def test_concurrent_stats():
+    """여러 스레드에서 동시에 호출해도 통계가 빠짐없이 집계되는지 테스트"""
+    executor = _executor(hedge_enabled=False)
+
+    def worker():
+        for _ in range(500):
+            executor.call("key", lambda timeout: "ok")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert executor.get_stats()["requests"] == 4000
+    print("✅ concurrent stats")
+
+
+def test_half_open_trial_released_on_deadline():
+    """half-open 시험 요청이 예산 초과로 끝나도 다음 요청이 시험 요청으로 허용되는지 테스트"""
+    executor = _executor(hedge_enabled=False)
+
+    def down(timeout):
+        raise ESConnectionError("Connection refused")
+
+    for _ in range(2):
+        try:
+            executor.call("key", down)
+        except ESConnectionError:
+            pass
+    time.sleep(0.25)
+    assert executor.breaker.state == "half_open"
+
+    try:
+        with deadline_scope(time.time() - 1):
+            executor.call("key", lambda timeout: "never")
+        raise AssertionError("expected DeadlineExceededError")
+    except DeadlineExceededError:
+        pass
+    assert executor.breaker.allow_request()
+    executor.breaker.release_trial()
+
+    response, degraded = executor.call("key", lambda timeout: "recovered")
+    assert response == "recovered" and degraded is None and executor.breaker.state == "closed"
+    print("✅ half-open trial released on deadline")
+
+
+def test_budget_limited_timeout_not_counted():
+    """실행 예산 때문에 줄어든 타임아웃으로 끝난 요청은 circuit breaker 실패로 세지 않는지 테스트"""
+    executor = _executor(hedge_enabled=False)
+
+    def timed_out(timeout):
+        raise ConnectionTimeout(f"timed out after {timeout:.3f}s")
+
+    for _ in range(3):
+        try:
+            with deadline_scope(time.time() + 0.05):
+                executor.call("key", timed_out)
+        except ConnectionTimeout:
+            pass
+    assert executor.breaker.state == "closed"
+
+    # 설정된 타임아웃 그대로 끝난 요청은 장애로 셈
+    for _ in range(2):
+        try:
+            executor.call("key", timed_out)
+        except ConnectionTimeout:
+            pass
+    assert executor.breaker.state == "open"
+    print("✅ budget-limited timeout not counted")
+
+
+def test_cancel_abandons_in_flight_request():
+    """실행 취소 시 진행 중인 요청을 기다리지 않고 바로 중단하는지 테스트"""
+    executor = _executor(hedge_enabled=False)
+    executor.call("cached", lambda timeout: "previous")
+    cancel_event = threading.Event()
+    threading.Timer(0.1, cancel_event.set).start()
+
+    start = time.time()
+    try:
+        with cancel_scope(cancel_event):
+            executor.call("cached", lambda timeout: time.sleep(1))
+        raise AssertionError("expected RunCancelledError")
+    except RunCancelledError:
+        pass
+    # 1초 요청을 끝까지 기다리지 않고, 취소는 장애로 보지 않아 stale 응답도 쓰지 않음
+    assert time.time() - start < 0.5
+    assert executor.stats["cancelled"] == 1 and executor.stats["stale_served"] == 0
+    assert executor.breaker.state == "closed"
+
+    # 이미 취소된 실행에서는 요청을 보내지 않음
+    calls = []
+    try:
+        with cancel_scope(cancel_event):
+            executor.call("other", lambda timeout: calls.append(1))
+        raise AssertionError("expected RunCancelledError")
+    except RunCancelledError:
+        pass
+    assert not calls
+    print(f"✅ cancel: {executor.get_stats()}")
+
+
+if __name__ == "__main__":
+    test_hedge_wins_over_slow_primary()
+    test_deadline_limits_timeout()
+    test_breaker_fails_fast_and_serves_stale()
+    test_unavailable_status_counts_as_failure()
+    test_concurrent_stats()
+    test_half_open_trial_released_on_deadline()
+    test_budget_limited_timeout_not_counted()
+    test_cancel_abandons_in_flight_request()
@@ -0,0 +1,84 @@
+"""
+Test in-memory refinement of previous search results (no Elasticsearch required)
+"""
+from agent.state import merge_search_hits
+from tools.result_refiner import refine_hits, refine_search_results, summarize_hits
+
+
+def _hit(doc_id, vehicle, system, score, mileage):
+    return {
+        "rank": 0,
+        "score": score,
+        "index": "vehicle_issues",
+        "id": doc_id,
+        "source": {"차종": vehicle, "시스템": system, "문제점내용": f"{system} 문제", "주행거리": mileage},
+        "format_type": "vehicle",
+        "query": "차량 브레이크 문제점",
+    }
+
+
+HITS = [
+    _hit("1", "K5", "브레이크", 9.1, 52000),
+    _hit("2", "Sonata", "브레이크", 8.7, 12000),
+    _hit("3", "K5", "엔진", 7.2, 150000),
+    _hit("4", "Tucson", "브레이크", 6.5, 83000),
+]
+
+
+def test_refine_filter_and_sort():
+    """필터 및 정렬 테스트"""
+    matched, groups = refine_hits(HITS, filters={"차종": "k5"}, sort_by="주행거리")
+    assert [hit["id"] for hit in matched] == ["3", "1"]
+    assert not groups
+    print("✅ filter + sort")
+
+
+def test_refine_group_by():
+    """그룹화 테스트"""
+    matched, groups = refine_hits(HITS, group_by="시스템", limit=2)
+    assert list(groups) == ["브레이크", "엔진"]
+    assert len(groups["브레이크"]) == 2
+    assert len(matched) == 4
+    print("✅ group by")
+
+
+def test_refine_tool_with_injected_hits():
+    """도구 호출 시 상태 주입 및 빈 결과 테스트"""
+    message = refine_search_results.invoke({
+        "name": "refine_search_results",
+        "args": {"filters": {"차종": "K5"}, "hits": HITS},
+        "id": "call-1",
+        "type": "tool_call",
+    })
+    assert len(message.artifact) == 2
+    assert "json:search_results" not in message.content
+
+    empty = refine_search_results.invoke({
+        "name": "refine_search_results",
+        "args": {"filters": {"차종": "Carnival"}, "hits": HITS},
+        "id": "call-2",
+        "type": "tool_call",
+    })
+    assert empty.artifact == []
+    assert "hits" not in refine_search_results.tool_call_schema.model_json_schema()["properties"]
+    print("✅ refine tool")
+
+
+def test_merge_and_summarize():
+    """상태 병합 및 캐시 요약 테스트"""
+    updated = dict(HITS[0], score=9.9)
+    merged = merge_search_hits(HITS, [updated])
+    assert len(merged) == 4
+    assert merged[-1]["score"] == 9.9
+
+    summary = summarize_hits(merged)
+    assert "4건" in summary and "K5" in summary
+    assert summarize_hits([]) == ""
+    print("✅ merge + summarize")
+
+
+if __name__ == "__main__":
+    test_refine_filter_and_sort()
+    test_refine_group_by()
+    test_refine_tool_with_injected_hits()
+    test_merge_and_summarize()
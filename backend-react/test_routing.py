@@ -0,0 +1,90 @@
+"""
+Test manufacturer routing for vehicle_issues (no Elasticsearch required)
+"""
+import pytest
+
+from generate_vehicle_data import build_bulk_actions
+from tools.index_mappings import MAPPING_SPEC_VERSION, build_index_body, load_mapping_spec
+from tools.routing import detect_manufacturer
+
+
+def test_detect_manufacturer():
+    """한 제조사만 가리키는 질문만 라우팅 값을 얻는지 테스트"""
+    assert detect_manufacturer("K5 브레이크 소음") == "기아"
+    assert detect_manufacturer("쏘나타에서 엔진 과열") == "현대"
+    assert detect_manufacturer("GV80의 변속 충격") == "제네시스"
+    assert detect_manufacturer("기아차 K8 배터리 방전") == "기아"
+    # 여러 제조사 또는 제조사 없음 → 전체 샤드 검색
+    assert detect_manufacturer("K5와 쏘나타 브레이크 비교") is None
+    assert detect_manufacturer("엔진 과열 원인") is None
+    assert detect_manufacturer("K55 부품") is None
+    print("✅ detect manufacturer")
+
+
+def test_routing_mapping_and_ingestion():
+    """라우팅 필수 매핑, 샤드 수, 색인 액션의 _routing 테스트"""
+    spec = load_mapping_spec()
+    mapping = build_index_body("vehicle_issues", "ngram", spec, shards=6)
+    assert mapping["mappings"]["_routing"] == {"required": True}
+    assert mapping["mappings"]["_meta"]["routing_field"] == "제조사"
+    assert mapping["settings"]["index"]["number_of_shards"] == 6
+    # 기존 매핑과 documents 인덱스는 라우팅 없음
+    assert "_routing" not in build_index_body("vehicle_issues", "standard")["mappings"]
+    assert "_routing" not in build_index_body("documents", "nori")["mappings"]
+
+    record = {"순번": 1, "제조사": "기아", "차종": "K5", "시스템": "브레이크", "문제점내용": "브레이크 패드 마모"}
+    action = next(build_bulk_actions([record], "vehicle_issues", mapping, spec, "ngram"))
+    assert action["_routing"] == "기아" and action["_source"]["dedup_key"] == "K5 | 브레이크 | 브레이크 패드 마모"
+    legacy = build_index_body("vehicle_issues", "standard")
+    assert "_routing" not in next(build_bulk_actions([record], "vehicle_issues", legacy, spec, "standard"))
+    print("✅ routing mapping and ingestion")
+
+
+class _RoutedIndex:
+    """라우팅 매핑(_meta.routing_field)을 가진 인덱스처럼 응답하고 search 옵션을 기록하는 클라이언트"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.calls = []
+        self.indices = self
+
+    def options(self, **kwargs):
+        return self
+
+    def exists(self, index, **kwargs):
+        return self.engine.indices.exists(index=index)
+
+    def get_mapping(self, index, **kwargs):
+        meta = {"mapping_spec": MAPPING_SPEC_VERSION, "korean_analyzer": None, "routing_field": "제조사"}
+        return {index: {"mappings": {"_meta": meta}}}
+
+    def search(self, index, body, **kwargs):
+        self.calls.append(kwargs.get("routing"))
+        return self.engine.search(index=index, body=body)
+
+
+def test_search_tool_routing(monkeypatch):
+    """검색 도구가 라우팅 매핑 인덱스에서만, 한 제조사 질문에만 routing을 넘기는지 테스트"""
+    import tools.elasticsearch_tool as es_tool
+    from tools.bm25_engine import get_embedded_engine
+    from tools.index_mappings import _capabilities_cache
+
+    client = _RoutedIndex(get_embedded_engine())
+    monkeypatch.setattr(es_tool, "get_embedded_engine", lambda: client)
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    monkeypatch.delenv("ES_ROUTING", raising=False)
+    monkeypatch.delitem(_capabilities_cache, "vehicle_issues", raising=False)
+    es_tool.elasticsearch_search.func("K5 브레이크 소음", index="vehicle_issues")
+    es_tool.elasticsearch_search.func("브레이크 패드 마모", index="vehicle_issues")
+    monkeypatch.setenv("ES_ROUTING", "false")
+    es_tool.elasticsearch_search.func("K5 엔진 과열", index="vehicle_issues")
+
+    assert client.calls == ["기아", None, None]
+    print(f"✅ search tool routing: {client.calls}")
+
+
+if __name__ == "__main__":
+    test_detect_manufacturer()
+    test_routing_mapping_and_ingestion()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_search_tool_routing(monkeypatch)
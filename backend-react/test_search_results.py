@@ -0,0 +1,219 @@
+"""
+Test search result shaping in the search tool (no Elasticsearch required)
+"""
+from typing import Any, TypedDict
+
+import pytest
+
+from langgraph.graph import END, StateGraph
+
+from tools.bm25_engine import EmbeddedSearchEngine, highlight_fragments
+from tools.elasticsearch_tool import (
+    COLLAPSE_INNER_HITS,
+    apply_score_cutoff,
+    build_highlight,
+    collapse_hits,
+    format_hit,
+)
+
+VEHICLE_FORMAT = {"type": "vehicle", "title_fields": ["차종", "시스템"], "content_fields": {"문제": "문제점내용"}}
+KEY_FIELDS = ["차종", "시스템", "문제점내용"]
+DOCUMENT_FORMAT = {
+    "type": "document",
+    "title_field": "title",
+    "content_field": "content",
+    "highlight": {"fields": ["content"], "fragment_size": 40, "number_of_fragments": 2, "exclude_source": ["content"]},
+}
+
+
+class _RunState(TypedDict):
+    result: Any
+
+
+def _run_in_graph(func):
+    """func를 그래프 노드 안에서 실행하고 (반환값, custom 스트림 이벤트 목록)을 돌려줍니다."""
+    workflow = StateGraph(_RunState)
+    workflow.add_node("run", lambda state: {"result": func()})
+    workflow.set_entry_point("run")
+    workflow.add_edge("run", END)
+    events, result = [], None
+    for mode, chunk in workflow.compile().stream({"result": None}, stream_mode=["custom", "values"]):
+        if mode == "custom":
+            events.append(chunk)
+        else:
+            result = chunk["result"]
+    return result, events
+
+
+def _es_hit(doc_id, vehicle, issue, score, vin):
+    return {
+        "_index": "vehicle_issues",
+        "_id": doc_id,
+        "_score": score,
+        "_source": {"차종": vehicle, "시스템": "브레이크", "문제점내용": issue, "VIN": vin},
+    }
+
+
+def test_local_collapse():
+    """로컬 중복 제거 테스트"""
+    hits = [
+        _es_hit("1", "K5", "브레이크 패드 마모", 9.0, "A"),
+        _es_hit("2", "K5", "브레이크 패드 마모", 8.9, "B"),
+        _es_hit("3", "Sonata", "브레이크 패드 마모", 8.5, "C"),
+        _es_hit("4", "K5", "브레이크 패드 마모", 8.1, "D"),
+        _es_hit("5", "K3", "ABS 센서 오류", 7.0, "E"),
+    ]
+    groups = collapse_hits(hits, KEY_FIELDS, limit=2)
+    assert [(hit["_id"], count) for hit, count in groups] == [("1", 3), ("3", 1)]
+    print("✅ local collapse")
+
+
+def test_es_collapse_counts():
+    """ES collapse inner_hits 그룹 크기 테스트"""
+    hit = _es_hit("1", "K5", "브레이크 패드 마모", 9.0, "A")
+    hit["inner_hits"] = {COLLAPSE_INNER_HITS: {"hits": {"total": {"value": 7}, "hits": []}}}
+    groups = collapse_hits([hit], KEY_FIELDS, limit=5, es_collapsed=True)
+    assert groups[0][1] == 7
+    print("✅ es collapse")
+
+
+def test_group_count_rendering():
+    """그룹 크기 표시 테스트"""
+    hit = {"rank": 1, "score": 9.0, "source": {"차종": "K5", "시스템": "브레이크", "문제점내용": "패드 마모"}}
+    assert "유사" not in format_hit(hit, VEHICLE_FORMAT)
+    assert "유사 3건" in format_hit({**hit, "group_count": 3}, VEHICLE_FORMAT)
+    print("✅ group count rendering")
+
+
+def test_highlight_request_and_rendering():
+    """하이라이트 요청 본문 및 조각 표시 테스트"""
+    highlight = build_highlight(DOCUMENT_FORMAT)
+    assert highlight["fields"]["content"] == {"fragment_size": 40, "number_of_fragments": 2, "no_match_size": 40}
+    assert build_highlight({"type": "document"}) is None
+
+    hit = {"rank": 1, "score": 3.0, "source": {"title": "정비 매뉴얼"},
+           "highlight": {"content": ["**브레이크** 패드 교체", "**브레이크** 오일 점검"]}}
+    text = format_hit(hit, DOCUMENT_FORMAT)
+    assert "**브레이크** 패드 교체 … **브레이크** 오일 점검" in text
+    # 하이라이트가 없으면 기존처럼 본문 앞부분 표시
+    assert "가" * 300 + "..." in format_hit({**hit, "highlight": {}, "source": {"content": "가" * 400}}, DOCUMENT_FORMAT)
+    print("✅ highlight request + rendering")
+
+
+def test_embedded_highlight():
+    """내장 엔진 하이라이트 조각 테스트"""
+    content = "서론 " * 40 + "브레이크 패드가 마모되면 소음이 발생합니다. " + "본문 " * 40
+    fragments = highlight_fragments(content, ["브레이크"], fragment_size=30, tags=("**", "**"))
+    assert fragments[0].startswith("**브레이크** 패드가")
+    assert highlight_fragments("관련 없는 내용", ["브레이크"], no_match_size=5) == ["관련 없는"]
+
+    engine = EmbeddedSearchEngine()
+    engine.index_documents("documents", [("1", {"title": "정비", "content": content})])
+    response = engine.search(index="documents", body={
+        "query": {"multi_match": {"query": "브레이크", "fields": ["title^2", "content"]}},
+        "_source": ["title"],
+        "highlight": build_highlight(DOCUMENT_FORMAT),
+    })
+    hit = response["hits"]["hits"][0]
+    assert "content" not in hit["_source"]
+    assert hit["highlight"]["content"][0].startswith("**브레이크**")
+    print("✅ embedded highlight")
+
+
+
+def test_score_cutoff():
+    """min_score / score_gap 절단 테스트"""
+    policy = {"min_score": 3.0, "score_gap": 0.4, "min_results": 1}
+    # 점수 하락폭이 최고 점수의 40% 이상인 지점에서 절단
+    assert apply_score_cutoff([10.0, 9.5, 9.0, 4.0, 3.8], policy) == (3, False)
+    # min_score 미만 절단
+    assert apply_score_cutoff([10.0, 8.0, 7.0, 2.9], policy) == (3, False)
+    # 최고 점수가 기준 미만이면 약한 검색
+    assert apply_score_cutoff([2.0, 1.9], policy) == (1, True)
+    assert apply_score_cutoff([], policy) == (0, False)
+    assert apply_score_cutoff([5.0, 1.0], {"min_score": 0.0}) == (2, False)
+    print("✅ score cutoff")
+
+
+def test_weak_search_signal(monkeypatch):
+    """내장 엔진으로 약한 검색 신호 테스트"""
+    from tools.elasticsearch_tool import elasticsearch_search
+
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    (text, hits), events = _run_in_graph(
+        lambda: elasticsearch_search.func("쏘나타 소음", index="vehicle_issues", max_results=5)
+    )
+    assert len(hits) == 1 and "관련성이 낮은 검색 결과" in text and events[0]["weak_search"] is True
+
+    text, hits = elasticsearch_search.func("엔진 과열", index="vehicle_issues", max_results=3)
+    assert len(hits) == 3 and "관련성이 낮은" not in text
+    print("✅ weak search signal")
+
+
+def test_search_results_stream_events(monkeypatch):
+    """call_tools 실행 중 검색마다 구조화된 결과 이벤트가 바로 전송되는지 테스트"""
+    import importlib
+
+    from langchain_core.messages import AIMessage
+
+    react_agent = importlib.import_module("agent.react_agent")
+    tool_calls = [
+        {"name": "elasticsearch_search", "args": {"query": "엔진 과열", "index": "vehicle_issues"}, "id": "call_1"},
+        {"name": "refine_search_results", "args": {"filters": {"시스템": "엔진"}}, "id": "call_2"},
+    ]
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    first, _ = _run_in_graph(lambda: react_agent.call_tools({"messages": [AIMessage(content="", tool_calls=tool_calls[:1])]}))
+    state = {"messages": [AIMessage(content="", tool_calls=tool_calls)], "search_hits": first["search_hits"]}
+    result, events = _run_in_graph(lambda: react_agent.call_tools(state))
+
+    assert [event["type"] for event in events] == ["search_results", "search_results"]
+    assert events[0]["query"] == "엔진 과열" and events[0]["returned_hits"] == len(events[0]["results"])
+    assert events[0]["results"][0]["rank"] == 1 and "source" in events[0]["results"][0]
+    # 도구 결과 메시지에는 더 이상 JSON 블록이 붙지 않음
+    assert all("json:search_results" not in m.content for m in result["messages"])
+    print("✅ search results stream events")
+
+
+def test_fallback_local_collapse(monkeypatch):
+    """ES collapse를 쓰는 인덱스도 폴백 엔진 결과는 로컬에서 중복 제거되는지 테스트"""
+    import tools.elasticsearch_tool as es_tool
+    from tools.bm25_engine import get_embedded_engine
+
+    engine = get_embedded_engine()
+    bodies = []
+
+    class _RecordingEngine:
+        indices = engine.indices
+
+        def search(self, index, body, **kwargs):
+            bodies.append((body, kwargs))
+            return engine.search(index=index, body=body)
+
+    # ES 매핑에 collapse 필드가 있다고 가정하고, ES는 응답하지 않는 포트로 장애 재현
+    monkeypatch.setattr(es_tool, "get_embedded_engine", lambda: _RecordingEngine())
+    monkeypatch.setattr(es_tool, "get_index_capabilities", lambda client, index: {
+        "composed_fields": {"dedup_key": KEY_FIELDS}, "routing_field": "제조사",
+    })
+    monkeypatch.delenv("SEARCH_BACKEND", raising=False)
+    monkeypatch.setenv("ELASTICSEARCH_URL", "http://127.0.0.1:1")
+    monkeypatch.setenv("SEARCH_FALLBACK", "embedded")
+    text, hits = es_tool.elasticsearch_search.func("K5 브레이크 소음", index="vehicle_issues", max_results=5)
+
+    body, options = bodies[-1]
+    assert "collapse" not in body and body["size"] == 20 and set(KEY_FIELDS) <= set(body["_source"])
+    assert "routing" not in options
+    keys = [tuple(hit["source"].get(field) for field in KEY_FIELDS) for hit in hits]
+    assert hits and len(keys) == len(set(keys)) and "내장 검색 엔진" in text
+    print(f"✅ fallback local collapse: {len(hits)} groups")
+
+
+if __name__ == "__main__":
+    test_local_collapse()
+    test_es_collapse_counts()
+    test_group_count_rendering()
+    test_highlight_request_and_rendering()
+    test_embedded_highlight()
+    test_score_cutoff()
+    for test in (test_weak_search_signal, test_search_results_stream_events, test_fallback_local_collapse):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
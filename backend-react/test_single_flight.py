@@ -0,0 +1,119 @@
+"""
+Test single-flight coalescing for thread-pool and asyncio callers (no Elasticsearch required)
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.single_flight import SingleFlight, normalize_search_key
+
+
+def test_thread_callers_share_one_request():
+    """스레드 호출자 합치기 테스트"""
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def slow_search():
+        calls.append(1)
+        release.wait(timeout=2)
+        return {"hits": {"hits": []}}
+
+    key = normalize_search_key("vehicle_issues", "K5  브레이크", 5)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, key, slow_search) for _ in range(8)]
+        time.sleep(0.2)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    stats = flight.get_stats()
+    assert stats["executed"] == 1 and stats["coalesced"] == 7 and stats["in_flight"] == 0
+    print(f"✅ thread callers: {stats}")
+
+
+def test_async_callers_and_errors():
+    """asyncio 호출자 합치기 및 예외 공유 테스트"""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def search():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "response"
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ConnectionError("es down")
+
+    async def main():
+        key = normalize_search_key("documents", "LangGraph", 5)
+        results = await asyncio.gather(*[flight.ado(key, search) for _ in range(5)])
+        assert results == ["response"] * 5
+
+        errors = await asyncio.gather(*[flight.ado("err", failing) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(e, ConnectionError) for e in errors)
+
+    asyncio.run(main())
+    assert len(calls) == 1
+    assert normalize_search_key("a", " K5   Brake ", 5) == ("a", "K5 Brake", 5)
+    print(f"✅ async callers: {flight.get_stats()}")
+
+
+def test_async_cancellation():
+    """대기 중인 호출 하나가 취소되어도 공유 요청은 계속되고, 모두 취소되면 요청도 취소되는지 테스트"""
+    flight = SingleFlight("test")
+    calls, cancelled = [], []
+
+    async def search():
+        calls.append(1)
+        try:
+            await asyncio.sleep(0.2)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "response"
+
+    async def main():
+        # 리더가 취소되어도 다른 호출은 같은 요청의 결과를 받음
+        leader = asyncio.create_task(flight.ado("shared", search))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.ado("shared", search))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == "response"
+        assert leader.cancelled() and len(calls) == 1 and not cancelled
+
+        # 기다리는 호출이 모두 취소되면 요청도 취소되고, 다음 호출은 새로 요청
+        waiters = [asyncio.create_task(flight.ado("abandoned", search)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert cancelled == [1] and flight.get_stats()["in_flight"] == 0
+        assert await flight.ado("abandoned", search) == "response"
+
+    asyncio.run(main())
+    assert len(calls) == 3
+    print(f"✅ async cancellation: {flight.get_stats()}")
+
+
+def test_stats_endpoint():
+    """검색 single-flight 통계가 /stats/single_flight로 노출되는지 테스트"""
+    from fastapi.testclient import TestClient
+
+    from agent.webapp import app
+
+    stats = TestClient(app).get("/stats/single_flight").json()
+    assert {"executed", "coalesced", "in_flight", "saved_ratio"} <= set(stats)
+    print(f"✅ stats endpoint: {stats}")
+
+
+if __name__ == "__main__":
+    test_thread_callers_share_one_request()
+    test_async_callers_and_errors()
+    test_async_cancellation()
+    test_stats_endpoint()
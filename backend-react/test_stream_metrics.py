@@ -0,0 +1,94 @@
+"""
+Test answer token streaming metrics (no OpenAI API call required)
+"""
+import importlib
+import time
+
+import pytest
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+from agent.llm_config import load_node_configs
+from agent.stream_metrics import StreamMetrics, StreamTimer
+
+
+def test_stream_timer():
+    """TTFT / 초당 토큰 / 토큰 간 간격 계산 테스트"""
+    timer = StreamTimer()
+    time.sleep(0.05)
+    for _ in range(5):
+        timer.on_chunk(AIMessageChunk(content="가"))
+        time.sleep(0.01)
+    # 내용 없는 마지막 청크의 사용량 정보가 출력 토큰 수로 쓰임
+    timer.on_chunk(AIMessageChunk(content="", usage_metadata={"input_tokens": 10, "output_tokens": 6, "total_tokens": 16}))
+    metrics = timer.finish()
+
+    assert metrics["ttft_ms"] >= 50 and metrics["tokens"] == 6
+    assert 10 <= metrics["gap_p50_ms"] < 50 and metrics["gap_max_ms"] >= metrics["gap_p95_ms"]
+    assert metrics["tokens_per_s"] > 0 and metrics["total_ms"] >= metrics["ttft_ms"]
+
+    empty = StreamTimer().finish()
+    assert empty["ttft_ms"] is None and empty["tokens"] == 0 and empty["tokens_per_s"] is None
+    print(f"✅ stream timer: {metrics}")
+
+
+def test_slo_violations():
+    """TTFT 목표 위반 집계 테스트"""
+    metrics = StreamMetrics("answer", ttft_slo_ms=100)
+    base = {"tokens": 10, "tokens_per_s": 50.0, "gap_p50_ms": 20.0, "gap_p95_ms": 30.0, "gap_max_ms": 40.0}
+    metrics.record({**base, "ttft_ms": 80.0})
+    metrics.record({**base, "ttft_ms": 250.0})
+    stats = metrics.get_stats()
+    assert stats["runs"] == 2 and stats["slo_violations"] == 1
+    assert stats["ttft_p95_ms"] == 250.0 and stats["tokens_per_s_p50"] == 50.0
+    print(f"✅ slo violations: {stats}")
+
+
+def test_answer_node_streams(monkeypatch):
+    """답변 노드가 토큰 스트리밍으로 생성하고 측정값을 메타데이터/이벤트로 남기는지 테스트"""
+    from benchmark_llm_nodes import DEFAULT_PROFILES, OFFLINE_ENV, SimulatedChatModel
+
+    for key, value in OFFLINE_ENV.items():
+        monkeypatch.setenv(key, value)
+
+    react_agent = importlib.import_module("agent.react_agent")
+    configs = load_node_configs()
+    graph = react_agent.create_react_agent(llm_factory=lambda node, config: SimulatedChatModel(
+        node=node, model=config["model"], max_tokens=config["max_tokens"],
+        latency_profile=DEFAULT_PROFILES["gpt-4o-mini"], records=[], time_scale=0.01,
+    ))
+
+    events, token_chunks, final_state = [], 0, None
+    for mode, chunk in graph.stream(
+        {"messages": [HumanMessage(content="엔진 과열 원인이 뭐야?")]}, stream_mode=["custom", "messages", "values"]
+    ):
+        if mode == "custom" and chunk["type"] == "answer_metrics":
+            events.append(chunk)
+        elif mode == "messages" and chunk[1].get("langgraph_node") == "agent" and chunk[0].content:
+            token_chunks += 1
+        elif mode == "values":
+            final_state = chunk
+
+    answer = final_state["messages"][-1]
+    metrics = answer.response_metadata["stream_metrics"]
+    assert answer.content.startswith("### 📊 검색 결과 요약") and answer.type == "ai"
+    assert len(events) == 1 and events[0]["ttft_ms"] == metrics["ttft_ms"]
+    # 시뮬레이션 TTFT 450ms × 0.01 이상, 출력 토큰 수는 사용량 정보 기준
+    assert metrics["ttft_ms"] >= 4.5 and metrics["tokens"] == 700
+    # 답변이 한 번에 오지 않고 토큰 단위로 스트리밍됨
+    assert token_chunks > 100
+
+    # 누적 측정값은 /stats/stream으로 노출
+    from fastapi.testclient import TestClient
+
+    from agent.webapp import app
+
+    stats = TestClient(app).get("/stats/stream").json()
+    assert stats["runs"] >= 1 and stats["ttft_p50_ms"] is not None
+    print(f"✅ answer node streams: {metrics}")
+
+
+if __name__ == "__main__":
+    test_stream_timer()
+    test_slo_violations()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_answer_node_streams(monkeypatch)
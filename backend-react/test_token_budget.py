@@ -0,0 +1,97 @@
+"""
+Test token-budget-aware rendering of search results (no Elasticsearch required)
+"""
+import pytest
+
+from tools.elasticsearch_tool import render_hits, strip_results_block
+from tools.token_budget import allocate_by_score, budget_scope, count_tokens, current_budget, truncate_to_tokens
+
+VEHICLE_FORMAT = {
+    "type": "vehicle",
+    "title_fields": ["차종", "시스템"],
+    "content_fields": {"문제": "문제점내용", "현상": "현상", "원인": "원인및요구안내용"},
+}
+
+
+def _hit(rank, score, text="브레이크 패드가 빠르게 마모되어 제동 시 소음이 발생합니다. " * 4):
+    return {
+        "rank": rank,
+        "score": score,
+        "source": {"차종": "K5", "시스템": "브레이크", "문제점내용": text, "현상": text, "원인및요구안내용": text},
+    }
+
+
+def test_counting_and_allocation():
+    """토큰 계산, 자르기, 점수 비율 배정 테스트"""
+    assert count_tokens("") == 0
+    assert count_tokens("브레이크 패드 마모") > count_tokens("브레이크")
+    text = "엔진 과열로 냉각수가 누수됩니다. " * 20
+    for max_tokens in (3, 10, 30):
+        # suffix("...")까지 포함해 max_tokens 이하
+        truncated = truncate_to_tokens(text, max_tokens)
+        assert truncated.endswith("...") and count_tokens(truncated) <= max_tokens
+    assert truncate_to_tokens(text, 1) == ""
+    assert truncate_to_tokens("짧은 문장", 30) == "짧은 문장"
+    assert allocate_by_score([3.0, 1.0], 400) == [300, 100]
+    assert allocate_by_score([0.0, 0.0], 100) == [50, 50]
+
+    assert current_budget(1500) == 1500
+    with budget_scope(200):
+        assert current_budget(1500) == 200
+    print("✅ counting + allocation")
+
+
+def test_shrink_before_drop():
+    """하위 결과는 생략 전에 제목만 표시되는지 테스트"""
+    hits = [_hit(1, 10.0), _hit(2, 9.0), _hit(3, 2.0), _hit(4, 1.0)]
+    unlimited = render_hits(hits, VEHICLE_FORMAT)
+
+    text = render_hits(hits, VEHICLE_FORMAT, budget=400)
+    assert count_tokens(text) <= 400 < count_tokens(unlimited)
+    assert "[1] K5 - 브레이크" in text and "내용:" in text
+    # 하위 결과는 제목만 남음
+    last = text[text.index("[4]"):]
+    assert "내용:" not in last
+
+    tiny = render_hits(hits, VEHICLE_FORMAT, budget=40)
+    assert "생략" in tiny and "[1]" in tiny
+
+    # 예산이 없어도 최상위 결과는 제목만 표시
+    for budget in (0, -50):
+        empty = render_hits(hits, VEHICLE_FORMAT, budget=budget)
+        assert "[1] K5 - 브레이크" in empty and "내용:" not in empty and "[2]" not in empty
+        assert "하위 결과 3건 생략" in empty
+    print(f"✅ shrink before drop ({count_tokens(unlimited)} → {count_tokens(text)} tokens)")
+
+
+def test_turn_budget_in_call_tools(monkeypatch):
+    """call_tools가 턴 예산을 도구 호출에 나눠 적용하는지 테스트"""
+    import importlib
+
+    from langchain_core.messages import AIMessage, ToolMessage
+
+    # agent 패키지는 같은 이름의 그래프 객체를 내보내므로 모듈을 직접 가져옴
+    react_agent = importlib.import_module("agent.react_agent")
+
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    monkeypatch.setattr(react_agent, "TURN_RESULT_TOKEN_BUDGET", 600)
+    tool_calls = [
+        {"name": "elasticsearch_search", "args": {"query": "엔진 과열", "index": "vehicle_issues"}, "id": "call_1"},
+        {"name": "elasticsearch_search", "args": {"query": "배터리 방전", "index": "vehicle_issues"}, "id": "call_2"},
+    ]
+    result = react_agent.call_tools({"messages": [AIMessage(content="", tool_calls=tool_calls)]})
+
+    messages = result["messages"]
+    assert len(messages) == 2
+    prompt_view = react_agent.prompt_messages(messages)
+    assert sum(count_tokens(m.content) for m in prompt_view) <= 600
+    assert isinstance(prompt_view[0], ToolMessage)
+    assert strip_results_block(messages[0].content) == prompt_view[0].content
+    print(f"✅ turn budget: {[count_tokens(m.content) for m in prompt_view]} tokens")
+
+
+if __name__ == "__main__":
+    test_counting_and_allocation()
+    test_shrink_before_drop()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_turn_budget_in_call_tools(monkeypatch)
@@ -0,0 +1,110 @@
+"""
+Test startup warmup and readiness (no OpenAI API call required)
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from agent.warmup import StartupWarmup
+
+
+class _Models:
+    def __init__(self, calls: list):
+        self.calls = calls
+        self.down = False
+
+    def retrieve(self, model: str):
+        if self.down:
+            raise ConnectionError("connection refused")
+        self.calls.append(model)
+
+
+class _Client:
+    """OpenAI 클라이언트의 웜업에 쓰는 부분만 흉내 (연결 없이 호출 기록)"""
+
+    def __init__(self, calls: list):
+        self._client = object()
+        self.models = _Models(calls)
+
+    def with_options(self, **kwargs):
+        return self
+
+
+class _LLM:
+    def __init__(self, client: _Client, model_name: str):
+        self.root_client = client
+        self.model_name = model_name
+
+
+def test_warmup_steps(monkeypatch):
+    """대표 질의 실행, 같은 HTTP 클라이언트는 한 번만 연결, 프롬프트 토큰화 테스트"""
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    calls = []
+    shared = _Client(calls)
+    warmup = StartupWarmup()
+    warmup.register(
+        {"thinking": _LLM(shared, "gpt-4o-mini"), "answer": _LLM(shared, "gpt-4o-mini"), "followups": _LLM(_Client(calls), "gpt-4.1-nano")},
+        {"answer": "검색 결과를 바탕으로 답변하세요."},
+    )
+    assert not warmup.ready
+    status = warmup.run()
+
+    assert status["ready"] and status["state"] == "done" and status["failed_steps"] == []
+    search = status["steps"]["search"]
+    # vehicle_issues 3개 + documents 2개 (es_indices.json의 warmup_queries)
+    assert search["queries"] == 5 and search["errors"] == []
+    assert status["steps"]["llm"]["connections"] == 2 and calls == ["gpt-4o-mini", "gpt-4.1-nano"]
+    assert status["steps"]["prompts"]["tokens"]["answer"] > 0
+    print(f"✅ warmup steps: {status['duration_ms']}ms, {status['steps']}")
+
+
+def test_readiness_endpoint(monkeypatch):
+    """readiness 프로브가 웜업을 시작하고, 끝나기 전에는 503을 반환하는지 테스트"""
+    import agent.webapp as webapp
+
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    warmup = StartupWarmup()
+    monkeypatch.setattr(webapp, "startup_warmup", warmup)
+    client = TestClient(webapp.app)
+
+    first = client.get("/ready")
+    assert warmup.wait(60)
+    assert first.status_code == 503 and first.json()["ready"] is False
+    second = client.get("/ready")
+    assert second.status_code == 200 and second.json()["steps"]["search"]["queries"] == 5
+    assert client.get("/warmup").json()["state"] == "done"
+    print(f"✅ readiness endpoint: {first.status_code} → {second.status_code}")
+
+
+def test_failed_steps_not_ready(monkeypatch):
+    """웜업 단계가 실패하면 503과 실패한 단계를 반환하고, 다음 프로브 때 다시 웜업하는지 테스트"""
+    import agent.webapp as webapp
+
+    monkeypatch.setenv("SEARCH_BACKEND", "embedded")
+    calls = []
+    llm_client = _Client(calls)
+    llm_client.models.down = True
+    warmup = StartupWarmup()
+    warmup.register({"answer": _LLM(llm_client, "gpt-4o-mini")}, {})
+    monkeypatch.setattr(webapp, "startup_warmup", warmup)
+    client = TestClient(webapp.app)
+
+    client.get("/ready")
+    assert warmup.wait(60)
+    status = warmup.get_status()
+    assert not status["ready"] and status["state"] == "failed" and status["failed_steps"] == ["llm"]
+    assert "connection refused" in status["steps"]["llm"]["errors"][0]
+
+    # 실패로 끝난 웜업은 다음 프로브가 다시 시작함 (LLM 복구 후 성공)
+    llm_client.models.down = False
+    failed = client.get("/ready")
+    assert failed.status_code == 503 and failed.json()["failed_steps"] == ["llm"]
+    assert warmup.wait(60)
+    recovered = client.get("/ready")
+    assert recovered.status_code == 200 and recovered.json()["failed_steps"] == [] and calls == ["gpt-4o-mini"]
+    print(f"✅ failed steps not ready: {failed.status_code} → {recovered.status_code}")
+
+
+if __name__ == "__main__":
+    for test in (test_warmup_steps, test_readiness_endpoint, test_failed_steps_not_ready):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
@@ -2,5 +2,6 @@
 Tools module for ReAct agent
 """
 from .elasticsearch_tool import elasticsearch_search, list_elasticsearch_indices
+from .result_refiner import refine_search_results
 
-__all__ = ["elasticsearch_search", "list_elasticsearch_indices"]
+__all__ = ["elasticsearch_search", "list_elasticsearch_indices", "refine_search_results"]
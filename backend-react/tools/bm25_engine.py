@@ -0,0 +1,430 @@
+"""
+In-process BM25 search engine
+
+Elasticsearch 없이 동작하는 임베디드 검색 백엔드입니다. 오프라인 테스트/벤치마크용
+대체 백엔드(SEARCH_BACKEND=embedded) 및 Elasticsearch 장애 시 읽기 전용
+폴백(SEARCH_FALLBACK=embedded)으로 사용됩니다.
+
+Elasticsearch 클라이언트와 같은 형태의 인터페이스(search, indices.exists,
+indices.get_alias, options)를 제공하므로 검색 도구가 그대로 사용할 수 있습니다.
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# BM25 파라미터 (Elasticsearch 기본값과 동일)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 퍼지 매칭 설정
+FUZZY_MAX_EXPANSIONS = 50
+FUZZY_SCORE_FACTOR = 0.5
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Any) -> List[str]:
+    """standard analyzer와 유사하게 소문자 변환 후 단어 단위로 분리합니다."""
+    if text is None:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def parse_field_boost(field_spec: str) -> Tuple[str, float]:
+    """'시스템^3' 형태의 필드 지정을 (필드명, 가중치)로 변환합니다."""
+    if "^" in field_spec:
+        name, boost = field_spec.rsplit("^", 1)
+        try:
+            return name, float(boost)
+        except ValueError:
+            return field_spec, 1.0
+    return field_spec, 1.0
+
+
+def auto_fuzziness(term: str) -> int:
+    """Elasticsearch fuzziness AUTO 규칙 (0-2자: 0, 3-5자: 1, 그 이상: 2)"""
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return 2
+
+
+def within_edit_distance(a: str, b: str, max_distance: int) -> bool:
+    """두 문자열의 편집 거리가 max_distance 이하인지 확인합니다 (조기 종료)."""
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j, char_b in enumerate(b, 1):
+            cost = 0 if char_a == char_b else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return False
+        previous = current
+    return previous[-1] <= max_distance
+
+
+def highlight_fragments(
+    text: Any,
+    terms: List[str],
+    fragment_size: int = 100,
+    number_of_fragments: int = 5,
+    no_match_size: int = 0,
+    tags: Tuple[str, str] = ("<em>", "</em>"),
+) -> List[str]:
+    """
+    Elasticsearch highlight와 비슷하게 검색어가 포함된 조각을 만듭니다.
+
+    검색어가 처음 등장하는 위치부터 fragment_size 길이의 창을 잘라 검색어를 태그로 감싸며,
+    일치가 없으면 앞부분 no_match_size 글자를 반환합니다.
+    """
+    if text is None:
+        return []
+    text = str(text)
+    lowered = text.lower()
+    term_set = set(terms)
+    matches = [match for match in TOKEN_PATTERN.finditer(lowered) if match.group() in term_set]
+    if not matches:
+        return [text[:no_match_size]] if no_match_size else []
+
+    fragments = []
+    window_end = -1
+    for match in matches:
+        if len(fragments) >= number_of_fragments:
+            break
+        if match.start() < window_end:
+            continue
+        window_start = match.start()
+        window_end = min(len(text), window_start + fragment_size)
+        spans = [m.span() for m in matches if window_start <= m.start() and m.end() <= window_end]
+        fragment, cursor = "", window_start
+        for start, end in spans:
+            fragment += text[cursor:start] + tags[0] + text[start:end] + tags[1]
+            cursor = end
+        fragments.append(fragment + text[cursor:window_end])
+    return fragments
+
+
+class FieldIndex:
+    """
+    필드 하나의 역색인
+
+    포스팅은 term → (문서 번호 배열, 빈도 배열)로 array 모듈을 사용해 압축 저장합니다.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.doc_lengths = array("I")
+        self.total_length = 0
+
+    def add(self, doc_number: int, value: Any) -> None:
+        tokens = tokenize(value)
+        # 문서 번호 순서대로 추가되므로 길이 배열을 맞춰 채움
+        while len(self.doc_lengths) < doc_number:
+            self.doc_lengths.append(0)
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        for term, freq in Counter(tokens).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = (array("I"), array("H"))
+                self.postings[term] = posting
+            posting[0].append(doc_number)
+            posting[1].append(min(freq, 65535))
+
+    def avg_length(self, doc_count: int) -> float:
+        return self.total_length / doc_count if doc_count else 0.0
+
+    def expand(self, term: str, fuzziness: Optional[int]) -> List[Tuple[str, float]]:
+        """검색어를 (색인 term, 점수 배율) 목록으로 확장합니다."""
+        if term in self.postings and not fuzziness:
+            return [(term, 1.0)]
+        expansions = [(term, 1.0)] if term in self.postings else []
+        if fuzziness:
+            for candidate in self.postings:
+                if candidate == term:
+                    continue
+                if within_edit_distance(term, candidate, fuzziness):
+                    expansions.append((candidate, FUZZY_SCORE_FACTOR))
+                    if len(expansions) >= FUZZY_MAX_EXPANSIONS:
+                        break
+        return expansions
+
+
+class EmbeddedIndex:
+    """인덱스 하나 (문서 저장소 + 필드별 역색인)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ids: List[str] = []
+        self.sources: List[Dict[str, Any]] = []
+        self.fields: Dict[str, FieldIndex] = {}
+
+    def add_document(self, doc_id: str, source: Dict[str, Any]) -> None:
+        doc_number = len(self.sources)
+        self.ids.append(str(doc_id))
+        self.sources.append(source)
+        for field, value in source.items():
+            if isinstance(value, (dict, list)):
+                continue
+            field_index = self.fields.get(field)
+            if field_index is None:
+                field_index = FieldIndex()
+                self.fields[field] = field_index
+            field_index.add(doc_number, value)
+
+    def score_field(self, field: str, terms: List[str], fuzziness: Optional[str]) -> Dict[int, float]:
+        """BM25로 필드 하나의 문서별 점수를 계산합니다."""
+        field_index = self.fields.get(field)
+        if field_index is None:
+            return {}
+        doc_count = len(self.sources)
+        avg_length = field_index.avg_length(doc_count) or 1.0
+        scores: Dict[int, float] = {}
+
+        for term in terms:
+            distance = auto_fuzziness(term) if fuzziness else None
+            for indexed_term, factor in field_index.expand(term, distance):
+                doc_numbers, freqs = field_index.postings[indexed_term]
+                df = len(doc_numbers)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for doc_number, freq in zip(doc_numbers, freqs):
+                    length = field_index.doc_lengths[doc_number]
+                    norm = freq * (BM25_K1 + 1) / (freq + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                    scores[doc_number] = scores.get(doc_number, 0.0) + idf * norm * factor
+        return scores
+
+
+class _Indices:
+    """Elasticsearch 클라이언트의 indices 네임스페이스 대체"""
+
+    def __init__(self, engine: "EmbeddedSearchEngine"):
+        self._engine = engine
+
+    def exists(self, index: str, **kwargs) -> bool:
+        return index in self._engine.indices_data
+
+    def get_mapping(self, index: str, **kwargs) -> Dict[str, Any]:
+        if index not in self._engine.indices_data:
+            raise KeyError(f"index_not_found_exception: no such index [{index}]")
+        return {index: {"mappings": {}}}
+
+    def get_alias(self, index: str = "*", **kwargs) -> Dict[str, Any]:
+        return {name: {"aliases": {}} for name in self._engine.indices_data}
+
+
+class EmbeddedSearchEngine:
+    """Elasticsearch 클라이언트 인터페이스를 흉내 내는 인메모리 BM25 검색 엔진"""
+
+    def __init__(self):
+        self.indices_data: Dict[str, EmbeddedIndex] = {}
+        self.indices = _Indices(self)
+
+    def options(self, **kwargs) -> "EmbeddedSearchEngine":
+        """요청 옵션(request_timeout 등)은 인메모리 검색에 의미가 없으므로 무시합니다."""
+        return self
+
+    def index_documents(self, index: str, documents: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """(문서 ID, 문서) 목록을 색인합니다."""
+        target = self.indices_data.setdefault(index, EmbeddedIndex(index))
+        count = 0
+        for doc_id, source in documents:
+            target.add_document(doc_id, source)
+            count += 1
+        return count
+
+    def search(self, index: str, body: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """
+        multi_match(best_fields) 또는 match_all 쿼리를 실행하고 Elasticsearch 형식의 응답을 반환합니다.
+
+        terms 집계(aggs)는 _source 값 기준으로 지원합니다 (문서 수 내림차순).
+
+        highlight는 검색어 위치 기준의 단순 조각으로 지원하고, 그 밖에 지원하지 않는
+        쿼리 옵션(collapse 등)은 무시합니다. 검색 도구는 이 엔진에 collapse 대신 로컬 중복
+        제거용 요청을 보내고, routing(샤드 선택)은 넘기지 않습니다.
+        """
+        target = self.indices_data.get(index)
+        if target is None:
+            raise KeyError(f"index_not_found_exception: no such index [{index}]")
+
+        query = body.get("query", {})
+        multi_match = query.get("multi_match", {})
+        terms = tokenize(multi_match.get("query", ""))
+        fuzziness = multi_match.get("fuzziness")
+        size = body.get("size", 10)
+        source_filter = body.get("_source")
+        highlight = body.get("highlight")
+
+        # best_fields: 문서별로 가장 높은 (필드 점수 x 가중치)를 사용
+        best: Dict[int, float] = {}
+        if "match_all" in query:
+            best = {doc_number: 1.0 for doc_number in range(len(target.sources))}
+        for field_spec in multi_match.get("fields", []):
+            field, boost = parse_field_boost(field_spec)
+            for doc_number, score in target.score_field(field, terms, fuzziness).items():
+                weighted = score * boost
+                if weighted > best.get(doc_number, 0.0):
+                    best[doc_number] = weighted
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        hits = []
+        for doc_number, score in ranked[:size]:
+            full_source = target.sources[doc_number]
+            source = full_source
+            if isinstance(source_filter, list):
+                source = {field: full_source[field] for field in source_filter if field in full_source}
+            hit = {
+                "_index": index,
+                "_id": target.ids[doc_number],
+                "_score": score,
+                "_source": source,
+            }
+            if highlight:
+                hit_highlight = self._highlight(full_source, terms, highlight)
+                if hit_highlight:
+                    hit["highlight"] = hit_highlight
+            hits.append(hit)
+
+        response = {
+            "took": 0,
+            "hits": {
+                "total": {"value": len(best), "relation": "eq"},
+                "max_score": hits[0]["_score"] if hits else None,
+                "hits": hits,
+            },
+        }
+        aggs = body.get("aggs") or body.get("aggregations")
+        if aggs:
+            response["aggregations"] = {
+                name: self._terms_aggregation(target, best, agg["terms"])
+                for name, agg in aggs.items()
+                if "terms" in agg
+            }
+        return response
+
+    @staticmethod
+    def _terms_aggregation(target: "EmbeddedIndex", doc_numbers: Iterable[int], terms: Dict[str, Any]) -> Dict[str, Any]:
+        """일치한 문서의 필드 값별 문서 수 (terms 집계)"""
+        counts: Dict[Any, int] = {}
+        for doc_number in doc_numbers:
+            value = target.sources[doc_number].get(terms["field"])
+            if value is not None:
+                counts[value] = counts.get(value, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+        return {"buckets": [{"key": key, "doc_count": count} for key, count in ranked[:terms.get("size", 10)]]}
+
+    @staticmethod
+    def _highlight(source: Dict[str, Any], terms: List[str], highlight: Dict[str, Any]) -> Dict[str, List[str]]:
+        """요청의 highlight 설정에 따라 필드별 조각을 만듭니다."""
+        tags = (highlight.get("pre_tags", ["<em>"])[0], highlight.get("post_tags", ["</em>"])[0])
+        result = {}
+        for field, options in highlight.get("fields", {}).items():
+            fragments = highlight_fragments(
+                source.get(field),
+                terms,
+                fragment_size=options.get("fragment_size", highlight.get("fragment_size", 100)),
+                number_of_fragments=options.get("number_of_fragments", highlight.get("number_of_fragments", 5)),
+                no_match_size=options.get("no_match_size", 0),
+                tags=tags,
+            )
+            if fragments:
+                result[field] = fragments
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """인덱스별 문서 수와 term 수를 반환합니다."""
+        return {
+            name: {
+                "docs": len(data.sources),
+                "terms": sum(len(field.postings) for field in data.fields.values()),
+            }
+            for name, data in self.indices_data.items()
+        }
+
+
+def write_snapshot(path: str, index: str, documents: Iterable[Tuple[str, Dict[str, Any]]], append: bool = False) -> int:
+    """(문서 ID, 문서) 목록을 JSONL 스냅샷 파일로 저장합니다."""
+    count = 0
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        for doc_id, source in documents:
+            f.write(json.dumps({"_index": index, "_id": str(doc_id), "_source": source}, ensure_ascii=False, default=str))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def export_index_snapshot(es_client, index: str, path: str, append: bool = False) -> int:
+    """Elasticsearch 인덱스 전체를 JSONL 스냅샷 파일로 내보냅니다."""
+    from elasticsearch.helpers import scan
+
+    documents = ((hit["_id"], hit["_source"]) for hit in scan(es_client, index=index, query={"query": {"match_all": {}}}))
+    return write_snapshot(path, index, documents, append=append)
+
+
+def load_snapshot(engine: EmbeddedSearchEngine, path: str) -> int:
+    """JSONL 스냅샷 파일을 엔진에 색인합니다."""
+    count = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            engine.index_documents(record["_index"], [(record["_id"], record["_source"])])
+            count += 1
+    return count
+
+
+def build_default_engine(vehicle_docs: Optional[int] = None, seed: int = 42, snapshot_path: Optional[str] = None) -> EmbeddedSearchEngine:
+    """
+    임베디드 엔진을 생성합니다.
+
+    스냅샷 파일이 있으면 그것을 사용하고, 없으면 generate_vehicle_issues()와
+    샘플 문서로 vehicle_issues / documents 인덱스를 만듭니다.
+    """
+    engine = EmbeddedSearchEngine()
+    snapshot_path = snapshot_path or os.getenv("EMBEDDED_INDEX_SNAPSHOT")
+    if snapshot_path and os.path.exists(snapshot_path):
+        count = load_snapshot(engine, snapshot_path)
+        logger.info("📦 Embedded engine loaded %d documents from snapshot: %s", count, snapshot_path)
+        return engine
+
+    from generate_vehicle_data import generate_vehicle_issues
+    from sample_data import SAMPLE_DOCS
+
+    if vehicle_docs is None:
+        vehicle_docs = int(os.getenv("EMBEDDED_VEHICLE_DOCS", "5000"))
+    records = generate_vehicle_issues(vehicle_docs, seed=seed)
+    engine.index_documents("vehicle_issues", ((record["순번"], record) for record in records))
+    # Elasticsearch의 _source처럼 JSON 값으로 저장 (datetime → ISO 문자열)
+    engine.index_documents("documents", (
+        (i, json.loads(json.dumps(doc, ensure_ascii=False, default=lambda value: value.isoformat())))
+        for i, doc in enumerate(SAMPLE_DOCS, 1)
+    ))
+    logger.info("📦 Embedded engine built: %s", engine.stats())
+    return engine
+
+
+_default_engine: Optional[EmbeddedSearchEngine] = None
+_default_engine_lock = threading.Lock()
+
+
+def get_embedded_engine() -> EmbeddedSearchEngine:
+    """프로세스 전역 임베디드 엔진을 반환합니다 (최초 호출 시 생성)."""
+    global _default_engine
+    if _default_engine is None:
+        with _default_engine_lock:
+            if _default_engine is None:
+                _default_engine = build_default_engine()
+    return _default_engine
@@ -2,25 +2,60 @@
 Elasticsearch search tool for ReAct agent
 """
 import os
+import re
 import json
 import time
 import logging
-from typing import Optional, List, Dict, Any
+import threading
+from typing import Optional, List, Dict, Any, Tuple, Union, Callable
 from dotenv import load_dotenv
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, ConnectionError as ESConnectionError, ConnectionTimeout
 
 # 환경 변수 로드
 load_dotenv()
 from langchain_core.tools import tool
+from langgraph.config import get_stream_writer
 from pydantic import BaseModel, Field
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from tools.bm25_engine import get_embedded_engine
+from tools.index_mappings import build_search_query, get_index_capabilities
+from tools.logging_config import VERBOSE, setup_logging
+from tools.query_profiler import QueryProfiler
+from tools.resilience import CircuitOpenError, ResilientExecutor, RunCancelledError
+from tools.routing import detect_routing
+from tools.single_flight import SingleFlight, normalize_search_key
+from tools.token_budget import allocate_by_score, count_tokens, current_budget, truncate_to_tokens
+
+# 로깅 설정 (큐 기반 JSON 로깅, 상세 로그는 샘플링)
+setup_logging()
 logger = logging.getLogger(__name__)
 
+# 동일한 동시 검색 요청을 하나로 합치는 single-flight 그룹
+search_flight = SingleFlight("elasticsearch_search")
+
+# hedging / deadline / circuit breaker를 적용하는 요청 실행기
+search_guard = ResilientExecutor("elasticsearch")
+
+# 샘플링된 검색과 느린 검색의 ES profile 결과를 느린 쿼리 로그에 기록
+search_profiler = QueryProfiler()
+
+# 프로세스 전체에서 공유하는 Elasticsearch 클라이언트 (연결 풀 재사용, 웜업으로 미리 연결)
+_es_clients: Dict[tuple, Elasticsearch] = {}
+_es_clients_lock = threading.Lock()
+
+# ES collapse 사용 시 그룹 크기를 가져오는 inner_hits 이름
+COLLAPSE_INNER_HITS = "duplicates"
+
+# 하이라이트 조각 표시 설정
+HIGHLIGHT_TAGS = ("**", "**")
+HIGHLIGHT_JOINER = " … "
+
+# 토큰 예산: 내용을 이보다 적게 보여줄 수 있으면 제목만 표시
+MIN_CONTENT_TOKENS = 20
+
+# 이전 버전이 도구 결과에 붙이던 프론트엔드용 JSON 블록 (저장된 대화에 남아 있을 수 있음)
+RESULTS_BLOCK_PATTERN = re.compile(r"\n*```json:search_results\n.*?\n```\n?", re.DOTALL)
+
 
 class ElasticsearchConfig:
     """Elasticsearch connection configuration"""
@@ -31,24 +66,46 @@ class ElasticsearchConfig:
         self.password = os.getenv("ELASTICSEARCH_PASSWORD", "")
         self.default_index = os.getenv("ES_DEFAULT_INDEX", "documents")
         self.index_config_file = os.getenv("ES_INDEX_CONFIG_FILE", "config/es_indices.json")
+        self.single_flight = os.getenv("ES_SINGLE_FLIGHT", "true").lower() == "true"
+        # 검색 백엔드: elasticsearch / embedded (인메모리 BM25)
+        self.search_backend = os.getenv("SEARCH_BACKEND", "elasticsearch").lower()
+        self.resilience = search_guard.config.enabled and self.search_backend != "embedded"
+        # Elasticsearch 장애 시 읽기 전용 폴백: none / embedded
+        self.search_fallback = os.getenv("SEARCH_FALLBACK", "none").lower()
+        # es_indices.json의 score_cutoff 정책 적용 여부
+        self.score_cutoff = os.getenv("ES_SCORE_CUTOFF", "true").lower() == "true"
+        # 라우팅 필드로 색인된 인덱스에서 질문이 한 값(제조사)만 가리키면 해당 샤드만 검색
+        self.routing = os.getenv("ES_ROUTING", "true").lower() == "true"
+        # ES profile 진단 (내장 엔진은 profile을 지원하지 않음)
+        self.query_profiling = search_profiler.config.enabled and self.search_backend != "embedded"
+        # 도구 호출 하나의 결과 텍스트 토큰 예산 (call_tools가 턴 예산에서 다시 배정)
+        self.result_token_budget = int(os.getenv("SEARCH_RESULT_TOKEN_BUDGET", "1500"))
 
         # 인덱스 설정 로드
         self.index_configs = self._load_index_configs()
 
     def get_client(self) -> Elasticsearch:
-        """Create Elasticsearch client"""
-        return Elasticsearch(
-            [self.url],
-            basic_auth=(self.username, self.password) if self.password else None,
-            verify_certs=False,
-        )
+        """Create Elasticsearch client (SEARCH_BACKEND=embedded이면 인메모리 엔진 반환)"""
+        if self.search_backend == "embedded":
+            return get_embedded_engine()
+        key = (self.url, self.username, self.password)
+        with _es_clients_lock:
+            client = _es_clients.get(key)
+            if client is None:
+                client = Elasticsearch(
+                    [self.url],
+                    basic_auth=(self.username, self.password) if self.password else None,
+                    verify_certs=False,
+                )
+                _es_clients[key] = client
+        return client
 
     def _load_index_configs(self) -> dict:
         """Load index configurations from JSON file"""
         try:
             with open(self.index_config_file, 'r', encoding='utf-8') as f:
                 configs = json.load(f)
-                logger.info(f"✅ Loaded index configurations for: {', '.join(configs.keys())}")
+                logger.info("✅ Loaded index configurations for: %s", ", ".join(configs), extra=VERBOSE)
                 return configs
         except FileNotFoundError:
             logger.warning(f"⚠️ Index config file not found: {self.index_config_file}")
@@ -58,6 +115,12 @@ class ElasticsearchConfig:
             logger.error(f"❌ Invalid JSON in index config: {e}")
             return {}
 
+    def get_fallback_client(self):
+        """Elasticsearch 장애 시 사용할 폴백 클라이언트 (없으면 None)"""
+        if self.search_fallback == "embedded" and self.search_backend != "embedded":
+            return get_embedded_engine()
+        return None
+
     def get_index_config(self, index_name: str) -> Optional[dict]:
         """Get configuration for specific index"""
         config = self.index_configs.get(index_name)
@@ -70,6 +133,251 @@ class ElasticsearchConfig:
         return list(self.index_configs.keys())
 
 
+def format_hit(
+    hit: Dict[str, Any], result_format: dict, content_tokens: Optional[int] = None, title_only: bool = False
+) -> str:
+    """
+    구조화된 검색 결과 하나를 프롬프트용 텍스트로 변환합니다.
+
+    Args:
+        hit: rank, score, source 등을 포함한 검색 결과
+        result_format: es_indices.json의 result_format 설정
+        content_tokens: 내용을 이 토큰 수 이하로 자름 (미지정 시 처음 300자)
+        title_only: 제목 줄만 표시
+
+    Returns:
+        포맷팅된 결과 텍스트
+    """
+    source = hit["source"]
+    format_type = result_format.get("type", "document")
+
+    # 설정 기반 결과 포맷팅
+    if format_type == "vehicle":
+        # 차량 이슈 포맷
+        title_fields = result_format.get("title_fields", [])
+        title_parts = [str(source.get(field, 'N/A')) for field in title_fields]
+        title = " - ".join(title_parts)
+
+        content_fields = result_format.get("content_fields", {})
+        content_parts = []
+        for label, field in content_fields.items():
+            value = source.get(field, 'N/A')
+            content_parts.append(f"{label}: {value}")
+        content = "\n   ".join(content_parts)
+        url = ""
+    else:
+        # 문서 포맷
+        title_field = result_format.get("title_field", "title")
+        content_field = result_format.get("content_field", "content")
+        url_field = result_format.get("url_field", "url")
+
+        title = source.get(title_field, "제목 없음")
+        content = source.get(content_field, "")
+        url = source.get(url_field, "")
+
+    # 하이라이트 조각이 있으면 잘라낸 본문 대신 일치 부분을 표시
+    fragments = [fragment for field_fragments in hit.get("highlight", {}).values() for fragment in field_fragments]
+    if fragments:
+        content_preview = HIGHLIGHT_JOINER.join(fragments)
+    elif content_tokens is None:
+        # 내용 요약 (처음 300자)
+        content_preview = content[:300] + "..." if len(content) > 300 else content
+    else:
+        content_preview = content
+    if content_tokens is not None:
+        content_preview = truncate_to_tokens(content_preview, content_tokens)
+
+    # 중복 묶음이면 그룹 크기를 함께 표시
+    group_count = hit.get("group_count", 1)
+    group_text = f", 유사 {group_count}건" if group_count > 1 else ""
+
+    result_text = f"\n[{hit['rank']}] {title} (점수: {hit['score']:.2f}{group_text})\n"
+    if title_only:
+        return result_text
+    result_text += f"   내용:\n   {content_preview}\n"
+    if url:
+        result_text += f"   URL: {url}\n"
+
+    return result_text
+
+
+def collapse_hits(
+    hits: List[Dict[str, Any]], key_fields: List[str], limit: int, es_collapsed: bool = False
+) -> List[Tuple[Dict[str, Any], int]]:
+    """
+    거의 같은 검색 결과를 하나의 그룹으로 묶습니다.
+
+    Args:
+        hits: Elasticsearch 응답의 hits (점수 내림차순)
+        key_fields: 그룹 키를 구성하는 필드
+        limit: 반환할 최대 그룹 수
+        es_collapsed: ES collapse가 이미 적용된 응답인지 여부 (inner_hits에서 그룹 크기 사용)
+
+    Returns:
+        (대표 결과, 그룹 크기) 목록
+    """
+    if es_collapsed:
+        groups = []
+        for hit in hits[:limit]:
+            total = hit.get("inner_hits", {}).get(COLLAPSE_INNER_HITS, {}).get("hits", {}).get("total", 1)
+            groups.append((hit, total["value"] if isinstance(total, dict) else total))
+        return groups
+
+    # 로컬 중복 제거: 가져온 범위 안에서 키가 같은 결과를 묶음
+    group_index: Dict[tuple, int] = {}
+    groups = []
+    for hit in hits:
+        key = tuple(str(hit["_source"].get(field, "")) for field in key_fields)
+        if key in group_index:
+            representative, count = groups[group_index[key]]
+            groups[group_index[key]] = (representative, count + 1)
+        elif len(groups) < limit:
+            group_index[key] = len(groups)
+            groups.append((hit, 1))
+    return groups
+
+
+def render_hits(
+    hits: List[Dict[str, Any]], result_format: Union[dict, Callable[[Dict[str, Any]], dict]], budget: Optional[int] = None
+) -> str:
+    """
+    검색 결과 목록을 토큰 예산 안에서 렌더링합니다.
+
+    예산을 점수 비율로 나눠 각 결과의 내용을 자르고, 배정량이 부족한 하위 결과는
+    제목만 표시합니다. 제목만으로도 전체 예산을 넘으면 나머지 결과를 생략합니다.
+    예산이 0 이하여도 최상위 결과는 제목만이라도 항상 표시합니다.
+
+    Args:
+        hits: rank, score, source를 포함한 검색 결과 (순위순)
+        result_format: es_indices.json의 result_format 설정 (결과별로 다르면 hit → 설정 함수)
+        budget: 결과 전체의 토큰 예산 (None이면 제한 없음)
+
+    Returns:
+        포맷팅된 결과 텍스트
+    """
+    get_format = result_format if callable(result_format) else (lambda hit: result_format)
+    if budget is None:
+        return "".join(format_hit(hit, get_format(hit)) for hit in hits)
+
+    parts = []
+    used = 0
+    carry = 0
+    shrunk = 0
+    for i, (hit, share) in enumerate(zip(hits, allocate_by_score([hit["score"] for hit in hits], budget))):
+        share += carry
+        result_format = get_format(hit)
+        full_text = format_hit(hit, result_format)
+        full_tokens = count_tokens(full_text)
+        # 내용을 뺀 부분(제목, 라벨, URL)의 토큰 수
+        overhead = count_tokens(format_hit(hit, result_format, content_tokens=0))
+        title_text = format_hit(hit, result_format, title_only=True)
+        title_tokens = count_tokens(title_text)
+
+        if full_tokens <= share:
+            text, tokens = full_text, full_tokens
+        elif share - overhead >= MIN_CONTENT_TOKENS:
+            text = format_hit(hit, result_format, content_tokens=share - overhead)
+            tokens = count_tokens(text)
+        elif used + title_tokens <= budget or not parts:
+            # 예산이 부족해도 최상위 결과의 제목은 남김 (결과가 있다는 사실을 모델에 전달)
+            text, tokens = title_text, title_tokens
+            shrunk += 1
+        else:
+            parts.append(f"\n(토큰 예산으로 하위 결과 {len(hits) - i}건 생략)\n")
+            logger.info("✂️ Token budget %d - shrunk %d, dropped %d of %d results", budget, shrunk, len(hits) - i, len(hits))
+            return "".join(parts)
+
+        parts.append(text)
+        used += tokens
+        carry = share - tokens
+
+    if shrunk:
+        logger.info("✂️ Token budget %d - shrunk %d of %d results to title only", budget, shrunk, len(hits), extra=VERBOSE)
+    return "".join(parts)
+
+
+def strip_results_block(text: str) -> str:
+    """이전 버전의 프론트엔드용 JSON 블록을 제거합니다 (모델 프롬프트에는 텍스트 결과만 사용)."""
+    return RESULTS_BLOCK_PATTERN.sub("\n", text)
+
+
+def apply_score_cutoff(scores: List[float], cutoff_config: dict) -> Tuple[int, bool]:
+    """
+    점수 기준으로 반환할 결과 수를 정합니다.
+
+    점수 내림차순 목록에서 min_score 미만이거나, 바로 앞 결과 대비 점수 하락폭이
+    최고 점수의 score_gap 비율 이상인 지점에서 자릅니다.
+
+    Args:
+        scores: 결과 점수 (내림차순)
+        cutoff_config: es_indices.json의 score_cutoff 설정
+
+    Returns:
+        (유지할 결과 수, 약한 검색 여부) - 최고 점수가 min_score 미만이면 약한 검색으로 보고
+        min_results개만 유지
+    """
+    if not scores:
+        return 0, False
+    min_score = cutoff_config.get("min_score", 0.0)
+    score_gap = cutoff_config.get("score_gap")
+    min_results = min(cutoff_config.get("min_results", 1), len(scores))
+
+    if scores[0] < min_score:
+        return min_results, True
+
+    keep = 1
+    while keep < len(scores):
+        score = scores[keep]
+        if score < min_score:
+            break
+        if score_gap is not None and (scores[keep - 1] - score) >= scores[0] * score_gap:
+            break
+        keep += 1
+    return max(keep, min_results), False
+
+
+def build_highlight(result_format: dict) -> Optional[Dict[str, Any]]:
+    """
+    result_format의 highlight 설정으로 Elasticsearch highlight 요청 본문을 만듭니다.
+
+    일치 부분이 없는 문서도 앞부분 조각(no_match_size)을 받도록 해서
+    본문 전체를 _source로 가져오지 않아도 미리보기를 표시할 수 있습니다.
+
+    Returns:
+        highlight 요청 본문 (설정이 없으면 None)
+    """
+    highlight_config = result_format.get("highlight")
+    if not highlight_config or not highlight_config.get("fields"):
+        return None
+    fragment_size = highlight_config.get("fragment_size", 150)
+    field_options = {
+        "fragment_size": fragment_size,
+        "number_of_fragments": highlight_config.get("number_of_fragments", 2),
+        "no_match_size": fragment_size,
+    }
+    return {
+        "pre_tags": [HIGHLIGHT_TAGS[0]],
+        "post_tags": [HIGHLIGHT_TAGS[1]],
+        "require_field_match": False,
+        "fields": {field: dict(field_options) for field in highlight_config["fields"]},
+    }
+
+
+def publish_search_results(search_metadata: Dict[str, Any]) -> None:
+    """
+    구조화된 검색 결과를 LangGraph custom 스트림으로 바로 전송합니다 (프론트엔드 테이블 표시용).
+
+    답변 생성이 끝나기 전에 결과 테이블을 그릴 수 있도록 검색이 끝나는 즉시 보냅니다.
+    그래프 실행 밖에서 도구를 직접 호출한 경우에는 아무것도 하지 않습니다.
+    """
+    try:
+        writer = get_stream_writer()
+    except (RuntimeError, KeyError):
+        # 그래프 밖 호출: 실행 컨텍스트가 없거나(RuntimeError) LangGraph 런타임이 없음(KeyError)
+        return
+    writer({"type": "search_results", **search_metadata})
+
+
 class SearchInput(BaseModel):
     """Input schema for search tool"""
     query: str = Field(description="검색어 또는 질문")
@@ -77,8 +385,8 @@ class SearchInput(BaseModel):
     max_results: int = Field(default=5, description="반환할 최대 결과 수")
 
 
-@tool("elasticsearch_search", args_schema=SearchInput)
-def elasticsearch_search(query: str, index: Optional[str] = None, max_results: int = 5) -> str:
+@tool("elasticsearch_search", args_schema=SearchInput, response_format="content_and_artifact")
+def elasticsearch_search(query: str, index: Optional[str] = None, max_results: int = 5) -> Tuple[str, List[Dict[str, Any]]]:
     """
     Elasticsearch에서 관련 문서를 검색합니다.
 
@@ -88,32 +396,42 @@ def elasticsearch_search(query: str, index: Optional[str] = None, max_results: i
         max_results: 반환할 최대 결과 수 (기본값: 5)
 
     Returns:
-        검색 결과를 포함한 문자열
+        (검색 결과를 포함한 문자열, 구조화된 검색 결과 목록)
     """
     start_time = time.time()
 
     try:
         config = ElasticsearchConfig()
         es_client = config.get_client()
+        fallback_client = config.get_fallback_client()
 
         # 인덱스가 지정되지 않았으면 기본 인덱스 사용
         if index is None:
             index = config.default_index
-            logger.info(f"📌 Using default index: {index}")
+            logger.info("📌 Using default index: %s", index, extra=VERBOSE)
 
-        logger.info(f"🔍 Elasticsearch search started - Query: '{query}', Index: {index}, Max results: {max_results}")
+        logger.info("🔍 Elasticsearch search started - Query: '%s', Index: %s, Max results: %d", query, index, max_results, extra=VERBOSE)
 
         # 인덱스 존재 확인
-        if not es_client.indices.exists(index=index):
+        if config.resilience:
+            index_exists, _ = search_guard.call(
+                ("exists", index),
+                lambda timeout: bool(es_client.options(request_timeout=timeout, max_retries=0).indices.exists(index=index)),
+                hedge=False,
+                fallback=(lambda: fallback_client.indices.exists(index=index)) if fallback_client else None,
+            )
+        else:
+            index_exists = es_client.indices.exists(index=index)
+        if not index_exists:
             logger.warning(f"⚠️ Index '{index}' does not exist")
-            return f"❌ 인덱스 '{index}'가 존재하지 않습니다."
+            return f"❌ 인덱스 '{index}'가 존재하지 않습니다.", []
 
         # 설정 파일에서 인덱스 설정 로드
         index_config = config.get_index_config(index)
         if not index_config:
             available_indices = config.get_available_indices()
             logger.error(f"❌ No configuration found for index '{index}'")
-            return f"❌ 인덱스 '{index}'에 대한 설정을 찾을 수 없습니다.\n사용 가능한 인덱스: {', '.join(available_indices)}"
+            return f"❌ 인덱스 '{index}'에 대한 설정을 찾을 수 없습니다.\n사용 가능한 인덱스: {', '.join(available_indices)}", []
 
         # 설정에서 필드 정보 가져오기
         search_fields = index_config.get("search_fields", [])
@@ -121,100 +439,175 @@ def elasticsearch_search(query: str, index: Optional[str] = None, max_results: i
 
         if not search_fields:
             logger.error(f"❌ No search fields configured for index '{index}'")
-            return f"❌ 인덱스 '{index}'에 검색 필드가 설정되어 있지 않습니다."
+            return f"❌ 인덱스 '{index}'에 검색 필드가 설정되어 있지 않습니다.", []
 
-        # 검색 쿼리 실행
+        # 검색 쿼리 실행 (한국어 분석 매핑이면 fuzziness 없는 쿼리 사용)
+        capabilities = get_index_capabilities(es_client, index)
         search_body = {
-            "query": {
-                "multi_match": {
-                    "query": query,
-                    "fields": search_fields,
-                    "type": "best_fields",
-                    "fuzziness": "AUTO"
-                }
-            },
+            "query": build_search_query(query, search_fields, capabilities),
             "size": max_results,
             "_source": source_fields
         }
 
+        # 하이라이트 조각 요청: 큰 본문 필드는 _source에서 제외하고 일치 부분만 전송받음
+        result_format = index_config.get("result_format", {})
+        highlight = build_highlight(result_format)
+        if highlight:
+            search_body["highlight"] = highlight
+            excluded = set(result_format["highlight"].get("exclude_source", []))
+            search_body["_source"] = [field for field in source_fields if field not in excluded]
+
+        # 점수 기준 절단: 절단 지점 뒤의 결과 수를 알 수 있도록 작은 범위를 더 가져옴
+        cutoff_config = index_config.get("score_cutoff") if config.score_cutoff else None
+        if cutoff_config:
+            search_body["size"] = max_results + cutoff_config.get("window", max_results)
+
+        # 중복 결과 묶음: 인덱스에 collapse 필드가 있으면 ES collapse, 없으면 더 가져와서 로컬 중복 제거
+        collapse_config = index_config.get("collapse")
+        es_collapsed = False
+        if collapse_config:
+            es_field = collapse_config.get("es_field")
+            if es_field and es_field in capabilities.get("composed_fields", {}):
+                es_collapsed = True
+                search_body["collapse"] = {
+                    "field": es_field,
+                    "inner_hits": {"name": COLLAPSE_INNER_HITS, "size": 0}
+                }
+            else:
+                search_body["size"] = max_results * collapse_config.get("overfetch", 4)
+                search_body["_source"] = list(dict.fromkeys(search_body["_source"] + collapse_config["key_fields"]))
+
+        # 폴백 엔진은 collapse를 지원하지 않으므로 ES collapse 대신 로컬 중복 제거용 요청을 보냄
+        fallback_body = search_body
+        if es_collapsed:
+            fallback_body = {key: value for key, value in search_body.items() if key != "collapse"}
+            fallback_body["size"] = max_results * collapse_config.get("overfetch", 4)
+            fallback_body["_source"] = list(dict.fromkeys(search_body["_source"] + collapse_config["key_fields"]))
+
+        # 제조사 라우팅: 한 제조사만 가리키는 질문은 그 제조사 문서가 있는 샤드만 검색 (아니면 전체 샤드)
+        # 라우팅은 검색할 샤드만 좁히므로 샤드가 없는 폴백 엔진에는 넘기지 않음 (전체 검색과 같은 결과)
+        search_options = {}
+        if config.routing and capabilities.get("routing_field"):
+            routing = detect_routing(capabilities["routing_field"], query)
+            if routing:
+                search_options["routing"] = routing
+                logger.info("🧭 Routing search to %s=%s", capabilities["routing_field"], routing, extra=VERBOSE)
+
+        flight_key = normalize_search_key(index, query, max_results)
+
+        def execute_search():
+            # 진단 모드: 샘플링된 검색은 같은 요청에서 ES profile 결과를 함께 받음
+            # (single-flight로 합쳐진 호출은 이 함수를 실행한 리더의 응답을 공유하므로
+            # 샘플링과 느린 검색 기록도 리더만 한 번 수행)
+            profile_sampled = config.query_profiling and search_profiler.should_sample()
+            if profile_sampled:
+                search_body["profile"] = True
+            search_start = time.time()
+            if not config.resilience:
+                result = es_client.search(index=index, body=search_body, **search_options), None
+            else:
+                # 요청별 타임아웃은 실행의 남은 예산에서 계산되며, 재시도는 hedging이 대신함
+                result = search_guard.call(
+                    flight_key,
+                    lambda timeout: es_client.options(request_timeout=timeout, max_retries=0).search(
+                        index=index, body=search_body, **search_options
+                    ),
+                    fallback=(lambda: fallback_client.search(index=index, body=fallback_body)) if fallback_client else None,
+                )
+            if config.query_profiling and not result[1]:
+                search_profiler.observe(
+                    es_client, index, query, search_body, search_options, result[0],
+                    (time.time() - search_start) * 1000, profile_sampled,
+                )
+            return result
+
         query_start = time.time()
-        response = es_client.search(index=index, body=search_body)
+        if config.single_flight:
+            # 동일한 (index, query, size) 요청이 진행 중이면 그 응답을 공유
+            response, degraded = search_flight.do(flight_key, execute_search)
+        else:
+            response, degraded = execute_search()
         query_duration = time.time() - query_start
 
         # 결과 포맷팅
         hits = response["hits"]["hits"]
+        if degraded == "fallback":
+            es_collapsed = False
+        groups = None
+        fetch_limit = len(hits) if cutoff_config else max_results
+        if collapse_config and hits:
+            groups = collapse_hits(hits, collapse_config["key_fields"], fetch_limit, es_collapsed)
+            hits = [hit for hit, _ in groups]
+
+        # 점수 기준 절단 (최대 max_results개, 기준을 넘는 나머지는 개수만 보고)
+        weak_search = False
+        beyond_limit = 0
+        if cutoff_config and hits:
+            keep, weak_search = apply_score_cutoff([hit["_score"] for hit in hits], cutoff_config)
+            beyond_limit = max(0, keep - max_results) if not weak_search else 0
+            dropped = len(hits) - keep
+            keep = min(keep, max_results)
+            hits = hits[:keep]
+            if groups:
+                groups = groups[:keep]
+            logger.info("✂️ Score cutoff - kept %d, dropped %d, beyond limit %d, weak: %s", keep, dropped, beyond_limit, weak_search, extra=VERBOSE)
         total_hits = response["hits"]["total"]["value"] if isinstance(response["hits"]["total"], dict) else response["hits"]["total"]
 
-        logger.info(f"📊 Search completed in {query_duration:.3f}s - Found {total_hits} total matches, returning {len(hits)} results")
+        logger.info("📊 Search completed in %.3fs - Found %d total matches, returning %d results", query_duration, total_hits, len(hits))
 
         if not hits:
-            logger.info(f"🔍 No results found for query: '{query}'")
-            return f"🔍 '{query}'에 대한 검색 결과가 없습니다."
+            logger.info("🔍 No results found for query: '%s'", query)
+            return f"🔍 '{query}'에 대한 검색 결과가 없습니다.", []
 
         # 검색 결과 점수 분석
         scores = [hit["_score"] for hit in hits]
-        avg_score = sum(scores) / len(scores)
-        logger.info(f"📈 Score stats - Min: {min(scores):.2f}, Max: {max(scores):.2f}, Avg: {avg_score:.2f}")
+        logger.info("📈 Score stats - Min: %.2f, Max: %.2f, Avg: %.2f", min(scores), max(scores), sum(scores) / len(scores), extra=VERBOSE)
 
         results = []
-        results.append(f"🔍 검색 결과 ({len(hits)}개):\n")
+        if degraded == "stale":
+            results.append("⚠️ Elasticsearch 장애로 캐시된 이전 검색 결과를 표시합니다.\n")
+        elif degraded == "fallback":
+            results.append("⚠️ Elasticsearch 장애로 내장 검색 엔진(읽기 전용)의 결과를 표시합니다.\n")
+        if weak_search:
+            results.append(
+                f"⚠️ 관련성이 낮은 검색 결과입니다 (최고 점수 {hits[0]['_score']:.2f} < 기준 {cutoff_config['min_score']:.2f}). "
+                "질문과 맞지 않을 수 있으니 답변 시 이를 알리거나 다른 검색어를 사용하세요.\n"
+            )
+        collapsed_count = sum(count for _, count in groups) - len(groups) if groups else 0
+        summary_parts = [f"{len(hits)}개"]
+        if collapsed_count:
+            summary_parts.append(f"유사 결과 {collapsed_count}건 묶음")
+        if beyond_limit:
+            summary_parts.append(f"기준을 넘는 결과 {beyond_limit}건 더 있음")
+        results.append(f"🔍 검색 결과 ({', '.join(summary_parts)}):\n")
 
         # 결과 포맷 설정 가져오기
-        result_format = index_config.get("result_format", {})
         format_type = result_format.get("type", "document")
 
         # 원본 데이터 수집 (테이블 표시용)
         raw_results = []
 
         for i, hit in enumerate(hits, 1):
-            source = hit["_source"]
-            score = hit["_score"]
-
             # 원본 데이터 저장
-            raw_results.append({
+            raw_result = {
                 "rank": i,
-                "score": round(score, 2),
+                "score": round(hit["_score"], 2),
                 "index": hit["_index"],
                 "id": hit.get("_id", ""),
-                "source": source,
+                "source": hit["_source"],
                 "format_type": format_type
-            })
-
-            # 설정 기반 결과 포맷팅
-            if format_type == "vehicle":
-                # 차량 이슈 포맷
-                title_fields = result_format.get("title_fields", [])
-                title_parts = [source.get(field, 'N/A') for field in title_fields]
-                title = " - ".join(title_parts)
-
-                content_fields = result_format.get("content_fields", {})
-                content_parts = []
-                for label, field in content_fields.items():
-                    value = source.get(field, 'N/A')
-                    content_parts.append(f"{label}: {value}")
-                content = "\n   ".join(content_parts)
-                url = ""
-            else:
-                # 문서 포맷
-                title_field = result_format.get("title_field", "title")
-                content_field = result_format.get("content_field", "content")
-                url_field = result_format.get("url_field", "url")
-
-                title = source.get(title_field, "제목 없음")
-                content = source.get(content_field, "")
-                url = source.get(url_field, "")
-
-            # 내용 요약 (처음 300자)
-            content_preview = content[:300] + "..." if len(content) > 300 else content
-
-            result_text = f"\n[{i}] {title} (점수: {score:.2f})\n"
-            result_text += f"   내용:\n   {content_preview}\n"
-            if url:
-                result_text += f"   URL: {url}\n"
-
-            results.append(result_text)
-
-        # JSON 블록 추가 (프론트엔드 테이블 표시용)
+            }
+            if groups:
+                raw_result["group_count"] = groups[i - 1][1]
+            if hit.get("highlight"):
+                raw_result["highlight"] = hit["highlight"]
+            raw_results.append(raw_result)
+
+        # 결과 텍스트는 이번 도구 호출의 토큰 예산 안에서 렌더링 (헤더 포함)
+        budget = current_budget(config.result_token_budget) - count_tokens("".join(results))
+        results.append(render_hits(raw_results, result_format, budget))
+
+        # 구조화된 결과는 custom 스트림 이벤트로 전송 (프론트엔드 테이블 표시용)
         search_metadata = {
             "total_hits": total_hits,
             "returned_hits": len(hits),
@@ -222,16 +615,22 @@ def elasticsearch_search(query: str, index: Optional[str] = None, max_results: i
             "query": query,
             "results": raw_results
         }
+        if weak_search:
+            search_metadata["weak_search"] = True
 
+        publish_search_results(search_metadata)
         formatted_text = "".join(results)
-        formatted_text += "\n\n```json:search_results\n"
-        formatted_text += json.dumps(search_metadata, ensure_ascii=False, indent=2)
-        formatted_text += "\n```\n"
 
         total_duration = time.time() - start_time
-        logger.info(f"✅ Search completed successfully in {total_duration:.3f}s")
+        if degraded:
+            logger.warning("♻️ Served %s results - Resilience stats: %s", degraded, search_guard.get_stats())
+        if config.single_flight:
+            flight_stats = search_flight.get_stats()
+            logger.info("✅ Search completed successfully in %.3fs - Single-flight executed: %d, coalesced: %d", total_duration, flight_stats["executed"], flight_stats["coalesced"], extra=VERBOSE)
+        else:
+            logger.info("✅ Search completed successfully in %.3fs", total_duration, extra=VERBOSE)
 
-        return formatted_text
+        return formatted_text, raw_results
 
     except Exception as e:
         error_msg = str(e)
@@ -239,16 +638,22 @@ def elasticsearch_search(query: str, index: Optional[str] = None, max_results: i
         logger.error(f"❌ Search failed after {total_duration:.3f}s - Error: {error_msg}")
 
         # Provide more specific error messages
-        if "ConnectionError" in error_msg or "Connection refused" in error_msg:
-            return f"❌ Elasticsearch 연결 실패: 서버가 실행 중인지 확인해주세요"
+        if isinstance(e, RunCancelledError):
+            return f"⏹️ 실행이 취소되어 검색을 중단했습니다", []
+        elif isinstance(e, CircuitOpenError):
+            return f"❌ Elasticsearch 연결 실패: 서버 장애가 감지되어 요청을 일시 차단했습니다. 잠시 후 다시 시도해주세요", []
+        elif isinstance(e, ConnectionTimeout) or isinstance(e, TimeoutError):
+            return f"❌ Elasticsearch 응답 시간 초과: 서버가 응답하지 않습니다", []
+        elif isinstance(e, ESConnectionError) or "ConnectionError" in error_msg or "Connection refused" in error_msg:
+            return f"❌ Elasticsearch 연결 실패: 서버가 실행 중인지 확인해주세요", []
         elif "ConnectionTimeout" in error_msg or "timeout" in error_msg.lower():
-            return f"❌ Elasticsearch 응답 시간 초과: 서버가 응답하지 않습니다"
+            return f"❌ Elasticsearch 응답 시간 초과: 서버가 응답하지 않습니다", []
         elif "AuthenticationException" in error_msg or "401" in error_msg:
-            return f"❌ Elasticsearch 인증 실패: 사용자명 또는 비밀번호를 확인해주세요"
+            return f"❌ Elasticsearch 인증 실패: 사용자명 또는 비밀번호를 확인해주세요", []
         elif "index_not_found" in error_msg.lower():
-            return f"❌ 인덱스 '{index}'를 찾을 수 없습니다. 사용 가능한 인덱스를 확인해주세요"
+            return f"❌ 인덱스 '{index}'를 찾을 수 없습니다. 사용 가능한 인덱스를 확인해주세요", []
         else:
-            return f"❌ Elasticsearch 검색 중 오류 발생: {error_msg}"
+            return f"❌ Elasticsearch 검색 중 오류 발생: {error_msg}", []
 
 
 @tool("list_elasticsearch_indices")
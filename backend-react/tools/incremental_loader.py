@@ -0,0 +1,233 @@
+"""
+Incremental index loader with content hashing
+
+인덱스를 지우고 다시 만드는 대신 바뀐 문서만 반영합니다.
+
+- 문서 ID: 매핑 명세의 id_fields 값으로 만든 안정적인 ID (vehicle_issues: 순번, documents: url)
+- 내용 해시: 색인할 _source(composed 필드 포함)의 정규화 JSON 해시 (hash_exclude 필드 제외)
+- 매니페스트: {문서 ID: [해시, 라우팅 값]}을 로컬 JSON 파일에 저장해 다음 실행과 비교
+- 새/변경 문서는 bulk index(같은 ID 덮어쓰기), 원본에서 사라진 문서는 bulk delete
+
+매니페스트가 없거나 다른 인덱스(재생성되어 UUID가 다름)의 것이면 모든 문서를 반영하고,
+인덱스의 문서 ID를 한 번 훑어 원본에 없는 문서를 지웁니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tools.index_mappings import build_index_body, compose_fields, detect_korean_analyzer, load_mapping_spec
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+INGEST_MANIFEST_DIR = os.getenv("INGEST_MANIFEST_DIR", ".ingest_manifests")
+
+
+def document_id(record: Dict[str, Any], id_fields: List[str]) -> str:
+    """id_fields 값으로 안정적인 문서 ID를 만듭니다."""
+    return ":".join(str(record[field]) for field in id_fields)
+
+
+def content_hash(source: Dict[str, Any], exclude: Iterable[str] = ()) -> str:
+    """색인할 문서 내용의 해시 (키 순서와 무관, exclude 필드 제외)"""
+    excluded = set(exclude)
+    payload = json.dumps(
+        {key: value for key, value in source.items() if key not in excluded},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def prepare_documents(
+    spec_name: str, records: Iterable[Dict[str, Any]], mode: str, spec: Optional[dict] = None, routing_field: Optional[str] = None,
+) -> Dict[str, Tuple[Dict[str, Any], str, Optional[str]]]:
+    """
+    원본 레코드를 색인할 문서로 만듭니다.
+
+    Returns:
+        {문서 ID: (_source, 내용 해시, 라우팅 값)}
+    """
+    spec = spec or load_mapping_spec()
+    index_spec = spec["indices"][spec_name]
+    id_fields = index_spec["id_fields"]
+    exclude = index_spec.get("hash_exclude", [])
+    documents = {}
+    for record in records:
+        source = compose_fields(spec_name, record, spec) if mode != "standard" else record
+        routing = str(record[routing_field]) if routing_field else None
+        documents[document_id(record, id_fields)] = (source, content_hash(source, exclude), routing)
+    return documents
+
+
+def plan_sync(documents: Dict[str, tuple], manifest_docs: Dict[str, list]) -> Dict[str, list]:
+    """
+    매니페스트와 비교해 반영할 작업을 정합니다.
+
+    Returns:
+        {"create": [ID], "update": [ID], "delete": [ID], "unchanged": [ID]}
+    """
+    plan: Dict[str, list] = {"create": [], "update": [], "delete": [], "unchanged": []}
+    for doc_id, (_, digest, _) in documents.items():
+        previous = manifest_docs.get(doc_id)
+        if previous is None:
+            plan["create"].append(doc_id)
+        elif previous[0] != digest:
+            plan["update"].append(doc_id)
+        else:
+            plan["unchanged"].append(doc_id)
+    plan["delete"] = [doc_id for doc_id in manifest_docs if doc_id not in documents]
+    return plan
+
+
+def manifest_path_for(index_name: str) -> str:
+    return os.path.join(INGEST_MANIFEST_DIR, f"{index_name}.json")
+
+
+def load_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """매니페스트를 읽습니다 (없거나 형식이 다르면 None)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        logger.warning(f"⚠️ Invalid ingest manifest {path}, doing a full sync: {e}")
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def save_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    """매니페스트를 원자적으로 저장합니다 (임시 파일에 쓴 뒤 교체)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _ensure_index(es, spec_name: str, index_name: str, spec: dict, shards: Optional[int]) -> Tuple[str, dict]:
+    """인덱스가 없으면 명세로 만들고 (분석기 모드, 매핑)을 반환합니다."""
+    if es.indices.exists(index=index_name):
+        mapping = es.indices.get_mapping(index=index_name)[index_name]
+        mode = mapping["mappings"].get("_meta", {}).get("korean_analyzer") or "standard"
+        return mode, mapping
+    mode = detect_korean_analyzer(es)
+    mapping = build_index_body(spec_name, mode, spec, shards=shards)
+    es.indices.create(index=index_name, body=mapping)
+    logger.info("✅ Created index '%s' (%s)", index_name, mode)
+    return mode, mapping
+
+
+def _index_uuid(es, index_name: str) -> str:
+    settings = es.indices.get_settings(index=index_name)
+    return next(iter(settings.values()))["settings"]["index"]["uuid"]
+
+
+def _existing_ids(es, index_name: str) -> Dict[str, list]:
+    """매니페스트가 없을 때 인덱스의 문서 ID와 라우팅 값을 훑습니다 (해시는 알 수 없으므로 None)."""
+    from elasticsearch.helpers import scan
+
+    return {
+        hit["_id"]: [None, hit.get("_routing")]
+        for hit in scan(es, index=index_name, query={"query": {"match_all": {}}}, _source=False, size=5000)
+    }
+
+
+def sync_index(
+    es,
+    spec_name: str,
+    records: Iterable[Dict[str, Any]],
+    index_name: Optional[str] = None,
+    manifest_path: Optional[str] = None,
+    shards: Optional[int] = None,
+    chunk_size: int = 1000,
+) -> Dict[str, Any]:
+    """
+    원본 레코드를 인덱스에 증분 반영합니다.
+
+    Args:
+        es: Elasticsearch 클라이언트
+        spec_name: 매핑 명세의 인덱스 이름 (vehicle_issues, documents)
+        records: 원본 레코드 전체 (원본에 없는 문서는 삭제됨)
+        index_name: 실제 인덱스 이름 (미지정 시 spec_name)
+        manifest_path: 매니페스트 파일 경로 (미지정 시 INGEST_MANIFEST_DIR/<인덱스>.json)
+        shards: 인덱스를 새로 만들 때의 프라이머리 샤드 수
+
+    Returns:
+        {"created", "updated", "deleted", "unchanged", "failed", "full_scan", "duration_s"}
+    """
+    from elasticsearch.helpers import streaming_bulk
+
+    start = time.time()
+    index_name = index_name or spec_name
+    manifest_path = manifest_path or manifest_path_for(index_name)
+    spec = load_mapping_spec()
+
+    mode, mapping = _ensure_index(es, spec_name, index_name, spec, shards)
+    routing_field = mapping["mappings"].get("_meta", {}).get("routing_field")
+    documents = prepare_documents(spec_name, records, mode, spec, routing_field)
+
+    index_uuid = _index_uuid(es, index_name)
+    manifest = load_manifest(manifest_path)
+    full_scan = manifest is None or manifest.get("index_uuid") != index_uuid
+    manifest_docs = _existing_ids(es, index_name) if full_scan else manifest["docs"]
+    plan = plan_sync(documents, manifest_docs)
+
+    def actions():
+        for doc_id in plan["create"] + plan["update"]:
+            source, _, routing = documents[doc_id]
+            action = {"_op_type": "index", "_index": index_name, "_id": doc_id, "_source": source}
+            if routing is not None:
+                action["_routing"] = routing
+            yield action
+        for doc_id in plan["delete"]:
+            action = {"_op_type": "delete", "_index": index_name, "_id": doc_id}
+            if manifest_docs[doc_id][1] is not None:
+                action["_routing"] = manifest_docs[doc_id][1]
+            yield action
+
+    # 성공한 작업만 매니페스트에 반영 (실패한 문서는 다음 실행에서 다시 시도)
+    next_docs = {doc_id: manifest_docs[doc_id] for doc_id in plan["unchanged"] if manifest_docs[doc_id][0] is not None}
+    failed = 0
+    for ok, item in streaming_bulk(es, actions(), chunk_size=chunk_size, raise_on_error=False, raise_on_exception=False):
+        op_type, result = next(iter(item.items()))
+        doc_id = result["_id"]
+        if op_type == "delete":
+            # 이미 없는 문서는 삭제된 것으로 봄
+            if not ok and result.get("status") != 404:
+                failed += 1
+                next_docs[doc_id] = manifest_docs[doc_id]
+        elif ok:
+            _, digest, routing = documents[doc_id]
+            next_docs[doc_id] = [digest, routing]
+        else:
+            failed += 1
+            logger.warning(f"⚠️ Failed to index {doc_id}: {result.get('error')}")
+
+    if plan["create"] or plan["update"] or plan["delete"]:
+        es.indices.refresh(index=index_name)
+    save_manifest(manifest_path, {
+        "version": MANIFEST_VERSION,
+        "index": index_name,
+        "index_uuid": index_uuid,
+        "analyzer_mode": mode,
+        "routing_field": routing_field,
+        "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "docs": next_docs,
+    })
+
+    stats = {
+        "created": len(plan["create"]),
+        "updated": len(plan["update"]),
+        "deleted": len(plan["delete"]),
+        "unchanged": len(plan["unchanged"]),
+        "failed": failed,
+        "full_scan": full_scan,
+        "duration_s": round(time.time() - start, 2),
+    }
+    logger.info("📦 Incremental sync '%s': %s", index_name, stats)
+    return stats
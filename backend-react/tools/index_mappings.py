@@ -0,0 +1,230 @@
+"""
+Declarative index mappings and Korean-aware query shapes
+
+config/index_mappings.json의 선언적 명세로 인덱스 생성 본문(settings + mappings)을
+만들고, 검색 도구가 인덱스의 _meta를 보고 쿼리 형태를 고를 수 있게 합니다.
+
+분석기 모드:
+- nori: 본문 필드를 nori 형태소 분석기로 색인 (analysis-nori 플러그인 필요)
+- ngram: 본문 필드는 standard 분석기, 부분 일치는 .ngram 하위 필드가 담당
+- standard: 기존 매핑 (하위 필드 없음, fuzziness AUTO 쿼리 사용)
+
+명세에 routing_field가 있으면 (nori/ngram 모드) 문서를 그 필드 값으로 라우팅해 색인하도록
+_routing을 필수로 두고, _meta에 기록해 검색 도구가 같은 값으로 샤드를 좁힐 수 있게 합니다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAPPING_SPEC_VERSION = "korean-v1"
+ANALYZER_MODES = ("nori", "ngram", "standard")
+
+# 인덱스 기능 정보 캐시 (인덱스명 → (조회 시각, 기능 정보))
+CAPABILITIES_TTL_S = 300
+CAPABILITIES_FAILURE_TTL_S = 30
+_capabilities_cache: Dict[str, tuple] = {}
+_capabilities_lock = threading.Lock()
+
+
+def load_mapping_spec(path: Optional[str] = None) -> dict:
+    """매핑 명세 파일을 읽습니다."""
+    path = path or os.getenv("ES_MAPPING_SPEC_FILE", "config/index_mappings.json")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def detect_korean_analyzer(es_client) -> str:
+    """
+    사용할 한국어 분석기 모드를 결정합니다.
+
+    ES_KOREAN_ANALYZER가 auto(기본값)이면 nori 토크나이저 사용 가능 여부를 확인해
+    nori 또는 ngram을 선택합니다.
+    """
+    mode = os.getenv("ES_KOREAN_ANALYZER", "auto").lower()
+    if mode in ANALYZER_MODES:
+        return mode
+    try:
+        es_client.indices.analyze(body={"tokenizer": "nori_tokenizer", "text": "브레이크 패드 마모"})
+        return "nori"
+    except Exception as e:
+        logger.info("ℹ️ nori tokenizer unavailable, using ngram analyzer: %s", e)
+        return "ngram"
+
+
+def build_index_body(spec_name: str, mode: str, spec: Optional[dict] = None, shards: Optional[int] = None) -> Dict[str, Any]:
+    """
+    인덱스 생성 본문을 만듭니다.
+
+    Args:
+        spec_name: 명세의 인덱스 이름 (vehicle_issues, documents)
+        mode: 분석기 모드 (nori / ngram / standard)
+        spec: 매핑 명세 (미지정 시 파일에서 로드)
+        shards: 프라이머리 샤드 수 (미지정 시 ES 기본값)
+
+    Returns:
+        es.indices.create(body=...)에 전달할 본문
+    """
+    if mode not in ANALYZER_MODES:
+        raise ValueError(f"Unknown analyzer mode: {mode}")
+    spec = spec or load_mapping_spec()
+    index_spec = spec["indices"][spec_name]
+    fields = index_spec["fields"]
+
+    properties = {}
+    ngram_fields = []
+    composed_fields = {}
+    for name, field_spec in fields.items():
+        if field_spec["type"] == "composed_keyword":
+            # 여러 필드를 이어 붙인 중복 제거용 키 (collapse 대상, 기존 매핑에는 없음)
+            if mode != "standard":
+                properties[name] = {"type": "keyword"}
+                composed_fields[name] = field_spec["compose"]
+            continue
+
+        if field_spec["type"] != "korean_text":
+            properties[name] = {"type": field_spec["type"]}
+            continue
+
+        if mode == "standard":
+            # 기존 매핑과 동일
+            properties[name] = {"type": "text", "analyzer": "standard"}
+            continue
+
+        properties[name] = {
+            "type": "text",
+            "analyzer": "korean_nori" if mode == "nori" else "standard",
+            "index_options": field_spec.get("index_options", "positions"),
+            "fields": {
+                "keyword": {"type": "keyword", "ignore_above": 256},
+                "ngram": {"type": "text", "analyzer": "korean_ngram", "index_options": "freqs"},
+            },
+        }
+        ngram_fields.append(name)
+
+    body: Dict[str, Any] = {"mappings": {"properties": properties}}
+    if shards:
+        body["settings"] = {"index": {"number_of_shards": shards}}
+    if mode == "standard":
+        return body
+
+    analysis = spec["analysis"]
+    used_tokenizers = ["korean_ngram_tokenizer"] + (["korean_nori_tokenizer"] if mode == "nori" else [])
+    used_analyzers = ["korean_ngram"] + (["korean_nori"] if mode == "nori" else [])
+    body["settings"] = {
+        "index": {**analysis.get("index", {}), **({"number_of_shards": shards} if shards else {})},
+        "analysis": {
+            "tokenizer": {name: analysis["tokenizer"][name] for name in used_tokenizers},
+            "analyzer": {name: analysis["analyzer"][name] for name in used_analyzers},
+        },
+    }
+    body["mappings"]["_meta"] = {
+        "mapping_spec": MAPPING_SPEC_VERSION,
+        "korean_analyzer": mode,
+        "ngram_fields": ngram_fields,
+        "ngram_boost_factor": spec.get("ngram_boost_factor", 0.5),
+        "composed_fields": composed_fields,
+    }
+    routing_field = index_spec.get("routing_field")
+    if routing_field:
+        # 라우팅 값 없이 색인한 문서가 섞이면 라우팅 검색에서 빠지므로 필수로 지정
+        body["mappings"]["_routing"] = {"required": True}
+        body["mappings"]["_meta"]["routing_field"] = routing_field
+    return body
+
+
+def compose_fields(spec_name: str, record: Dict[str, Any], spec: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    명세의 composed_keyword 필드 값을 계산해 문서에 추가합니다.
+
+    Returns:
+        composed 필드가 추가된 문서 (원본은 변경하지 않음)
+    """
+    spec = spec or load_mapping_spec()
+    composed = {
+        name: " | ".join(str(record.get(field, "")) for field in field_spec["compose"])
+        for name, field_spec in spec["indices"][spec_name]["fields"].items()
+        if field_spec["type"] == "composed_keyword"
+    }
+    return {**record, **composed} if composed else record
+
+
+def get_index_capabilities(es_client, index: str) -> Dict[str, Any]:
+    """
+    인덱스 매핑의 _meta에서 한국어 분석 지원 여부를 조회합니다 (캐시됨).
+
+    Returns:
+        {"korean_analyzer": 모드 또는 None, "ngram_fields": [...], "ngram_boost_factor": float,
+         "composed_fields": {필드명: [구성 필드]}, "routing_field": 라우팅 필드 또는 None}
+    """
+    now = time.time()
+    with _capabilities_lock:
+        cached = _capabilities_cache.get(index)
+    if cached and now < cached[0]:
+        return cached[1]
+
+    capabilities = {
+        "korean_analyzer": None, "ngram_fields": [], "ngram_boost_factor": 0.5, "composed_fields": {}, "routing_field": None,
+    }
+    ttl = CAPABILITIES_TTL_S
+    try:
+        mapping = es_client.options(request_timeout=2, max_retries=0).indices.get_mapping(index=index)
+        for index_mapping in mapping.values():
+            meta = index_mapping.get("mappings", {}).get("_meta", {})
+            if meta.get("mapping_spec") == MAPPING_SPEC_VERSION:
+                capabilities = {
+                    "korean_analyzer": meta.get("korean_analyzer"),
+                    "ngram_fields": meta.get("ngram_fields", []),
+                    "ngram_boost_factor": meta.get("ngram_boost_factor", 0.5),
+                    "composed_fields": meta.get("composed_fields", {}),
+                    "routing_field": meta.get("routing_field"),
+                }
+            break
+    except Exception as e:
+        # 조회 실패 시 기존 쿼리 형태를 사용하고 잠시 후 다시 확인
+        logger.debug("Index capabilities lookup failed for '%s': %s", index, e)
+        ttl = CAPABILITIES_FAILURE_TTL_S
+
+    with _capabilities_lock:
+        _capabilities_cache[index] = (now + ttl, capabilities)
+    return capabilities
+
+
+def build_search_query(query: str, search_fields: List[str], capabilities: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    인덱스 기능에 맞는 multi_match 쿼리를 만듭니다.
+
+    한국어 분석 매핑이면 fuzziness 없이 본문 필드와 .ngram 하위 필드를 함께 검색하고,
+    기존 매핑이면 fuzziness AUTO를 사용합니다.
+    """
+    if os.getenv("ES_QUERY_SHAPE", "auto").lower() == "fuzzy" or not capabilities.get("korean_analyzer"):
+        return {
+            "multi_match": {
+                "query": query,
+                "fields": search_fields,
+                "type": "best_fields",
+                "fuzziness": "AUTO"
+            }
+        }
+
+    ngram_fields = set(capabilities.get("ngram_fields", []))
+    factor = capabilities.get("ngram_boost_factor", 0.5)
+    fields = list(search_fields)
+    for field_spec in search_fields:
+        name, _, boost = field_spec.partition("^")
+        if name in ngram_fields:
+            weight = (float(boost) if boost else 1.0) * factor
+            fields.append(f"{name}.ngram^{weight:g}")
+
+    return {
+        "multi_match": {
+            "query": query,
+            "fields": fields,
+            "type": "best_fields",
+            "tie_breaker": 0.3
+        }
+    }
@@ -0,0 +1,181 @@
+"""
+Shared logging setup for the agent and tools
+
+- 큐 기반 핸들러: 호출 스레드는 로그 레코드를 큐에 넣기만 하고, 포맷팅과 출력은
+  백그라운드 스레드(QueueListener)가 처리합니다.
+- 구조화된 JSON 출력: 각 줄에 LangGraph 실행의 run_id / thread_id / 노드 이름을 붙입니다.
+- 지연 포맷팅: logger.info("... %s", value) 형식의 인자는 출력 스레드에서 포맷됩니다.
+- 샘플링: extra=VERBOSE로 표시한 상세 로그는 LOG_VERBOSE_SAMPLE_RATE 비율만 남깁니다.
+
+LangGraph 서버의 로깅 설정을 건드리지 않도록 이 프로젝트의 로거(agent, tools)에만
+핸들러를 연결합니다.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO
+
+# 핸들러를 연결할 로거 (모듈 로거는 __name__ 기준이므로 하위 모듈 모두 포함)
+LOGGER_NAMESPACES = ("agent", "tools")
+
+# 상세 로그 표시 (샘플링 대상)
+VERBOSE = {"verbose": True}
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LangGraph 실행 설정에서 로그에 붙일 필드
+CONTEXT_FIELDS = ("run_id", "thread_id", "node")
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_setup_lock = threading.Lock()
+
+
+def current_run_context() -> Dict[str, Any]:
+    """현재 LangGraph 실행의 run_id / thread_id / 노드 이름을 반환합니다 (실행 밖이면 빈 dict)."""
+    try:
+        from langgraph.config import get_config
+
+        config = get_config()
+    except Exception:
+        return {}
+    # LangGraph 서버는 run_id를 실행 메타데이터로 전달
+    metadata = config.get("metadata") or {}
+    configurable = config.get("configurable") or {}
+    context = {
+        "run_id": metadata.get("run_id") or config.get("run_id"),
+        "thread_id": configurable.get("thread_id") or metadata.get("thread_id"),
+        "node": metadata.get("langgraph_node"),
+    }
+    return {key: str(value) for key, value in context.items() if value is not None}
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    실행 컨텍스트만 붙여 레코드를 큐에 넣는 핸들러
+
+    기본 QueueHandler.prepare()는 호출 스레드에서 메시지를 포맷하지만, 여기서는
+    msg/args를 그대로 넘겨 출력 스레드에서 포맷합니다 (같은 프로세스 안의 큐이므로
+    레코드를 직렬화할 필요가 없음).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        for key, value in current_run_context().items():
+            setattr(record, key, value)
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """extra=VERBOSE 레코드는 rate 비율만 통과시킵니다 (경고 이상은 항상 통과)."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+        self.every = round(1 / self.rate) if self.rate > 0 else 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "verbose", False) or record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        with self._lock:
+            self._count += 1
+            keep = self.every > 0 and (self._count - 1) % self.every == 0
+            if not keep:
+                self.dropped += 1
+        return keep
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄 JSON으로 출력합니다."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(stream: Optional[TextIO] = None, force: bool = False) -> None:
+    """
+    공유 로깅 파이프라인을 설정합니다 (여러 번 호출해도 한 번만 설정).
+
+    환경 변수:
+        LOG_LEVEL: 로그 레벨 (기본 INFO)
+        LOG_FORMAT: json / text (기본 json)
+        LOG_VERBOSE_SAMPLE_RATE: 상세 로그를 남길 비율 (기본 0.1)
+
+    Args:
+        stream: 출력 스트림 (기본 stderr, 벤치마크에서 파일 지정)
+        force: 기존 설정을 내리고 다시 설정
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            if not force:
+                return
+            _shutdown()
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        if os.getenv("LOG_FORMAT", "json").lower() == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = ContextQueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter(float(os.getenv("LOG_VERBOSE_SAMPLE_RATE", "0.1"))))
+
+        level = os.getenv("LOG_LEVEL", "INFO").upper()
+        for name in LOGGER_NAMESPACES:
+            namespace_logger = logging.getLogger(name)
+            namespace_logger.setLevel(level)
+            namespace_logger.addHandler(_queue_handler)
+            namespace_logger.propagate = False
+
+        _listener = QueueListener(log_queue, output)
+        _listener.start()
+
+
+def _shutdown() -> None:
+    global _listener, _queue_handler
+    if _listener is not None:
+        # 큐에 남은 레코드를 모두 출력한 뒤 종료
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        for name in LOGGER_NAMESPACES:
+            logging.getLogger(name).removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def shutdown_logging() -> None:
+    """백그라운드 출력 스레드를 멈추고 남은 로그를 모두 출력합니다."""
+    with _setup_lock:
+        _shutdown()
+
+
+def sampling_stats() -> Dict[str, int]:
+    """샘플링으로 버린 상세 로그 수를 반환합니다."""
+    if _queue_handler is None:
+        return {"dropped": 0}
+    return {"dropped": sum(getattr(f, "dropped", 0) for f in _queue_handler.filters)}
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,226 @@
+"""
+Elasticsearch query profiling and slow-query capture
+
+검색 도구는 클라이언트에서 잰 시간만 기록해서, 어떤 쿼리 형태가 왜 느렸는지 알 수 없습니다.
+진단 모드를 켜면 일부 검색의 ES profile 결과를 검색 본문과 함께 로컬 JSONL 로그에 남깁니다.
+
+- 샘플링: ES_PROFILE_SAMPLE_RATE 비율의 검색은 요청에 profile: true를 붙여 실행 (추가 요청 없음)
+- 느린 검색: 클라이언트 시간 또는 서버 took이 ES_SLOW_QUERY_MS 이상이면 같은 본문/라우팅으로
+  백그라운드에서 profile: true 재실행 (사용자 응답은 기다리지 않음, 캐시가 데워진 상태의 측정)
+- 요약: 재작성(rewrite) 시간, 쿼리 단계별 시간(create_weight, build_scorer, next_doc, score 등),
+  필드별 term 쿼리 시간과 개수(fuzzy 확장 비용), 쿼리 타입 분포
+
+로그는 search_fields의 boost와 fuzziness 조정에 사용합니다 (python slow_query_report.py).
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from tools.logging_config import current_run_context
+
+logger = logging.getLogger(__name__)
+
+# 쿼리 설명("제목:엔진~1" 등)에서 필드 이름 추출
+FIELD_PATTERN = re.compile(r"^[+\-(]*([^\s:()+\-^~][^\s:()^~]*):")
+
+# 필드별 비용을 셀 말단 쿼리 타입
+TERM_QUERY_TYPES = {"TermQuery", "FuzzyQuery", "PrefixQuery", "WildcardQuery", "SynonymQuery", "PhraseQuery", "TermInSetQuery"}
+
+
+class QueryProfileConfig:
+    """Query profiling settings loaded from environment variables"""
+
+    def __init__(self):
+        self.sample_rate = max(0.0, min(1.0, float(os.getenv("ES_PROFILE_SAMPLE_RATE", "0"))))
+        self.slow_query_ms = float(os.getenv("ES_SLOW_QUERY_MS", "0"))
+        self.log_path = os.getenv("ES_SLOW_QUERY_LOG", "logs/es_slow_queries.jsonl")
+        self.max_pending_reruns = int(os.getenv("ES_PROFILE_MAX_PENDING", "4"))
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_query_ms > 0
+
+
+def _walk(node: Dict[str, Any], summary: Dict[str, Any]) -> None:
+    """프로파일 쿼리 트리를 돌며 쿼리 타입 수와 필드별 말단 쿼리 시간을 모읍니다."""
+    query_type = node.get("type", "")
+    summary["query_types"][query_type] = summary["query_types"].get(query_type, 0) + 1
+    children = node.get("children") or []
+    if not children and query_type in TERM_QUERY_TYPES:
+        match = FIELD_PATTERN.match(node.get("description", ""))
+        field = match.group(1) if match else "?"
+        stats = summary["fields"].setdefault(field, {"ms": 0.0, "terms": 0})
+        stats["ms"] += node.get("time_in_nanos", 0) / 1e6
+        stats["terms"] += 1
+    for child in children:
+        _walk(child, summary)
+
+
+def summarize_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ES profile 응답을 샤드 전체 합계로 요약합니다.
+
+    Returns:
+        {"shards", "rewrite_ms", "query_ms", "collector_ms", "breakdown_ms": {단계: ms},
+         "fields": {필드: {"ms", "terms"}}, "query_types": {타입: 개수}}
+    """
+    summary = {
+        "shards": 0, "rewrite_ms": 0.0, "query_ms": 0.0, "collector_ms": 0.0,
+        "breakdown_ms": {}, "fields": {}, "query_types": {},
+    }
+    for shard in profile.get("shards", []):
+        summary["shards"] += 1
+        for search in shard.get("searches", []):
+            summary["rewrite_ms"] += search.get("rewrite_time", 0) / 1e6
+            summary["collector_ms"] += sum(c.get("time_in_nanos", 0) for c in search.get("collector", [])) / 1e6
+            for root in search.get("query", []):
+                summary["query_ms"] += root.get("time_in_nanos", 0) / 1e6
+                # 루트 쿼리의 단계별 시간은 하위 쿼리를 포함
+                for phase, nanos in root.get("breakdown", {}).items():
+                    if not phase.endswith("_count"):
+                        summary["breakdown_ms"][phase] = summary["breakdown_ms"].get(phase, 0.0) + nanos / 1e6
+                _walk(root, summary)
+
+    def rounded(value):
+        if isinstance(value, float):
+            return round(value, 3)
+        if isinstance(value, dict):
+            return {key: rounded(item) for key, item in value.items()}
+        return value
+
+    summary = rounded(summary)
+    summary["breakdown_ms"] = dict(sorted(summary["breakdown_ms"].items(), key=lambda item: -item[1]))
+    summary["fields"] = dict(sorted(summary["fields"].items(), key=lambda item: -item[1]["ms"]))
+    return summary
+
+
+class QueryProfiler:
+    """샘플링된 검색과 느린 검색의 ES profile 결과를 느린 쿼리 로그에 기록합니다."""
+
+    def __init__(self, config: Optional[QueryProfileConfig] = None):
+        self.config = config or QueryProfileConfig()
+        self.every = round(1 / self.config.sample_rate) if self.config.sample_rate > 0 else 0
+        self._count = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="es-profile")
+        self.stats = {"sampled": 0, "slow": 0, "reruns": 0, "written": 0, "dropped": 0, "errors": 0}
+
+    def should_sample(self) -> bool:
+        """이번 검색에 profile: true를 붙일지 (ES_PROFILE_SAMPLE_RATE 비율)"""
+        if not self.every:
+            return False
+        with self._lock:
+            self._count += 1
+            sampled = (self._count - 1) % self.every == 0
+            if sampled:
+                self.stats["sampled"] += 1
+        return sampled
+
+    def observe(
+        self,
+        es_client,
+        index: str,
+        query: str,
+        search_body: Dict[str, Any],
+        search_options: Dict[str, Any],
+        response: Dict[str, Any],
+        client_ms: float,
+        sampled: bool = False,
+    ) -> None:
+        """
+        검색 응답을 확인해 프로파일이 있으면 기록하고, 느린 검색이면 프로파일 재실행을 예약합니다.
+
+        Args:
+            search_body: 실행한 검색 본문 (샘플링된 검색은 profile: true 포함)
+            search_options: routing 등 search 호출 옵션
+            client_ms: 클라이언트에서 잰 검색 시간
+            sampled: should_sample()로 profile: true를 붙인 검색인지
+        """
+        took_ms = response.get("took")
+        slow = self.config.slow_query_ms > 0 and max(client_ms, took_ms or 0) >= self.config.slow_query_ms
+        if not (sampled or slow):
+            return
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "reason": "slow" if slow else "sampled",
+            "index": index,
+            "query": query,
+            "routing": search_options.get("routing"),
+            "client_ms": round(client_ms, 1),
+            "took_ms": took_ms,
+            "total_hits": (response.get("hits") or {}).get("total"),
+            **current_run_context(),
+        }
+        body = {key: value for key, value in search_body.items() if key != "profile"}
+        if slow:
+            with self._lock:
+                self.stats["slow"] += 1
+        if sampled and response.get("profile"):
+            self.write(entry, body, response["profile"], "request")
+        elif slow:
+            self._schedule_rerun(es_client, index, body, search_options, entry)
+
+    def _schedule_rerun(self, es_client, index: str, body: dict, search_options: dict, entry: dict) -> None:
+        with self._lock:
+            if self._pending >= self.config.max_pending_reruns:
+                self.stats["dropped"] += 1
+                return
+            self._pending += 1
+
+        def rerun():
+            try:
+                profiled = es_client.search(index=index, body={**body, "profile": True}, **search_options)
+                entry["rerun_took_ms"] = profiled.get("took")
+                self.write(entry, body, profiled.get("profile", {}), "rerun")
+                with self._lock:
+                    self.stats["reruns"] += 1
+            except Exception as e:
+                with self._lock:
+                    self.stats["errors"] += 1
+                logger.warning(f"⚠️ Slow query profile rerun failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+        self._pool.submit(rerun)
+
+    def write(self, entry: Dict[str, Any], body: Dict[str, Any], profile: Dict[str, Any], source: str) -> None:
+        """느린 쿼리 로그에 한 줄(JSON)을 추가합니다."""
+        record = {**entry, "profile_source": source, "profile": summarize_profile(profile), "search_body": body}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        os.makedirs(os.path.dirname(self.config.log_path) or ".", exist_ok=True)
+        with self._write_lock:
+            with open(self.config.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        with self._lock:
+            self.stats["written"] += 1
+        logger.info(
+            f"🐢 ES query profile logged ({record['reason']}, {source}) - took {entry['took_ms']}ms, "
+            f"rewrite {record['profile']['rewrite_ms']}ms, query {record['profile']['query_ms']}ms"
+        )
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """예약된 재실행이 끝날 때까지 기다립니다 (테스트/종료용)."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if self._pending == 0:
+                    return
+            time.sleep(0.01)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.config.enabled,
+            "sample_rate": self.config.sample_rate,
+            "slow_query_ms": self.config.slow_query_ms,
+            "log_path": self.config.log_path,
+            **self.stats,
+        }
@@ -0,0 +1,423 @@
+"""
+Resilience layer for Elasticsearch requests
+
+- Hedged requests: 최근 지연 시간의 백분위수만큼 기다려도 응답이 없으면 같은
+  요청을 한 번 더 보내고 먼저 도착한 응답을 사용합니다.
+- Deadline: 실행(run)의 남은 예산에서 요청별 타임아웃을 계산합니다.
+- Cancellation: 실행이 취소되면 진행 중인 요청을 더 기다리지 않고 즉시 중단합니다.
+- Circuit breaker: 연속 실패 시 일정 시간 동안 요청을 즉시 실패시키거나
+  캐시된 이전 응답(stale) 또는 폴백 백엔드의 응답을 반환합니다.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from elasticsearch import ApiError, ConnectionError as ESConnectionError, ConnectionTimeout
+
+from tools.logging_config import VERBOSE
+
+logger = logging.getLogger(__name__)
+
+# 현재 실행의 절대 마감 시각 (time.time() 기준, None이면 무제한)
+request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+# 현재 실행의 취소 신호 (None이면 취소 불가)
+run_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "run_cancel_event", default=None
+)
+
+# 취소 신호를 확인하는 간격 (초)
+CANCEL_POLL_S = 0.05
+
+
+class CircuitOpenError(Exception):
+    """Circuit breaker가 열려 있어 요청을 보내지 않았을 때 발생합니다."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """실행 예산을 모두 사용해 요청을 보낼 수 없을 때 발생합니다."""
+
+
+class RunCancelledError(Exception):
+    """실행(run)이 취소되어 요청을 중단했을 때 발생합니다."""
+
+
+# 장애로 간주하는 예외 (4xx 등 요청 자체의 오류는 제외)
+TRANSIENT_ERRORS = (ESConnectionError, ConnectionTimeout, TimeoutError)
+# 장애로 간주하는 응답 상태 (5xx 외에 과부하로 거절된 요청)
+TRANSIENT_STATUSES = {429}
+# 요청 타임아웃 예외 (실행 예산 때문에 줄어든 타임아웃으로 끝나면 장애로 세지 않음)
+TIMEOUT_ERRORS = (ConnectionTimeout, TimeoutError)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """서버 장애(연결 오류, 타임아웃, 5xx/429 응답)인지 확인합니다."""
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    if isinstance(error, ApiError):
+        return error.meta.status >= 500 or error.meta.status in TRANSIENT_STATUSES
+    return False
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]):
+    """블록 안에서 실행되는 요청에 마감 시각을 적용합니다."""
+    token = request_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+
+@contextmanager
+def cancel_scope(cancel_event: Optional[threading.Event]):
+    """블록 안에서 실행되는 요청에 취소 신호를 연결합니다."""
+    token = run_cancel_event.set(cancel_event)
+    try:
+        yield
+    finally:
+        run_cancel_event.reset(token)
+
+
+def interruption_reason() -> Optional[str]:
+    """실행을 멈춰야 하면 그 이유("cancelled" / "deadline")를, 아니면 None을 반환합니다."""
+    cancel_event = run_cancel_event.get()
+    if cancel_event is not None and cancel_event.is_set():
+        return "cancelled"
+    deadline = request_deadline.get()
+    if deadline is not None and time.time() >= deadline:
+        return "deadline"
+    return None
+
+
+def check_interrupted(name: str) -> None:
+    """실행이 취소되었거나 마감 시각이 지났으면 예외를 발생시킵니다."""
+    reason = interruption_reason()
+    if reason == "cancelled":
+        raise RunCancelledError(f"{name}: run cancelled")
+    if reason == "deadline":
+        raise DeadlineExceededError(f"{name}: run deadline exceeded (timeout)")
+
+
+class ResilienceConfig:
+    """Resilience settings loaded from environment variables"""
+
+    def __init__(self):
+        self.enabled = os.getenv("ES_RESILIENCE", "true").lower() == "true"
+        self.request_timeout = float(os.getenv("ES_REQUEST_TIMEOUT_S", "10"))
+        self.hedge_enabled = os.getenv("ES_HEDGE", "true").lower() == "true"
+        self.hedge_percentile = float(os.getenv("ES_HEDGE_PERCENTILE", "95"))
+        self.hedge_min_delay = float(os.getenv("ES_HEDGE_MIN_DELAY_MS", "50")) / 1000
+        self.hedge_min_samples = int(os.getenv("ES_HEDGE_MIN_SAMPLES", "20"))
+        self.breaker_failure_threshold = int(os.getenv("ES_BREAKER_FAILURES", "5"))
+        self.breaker_reset_timeout = float(os.getenv("ES_BREAKER_RESET_S", "30"))
+        self.stale_ttl = float(os.getenv("ES_STALE_TTL_S", "600"))
+        self.stale_max_entries = int(os.getenv("ES_STALE_MAX_ENTRIES", "500"))
+        self.pool_size = int(os.getenv("ES_HEDGE_POOL_SIZE", "16"))
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """값 목록의 백분위수 (가장 가까운 위치의 값, 값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))]
+
+
+class LatencyTracker:
+    """최근 요청 지연 시간을 보관하고 백분위수를 계산합니다."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples)
+        return percentile(samples, pct)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    """
+    closed → (연속 실패) → open → (reset_timeout 경과) → half-open → 성공 시 closed
+
+    half-open 상태에서는 시험 요청 하나만 통과시킵니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.time() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.time() - self._opened_at < self.reset_timeout:
+                return False
+            # half-open: 시험 요청 하나만 허용
+            if self._trial_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("✅ Elasticsearch circuit closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """결과를 판단할 수 없이 끝난 시험 요청을 반납합니다 (상태는 그대로, 다음 요청이 시험 요청이 됨)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"🚫 Elasticsearch circuit opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.time()
+
+
+class StaleCache:
+    """마지막으로 성공한 응답을 키별로 보관합니다 (LRU)."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time(), value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                return None
+            return entry[1]
+
+
+class ResilientExecutor:
+    """
+    요청 함수에 hedging, deadline, circuit breaker, stale 응답을 적용합니다.
+
+    요청 함수는 요청별 타임아웃(초)을 인자로 받아야 합니다.
+    """
+
+    def __init__(self, name: str, config: Optional[ResilienceConfig] = None):
+        self.name = name
+        self.config = config or ResilienceConfig()
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(
+            self.config.breaker_failure_threshold, self.config.breaker_reset_timeout
+        )
+        self.stale = StaleCache(self.config.stale_ttl, self.config.stale_max_entries)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.config.pool_size, thread_name_prefix=f"{name}-hedge"
+        )
+        self.stats = {
+            "requests": 0, "hedged": 0, "hedge_wins": 0,
+            "fast_failed": 0, "stale_served": 0, "fallback_served": 0, "cancelled": 0,
+        }
+        # 요청 스레드와 hedge 스레드가 함께 갱신
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _request_timeout(self) -> float:
+        """설정된 타임아웃과 실행의 남은 예산 중 작은 값을 반환합니다."""
+        cancel_event = run_cancel_event.get()
+        if cancel_event is not None and cancel_event.is_set():
+            raise RunCancelledError(f"{self.name}: run cancelled")
+        deadline = request_deadline.get()
+        if deadline is None:
+            return self.config.request_timeout
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"{self.name}: run deadline exceeded (timeout)")
+        return min(self.config.request_timeout, remaining)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.config.hedge_enabled or len(self.latency) < self.config.hedge_min_samples:
+            return None
+        delay = self.latency.percentile(self.config.hedge_percentile)
+        return max(self.config.hedge_min_delay, delay or 0.0)
+
+    def _serve_degraded(
+        self, key: Hashable, reason: Exception, fallback: Optional[Callable[[], Any]]
+    ) -> Tuple[Any, str]:
+        """stale 응답, 폴백 응답 순으로 대체 응답을 찾고, 없으면 원래 예외를 발생시킵니다."""
+        cached = self.stale.get(key)
+        if cached is not None:
+            self._count("stale_served")
+            logger.warning("♻️ [%s] Serving stale response for %s: %s", self.name, key, reason)
+            return cached, "stale"
+        if fallback is not None:
+            self._count("fallback_served")
+            logger.warning("🛟 [%s] Serving fallback response for %s: %s", self.name, key, reason)
+            return fallback(), "fallback"
+        raise reason
+
+    def _run(self, fn: Callable[[float], Any], timeout: float, hedge: bool = True) -> Any:
+        """
+        주 요청을 보내고, 지연되면 hedge 요청을 추가로 보내 먼저 끝난 결과를 사용합니다.
+
+        실행에 취소 신호가 있으면 요청을 풀에서 실행하며 기다리는 동안 신호를 확인하고,
+        취소되면 응답을 버리고 바로 RunCancelledError를 발생시킵니다 (남은 요청은
+        요청별 타임아웃 안에 끝남).
+        """
+        cancel_event = run_cancel_event.get()
+        hedge_delay = self._hedge_delay() if hedge else None
+        if hedge_delay is not None and hedge_delay >= timeout:
+            hedge_delay = None
+        if hedge_delay is None and cancel_event is None:
+            return fn(timeout)
+
+        started = time.time()
+        pending = {self._pool.submit(fn, timeout)}
+        hedge_future = None
+        error: Optional[BaseException] = None
+        while pending:
+            wait_timeout = CANCEL_POLL_S if cancel_event is not None else None
+            if hedge_future is None and hedge_delay is not None:
+                until_hedge = max(0.0, started + hedge_delay - time.time())
+                wait_timeout = until_hedge if wait_timeout is None else min(wait_timeout, until_hedge)
+            done, pending = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge_future:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+
+            if cancel_event is not None and cancel_event.is_set():
+                for future in pending:
+                    future.cancel()
+                self._count("cancelled")
+                logger.info("⏹️ [%s] Run cancelled - abandoned %d in-flight request(s)", self.name, len(pending), extra=VERBOSE)
+                raise RunCancelledError(f"{self.name}: run cancelled")
+
+            if pending and hedge_future is None and hedge_delay is not None and time.time() - started >= hedge_delay:
+                self._count("hedged")
+                logger.info("🏁 [%s] Hedging request after %.0fms", self.name, hedge_delay * 1000, extra=VERBOSE)
+                hedge_future = self._pool.submit(fn, max(0.001, timeout - (time.time() - started)))
+                pending.add(hedge_future)
+        raise error
+
+    def call(
+        self,
+        key: Hashable,
+        fn: Callable[[float], Any],
+        hedge: bool = True,
+        fallback: Optional[Callable[[], Any]] = None,
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        요청을 실행합니다.
+
+        Args:
+            key: stale 응답 캐시 키
+            fn: 요청별 타임아웃을 받아 요청을 수행하는 함수
+            hedge: hedged request 사용 여부
+            fallback: 장애 시 stale 응답도 없을 때 사용할 대체 요청 함수
+
+        Returns:
+            (응답, 대체 응답 종류: None / "stale" / "fallback")
+        """
+        self._count("requests")
+
+        if not self.breaker.allow_request():
+            self._count("fast_failed")
+            return self._serve_degraded(key, CircuitOpenError(f"{self.name}: circuit open"), fallback)
+
+        try:
+            timeout = self._request_timeout()
+        except DeadlineExceededError as e:
+            # 요청을 보내지 않았으므로 half-open 시험 요청도 반납
+            self.breaker.release_trial()
+            return self._serve_degraded(key, e, fallback)
+        except RunCancelledError:
+            self.breaker.release_trial()
+            raise
+        # 실행 예산 때문에 설정값보다 짧아진 타임아웃
+        budget_limited = timeout < self.config.request_timeout
+
+        start = time.time()
+        try:
+            response = self._run(fn, timeout, hedge)
+        except RunCancelledError:
+            # 취소는 서버 장애가 아니므로 circuit breaker와 대체 응답에 반영하지 않음 (시험 요청만 반납)
+            self.breaker.release_trial()
+            raise
+        except Exception as e:
+            if not is_transient_error(e):
+                # 요청 자체의 오류 (잘못된 쿼리 등 4xx)는 서버 장애로 보지 않음 (시험 요청만 반납)
+                self.breaker.release_trial()
+                raise
+            if budget_limited and isinstance(e, TIMEOUT_ERRORS):
+                # 남은 예산이 부족해 끊긴 요청은 서버 장애로 보지 않음
+                self.breaker.release_trial()
+            else:
+                self.breaker.record_failure()
+            return self._serve_degraded(key, e, fallback)
+
+        self.latency.record(time.time() - start)
+        self.breaker.record_success()
+        self.stale.put(key, response)
+        return response, None
+
+    def get_stats(self) -> Dict[str, Any]:
+        p50 = self.latency.percentile(50)
+        p99 = self.latency.percentile(99)
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "breaker": self.breaker.state,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+        }
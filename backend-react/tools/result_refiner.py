@@ -0,0 +1,214 @@
+"""
+Refinement tool over previously retrieved search results
+
+이전 턴에서 가져온 검색 결과(AgentState.search_hits)를 Elasticsearch에 다시
+질의하지 않고 메모리에서 필터링, 정렬, 그룹화합니다.
+"""
+import logging
+from collections import Counter, OrderedDict
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+from langchain_core.tools import tool
+from langgraph.prebuilt import InjectedState
+from pydantic import BaseModel, Field
+
+from tools.elasticsearch_tool import ElasticsearchConfig, publish_search_results, render_hits
+from tools.logging_config import VERBOSE
+from tools.token_budget import allocate_by_score, count_tokens, current_budget
+
+logger = logging.getLogger(__name__)
+
+# 캐시 요약에 표시할 필드별 최대 값 개수
+SUMMARY_VALUES_LIMIT = 10
+
+
+def _matches(source: Dict[str, Any], filters: Dict[str, str]) -> bool:
+    """모든 필터 조건을 만족하는지 확인합니다 (대소문자 무시 부분 일치)."""
+    for field, expected in filters.items():
+        value = source.get(field)
+        if value is None:
+            return False
+        if str(expected).strip().lower() not in str(value).lower():
+            return False
+    return True
+
+
+def _sort_key(hit: Dict[str, Any], sort_by: str):
+    """정렬 키를 생성합니다. 숫자 필드는 숫자로 비교합니다."""
+    if sort_by == "score":
+        return (0, hit.get("score", 0.0))
+    value = hit["source"].get(sort_by)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    try:
+        return (0, float(value))
+    except (TypeError, ValueError):
+        return (1, str(value) if value is not None else "")
+
+
+def refine_hits(
+    hits: List[Dict[str, Any]],
+    filters: Optional[Dict[str, str]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = True,
+    group_by: Optional[str] = None,
+    limit: int = 10,
+    index: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], "OrderedDict[str, List[Dict[str, Any]]]"]:
+    """
+    캐시된 검색 결과를 필터링, 정렬, 그룹화합니다.
+
+    Args:
+        hits: 구조화된 검색 결과 목록
+        filters: 필드별 필터 조건
+        sort_by: 정렬 기준 필드 (미지정 시 점수)
+        descending: 내림차순 여부
+        group_by: 그룹화 기준 필드
+        limit: 반환할 최대 결과 수 (그룹화 시 그룹당 최대 수)
+        index: 특정 인덱스의 결과만 사용
+
+    Returns:
+        (정렬된 결과 목록, 그룹별 결과)
+    """
+    filters = filters or {}
+    candidates = [
+        hit for hit in hits
+        if (index is None or hit.get("index") == index) and _matches(hit["source"], filters)
+    ]
+    candidates.sort(key=lambda hit: _sort_key(hit, sort_by or "score"), reverse=descending)
+
+    groups: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+    if group_by:
+        for hit in candidates:
+            key = str(hit["source"].get(group_by, "N/A"))
+            groups.setdefault(key, []).append(hit)
+        for key in groups:
+            groups[key] = groups[key][:limit]
+        return candidates, groups
+
+    return candidates[:limit], groups
+
+
+def summarize_hits(hits: List[Dict[str, Any]], fields: Tuple[str, ...] = ("차종", "시스템")) -> str:
+    """
+    캐시된 검색 결과를 플래너 프롬프트용으로 요약합니다.
+
+    Returns:
+        캐시 요약 문자열 (결과가 없으면 빈 문자열)
+    """
+    if not hits:
+        return ""
+
+    indices = Counter(hit.get("index", "") for hit in hits)
+    queries = list(OrderedDict.fromkeys(hit.get("query") for hit in hits if hit.get("query")))
+
+    lines = [f"이전 검색 결과 {len(hits)}건이 캐시되어 있습니다."]
+    lines.append("- 인덱스: " + ", ".join(f"{name}({count}건)" for name, count in indices.items()))
+    if queries:
+        lines.append("- 검색어: " + ", ".join(f"'{q}'" for q in queries[-5:]))
+    for field in fields:
+        values = Counter(
+            str(hit["source"][field]) for hit in hits if field in hit.get("source", {})
+        )
+        if values:
+            top_values = [value for value, _ in values.most_common(SUMMARY_VALUES_LIMIT)]
+            lines.append(f"- {field}: " + ", ".join(top_values))
+    return "\n".join(lines)
+
+
+class RefineInput(BaseModel):
+    """Input schema for refinement tool"""
+    filters: Dict[str, str] = Field(
+        default_factory=dict,
+        description="필드별 필터 조건 (부분 일치, 예: {\"차종\": \"K5\", \"시스템\": \"브레이크\"})"
+    )
+    sort_by: Optional[str] = Field(default=None, description="정렬 기준 필드 (미지정 시 점수)")
+    descending: bool = Field(default=True, description="내림차순 정렬 여부")
+    group_by: Optional[str] = Field(default=None, description="그룹화 기준 필드 (예: 차종, 시스템)")
+    limit: int = Field(default=10, description="반환할 최대 결과 수 (그룹화 시 그룹당)")
+    index: Optional[str] = Field(default=None, description="특정 인덱스의 이전 결과만 사용")
+    fallback_query: Optional[str] = Field(
+        default=None,
+        description="이전 결과로 답할 수 없을 때 Elasticsearch에서 새로 검색할 검색어"
+    )
+    hits: Annotated[List[Dict[str, Any]], InjectedState("search_hits")]
+
+
+@tool("refine_search_results", args_schema=RefineInput, response_format="content_and_artifact")
+def refine_search_results(
+    hits: List[Dict[str, Any]],
+    filters: Optional[Dict[str, str]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = True,
+    group_by: Optional[str] = None,
+    limit: int = 10,
+    index: Optional[str] = None,
+    fallback_query: Optional[str] = None,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    이전 턴의 검색 결과를 Elasticsearch 재검색 없이 필터링, 정렬, 그룹화합니다.
+    이전 결과로 답할 수 있는 후속 질문에는 이 도구를 먼저 사용하세요.
+
+    Args:
+        hits: 에이전트 상태에 저장된 이전 검색 결과 (자동 주입)
+        filters: 필드별 필터 조건
+        sort_by: 정렬 기준 필드
+        descending: 내림차순 여부
+        group_by: 그룹화 기준 필드
+        limit: 반환할 최대 결과 수
+        index: 특정 인덱스의 결과만 사용
+        fallback_query: 결과가 없을 때 새로 검색할 검색어
+
+    Returns:
+        (정제된 결과 문자열, 정제된 결과 목록)
+    """
+    filters = filters or {}
+    logger.info("🧹 Refining %d cached hits - Filters: %s, Sort: %s, Group: %s", len(hits), filters, sort_by, group_by, extra=VERBOSE)
+
+    matched, groups = refine_hits(hits, filters, sort_by, descending, group_by, limit, index)
+
+    if not matched:
+        logger.info("🔍 No cached hits matched the refinement")
+        return "🔍 이전 검색 결과에서 조건에 맞는 항목이 없습니다.", []
+
+    config = ElasticsearchConfig()
+
+    def result_format(hit: Dict[str, Any]) -> dict:
+        return config.index_configs.get(hit.get("index"), {}).get("result_format", {})
+
+    filter_text = ", ".join(f"{field}={value}" for field, value in filters.items()) or "없음"
+    results = [f"🧹 이전 검색 결과 정제 (필터: {filter_text}, {len(matched)}개):\n"]
+    # 결과 텍스트는 이번 도구 호출의 토큰 예산 안에서 렌더링 (헤더 포함)
+    budget = current_budget(config.result_token_budget) - count_tokens(results[0])
+
+    if groups:
+        rendered = []
+        group_texts = [f"\n### {group_by}: {key} ({len(group_hits)}개)\n" for key, group_hits in groups.items()]
+        budget -= count_tokens("".join(group_texts))
+        # 그룹별 예산은 그룹 내 점수 합 비율로 배정
+        group_budgets = allocate_by_score(
+            [sum(hit.get("score", 0.0) for hit in group_hits) for group_hits in groups.values()], budget
+        )
+        for group_text, group_hits, group_budget in zip(group_texts, groups.values(), group_budgets):
+            ranked = [{**hit, "rank": len(rendered) + offset} for offset, hit in enumerate(group_hits, 1)]
+            rendered.extend(group_hits)
+            results.append(group_text)
+            results.append(render_hits(ranked, result_format, group_budget))
+    else:
+        rendered = matched
+        ranked = [{**hit, "rank": rank} for rank, hit in enumerate(matched, 1)]
+        results.append(render_hits(ranked, result_format, budget))
+
+    search_metadata = {
+        "total_hits": len(matched),
+        "returned_hits": len(rendered),
+        "index": index or ", ".join(OrderedDict.fromkeys(hit.get("index", "") for hit in rendered)),
+        "query": filter_text,
+        "results": [{**hit, "rank": rank} for rank, hit in enumerate(rendered, 1)]
+    }
+
+    publish_search_results(search_metadata)
+    return "".join(results), rendered
+
+
+__all__ = ["refine_search_results", "refine_hits", "summarize_hits"]
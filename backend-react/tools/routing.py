@@ -0,0 +1,58 @@
+"""
+Custom routing values for search queries
+
+라우팅 필드로 색인한 인덱스(vehicle_issues의 제조사)는 질문이 분명히 한 값만 가리킬 때
+그 값을 routing으로 넘겨 해당 샤드만 검색합니다. 여러 값이 보이거나 아무 값도 없으면
+None을 반환하고 검색 도구는 전체 샤드를 검색합니다.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+from tools.bm25_engine import tokenize
+from tools.vehicle_catalog import MODEL_ALIASES, VEHICLES
+
+# 차종/제조사명 뒤에 붙는 조사 (예: "K5의", "쏘나타에서", "기아차")
+PARTICLE_PATTERN = re.compile(r"(?:의|은|는|이|가|을|를|에|에서|와|과|도|만|랑|이랑|하고|로|으로|차)")
+
+
+@lru_cache(maxsize=1)
+def manufacturer_terms() -> Dict[str, str]:
+    """제조사명, 차종명(영문/한글 별칭, 소문자) → 제조사"""
+    terms = {}
+    model_makers = {}
+    for manufacturer, models in VEHICLES.items():
+        terms[manufacturer.lower()] = manufacturer
+        for model in models:
+            terms[model.lower()] = manufacturer
+            model_makers[model] = manufacturer
+    for alias, model in MODEL_ALIASES.items():
+        terms[alias.lower()] = model_makers[model]
+    return terms
+
+
+def detect_manufacturer(query: str) -> Optional[str]:
+    """질문이 한 제조사만 가리키면 그 제조사를 반환합니다 (없거나 둘 이상이면 None)."""
+    terms = manufacturer_terms()
+    found = set()
+    for token in tokenize(query):
+        if token in terms:
+            found.add(terms[token])
+            continue
+        for term, manufacturer in terms.items():
+            if token.startswith(term) and PARTICLE_PATTERN.fullmatch(token[len(term):]):
+                found.add(manufacturer)
+                break
+    return found.pop() if len(found) == 1 else None
+
+
+# 라우팅 필드 → 질문에서 라우팅 값을 찾는 함수
+ROUTING_DETECTORS: Dict[str, Callable[[str], Optional[str]]] = {
+    "제조사": detect_manufacturer,
+}
+
+
+def detect_routing(routing_field: str, query: str) -> Optional[str]:
+    """인덱스의 라우팅 필드에 맞는 라우팅 값을 질문에서 찾습니다."""
+    detector = ROUTING_DETECTORS.get(routing_field)
+    return detector(query) if detector else None
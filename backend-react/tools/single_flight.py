@@ -0,0 +1,201 @@
+"""
+Single-flight request coalescing for identical concurrent searches
+
+같은 키로 동시에 들어온 호출은 진행 중인 하나의 요청을 기다렸다가 그 응답을
+공유합니다. 스레드 풀 호출자(do)와 asyncio 호출자(ado)가 같은 진행 중
+요청을 공유할 수 있도록 concurrent.futures.Future를 사용합니다.
+
+asyncio 호출자의 요청은 별도 태스크로 실행되어, 기다리던 호출 하나가 취소되어도
+공유 요청은 계속 진행되고 기다리는 호출이 모두 떠났을 때만 취소됩니다.
+"""
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import Future, wait
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, Union
+
+from tools.logging_config import VERBOSE
+from tools.resilience import CANCEL_POLL_S, RunCancelledError, run_cancel_event
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_search_key(index: str, query: str, size: int) -> Tuple[str, str, int]:
+    """
+    검색 키를 정규화합니다 (공백 정리).
+
+    대소문자는 그대로 둡니다. 검색 분석기에 따라 대소문자가 결과에 영향을 줄 수 있어
+    다른 질의를 같은 요청으로 합치지 않도록 합니다.
+    """
+    return (index, " ".join(query.split()), int(size))
+
+
+class SingleFlight:
+    """
+    동일 키의 동시 호출을 하나의 실행으로 합칩니다.
+
+    Attributes:
+        name: 통계 로그에 표시할 이름
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        # 진행 중인 요청별 기다리는 호출 수 (리더 포함)
+        self._waiters: Dict[Future, int] = {}
+        # asyncio 리더가 시작한 요청 태스크 (모든 호출이 취소되면 취소)
+        self._tasks: Dict[Future, asyncio.Task] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def _acquire(self, key: Hashable) -> Tuple[Future, bool]:
+        """진행 중인 요청을 찾거나 새로 등록합니다. (future, leader 여부)를 반환합니다."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                self._waiters[future] += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self._waiters[future] = 1
+            self._executed += 1
+            return future, True
+
+    def _release(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _leave(self, key: Hashable, future: Future) -> int:
+        """기다림을 끝낸 호출을 빼고 남은 호출 수를 반환합니다 (0이면 새 호출과 공유하지 않음)."""
+        with self._lock:
+            remaining = self._waiters.get(future, 1) - 1
+            if remaining > 0:
+                self._waiters[future] = remaining
+                return remaining
+            self._waiters.pop(future, None)
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            return 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        스레드 호출자용: 같은 키의 요청이 진행 중이면 그 결과를 기다려 공유합니다.
+
+        Args:
+            key: 정규화된 요청 키
+            fn: 실제 요청을 수행하는 함수
+
+        Returns:
+            fn의 반환값 (리더와 대기자가 같은 객체를 공유)
+        """
+        while True:
+            future, is_leader = self._acquire(key)
+            if is_leader:
+                break
+            logger.info("🤝 [%s] Coalesced in-flight request: %s", self.name, key, extra=VERBOSE)
+            try:
+                return self._wait(future)
+            except RunCancelledError:
+                cancel_event = run_cancel_event.get()
+                if cancel_event is not None and cancel_event.is_set():
+                    raise
+                # 리더의 실행만 취소된 경우: 이 호출이 직접 요청
+                logger.info("🔁 [%s] Leader run cancelled, retrying: %s", self.name, key, extra=VERBOSE)
+            finally:
+                self._leave(key, future)
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._release(key, future)
+            self._leave(key, future)
+        return future.result()
+
+    @staticmethod
+    def _wait(future: Future) -> Any:
+        """리더의 결과를 기다립니다 (이 호출의 실행이 취소되면 기다림을 중단)."""
+        cancel_event = run_cancel_event.get()
+        if cancel_event is None:
+            return future.result()
+        while not wait([future], timeout=CANCEL_POLL_S).done:
+            if cancel_event.is_set():
+                raise RunCancelledError("single-flight wait cancelled")
+        return future.result()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Union[Awaitable[Any], Any]]) -> Any:
+        """
+        asyncio 호출자용: do()와 같지만 이벤트 루프를 막지 않고 기다립니다.
+
+        Args:
+            key: 정규화된 요청 키
+            fn: 코루틴 함수 또는 동기 함수 (동기 함수는 스레드에서 실행)
+
+        Returns:
+            fn의 반환값
+        """
+        future, is_leader = self._acquire(key)
+        if is_leader:
+            with self._lock:
+                self._tasks[future] = asyncio.ensure_future(self._run(key, future, fn))
+        else:
+            logger.info("🤝 [%s] Coalesced in-flight request: %s", self.name, key, extra=VERBOSE)
+        left = False
+        try:
+            # 이 호출이 취소되어도 공유 요청은 계속 진행되도록 shield
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            left = True
+            if self._leave(key, future) == 0:
+                # 기다리는 호출이 모두 취소됨: 공유 요청도 취소
+                logger.info("🛑 [%s] All waiters cancelled, cancelling request: %s", self.name, key, extra=VERBOSE)
+                future.cancel()
+                with self._lock:
+                    task = self._tasks.get(future)
+                if task is not None:
+                    task.get_loop().call_soon_threadsafe(task.cancel)
+            raise
+        finally:
+            if not left:
+                self._leave(key, future)
+
+    async def _run(self, key: Hashable, future: Future, fn: Callable[[], Union[Awaitable[Any], Any]]) -> None:
+        """리더 태스크: 요청을 실행해 결과를 공유 Future에 넣습니다."""
+        try:
+            if inspect.iscoroutinefunction(fn):
+                result = await fn()
+            else:
+                result = await asyncio.to_thread(fn)
+            if not future.cancelled():
+                future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            if not future.cancelled():
+                future.set_exception(e)
+        finally:
+            self._release(key, future)
+            with self._lock:
+                self._tasks.pop(future, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """실행/합쳐진 호출 수 통계를 반환합니다."""
+        with self._lock:
+            total = self._executed + self._coalesced
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._in_flight),
+                "saved_ratio": round(self._coalesced / total, 3) if total else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._executed = 0
+            self._coalesced = 0
@@ -0,0 +1,112 @@
+"""
+Token budget for search results in the answer prompt
+
+답변 프롬프트에 들어가는 검색 결과의 크기를 토큰 단위로 제한합니다.
+
+- 토큰 수는 모델 토크나이저(tiktoken)로 계산하며, 인코딩은 한 번만 로드해 재사용합니다.
+  토크나이저를 로드할 수 없으면(오프라인 등) 문자 종류 기반 추정치를 사용합니다.
+- 한 턴의 예산은 call_tools가 도구 호출 사이에 나누고, 각 도구는 받은 예산을
+  점수 비율로 결과에 나눕니다.
+"""
+import contextvars
+import logging
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_MODEL = os.getenv("TOKEN_BUDGET_MODEL", "gpt-4o-mini")
+
+# 현재 도구 호출에 배정된 결과 토큰 예산 (None이면 도구 기본값 사용)
+result_token_budget: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "result_token_budget", default=None
+)
+
+
+@contextmanager
+def budget_scope(tokens: Optional[int]):
+    """블록 안에서 실행되는 도구에 결과 토큰 예산을 적용합니다."""
+    token = result_token_budget.set(tokens)
+    try:
+        yield
+    finally:
+        result_token_budget.reset(token)
+
+
+def current_budget(default: int) -> int:
+    """현재 도구 호출의 결과 토큰 예산을 반환합니다."""
+    budget = result_token_budget.get()
+    return default if budget is None else budget
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    """tiktoken 인코딩을 로드합니다 (실패 시 None, 결과는 캐시됨)."""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(TOKENIZER_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ Tokenizer unavailable, using estimated token counts: {e}")
+        return None
+
+
+def _estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 추정합니다 (ASCII 약 4자당 1토큰, 한글 등은 1자당 1토큰)."""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def count_tokens(text: str) -> int:
+    """문자열의 토큰 수를 계산합니다."""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return _estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, suffix: str = "...") -> str:
+    """문자열을 max_tokens 이하로 자릅니다 (잘렸으면 suffix 추가, suffix 토큰도 max_tokens에 포함)."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens - count_tokens(suffix)
+    encoding = get_encoding()
+    while limit > 0:
+        if encoding is not None:
+            # 토큰 경계에서 잘린 멀티바이트 문자는 제거
+            truncated = encoding.decode(encoding.encode(text, disallowed_special=())[:limit]).rstrip("�")
+        else:
+            truncated = text
+            while truncated and _estimate_tokens(truncated) > limit:
+                truncated = truncated[: max(0, len(truncated) - max(1, len(truncated) // 8))]
+        result = truncated.rstrip() + suffix
+        # 자른 끝과 suffix가 합쳐지며 토큰 수가 달라질 수 있으므로 다시 확인
+        if count_tokens(result) <= max_tokens:
+            return result
+        limit -= 1
+    return ""
+
+
+def allocate_by_score(scores: List[float], budget: int) -> List[int]:
+    """
+    예산을 점수 비율로 나눕니다.
+
+    Returns:
+        결과별 토큰 예산 (합계는 budget 이하)
+    """
+    if not scores:
+        return []
+    weights = [max(score, 0.0) for score in scores]
+    total = sum(weights)
+    if total <= 0:
+        return [budget // len(scores)] * len(scores)
+    return [int(budget * weight / total) for weight in weights]
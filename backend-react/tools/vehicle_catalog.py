@@ -0,0 +1,23 @@
+"""
+Vehicle manufacturer / model catalog
+
+데이터 생성 스크립트(generate_vehicle_data)와 런타임 코드(인텐트 라우터, 제조사 라우팅)가
+함께 쓰는 제조사별 차종 목록과 차종 한글 이름 별칭입니다.
+"""
+
+# 제조사 → 차종 (데이터의 제조사/차종 값)
+VEHICLES = {
+    "현대": ["Sonata", "Avante", "Grandeur", "Tucson", "SantaFe", "Kona", "Venue", "Palisade"],
+    "기아": ["K3", "K5", "K7", "K8", "Sportage", "Sorento", "Carnival", "Seltos", "Niro"],
+    "제네시스": ["G70", "G80", "G90", "GV70", "GV80"],
+    "쌍용": ["Tivoli", "Korando", "Rexton"],
+    "르노삼성": ["SM6", "QM6", "XM3"]
+}
+
+# 차종 한글 이름 → 데이터의 차종 값
+MODEL_ALIASES = {
+    "쏘나타": "Sonata", "아반떼": "Avante", "그랜저": "Grandeur", "투싼": "Tucson",
+    "싼타페": "SantaFe", "코나": "Kona", "베뉴": "Venue", "팰리세이드": "Palisade",
+    "스포티지": "Sportage", "쏘렌토": "Sorento", "카니발": "Carnival", "셀토스": "Seltos",
+    "니로": "Niro", "티볼리": "Tivoli", "코란도": "Korando", "렉스턴": "Rexton",
+}
@@ -23,6 +23,7 @@ import { useAppStore } from "@/store/app-store";
 import { useNetworkStatus } from "@/hooks/use-network-status";
 import { reactModeCache } from "@/lib/cache";
 import { logger } from "@/lib/logger";
+import type { SearchMetadata } from "@/lib/types";
 import {
   createLangGraphClient,
   createThread,
@@ -41,6 +42,7 @@ export default function Home() {
   const scrollRef = useRef<HTMLDivElement>(null);
   const abortControllerRef = useRef<AbortController | null>(null);
   const [streamingContent, setStreamingContent] = useState<string>("");
+  const [streamingSearchResults, setStreamingSearchResults] = useState<SearchMetadata[]>([]);
   const updateTimerRef = useRef<NodeJS.Timeout | null>(null);
   const [researchStage, setResearchStage] = useState<ResearchStage | null>(null);
   const [intermediateResults, setIntermediateResults] = useState<Record<string, any>>({});
@@ -569,9 +571,12 @@ export default function Home() {
 
       // Initialize streaming state
       setStreamingContent("");
+      setStreamingSearchResults([]);
       setIntermediateResults({}); // Clear intermediate results for new message
       setCompletedStages([]); // Clear completed stages
       let bufferContent = "";
+      let suggestedQuestions: string[] | undefined; // 답변과 병렬로 생성되는 후속 질문
+      const streamedSearchResults: SearchMetadata[] = []; // 검색이 끝날 때마다 도착하는 구조화된 결과
       sourcesRef.current.clear(); // Clear sources for new message
 
       // 경과 시간 추적 시작
@@ -892,6 +897,22 @@ export default function Home() {
 
             // Also check the entire chunk data for sources
             extractSourcesFromData(chunk.data);
+
+            if (Array.isArray(chunk.data?.suggested_questions) && chunk.data.suggested_questions.length > 0) {
+              suggestedQuestions = chunk.data.suggested_questions;
+            }
+          } else if (chunk.event === "custom") {
+            // 그래프 노드가 직접 보내는 이벤트 (후속 질문 등)
+            if (chunk.data?.type === "suggested_questions" && Array.isArray(chunk.data.questions)) {
+              suggestedQuestions = chunk.data.questions;
+            } else if (chunk.data?.type === "search_results" && Array.isArray(chunk.data.results)) {
+              // 답변 생성 전에 결과 테이블을 바로 표시
+              streamedSearchResults.push(chunk.data as SearchMetadata);
+              setStreamingSearchResults([...streamedSearchResults]);
+            } else if (chunk.data?.type === "answer_metrics") {
+              // 답변 스트리밍 측정값 (첫 토큰 지연, 초당 토큰, 토큰 간 간격)
+              logger.info('API', 'Answer stream metrics', chunk.data);
+            }
           } else if (chunk.event === "updates") {
             // Handle updates event - check if there are messages with content
             const updateData = chunk.data;
@@ -982,6 +1003,7 @@ export default function Home() {
       if (bufferContent) {
         // Clear streaming state
         setStreamingContent("");
+        setStreamingSearchResults([]);
         setIntermediateResults({}); // Clear intermediate results
 
         // Collect sources
@@ -1009,7 +1031,9 @@ export default function Home() {
           role: "assistant",
           content: bufferContent,
           duration,
-          sources: sources.length > 0 ? sources : undefined
+          sources: sources.length > 0 ? sources : undefined,
+          suggestedQuestions,
+          searchResults: streamedSearchResults.length > 0 ? streamedSearchResults : undefined,
         });
         updateThreadMetadata(threadId, "assistant", bufferContent);
 
@@ -1097,6 +1121,7 @@ export default function Home() {
         elapsedTimeIntervalRef.current = null;
       }
       setStreamingContent("");
+      setStreamingSearchResults([]);
       setResearchStage(null);
       setIntermediateResults({}); // Clear intermediate results
       setCompletedStages([]); // Clear completed stages
@@ -1340,7 +1365,8 @@ export default function Home() {
                     <ChatMessage
                       message={{
                         role: "assistant",
-                        content: streamingContent
+                        content: streamingContent,
+                        searchResults: streamingSearchResults,
                       }}
                       researchStage={researchStage}
                       isStreaming={true}
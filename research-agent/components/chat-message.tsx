@@ -26,21 +26,7 @@ import {
 import type { Message } from "@/lib/types";
 import { cn } from "@/lib/utils";
 
-// Extract search results JSON from message content
-function extractSearchResults(content: string): any | null {
-  const regex = /```json:search_results\n([\s\S]*?)\n```/;
-  const match = content.match(regex);
-  if (!match || !match[1]) return null;
-
-  try {
-    return JSON.parse(match[1]);
-  } catch (error) {
-    console.error("Failed to parse search results JSON:", error);
-    return null;
-  }
-}
-
-// Remove search results JSON block from content
+// Remove search results JSON block left in content by older backend versions
 function removeSearchResultsBlock(content: string): string {
   return content.replace(/```json:search_results\n[\s\S]*?\n```/g, '').trim();
 }
@@ -127,9 +113,12 @@ export const ChatMessage = memo(function ChatMessage({
   const isUser = message.role === "user";
 
   // Extract suggested questions, conclusion, and search results from assistant messages
-  const suggestedQuestions = !isUser ? extractSuggestedQuestions(message.content) : [];
+  // 후속 질문은 별도 이벤트로 전달됨 (이전 메시지는 본문의 질문 섹션에서 추출)
+  const inlineQuestions = !isUser ? extractSuggestedQuestions(message.content) : [];
+  const suggestedQuestions = message.suggestedQuestions ?? inlineQuestions;
   const conclusion = !isUser ? extractConclusion(message.content) : null;
-  const searchResults = !isUser ? extractSearchResults(message.content) : null;
+  // 검색 결과는 custom 스트림 이벤트로 전달됨 (검색이 끝나는 즉시 표시)
+  const searchResults = !isUser ? message.searchResults ?? [] : [];
 
   // Remove conclusion, suggested questions, and search results sections from main content
   let displayContent = message.content;
@@ -137,12 +126,10 @@ export const ChatMessage = memo(function ChatMessage({
     if (conclusion) {
       displayContent = removeConclusionSection(displayContent);
     }
-    if (suggestedQuestions.length > 0) {
+    if (inlineQuestions.length > 0) {
       displayContent = removeSuggestedQuestionsSection(displayContent);
     }
-    if (searchResults) {
-      displayContent = removeSearchResultsBlock(displayContent);
-    }
+    displayContent = removeSearchResultsBlock(displayContent);
   }
 
   // 이스케이프된 줄바꿈 문자를 실제 줄바꿈으로 변환
@@ -344,9 +331,9 @@ export const ChatMessage = memo(function ChatMessage({
                 <SourceCitation sources={message.sources} />
               )}
               {/* Search Results Table */}
-              {!isUser && searchResults && !isStreaming && (
-                <SearchResultsTable metadata={searchResults} />
-              )}
+              {searchResults.map((metadata, i) => (
+                <SearchResultsTable key={`${metadata.index}-${metadata.query}-${i}`} metadata={metadata} />
+              ))}
               {/* Conclusion Card */}
               {!isUser && conclusion && !isStreaming && (
                 <div className="mt-4">
@@ -5,25 +5,9 @@ import { Database, ChevronDown, ChevronUp, ChevronLeft, ChevronRight, Eye } from
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
+import type { SearchMetadata } from "@/lib/types";
 import { cn } from "@/lib/utils";
 
-interface SearchResultData {
-  rank: number;
-  score: number;
-  index: string;
-  id: string;
-  source: Record<string, any>;
-  format_type: string;
-}
-
-interface SearchMetadata {
-  total_hits: number;
-  returned_hits: number;
-  index: string;
-  query: string;
-  results: SearchResultData[];
-}
-
 interface SearchResultsTableProps {
   metadata: SearchMetadata;
   className?: string;
@@ -62,7 +46,11 @@ export const SearchResultsTable = memo(function SearchResultsTable({
     return String(value);
   };
 
-  const getMainFields = (source: Record<string, any>, formatType: string) => {
+  const getMainFields = (
+    source: Record<string, any>,
+    formatType: string,
+    highlight?: Record<string, string[]>
+  ) => {
     if (formatType === "vehicle") {
       return {
         title: [source.car_model, source.system, source.issue].filter(Boolean).join(" - ") || "N/A",
@@ -71,7 +59,11 @@ export const SearchResultsTable = memo(function SearchResultsTable({
     }
     return {
       title: source.title || source.name || "제목 없음",
-      preview: source.content || source.description || "내용 없음",
+      preview:
+        Object.values(highlight ?? {}).flat().join(" … ").replace(/\*\*/g, "") ||
+        source.content ||
+        source.description ||
+        "내용 없음",
     };
   };
 
@@ -123,7 +115,11 @@ export const SearchResultsTable = memo(function SearchResultsTable({
                 </thead>
                 <tbody>
                   {currentResults.map((result) => {
-                    const { title, preview } = getMainFields(result.source, result.format_type);
+                    const { title, preview } = getMainFields(
+                      result.source,
+                      result.format_type,
+                      result.highlight
+                    );
                     const isRowExpanded = expandedRows.has(result.rank);
 
                     return (
@@ -248,7 +248,10 @@ export async function* streamMessage(
     config: {
       configurable: configParams,
     },
-    streamMode: ["updates", "values", "messages"],
+    streamMode: ["updates", "values", "messages", "custom"],
+    // 탭을 닫거나 스트림을 중단하면 서버 실행도 취소, 실행 중 새 메시지는 이전 실행을 중단
+    onDisconnect: "cancel",
+    multitaskStrategy: "interrupt",
     signal: abortSignal, // Pass abort signal to cancel backend execution
   });
 
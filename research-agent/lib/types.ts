@@ -6,6 +6,27 @@ export interface Source {
   snippet?: string;
 }
 
+// Structured search hits streamed from the backend ("search_results" custom event)
+export interface SearchResultData {
+  rank: number;
+  score: number;
+  index: string;
+  id: string;
+  source: Record<string, any>;
+  format_type: string;
+  highlight?: Record<string, string[]>;
+  group_count?: number;
+}
+
+export interface SearchMetadata {
+  total_hits: number;
+  returned_hits: number;
+  index: string;
+  query: string;
+  results: SearchResultData[];
+  weak_search?: boolean;
+}
+
 export interface Feedback {
   rating: number; // 1-5 stars
   comment?: string; // Optional user comment
@@ -20,6 +41,8 @@ export interface Message {
   duration?: number; // Duration in milliseconds for assistant messages
   sources?: Source[]; // Sources/citations used in the response
   feedback?: Feedback; // User feedback for assistant messages (Beta)
+  suggestedQuestions?: string[]; // Follow-up questions generated alongside the answer
+  searchResults?: SearchMetadata[]; // Structured search hits, one entry per search
 }
 
 export interface Thread {